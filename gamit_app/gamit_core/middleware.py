@@ -1,5 +1,5 @@
 from django.utils.deprecation import MiddlewareMixin
-from workflow.models import Persona
+from workflow.personas import PersonaResolver
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,8 +13,8 @@ class PresentationModeMiddleware(MiddlewareMixin):
             role_code = request.session.get('active_demo_role')
             if role_code:
                 try:
-                    # FIX: Filter via role__code
-                    persona = Persona.objects.filter(role__code=role_code, is_active=True).first()
+                    # Cached per role code; invalidated on Persona/Role writes
+                    persona = PersonaResolver.demo_persona(role_code)
                     if persona:
                         request.user.active_demo_role = role_code
                         request.user.demo_persona = persona
@@ -142,6 +142,36 @@ if os.environ.get('DB_NAME') and os.environ.get('DB_HOST'):
     }
 
 
+# Cache (inbox counters, lookups). Per-process memory by default; set REDIS_URL
+# in multi-worker deployments so every worker sees the same counters. Without
+# it, persona and workflow-graph entries fall back to short TTLs (workflow.caching).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'gamit-default',
+    }
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL'),
+    }
+
+# Outbound mail. Workflow notifications are queued in inventory.NotificationOutbox
+# and sent by `manage.py dispatch_notifications` (the gamit_notifications compose
+# service); set EMAIL_BACKEND to the console or file backend (EMAIL_FILE_PATH) to
+# run the dispatcher offline.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False').lower() == 'true'
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', '30'))
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', str(BASE_DIR / 'sent_emails'))
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'noreply@spmo.edu.ph')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -188,6 +218,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Compressed JSONL exports of archived log months (manage.py archive_logs)
+LOG_ARCHIVE_ROOT = os.environ.get('LOG_ARCHIVE_ROOT', os.path.join(BASE_DIR, 'log_archive'))
+
 # --- AUTHENTICATION AND REDIRECTION SETTINGS ---
 # When a user logs in, send them here:
 LOGIN_REDIRECT_URL = 'dashboard'
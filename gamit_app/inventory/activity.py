@@ -0,0 +1,160 @@
+from collections import defaultdict
+from django.db import connection
+from django.db.models import Case, When, Value, F, Q, CharField, IntegerField, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+
+class ActivityFeed:
+    """
+    Queries behind the SPMO activity log (inventory.views.activity_log).
+      - Process monitor: the latest WorkflowMovementLog of each transaction is
+        picked in SQL (ROW_NUMBER() over the transaction key), so only one page
+        of groups is ever loaded; history rows are fetched for that page only.
+      - Live pulse: one UNION ALL over movements, asset edits, registrations and
+        service logs, ordered and limited by the database.
+    """
+
+    # Transaction FK on WorkflowMovementLog -> group type (in precedence order)
+    GROUP_FIELDS = [
+        ('batch', 'batch'),
+        ('transfer', 'transfer'),
+        ('inspection', 'inspect'),
+        ('return_request', 'return'),
+        ('loss_report', 'loss'),
+        ('clearance', 'clear'),
+    ]
+    SYSTEM_GROUP = 'sys'
+    PULSE_SIZE = 25
+
+    @staticmethod
+    def with_group_key(logs):
+        """Annotates `group_type` / `group_ref` (the parent transaction; system logs are their own group)."""
+        return logs.annotate(
+            group_type=Case(
+                *[When(**{f"{field}__isnull": False}, then=Value(code)) for field, code in ActivityFeed.GROUP_FIELDS],
+                default=Value(ActivityFeed.SYSTEM_GROUP),
+                output_field=CharField(),
+            ),
+            group_ref=Coalesce(
+                *[F(f"{field}_id") for field, _ in ActivityFeed.GROUP_FIELDS], F('id'),
+                output_field=IntegerField(),
+            ),
+        )
+
+    @staticmethod
+    def latest_per_transaction(logs):
+        """One row per transaction (its newest movement), newest first. Paginate this queryset directly."""
+        keyed = ActivityFeed.with_group_key(logs)
+        return keyed.annotate(
+            group_rank=Window(
+                RowNumber(),
+                partition_by=[F('group_type'), F('group_ref')],
+                order_by=[F('timestamp').desc(), F('id').desc()],
+            )
+        ).filter(group_rank=1).order_by('-timestamp', '-id')
+
+    @staticmethod
+    def groups(logs, latest_rows):
+        """
+        Builds the template groups ({'latest', 'history', 'type'}) for one page of
+        `latest_rows`; the older movements come from a single query over `logs`.
+        """
+        latest_rows = list(latest_rows)
+        refs = defaultdict(list)
+        for row in latest_rows:
+            refs[row.group_type].append(row.group_ref)
+
+        history = defaultdict(list)
+        match = Q()
+        for field, code in ActivityFeed.GROUP_FIELDS:
+            if refs.get(code):
+                match |= Q(**{f"{field}_id__in": refs[code]})
+        if match:
+            older = ActivityFeed.with_group_key(logs).filter(match).exclude(
+                pk__in=[row.pk for row in latest_rows]
+            ).order_by('-timestamp', '-id')
+            for log in older:
+                history[(log.group_type, log.group_ref)].append(log)
+
+        return [
+            {
+                'latest': row,
+                'history': history.get((row.group_type, row.group_ref), []),
+                'type': row.group_type,
+            }
+            for row in latest_rows
+        ]
+
+    @staticmethod
+    def live_pulse(movements, size=PULSE_SIZE):
+        """Newest `size` events across the audit sources, as the dicts the activity template renders."""
+        from django.contrib.auth.models import User
+        from .models import AssetChangeLog, Asset, ServiceLog
+
+        def columns(qs, kind, when, user, action, detail, category, target):
+            return qs.annotate(
+                p_kind=Value(kind, output_field=CharField()),
+                p_when=F(when),
+                p_user=user,
+                p_action=action,
+                p_detail=detail,
+                p_category=category,
+                p_target=target,
+            ).values_list('p_kind', 'p_when', 'p_user', 'p_action', 'p_detail', 'p_category', 'p_target').order_by()
+
+        blank = Value('', output_field=CharField())
+        no_user = Value(None, output_field=IntegerField())
+        parts = [
+            columns(
+                movements, 'WORKFLOW', 'timestamp', F('user_id'), F('action_taken'), blank,
+                Case(
+                    When(batch__isnull=False, then=Value('BATCH')),
+                    When(transfer__isnull=False, then=Value('TRANSFER')),
+                    When(inspection__isnull=False, then=Value('INSPECT')),
+                    default=Value('MOVE'),
+                    output_field=CharField(),
+                ),
+                Coalesce(
+                    *[F(f"{field}__transaction_id") for field, _ in ActivityFeed.GROUP_FIELDS],
+                    Value('SYS'), output_field=CharField(),
+                ),
+            ),
+            columns(
+                AssetChangeLog.objects.all(), 'REVISION', 'timestamp', F('user_id'), F('tab'), F('field_name'),
+                Value('EDIT', output_field=CharField()), F('asset__property_number'),
+            ),
+            columns(
+                Asset.objects.all(), 'CREATION', 'created_at', no_user, F('name'), blank,
+                Value('NEW', output_field=CharField()), F('property_number'),
+            ),
+            columns(
+                ServiceLog.objects.all(), 'SERVICE', 'created_at', no_user, F('service_type'), F('description'),
+                Value('MAINT', output_field=CharField()), F('asset__property_number'),
+            ),
+        ]
+        if connection.features.supports_slicing_ordering_in_compound:
+            # Let each branch stop after `size` rows from its timestamp index
+            parts = [part.order_by("-p_when")[:size] for part in parts]
+
+        rows = list(parts[0].union(*parts[1:], all=True).order_by('-p_when')[:size])
+
+        users = User.objects.in_bulk({row[2] for row in rows if row[2]})
+        tabs = dict(AssetChangeLog.TAB_CHOICES)
+        services = dict(ServiceLog.SERVICE_TYPES)
+        pulse = []
+        for kind, when, user_id, action, detail, category, target in rows:
+            if kind == 'REVISION':
+                action = f"Updated {tabs.get(action, action)}: {detail}"
+            elif kind == 'CREATION':
+                action = f"Newly Registered: {(action or '')[:50]}"
+            elif kind == 'SERVICE':
+                action = f"{services.get(action, action)}: {(detail or '')[:50]}"
+            pulse.append({
+                'user': users.get(user_id),
+                'timestamp': when,
+                'action': action,
+                'type': kind,
+                'category': category,
+                'target_id': target,
+            })
+        return pulse
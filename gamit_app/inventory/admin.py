@@ -15,6 +15,7 @@ from .models import (
     PropertyClearanceRequest,
     AssetReturnRequest,
     AssetLossReport,
+    SequenceCounter,
 )
 from .resources import AssetResource, patch_csv_format
 
@@ -186,4 +187,10 @@ class AssetNotificationAdmin(admin.ModelAdmin):
     list_display = ('created_at', 'recipient_role', 'asset', 'message', 'triggered_by', 'is_read')
     list_filter = ('recipient_role', 'is_read', 'created_at')
     search_fields = ('asset__property_number', 'message')
-    date_hierarchy = 'created_at'
\ No newline at end of file
+    date_hierarchy = 'created_at'
+
+# --- 11. SEQUENCE COUNTERS ---
+@admin.register(SequenceCounter)
+class SequenceCounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_value', 'width')
+    search_fields = ('name',)
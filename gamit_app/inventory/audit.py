@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_actor = ContextVar('asset_audit_actor', default=None)
+
+
+class AssetAudit:
+    """
+    Field-level change capture for Asset (inventory.AssetChangeLog).
+    Every Asset instance keeps the column values it was loaded with
+    (inventory.signals, post_init: a copy of the audited columns, no extra SELECT); a save diffs
+    them against the saved values once and writes all changed fields with a
+    single bulk_create. Bulk paths that skip save() (the importers) pass the
+    values they already looked up to entries() and record() per chunk.
+
+    Who/where is ambient: wrap a write in `AssetAudit.actor(user, ip, tab)`;
+    outside of one (management commands, imports) entries have no user and
+    each field is filed under the tab that edits it. File fields and the
+    derived columns (search document, property digits, image variants) are
+    not audited.
+    """
+
+    IGNORED = ('id', 'created_at', 'search_document', 'property_digits', 'image_variants')
+    MAX_VALUE = 500
+    _fields = None
+    _tabs = None
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+    @staticmethod
+    def tracked_fields():
+        """{attname: field name} of the audited Asset columns."""
+        if AssetAudit._fields is None:
+            from django.db.models import FileField
+            from .models import Asset
+
+            AssetAudit._fields = {
+                field.attname: field.name for field in Asset._meta.concrete_fields
+                if field.name not in AssetAudit.IGNORED and not isinstance(field, FileField)
+            }
+        return AssetAudit._fields
+
+    @staticmethod
+    def tab_for(field_name):
+        """AssetChangeLog.tab of the asset-detail tab that edits the field (PROPERTY for the rest)."""
+        if AssetAudit._tabs is None:
+            from .forms import PropertyTabForm, FinanceTabForm, LifecycleTabForm, GovernmentTabForm
+
+            AssetAudit._tabs = {
+                name: tab
+                for tab, form in (
+                    ('PROPERTY', PropertyTabForm), ('FINANCE', FinanceTabForm),
+                    ('LIFECYCLE', LifecycleTabForm), ('GOVERNMENT', GovernmentTabForm),
+                )
+                for name in form._meta.fields
+            }
+        return AssetAudit._tabs.get(field_name, 'PROPERTY')
+
+    @staticmethod
+    @contextmanager
+    def actor(user=None, ip_address=None, tab=None):
+        """Attributes the Asset changes saved inside the block to `user` (and files them under `tab`)."""
+        token = _actor.set({'user': user, 'ip_address': ip_address or None, 'tab': tab.upper() if tab else None})
+        try:
+            yield
+        finally:
+            _actor.reset(token)
+
+    # ------------------------------------------------------------------
+    # Capture
+    # ------------------------------------------------------------------
+    @staticmethod
+    def state(instance):
+        """The instance's loaded values of the audited columns (deferred columns are absent)."""
+        loaded = instance.__dict__
+        return {attname: loaded[attname] for attname in AssetAudit.tracked_fields() if attname in loaded}
+
+    @staticmethod
+    def diff(old, new, only=None):
+        """[(field name, old text, new text)] for audited columns present in both states that changed."""
+        changes = []
+        for attname, name in AssetAudit.tracked_fields().items():
+            if attname not in old or attname not in new:
+                continue
+            if only is not None and name not in only and attname not in only:
+                continue
+            if old[attname] == new[attname]:
+                continue  # Decimal('5') == Decimal('5.00'): same value as re-typed by a form
+            before, after = AssetAudit._text(old[attname]), AssetAudit._text(new[attname])
+            if before != after:
+                changes.append((name, before, after))
+        return changes
+
+    @staticmethod
+    def entries(asset_id, old, new, only=None):
+        """Unsaved AssetChangeLog rows for one asset's diff, attributed to the current actor."""
+        from .models import AssetChangeLog
+
+        actor = _actor.get() or {}
+        return [
+            AssetChangeLog(
+                asset_id=asset_id, user=actor.get('user'), tab=actor.get('tab') or AssetAudit.tab_for(name),
+                field_name=name, old_value=before[:AssetAudit.MAX_VALUE], new_value=after[:AssetAudit.MAX_VALUE],
+                ip_address=actor.get('ip_address'),
+            )
+            for name, before, after in AssetAudit.diff(old, new, only)
+        ]
+
+    @staticmethod
+    def record(entries):
+        """Writes change rows with one bulk_create (department ids shown as names). Returns them."""
+        from .models import AssetChangeLog, Department
+
+        if not entries:
+            return entries
+        ids = {value for e in entries if e.field_name == 'department' for value in (e.old_value, e.new_value) if value}
+        if ids:
+            names = {str(pk): name for pk, name in Department.objects.filter(pk__in=ids).values_list('pk', 'name')}
+            for entry in entries:
+                if entry.field_name == 'department':
+                    entry.old_value = names.get(entry.old_value, entry.old_value)
+                    entry.new_value = names.get(entry.new_value, entry.new_value)
+        AssetChangeLog.objects.bulk_create(entries)
+        return entries
+
+    @staticmethod
+    def saved(instance, update_fields=None):
+        """post_save hook: records the diff since load, then makes the saved values the new baseline."""
+        old = getattr(instance, '_audit_state', None)
+        new = AssetAudit.state(instance)
+        instance._audit_changes = []
+        if old:
+            entries = AssetAudit.record(AssetAudit.entries(instance.pk, old, new, update_fields))
+            instance._audit_changes = [entry.field_name for entry in entries]
+        instance._audit_state = new
+        return instance._audit_changes
+
+    @staticmethod
+    def _text(value):
+        return '' if value is None else str(value)
@@ -0,0 +1,239 @@
+import datetime
+from decimal import Decimal
+from django.db import connection, transaction
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the pure-Python path computes the same schedules
+    np = None
+
+
+class DepreciationEngine:
+    """
+    Batch depreciation into inventory.DepreciationSchedule (one row per asset
+    per month of useful life). Assets are loaded as columns (cost, salvage,
+    life, method, start) and grouped by (method, life); every group shares one
+    accumulated-depreciation curve, so a schedule is a single outer product
+    (numpy when installed, plain Python otherwise). Book value as of a date is
+    then an indexed lookup of that month's row instead of per-instance Python.
+
+    Schedules start in the month of depreciation_start_date (else date_acquired);
+    assets without a cost or useful life, or with salvage >= cost, have none.
+    Asset saves that change these columns rebuild the asset's rows
+    (inventory.signals) and the importers rebuild the rows they wrote; after other
+    bulk writes run `manage.py build_depreciation_schedules`. Months without a row
+    are computed inline by book_values(), so a missing schedule is only slower.
+    """
+
+    FIELDS = ('acquisition_cost', 'salvage_value', 'useful_life_years', 'depreciation_method', 'depreciation_start_date', 'date_acquired')
+    CHUNK_SIZE = 2000
+    INSERT_BATCH = 20000
+
+    # ------------------------------------------------------------------
+    # Curves and schedules
+    # ------------------------------------------------------------------
+    @staticmethod
+    def curve(method, years):
+        """Accumulated fraction of the depreciable amount after each month (straight-line / sum-of-years)."""
+        months = years * 12
+        if method == 'SUM_OF_YEARS':
+            total = years * (years + 1) / 2
+            fractions, done = [], 0.0
+            for year in range(years):
+                share = (years - year) / total
+                fractions.extend(done + share * m / 12 for m in range(1, 13))
+                done += share
+            return fractions
+        return [m / months for m in range(1, months + 1)]
+
+    @staticmethod
+    def declining_factor(years):
+        """Monthly remaining-value factor of double-declining balance (2 / life per year)."""
+        return 1 - (2 / years) / 12
+
+    @staticmethod
+    def schedules(records, use_numpy=None):
+        """
+        Yields (asset id, start month, [accumulated after each month]) for records of
+        (id, cost, salvage, years, method, start date). use_numpy=None picks numpy when available.
+        """
+        use_numpy = np is not None if use_numpy is None else use_numpy
+        groups = {}
+        for record in records:
+            asset_id, cost, salvage, years, method, start = record
+            if not cost or not years or not start:
+                continue
+            cost, salvage = float(cost), float(salvage or 0)
+            if cost <= salvage:
+                continue
+            groups.setdefault((method or 'STRAIGHT_LINE', years), []).append((asset_id, cost, cost - salvage, start))
+
+        for (method, years), members in groups.items():
+            compute = DepreciationEngine._group_numpy if use_numpy else DepreciationEngine._group_python
+            for asset_id, start, accumulated in compute(method, years, members):
+                yield asset_id, DepreciationEngine.month_start(start), accumulated
+
+    @staticmethod
+    def _group_numpy(method, years, members):
+        ids = [m[0] for m in members]
+        cost = np.array([m[1] for m in members])
+        depreciable = np.array([m[2] for m in members])
+        if method == 'DECLINING_BALANCE':
+            months = np.arange(1, years * 12 + 1)
+            accumulated = np.minimum(
+                cost[:, None] * (1 - DepreciationEngine.declining_factor(years) ** months)[None, :],
+                depreciable[:, None],
+            )
+            # Whatever is left above salvage is written off in the last month
+            accumulated[:, -1] = depreciable
+        else:
+            accumulated = depreciable[:, None] * np.array(DepreciationEngine.curve(method, years))[None, :]
+        accumulated = np.round(accumulated, 2)
+        for index, asset_id in enumerate(ids):
+            yield asset_id, members[index][3], accumulated[index].tolist()
+
+    @staticmethod
+    def _group_python(method, years, members):
+        if method == 'DECLINING_BALANCE':
+            factor = DepreciationEngine.declining_factor(years)
+            remaining = [factor ** m for m in range(1, years * 12 + 1)]
+            for asset_id, cost, depreciable, start in members:
+                accumulated = [round(min(cost * (1 - r), depreciable), 2) for r in remaining]
+                accumulated[-1] = round(depreciable, 2)
+                yield asset_id, start, accumulated
+        else:
+            curve = DepreciationEngine.curve(method, years)
+            for asset_id, cost, depreciable, start in members:
+                yield asset_id, start, [round(depreciable * f, 2) for f in curve]
+
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+    @staticmethod
+    def rebuild(queryset=None, chunk_size=CHUNK_SIZE, use_numpy=None):
+        """Recomputes the schedule rows of every asset in `queryset` (all assets by default). Returns (assets, rows)."""
+        from .models import Asset
+
+        queryset = queryset if queryset is not None else Asset.objects.all()
+        columns = queryset.order_by('pk').values_list('pk', *DepreciationEngine.FIELDS)
+        assets = rows = 0
+        chunk = []
+        for values in columns.iterator(chunk_size=chunk_size):
+            chunk.append(values)
+            if len(chunk) >= chunk_size:
+                rows += DepreciationEngine._write(chunk, use_numpy)
+                assets += len(chunk)
+                chunk = []
+        if chunk:
+            rows += DepreciationEngine._write(chunk, use_numpy)
+            assets += len(chunk)
+        return assets, rows
+
+    @staticmethod
+    def _write(chunk, use_numpy):
+        from .models import DepreciationSchedule
+
+        records = [
+            (pk, cost, salvage, years, method, start or acquired)
+            for pk, cost, salvage, years, method, start, acquired in chunk
+        ]
+        table = connection.ops.quote_name(DepreciationSchedule._meta.db_table)
+        sql = (
+            f"INSERT INTO {table} (asset_id, period, depreciation, accumulated, book_value) "
+            f"VALUES (%s, %s, %s, %s, %s)"
+        )
+        costs = {pk: float(cost or 0) for pk, cost, *_ in records}
+        periods = {}
+        written = 0
+        with transaction.atomic():
+            DepreciationSchedule.objects.filter(asset_id__in=[r[0] for r in records]).delete()
+            batch = []
+            with connection.cursor() as cursor:
+                for asset_id, start, accumulated in DepreciationEngine.schedules(records, use_numpy):
+                    months = periods.get(start)
+                    if months is None or len(months) < len(accumulated):
+                        months = periods[start] = DepreciationEngine.months_from(start, len(accumulated))
+                    cost, previous = costs[asset_id], 0.0
+                    for period, total in zip(months, accumulated):
+                        batch.append((asset_id, period, round(total - previous, 2), total, round(cost - total, 2)))
+                        previous = total
+                    if len(batch) >= DepreciationEngine.INSERT_BATCH:
+                        cursor.executemany(sql, batch)
+                        written += len(batch)
+                        batch = []
+                if batch:
+                    cursor.executemany(sql, batch)
+                    written += len(batch)
+        return written
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    @staticmethod
+    def book_value_as_of(asset, as_of):
+        """Net book value of one asset at the end of as_of's month (one indexed lookup)."""
+        return DepreciationEngine.book_values(as_of, [asset])[asset.pk]
+
+    @staticmethod
+    def book_values(as_of, assets):
+        """
+        {asset id: net book value} as of a date for Asset instances or a queryset: one
+        lookup on (period, asset) plus the asset columns for months outside a schedule.
+        """
+        from .models import DepreciationSchedule
+
+        if not isinstance(assets, (list, tuple)):
+            assets = list(assets.only('pk', 'accumulated_depreciation', *DepreciationEngine.FIELDS))
+        period = DepreciationEngine.month_start(as_of)
+        scheduled = dict(
+            DepreciationSchedule.objects.filter(period=period, asset_id__in=[a.pk for a in assets])
+            .values_list('asset_id', 'book_value')
+        )
+        values = {}
+        for asset in assets:
+            if asset.pk in scheduled:
+                values[asset.pk] = scheduled[asset.pk]
+                continue
+            cost, salvage = asset.acquisition_cost, asset.salvage_value or Decimal('0')
+            start = asset.depreciation_start_date or asset.date_acquired
+            if not cost or not asset.useful_life_years or not start or cost <= salvage:
+                # No schedule: the stored accumulated figure, as Asset.book_value
+                values[asset.pk] = asset.book_value
+                continue
+            start = DepreciationEngine.month_start(start)
+            elapsed = (period.year - start.year) * 12 + period.month - start.month
+            if elapsed < 0:
+                values[asset.pk] = cost
+            elif elapsed >= asset.useful_life_years * 12:
+                # Past the last scheduled month: fully depreciated down to salvage
+                values[asset.pk] = salvage
+            else:
+                # Inside the useful life but not materialized (yet): compute the month inline
+                values[asset.pk] = DepreciationEngine._inline_book_value(asset, start, elapsed)
+        return values
+
+    @staticmethod
+    def _inline_book_value(asset, start, elapsed):
+        record = (asset.pk, asset.acquisition_cost, asset.salvage_value, asset.useful_life_years,
+                  asset.depreciation_method, start)
+        for _, _, accumulated in DepreciationEngine.schedules([record], use_numpy=False):
+            return Decimal(str(round(float(asset.acquisition_cost) - accumulated[elapsed], 2))).quantize(Decimal('0.01'))
+        return asset.acquisition_cost
+
+    # ------------------------------------------------------------------
+    # Dates
+    # ------------------------------------------------------------------
+    @staticmethod
+    def month_start(value):
+        return value.replace(day=1)
+
+    @staticmethod
+    def months_from(start, count):
+        months = []
+        year, month = start.year, start.month
+        for _ in range(count):
+            months.append(datetime.date(year, month, 1))
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+        return months
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+class DocumentJobQueue:
+    """
+    Background rendering of finalized PAR / ICS / PTR documents (inventory.DocumentJob).
+    WorkflowEngine.transition only inserts a job row on FINALIZE, so the approval
+    commits without touching ReportLab/pypdf; `manage.py process_document_jobs`
+    claims queued jobs, renders them (reporting page progress) and stores the
+    file and SHA256 hash exactly as the synchronous generators did. Each job also
+    records its rendered file in DocumentJob.output (the PTR has nowhere else to go).
+    """
+
+    MAX_ATTEMPTS = 3
+    # A RUNNING job not finished after this long is assumed to belong to a dead worker
+    STALE_AFTER = timedelta(minutes=15)
+    # Write progress at most every N percent (one UPDATE each)
+    PROGRESS_STEP = 5
+
+    @staticmethod
+    def enqueue(document):
+        """Queues the final document of a FINALIZED transaction; returns the job (None if it has none)."""
+        from .models import AssetBatch, AssetTransferRequest, DocumentJob
+
+        if isinstance(document, AssetBatch):
+            kind = 'PAR' if document.total_value >= 50000 else 'ICS'
+            return DocumentJob.objects.create(kind=kind, batch=document)
+        if isinstance(document, AssetTransferRequest):
+            return DocumentJob.objects.create(kind='PTR', transfer=document)
+        return None
+
+    @staticmethod
+    def latest_for(document):
+        """Most recent job of a batch / transfer (for the detail page), or None."""
+        jobs = getattr(document, 'document_jobs', None)
+        return jobs.order_by('-id').first() if jobs is not None else None
+
+    @staticmethod
+    def claim(now=None):
+        """Atomically marks the oldest runnable job RUNNING and returns it (None when idle)."""
+        from .models import DocumentJob
+
+        now = now or timezone.now()
+        stale = Q(status='RUNNING', started_at__lt=now - DocumentJobQueue.STALE_AFTER)
+        # A worker died on the last attempt: nothing will pick the job up again, so stop the polling
+        DocumentJob.objects.filter(stale, attempts__gte=DocumentJobQueue.MAX_ATTEMPTS).update(
+            status='FAILED', finished_at=now, error='Worker stopped while rendering (no attempts left).',
+        )
+        runnable = Q(status='PENDING') | stale
+        with transaction.atomic():
+            job = (
+                DocumentJob.objects.select_for_update(skip_locked=True)
+                .filter(runnable, attempts__lt=DocumentJobQueue.MAX_ATTEMPTS)
+                .order_by('id').first()
+            )
+            if job is None:
+                return None
+            job.status, job.started_at, job.progress = 'RUNNING', now, 0
+            job.attempts += 1
+            job.save(update_fields=['status', 'started_at', 'progress', 'attempts'])
+        return job
+
+    @staticmethod
+    def run(job):
+        """Renders one claimed job. Failures are recorded on the job (re-queued until MAX_ATTEMPTS)."""
+        from .models import DocumentJob
+        from .services import PARGenerator, ICSGenerator, PTRGenerator
+
+        reported = [0]
+
+        def progress(done, total):
+            # Pages drawn map to 0-90%; merging/saving is the last stretch
+            percent = int(done * 90 / total) if total else 90
+            if percent - reported[0] >= DocumentJobQueue.PROGRESS_STEP:
+                reported[0] = percent
+                DocumentJob.objects.filter(pk=job.pk).update(progress=percent)
+
+        try:
+            if job.kind == 'PAR':
+                PARGenerator.finalize_par(job.batch, progress=progress)
+                job.output.name = job.batch.par_file.name
+            elif job.kind == 'ICS':
+                ICSGenerator.finalize_ics(job.batch)  # Stored in par_file as well
+                job.output.name = job.batch.par_file.name
+            elif job.kind == 'PTR':
+                rendered = PTRGenerator.finalize_ptr(job.transfer)
+                job.output.save(f"PTR_{job.transfer.transaction_id}_Final.pdf", rendered, save=False)
+        except Exception as exc:
+            job.error = f"{exc.__class__.__name__}: {exc}"[:2000]
+            job.status = 'FAILED' if job.attempts >= DocumentJobQueue.MAX_ATTEMPTS else 'PENDING'
+            job.finished_at = timezone.now() if job.status == 'FAILED' else None
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            return False
+
+        job.status, job.progress, job.error, job.finished_at = 'DONE', 100, '', timezone.now()
+        job.save(update_fields=['status', 'progress', 'error', 'finished_at', 'output'])
+        return True
+
+    @staticmethod
+    def process(limit=None):
+        """Claims and runs jobs until the queue is empty (or `limit` jobs ran). Returns (done, failed)."""
+        done = failed = 0
+        while limit is None or done + failed < limit:
+            job = DocumentJobQueue.claim()
+            if job is None:
+                break
+            if DocumentJobQueue.run(job):
+                done += 1
+            else:
+                failed += 1
+        return done, failed
+
+    @staticmethod
+    def status_payload(job):
+        """JSON body for the polling endpoint."""
+        if job is None:
+            return {'status': 'NONE', 'progress': 0}
+        payload = {
+            'id': job.pk,
+            'kind': job.kind,
+            'status': job.status,
+            'status_label': job.get_status_display(),
+            'progress': job.progress,
+            'error': job.error if job.status == 'FAILED' else '',
+        }
+        if job.status == 'DONE' and job.output:
+            payload['file_url'] = job.output.url
+        return payload
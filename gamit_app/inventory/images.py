@@ -0,0 +1,165 @@
+import hashlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+
+
+def _render_job(job):
+    """Process-pool entry point: renders one (asset id, field, source name); returns (asset id, field, entry)."""
+    asset_id, field, name = job
+    if not name:
+        return asset_id, field, None
+    try:
+        return asset_id, field, ImageDerivatives.render_to_storage(name)
+    except Exception:
+        # Missing or unreadable source: recorded without derivatives so it is not retried on every save;
+        # the template tag keeps serving the original
+        return asset_id, field, {'source': name}
+
+
+class ImageDerivatives:
+    """
+    Bounded-size WebP derivatives of asset photos (Asset.image_variants).
+    Each derivative is named after the SHA256 of its source bytes
+    (derivatives/ab/abcd..._thumb.webp), so URLs never change for the same
+    photo and can be served with far-future cache headers. Asset.image_variants
+    records {field: {'source': name, spec: derivative name}}; an entry whose
+    source no longer matches the field is stale and the `image_variant` template
+    tag falls back to the original until it is regenerated (on upload via
+    inventory.signals, or `manage.py build_image_derivatives`).
+    """
+
+    FIELDS = ('image_serial', 'image_condition')
+    # spec -> bounding box (aspect ratio is kept)
+    SPECS = {'thumb': (160, 160), 'card': (800, 800)}
+    FORMAT = 'WEBP'
+    QUALITY = 80
+    PREFIX = 'derivatives/'
+
+    @staticmethod
+    def render(content):
+        """{spec: WebP bytes} for the image bytes in `content`."""
+        from PIL import Image, ImageOps
+
+        results = {}
+        with Image.open(io.BytesIO(content)) as source:
+            image = ImageOps.exif_transpose(source)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            for spec, box in ImageDerivatives.SPECS.items():
+                derivative = image.copy()
+                derivative.thumbnail(box, Image.LANCZOS)
+                buffer = io.BytesIO()
+                derivative.save(buffer, ImageDerivatives.FORMAT, quality=ImageDerivatives.QUALITY, method=4)
+                results[spec] = buffer.getvalue()
+        return results
+
+    @staticmethod
+    def render_to_storage(name, storage=None):
+        """Reads source `name`, stores its derivatives (once per content) and returns the image_variants entry."""
+        storage = storage or default_storage
+        with storage.open(name, 'rb') as handle:
+            content = handle.read()
+        digest = hashlib.sha256(content).hexdigest()
+        entry = {'source': name}
+        rendered = None
+        for spec in ImageDerivatives.SPECS:
+            target = f"{ImageDerivatives.PREFIX}{digest[:2]}/{digest}_{spec}.webp"
+            if not storage.exists(target):
+                rendered = rendered or ImageDerivatives.render(content)
+                target = storage.save(target, ContentFile(rendered[spec]))
+            entry[spec] = target
+        return entry
+
+    @staticmethod
+    def url(asset, field, spec='thumb'):
+        """URL of a derivative of the asset's current photo, else of the original ('' without a photo)."""
+        image = getattr(asset, field)
+        if not image:
+            return ''
+        entry = (asset.image_variants or {}).get(field) or {}
+        if entry.get('source') == image.name and entry.get(spec):
+            return image.storage.url(entry[spec])
+        return image.url
+
+    @staticmethod
+    def stale_fields(asset):
+        """Image fields of a loaded asset whose derivatives are missing or belong to an older photo."""
+        loaded = asset.__dict__
+        variants = loaded.get('image_variants') or {}
+        stale = []
+        for field in ImageDerivatives.FIELDS:
+            if field not in loaded:
+                continue
+            name = getattr(loaded[field], 'name', loaded[field]) or ''
+            if (variants.get(field) or {}).get('source', '') != name:
+                stale.append(field)
+        return stale
+
+    @staticmethod
+    def refresh(asset_ids):
+        """Regenerates the stale derivatives of the given assets inline (upload path)."""
+        from .models import Asset
+
+        jobs = ImageDerivatives._jobs(Asset.objects.filter(pk__in=asset_ids))
+        return ImageDerivatives._apply(map(_render_job, jobs))
+
+    @staticmethod
+    def backfill(processes=None, chunk_size=200, queryset=None):
+        """Generates every missing/stale derivative, rendering in a process pool. Returns the number of fields updated."""
+        from .models import Asset
+
+        queryset = queryset if queryset is not None else Asset.objects.all()
+        jobs = ImageDerivatives._jobs(queryset)
+        if not jobs:
+            return 0
+        if processes == 1:
+            return ImageDerivatives._apply(map(_render_job, jobs), chunk_size)
+        # Workers only touch storage; don't let forked children share the parent's DB sockets
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            return ImageDerivatives._apply(pool.map(_render_job, jobs, chunksize=8), chunk_size)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _jobs(queryset):
+        jobs = []
+        for asset in queryset.only('id', 'image_variants', *ImageDerivatives.FIELDS).iterator(chunk_size=2000):
+            for field in ImageDerivatives.stale_fields(asset):
+                name = getattr(asset, field).name or ''
+                jobs.append((asset.pk, field, name))
+        return jobs
+
+    @staticmethod
+    def _apply(results, chunk_size=200):
+        """Writes finished entries back, one bulk_update per chunk (save() and signals are skipped)."""
+        from .models import Asset
+
+        pending = {}
+        updated = 0
+        for asset_id, field, entry in results:
+            pending.setdefault(asset_id, {})[field] = entry
+            if len(pending) >= chunk_size:
+                updated += ImageDerivatives._flush(Asset, pending)
+                pending = {}
+        if pending:
+            updated += ImageDerivatives._flush(Asset, pending)
+        return updated
+
+    @staticmethod
+    def _flush(model, pending):
+        assets = list(model.objects.filter(pk__in=pending).only('id', 'image_variants'))
+        for asset in assets:
+            variants = dict(asset.image_variants or {})
+            for field, entry in pending[asset.pk].items():
+                if entry:
+                    variants[field] = entry
+                else:
+                    variants.pop(field, None)
+            asset.image_variants = variants
+        model.objects.bulk_update(assets, ['image_variants'])
+        return sum(len(fields) for fields in pending.values())
@@ -0,0 +1,547 @@
+import codecs
+import csv
+import datetime
+import io
+from decimal import Decimal, InvalidOperation
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+
+class _DryRun(Exception):
+    """Raised to roll back a dry-run import once counted."""
+
+
+def _rebuild_depreciation(property_numbers, chunk_size=2000):
+    """Recomputes the depreciation schedules of the imported assets (bulk writes skip the save() signal)."""
+    from .depreciation import DepreciationEngine
+    from .models import Asset
+
+    numbers = sorted(property_numbers)
+    for start in range(0, len(numbers), chunk_size):
+        DepreciationEngine.rebuild(Asset.objects.filter(property_number__in=numbers[start:start + chunk_size]))
+
+
+class AssetImporter:
+    """
+    Bulk import of AssetResource-shaped CSV/XLSX files (the admin import columns).
+    Rows are streamed, normalized with the same rules as AssetResource
+    (inventory.resources.normalize_asset_row) and written per chunk: one
+    transaction with a bulk_create of new assets and a bulk_update of existing
+    ones (matched by property_number). Departments and existing property
+    numbers are loaded once up front, so the query count grows with the number
+    of chunks rather than rows. Chunks commit one by one (a failure keeps the
+    chunks already written); dry runs wrap the whole import and roll it back.
+    Existing assets only receive the columns the file actually has (like
+    AssetResource, which skips fields whose column is missing); the other
+    values come from the stored row, never from the model defaults (blank
+    date_acquired / status cells included; those are only required on create).
+    save() is skipped, so the derived columns (search document, property
+    digits, sequences) and the audit trail of updated rows are written here; the
+    KPI snapshot and the written assets' depreciation schedules are rebuilt once
+    at the end (`manage.py rebuild_kpi_snapshot` / `build_depreciation_schedules`
+    after an aborted import).
+    """
+
+    CHUNK_SIZE = 2000
+    # File column -> field written for property numbers that already exist (when the column is present)
+    UPDATE_COLUMNS = {
+        'name': 'name', 'description': 'description', 'date_acquired': 'date_acquired',
+        'acquisition_cost': 'acquisition_cost', 'assigned_office': 'department', 'ppe_category': 'asset_class',
+        'asset_type': 'asset_nature', 'status': 'status',
+        'accountable_firstname': 'accountable_firstname', 'accountable_surname': 'accountable_surname',
+    }
+    UPDATE_FIELDS = list(UPDATE_COLUMNS.values()) + ['search_document']
+    # Required fields: a blank cell keeps the stored value instead of clearing it or writing the create default
+    KEEP_WHEN_BLANK = ('date_acquired', 'status')
+    DATE_FORMATS = ('%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y')
+    ENCODINGS = ('utf-8-sig', 'cp1252', 'latin-1')
+    MAX_REPORTED_ERRORS = 100
+
+    @staticmethod
+    def import_file(source, file_format=None, chunk_size=CHUNK_SIZE, dry_run=False, progress=None):
+        """
+        Imports a path or binary file object. `progress(stats)` is called after every chunk.
+        Returns {'rows', 'created', 'updated', 'skipped', 'errors', 'error_rows', 'chunks'}.
+        """
+        rows = AssetImporter.read_rows(source, file_format)
+        return AssetImporter.import_rows(rows, chunk_size=chunk_size, dry_run=dry_run, progress=progress)
+
+    @staticmethod
+    def import_rows(rows, chunk_size=CHUNK_SIZE, dry_run=False, progress=None):
+        """Imports an iterable of {column: value} dicts (see import_file)."""
+        stats = {'rows': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0, 'error_rows': [], 'chunks': 0}
+        if not dry_run:
+            AssetImporter._run(rows, chunk_size, stats, progress)
+            return stats
+        try:
+            with transaction.atomic():
+                AssetImporter._run(rows, chunk_size, stats, progress)
+                raise _DryRun()
+        except _DryRun:
+            pass
+        return stats
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    @staticmethod
+    def read_rows(source, file_format=None):
+        """Yields one dict per data row (lower-cased headers) from a CSV or XLSX path / binary file."""
+        name = source if isinstance(source, str) else getattr(source, 'name', '') or ''
+        file_format = (file_format or name.rsplit('.', 1)[-1]).lower()
+        handle = open(source, 'rb') if isinstance(source, str) else source
+        try:
+            if file_format == 'xlsx':
+                yield from AssetImporter._xlsx_rows(handle)
+            else:
+                yield from AssetImporter._csv_rows(handle)
+        finally:
+            if isinstance(source, str):
+                handle.close()
+
+    @staticmethod
+    def _csv_rows(handle):
+        encoding = AssetImporter._detect_encoding(handle)
+        text = io.TextIOWrapper(handle, encoding=encoding, newline='')
+        try:
+            reader = csv.reader(text)
+            headers = [h.strip().lower() for h in next(reader, [])]
+            for values in reader:
+                if any(v.strip() for v in values):
+                    yield dict(zip(headers, values))
+        finally:
+            # Hand the caller's file object back open
+            text.detach()
+
+    @staticmethod
+    def _detect_encoding(handle):
+        """First of ENCODINGS that decodes the whole stream (read in 1 MiB blocks, then rewound)."""
+        for encoding in AssetImporter.ENCODINGS:
+            handle.seek(0)
+            decoder = codecs.getincrementaldecoder(encoding)()
+            try:
+                for block in iter(lambda: handle.read(1 << 20), b''):
+                    decoder.decode(block)
+                decoder.decode(b'', final=True)
+            except UnicodeDecodeError:
+                continue
+            handle.seek(0)
+            return encoding
+        handle.seek(0)
+        return 'latin-1'
+
+    @staticmethod
+    def _xlsx_rows(handle):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImproperlyConfigured("XLSX imports need the 'openpyxl' package (pip install openpyxl).")
+
+        workbook = load_workbook(handle, read_only=True, data_only=True)
+        try:
+            values = workbook.active.iter_rows(values_only=True)
+            headers = [str(h or '').strip().lower() for h in next(values, [])]
+            for row in values:
+                if any(v not in (None, '') for v in row):
+                    yield {h: ('' if v is None else v) for h, v in zip(headers, row)}
+        finally:
+            workbook.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _run(rows, chunk_size, stats, progress):
+        from .models import Asset, Department
+        from .sequences import SequenceAllocator
+        from .snapshots import AssetKpiTracker
+
+        departments = dict(Department.objects.values_list('name', 'id'))
+        existing = dict(Asset.objects.exclude(property_number=None).values_list('property_number', 'id'))
+        seen = set()
+        update_fields = None
+        touched = set()
+
+        chunk = []
+        for line, row in enumerate(rows, start=2):
+            stats['rows'] += 1
+            if update_fields is None:
+                update_fields = AssetImporter.update_fields(row.keys())
+            parsed = AssetImporter._parse(row, stats, line, existing)
+            if parsed is None:
+                continue
+            number = parsed['property_number']
+            # Same rule as AssetResource.skip_row: first occurrence of a number wins (unnumbered rows get new ones)
+            if number and number in seen:
+                stats['skipped'] += 1
+                continue
+            seen.add(number)
+            chunk.append(parsed)
+            if len(chunk) >= chunk_size:
+                touched.update(AssetImporter._write_chunk(chunk, departments, existing, update_fields, stats))
+                chunk = []
+                if progress:
+                    progress(stats)
+        if chunk:
+            touched.update(AssetImporter._write_chunk(chunk, departments, existing, update_fields, stats))
+            if progress:
+                progress(stats)
+
+        if stats['created'] or stats['updated']:
+            # Explicit numbers may run ahead of the counters
+            SequenceAllocator.resync("PAR", Asset, "property_number", use_year=False)
+            SequenceAllocator.resync("AST", Asset, "item_id", use_year=True)
+            # One set-based pass; folding rows in per chunk costs a few queries per (dimensions, day) cell
+            AssetKpiTracker.rebuild()
+            _rebuild_depreciation(touched)
+
+    @staticmethod
+    def update_fields(columns):
+        """Fields an update may write for a file with these (lower-cased) columns."""
+        columns = set(columns)
+        fields = [field for column, field in AssetImporter.UPDATE_COLUMNS.items() if column in columns]
+        return fields + ['search_document'] if fields else []
+
+    @staticmethod
+    def _parse(row, stats, line, existing=()):
+        """
+        Normalized field values of one row, or None (counted as skipped / error).
+        date_acquired is only required for rows that create an asset (numbers not in `existing`).
+        """
+        from .resources import normalize_asset_row
+
+        row = normalize_asset_row(dict(row))
+        number = str(row.get('property_number') or '').strip()
+        raw_date = row.get('date_acquired')
+        if not number and raw_date in (None, ''):
+            stats['skipped'] += 1
+            return None
+        try:
+            date_acquired = AssetImporter._date(raw_date)
+            if date_acquired is None and number not in existing:
+                raise ValueError('date_acquired is required')
+            cost = AssetImporter._decimal(row.get('acquisition_cost'))
+        except (ValueError, InvalidOperation) as e:
+            AssetImporter._error(stats, line, number, str(e) or 'invalid value')
+            return None
+
+        def text(key):
+            value = row.get(key)
+            value = '' if value is None else str(value).strip()
+            return value or None
+
+        return {
+            'property_number': number or None,
+            'item_id': text('item_id'),
+            'name': (text('name') or '')[:255],
+            'description': text('description'),
+            'date_acquired': date_acquired,
+            'acquisition_cost': cost,
+            'office': text('assigned_office'),
+            'asset_class': row['asset_class'],
+            'asset_nature': row['asset_nature'][:100],
+            'status': (text('status') or '')[:20] or None,
+            'accountable_firstname': text('accountable_firstname'),
+            'accountable_surname': text('accountable_surname'),
+        }
+
+    @staticmethod
+    def _write_chunk(chunk, departments, existing, update_fields, stats):
+        from .models import Asset, Department
+        from .audit import AssetAudit
+        from .depreciation import DepreciationEngine
+        from .media_linker import AssetImageLinker
+        from .search import AssetSearch
+        from .sequences import SequenceAllocator
+
+        with transaction.atomic():
+            # New offices: one insert and one lookup per chunk
+            new_offices = {p['office'] for p in chunk if p['office'] and p['office'] not in departments}
+            if new_offices:
+                Department.objects.bulk_create([Department(name=n) for n in sorted(new_offices)], ignore_conflicts=True)
+                departments.update(Department.objects.filter(name__in=new_offices).values_list('name', 'id'))
+
+            creates = [p for p in chunk if p['property_number'] not in existing]
+            numbers = iter(SequenceAllocator.reserve_block(
+                "PAR", Asset, "property_number", use_year=False, count=sum(1 for p in creates if not p['property_number'])
+            ))
+            item_ids = iter(SequenceAllocator.reserve_block(
+                "AST", Asset, "item_id", use_year=True, count=sum(1 for p in creates if not p['item_id'])
+            ))
+
+            # Stored values of the rows being updated: the base for columns the file lacks and the audit "before"
+            audited = [f for f in update_fields if f != 'search_document']
+            stored_fields = AssetImporter._attnames([f for f in AssetImporter.UPDATE_FIELDS if f != 'search_document'])
+            update_ids = [existing[p['property_number']] for p in chunk if p['property_number'] in existing]
+            stored = {
+                values['id']: values
+                for values in Asset.objects.filter(pk__in=update_ids).values('id', 'department__name', *stored_fields)
+            } if update_ids and update_fields else {}
+
+            new_assets, updated_assets = [], []
+            for parsed in chunk:
+                office = parsed.pop('office')
+                if parsed['property_number'] in existing:
+                    pk = existing[parsed['property_number']]
+                    if not update_fields or pk not in stored:
+                        stats['skipped'] += 1  # Nothing to write (number-only file) or deleted meanwhile
+                        continue
+                    values = {att: stored[pk][att] for att in stored_fields}
+                    office_name = stored[pk]['department__name']
+                    for field in audited:
+                        if field == 'department':
+                            values['department_id'], office_name = (departments.get(office) if office else None), office
+                        elif parsed[field] is not None or field not in AssetImporter.KEEP_WHEN_BLANK:
+                            values[field] = parsed[field]
+                    asset = Asset(pk=pk, property_number=parsed['property_number'], **values)
+                    asset.search_document = AssetSearch.document_for(asset, office_name or '')
+                    updated_assets.append(asset)
+                    continue
+                parsed['status'] = parsed['status'] or 'SERVICEABLE'
+                asset = Asset(department_id=departments.get(office) if office else None, **parsed)
+                asset.search_document = AssetSearch.document_for(asset, office or '')
+                asset.property_number = asset.property_number or next(numbers)
+                asset.item_id = asset.item_id or next(item_ids)
+                asset.property_digits = AssetImageLinker.normalize(asset.property_number)[:64]
+                new_assets.append(asset)
+
+            Asset.objects.bulk_create(new_assets, batch_size=len(chunk))
+            if updated_assets:
+                # bulk_update skips post_save: diff against the stored values loaded above (one INSERT)
+                Asset.objects.bulk_update(updated_assets, update_fields, batch_size=500)
+                AssetAudit.record([
+                    entry for asset in updated_assets
+                    for entry in AssetAudit.entries(asset.pk, stored[asset.pk], AssetAudit.state(asset), audited)
+                ])
+
+        stats['created'] += len(new_assets)
+        stats['updated'] += len(updated_assets)
+        stats['chunks'] += 1
+        # Numbers whose depreciation inputs were written
+        rescheduled = updated_assets if set(update_fields) & set(DepreciationEngine.FIELDS) else []
+        return [asset.property_number for asset in new_assets + rescheduled]
+
+    @staticmethod
+    def _attnames(fields):
+        from .models import Asset
+
+        return [Asset._meta.get_field(name).attname for name in fields]
+
+    # ------------------------------------------------------------------
+    # Value cleaning
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _date(value):
+        if value in (None, '', 'NULL', 'null', 'N/A'):
+            return None
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        if isinstance(value, datetime.date):
+            return value
+        value = str(value).strip()
+        for fmt in AssetImporter.DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+        raise ValueError(f"Invalid date '{value}'")
+
+    @staticmethod
+    def _decimal(value):
+        if value in (None, ''):
+            return None
+        if isinstance(value, (int, float, Decimal)):
+            return Decimal(str(value))
+        value = str(value).replace(',', '').replace('"', '').strip()
+        return Decimal(value) if value else None
+
+    @staticmethod
+    def _error(stats, line, number, message):
+        stats['errors'] += 1
+        if len(stats['error_rows']) < AssetImporter.MAX_REPORTED_ERRORS:
+            stats['error_rows'].append({'line': line, 'property_number': number, 'error': message})
+
+
+class RpcppeImporter:
+    """
+    Staged upsert of the COA RPCPPE CSV (`manage.py import_rpcppe_data`).
+    Each chunk looks up which property numbers already exist (one SELECT),
+    reserves item ids for the new ones, then writes the whole chunk with one
+    INSERT ... ON CONFLICT (property_number) DO UPDATE where the backend
+    supports it (PostgreSQL, SQLite), or a bulk_update + bulk_create pair
+    elsewhere. The KPI snapshot and the depreciation schedules of the written
+    assets are rebuilt at the end. A dry run classifies every row as new /
+    changed / unchanged per department without writing anything.
+    """
+
+    CHUNK_SIZE = 1000
+    HEADER_ROWS = 7
+    # Columns written on conflict (item_id and created_at keep their original values)
+    UPSERT_FIELDS = [
+        'name', 'brand', 'description', 'unit_of_measure', 'acquisition_cost', 'quantity_physical_count',
+        'department', 'asset_class', 'status', 'date_acquired', 'search_document',
+    ]
+    COMPARED_FIELDS = [
+        'name', 'brand', 'description', 'unit_of_measure', 'acquisition_cost', 'quantity_physical_count',
+        'department_id', 'asset_class', 'status', 'date_acquired',
+    ]
+    PLACEHOLDER_DATE = datetime.date(2026, 1, 1)
+
+    @staticmethod
+    def read_rows(path):
+        """Yields one {field: value, 'office': name} dict per usable RPCPPE line."""
+        with open(path, newline='', encoding='utf-8-sig') as csvfile:
+            reader = csv.reader(csvfile)
+            # Skip header rows (1-7)
+            for _ in range(RpcppeImporter.HEADER_ROWS):
+                next(reader, None)
+            for row in reader:
+                if not row or len(row) < 13:
+                    continue
+                prop_num = row[3].strip()
+                office_name = row[12].strip()
+                if not prop_num or not office_name:
+                    continue
+                cost_str = row[5].replace(',', '').replace('"', '').strip()
+                try:
+                    cost = Decimal(cost_str) if cost_str else Decimal('0')
+                except InvalidOperation:
+                    cost = Decimal('0')
+                qty_physical = row[7].strip()
+                article = row[0].strip()
+                yield {
+                    'property_number': prop_num,
+                    'name': article,
+                    'brand': row[1].strip(),
+                    'description': row[2].strip(),
+                    'unit_of_measure': row[4].strip() or 'Unit',
+                    'acquisition_cost': cost,
+                    'quantity_physical_count': int(qty_physical) if qty_physical.isdigit() else 1,
+                    'asset_class': article,  # Article maps to Category in GAMIT context
+                    'status': 'SERVICEABLE',
+                    'date_acquired': RpcppeImporter.PLACEHOLDER_DATE,  # Placeholder for date
+                    'office': office_name,
+                }
+
+    @staticmethod
+    def run(rows, chunk_size=CHUNK_SIZE, dry_run=False, progress=None):
+        """
+        Upserts `rows` (see read_rows). Returns {'rows', 'new', 'changed', 'unchanged', 'by_department'}
+        where by_department maps office name -> {'new', 'changed', 'unchanged'}.
+        """
+        from .models import Asset, Department
+        from .sequences import SequenceAllocator
+        from .snapshots import AssetKpiTracker
+
+        stats = {'rows': 0, 'new': 0, 'changed': 0, 'unchanged': 0, 'by_department': {}}
+        departments = dict(Department.objects.values_list('name', 'id'))
+
+        chunk = {}
+        touched = set()
+        for row in rows:
+            stats['rows'] += 1
+            # Later lines win, as with the old update_or_create loop
+            chunk.pop(row['property_number'], None)
+            chunk[row['property_number']] = row
+            if len(chunk) >= chunk_size:
+                touched.update(RpcppeImporter._chunk(list(chunk.values()), departments, stats, dry_run))
+                chunk = {}
+                if progress:
+                    progress(stats)
+        if chunk:
+            touched.update(RpcppeImporter._chunk(list(chunk.values()), departments, stats, dry_run))
+            if progress:
+                progress(stats)
+
+        if not dry_run and (stats['new'] or stats['changed']):
+            SequenceAllocator.resync("PAR", Asset, "property_number", use_year=False)
+            AssetKpiTracker.rebuild()
+            _rebuild_depreciation(touched)
+        return stats
+
+    @staticmethod
+    def _chunk(rows, departments, stats, dry_run):
+        from .models import Asset
+
+        current = {
+            values['property_number']: values
+            for values in Asset.objects.filter(property_number__in=[r['property_number'] for r in rows])
+            .values('id', 'property_number', *RpcppeImporter.COMPARED_FIELDS)
+        }
+
+        changed_rows = []
+        for row in rows:
+            office = row['office']
+            per_department = stats['by_department'].setdefault(office, {'new': 0, 'changed': 0, 'unchanged': 0})
+            existing = current.get(row['property_number'])
+            if existing is None:
+                outcome = 'new'
+            elif RpcppeImporter._differs(row, existing, departments.get(office)):
+                outcome = 'changed'
+            else:
+                outcome = 'unchanged'
+            stats[outcome] += 1
+            per_department[outcome] += 1
+            if outcome != 'unchanged':
+                changed_rows.append((row, existing))
+
+        if not dry_run and changed_rows:
+            RpcppeImporter._upsert(changed_rows, departments)
+            return [row['property_number'] for row, _ in changed_rows]
+        return []
+
+    @staticmethod
+    def _differs(row, existing, department_id):
+        for field in RpcppeImporter.COMPARED_FIELDS:
+            incoming = department_id if field == 'department_id' else row[field]
+            if incoming != existing[field]:
+                return True
+        return False
+
+    @staticmethod
+    def _upsert(changed_rows, departments):
+        from django.db import connection
+        from .models import Asset, Department
+        from .audit import AssetAudit
+        from .media_linker import AssetImageLinker
+        from .search import AssetSearch
+        from .sequences import SequenceAllocator
+
+        with transaction.atomic():
+            new_offices = {row['office'] for row, _ in changed_rows if row['office'] not in departments}
+            if new_offices:
+                Department.objects.bulk_create([Department(name=n) for n in sorted(new_offices)], ignore_conflicts=True)
+                departments.update(Department.objects.filter(name__in=new_offices).values_list('name', 'id'))
+
+            item_ids = iter(SequenceAllocator.reserve_block(
+                "AST", Asset, "item_id", use_year=True, count=sum(1 for _, existing in changed_rows if existing is None)
+            ))
+            new_assets, updated_assets, audit = [], [], []
+            for row, existing in changed_rows:
+                fields = {k: v for k, v in row.items() if k != 'office'}
+                asset = Asset(department_id=departments[row['office']], **fields)
+                asset.search_document = AssetSearch.document_for(asset, row['office'])
+                asset.property_digits = AssetImageLinker.normalize(asset.property_number)[:64]
+                if existing is None:
+                    asset.item_id = next(item_ids)
+                    new_assets.append(asset)
+                else:
+                    updated_assets.append(asset)
+                    # The upsert skips post_save: diff against the values the chunk lookup already loaded
+                    audit.extend(AssetAudit.entries(existing['id'], existing, AssetAudit.state(asset)))
+
+            if connection.features.supports_update_conflicts_with_target:
+                # One statement per chunk; a number inserted concurrently since the lookup is updated, not duplicated
+                Asset.objects.bulk_create(
+                    new_assets + updated_assets, update_conflicts=True,
+                    unique_fields=['property_number'], update_fields=RpcppeImporter.UPSERT_FIELDS,
+                )
+            else:
+                ids = dict(Asset.objects.filter(
+                    property_number__in=[a.property_number for a in updated_assets]
+                ).values_list('property_number', 'id'))
+                for asset in updated_assets:
+                    asset.pk = ids[asset.property_number]
+                Asset.objects.bulk_update(updated_assets, RpcppeImporter.UPSERT_FIELDS, batch_size=500)
+                Asset.objects.bulk_create(new_assets)
+            AssetAudit.record(audit)
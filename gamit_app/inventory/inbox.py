@@ -0,0 +1,90 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from workflow.caching import cache_timeout
+
+
+class PendingCountStore:
+    """
+    Cached number of transactions waiting on each workflow role (the nav badge).
+    A role's counter is filled from TransactionIndex on a cache miss and then
+    adjusted in place (incr/decr after commit) by the TransactionIndex sync
+    whenever a saved transaction changes step, whether through WorkflowEngine,
+    the admin or a direct save, so a warm cache answers the badge with zero
+    queries. Step role changes and deletes drop or adjust the affected counters;
+    the timeout bounds any drift from a race with a recount or a queryset update().
+    Configure a shared cache (CACHES / REDIS_URL) when running several workers:
+    with the per-process default, adjustments made by other processes never reach
+    this one's counters, so they live only LOCAL_TIMEOUT seconds.
+    """
+
+    TIMEOUT = 60 * 60
+    LOCAL_TIMEOUT = 30
+    ROLE_KEY = 'inbox:pending:role:{}'
+
+    @staticmethod
+    def for_user(user):
+        roles = PendingCountStore.user_roles(user)
+        if not roles:
+            return 0
+        return sum(PendingCountStore.counts(roles).values())
+
+    @staticmethod
+    def user_roles(user):
+        """Role ids of the user's active personas (via the cached PersonaResolver)."""
+        from workflow.personas import PersonaResolver
+
+        return sorted(PersonaResolver.for_user(user).role_ids)
+
+    @staticmethod
+    def counts(role_ids):
+        """{role_id: pending transactions}; missing counters are recounted in one grouped query."""
+        from .models import TransactionIndex
+
+        keys = {PendingCountStore.ROLE_KEY.format(role_id): role_id for role_id in role_ids}
+        cached = cache.get_many(list(keys))
+        result = {keys[key]: value for key, value in cached.items()}
+
+        missing = [role_id for key, role_id in keys.items() if key not in cached]
+        if missing:
+            fresh = dict.fromkeys(missing, 0)
+            fresh.update(
+                TransactionIndex.objects.filter(required_role__in=missing)
+                .values_list('required_role').annotate(total=Count('id')).order_by()
+            )
+            cache.set_many(
+                {PendingCountStore.ROLE_KEY.format(role_id): total for role_id, total in fresh.items()},
+                PendingCountStore.timeout(),
+            )
+            result.update(fresh)
+        return result
+
+    @staticmethod
+    def timeout():
+        return cache_timeout(PendingCountStore.TIMEOUT, PendingCountStore.LOCAL_TIMEOUT)
+
+    @staticmethod
+    def moved(old_role_id, new_role_id):
+        """A transaction left a step owned by old_role_id for one owned by new_role_id (either may be None)."""
+        if old_role_id == new_role_id:
+            return
+
+        def apply():
+            if old_role_id:
+                PendingCountStore._adjust(old_role_id, -1)
+            if new_role_id:
+                PendingCountStore._adjust(new_role_id, 1)
+
+        # Only move the counters once the step change is actually committed
+        transaction.on_commit(apply)
+
+    @staticmethod
+    def invalidate_roles(*role_ids):
+        cache.delete_many([PendingCountStore.ROLE_KEY.format(role_id) for role_id in role_ids if role_id])
+
+    @staticmethod
+    def _adjust(role_id, delta):
+        try:
+            cache.incr(PendingCountStore.ROLE_KEY.format(role_id), delta)
+        except ValueError:
+            pass  # Counter not cached: the next read recounts it
@@ -0,0 +1,233 @@
+from collections import defaultdict
+from django.apps import apps as global_apps
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+
+class TransactionIndexer:
+    """
+    Maintains inventory.TransactionIndex, the denormalized one-row-per-transaction
+    table behind the task inbox (transaction_history) and the ledger.
+    Rows are upserted from post_save of the six transaction models; requestor,
+    asset and workflow-step edits push their copied columns through here too.
+    """
+
+    # code -> (model name, links to an asset)
+    TYPES = {
+        'BATCH': ('AssetBatch', False),
+        'REQ': ('InspectionRequest', True),
+        'TRF': ('AssetTransferRequest', True),
+        'RET': ('AssetReturnRequest', True),
+        'LOSS': ('AssetLossReport', True),
+        'CLR': ('PropertyClearanceRequest', False),
+    }
+    MODEL_TYPES = {model_name: code for code, (model_name, _) in TYPES.items()}
+
+    APPROVED_STATUSES = frozenset({'APPROVED', 'PAR_RELEASED', 'FINALIZED'})
+    RETURNED_STATUSES = frozenset({'RETURNED', 'REJECTED'})
+
+    UPSERT_FIELDS = [
+        'transaction_id', 'requestor', 'requestor_name', 'requestor_office', 'department',
+        'current_step', 'required_role', 'raw_status', 'status',
+        'asset', 'asset_label', 'asset_name', 'search_text', 'created_at',
+    ]
+
+    @staticmethod
+    def normalize_status(raw):
+        u = str(raw or '').upper()
+        if u in TransactionIndexer.APPROVED_STATUSES:
+            return 'APPROVED'
+        if u in TransactionIndexer.RETURNED_STATUSES:
+            return 'RETURNED'
+        return 'PENDING'
+
+    @staticmethod
+    def type_for(instance):
+        return TransactionIndexer.MODEL_TYPES.get(instance.__class__.__name__)
+
+    @staticmethod
+    def build_row(code, obj, index_model=None):
+        """Unsaved TransactionIndex row for a transaction object (works with historical models too)."""
+        if index_model is None:
+            from .models import TransactionIndex as index_model
+
+        has_asset = TransactionIndexer.TYPES[code][1]
+        requestor = obj.requestor
+        try:
+            profile = requestor.userprofile
+        except ObjectDoesNotExist:
+            profile = None
+        requestor_name = f"{requestor.first_name} {requestor.last_name}".strip() or requestor.username
+
+        step = obj.current_step if obj.current_step_id else None
+        search_parts = [obj.transaction_id, requestor.first_name, requestor.last_name, requestor.username]
+
+        asset = None
+        if has_asset:
+            asset = obj.asset
+            a_label, a_name = asset.property_number or '', asset.name
+            search_parts += [asset.property_number, asset.name]
+        elif code == 'BATCH':
+            a_label = obj.supplier_name or obj.requesting_unit or '-'
+            a_name = f"PO: {obj.po_number}" if obj.po_number else ''
+            search_parts += [obj.supplier_name, obj.requesting_unit, obj.po_number]
+        else:
+            a_label = (obj.purpose[:50] + '...') if obj.purpose and len(obj.purpose) > 50 else (obj.purpose or '-')
+            a_name = ''
+            search_parts.append(obj.purpose)
+
+        raw_status = obj.status or 'Pending'
+        return index_model(
+            type_code=code,
+            object_id=obj.pk,
+            transaction_id=obj.transaction_id,
+            requestor=requestor,
+            requestor_name=requestor_name[:300],
+            requestor_office=profile.office if profile else None,
+            department_id=profile.department_id if profile else None,
+            current_step=step,
+            required_role_id=step.required_persona_role_id if step else None,
+            raw_status=raw_status,
+            status=TransactionIndexer.normalize_status(raw_status),
+            asset=asset,
+            asset_label=a_label[:255],
+            asset_name=(a_name or '')[:255],
+            search_text=' '.join(' '.join(str(p).split()) for p in search_parts if p).lower(),
+            created_at=obj.created_at,
+        )
+
+    @staticmethod
+    def sync(instance):
+        """
+        Upserts the index row of one transaction (single INSERT ... ON CONFLICT DO UPDATE).
+        Returns the role the transaction now waits on.
+        """
+        from .models import TransactionIndex
+
+        code = TransactionIndexer.type_for(instance)
+        if code is None or not instance.pk:
+            return None
+        row = TransactionIndexer.build_row(code, instance)
+        TransactionIndexer._upsert(TransactionIndex, [row])
+        return row.required_role_id
+
+    @staticmethod
+    def indexed_role(instance):
+        """Role the stored index row waits on (None when the transaction is not indexed yet)."""
+        from .models import TransactionIndex
+
+        code = TransactionIndexer.type_for(instance)
+        if code is None:
+            return None
+        return TransactionIndex.objects.filter(type_code=code, object_id=instance.pk) \
+            .values_list('required_role_id', flat=True).first()
+
+    @staticmethod
+    def remove(instance):
+        """Deletes the index row; returns the role it was waiting on (for the pending counters)."""
+        from .models import TransactionIndex
+
+        code = TransactionIndexer.type_for(instance)
+        if code is None:
+            return None
+        rows = TransactionIndex.objects.filter(type_code=code, object_id=instance.pk)
+        required_role_id = rows.values_list('required_role_id', flat=True).first()
+        rows.delete()
+        return required_role_id
+
+    # ------------------------------------------------------------------
+    # Propagation of copied columns
+    # ------------------------------------------------------------------
+    @staticmethod
+    def requestor_changed(user):
+        """Re-syncs rows whose copied requestor name no longer matches the user."""
+        from .models import TransactionIndex
+
+        name = f"{user.first_name} {user.last_name}".strip() or user.username
+        TransactionIndexer._resync(TransactionIndex.objects.filter(requestor=user).exclude(requestor_name=name))
+
+    @staticmethod
+    def profile_changed(profile):
+        from .models import TransactionIndex
+
+        TransactionIndex.objects.filter(requestor_id=profile.user_id).update(
+            department_id=profile.department_id, requestor_office=profile.office,
+        )
+
+    @staticmethod
+    def asset_changed(asset):
+        from .models import TransactionIndex
+
+        TransactionIndexer._resync(
+            TransactionIndex.objects.filter(asset_id=asset.pk).exclude(
+                asset_label=asset.property_number or '', asset_name=asset.name,
+            )
+        )
+
+    @staticmethod
+    def step_changed(step):
+        """Moves waiting transactions to the step's (new) required role; returns the roles affected."""
+        from .models import TransactionIndex
+
+        stale = TransactionIndex.objects.filter(current_step=step).exclude(
+            required_role_id=step.required_persona_role_id,
+        )
+        previous_roles = set(stale.values_list('required_role_id', flat=True).distinct())
+        if previous_roles:
+            stale.update(required_role_id=step.required_persona_role_id)
+            previous_roles.add(step.required_persona_role_id)
+        return previous_roles
+
+    # ------------------------------------------------------------------
+    # Full rebuild
+    # ------------------------------------------------------------------
+    @staticmethod
+    def rebuild(apps=None, chunk_size=500):
+        """Recreates every index row from the source tables. Returns the row count."""
+        apps = apps or global_apps
+        index_model = apps.get_model('inventory', 'TransactionIndex')
+        total = 0
+        with transaction.atomic():
+            index_model.objects.all().delete()
+            for code, (model_name, has_asset) in TransactionIndexer.TYPES.items():
+                model = apps.get_model('inventory', model_name)
+                related = ['requestor__userprofile', 'current_step'] + (['asset'] if has_asset else [])
+                rows = []
+                for obj in model.objects.select_related(*related).iterator(chunk_size=chunk_size):
+                    rows.append(TransactionIndexer.build_row(code, obj, index_model))
+                    if len(rows) >= chunk_size:
+                        index_model.objects.bulk_create(rows)
+                        total += len(rows)
+                        rows = []
+                if rows:
+                    index_model.objects.bulk_create(rows)
+                    total += len(rows)
+        return total
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _upsert(index_model, rows):
+        index_model.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['type_code', 'object_id'],
+            update_fields=TransactionIndexer.UPSERT_FIELDS,
+        )
+
+    @staticmethod
+    def _resync(index_queryset):
+        from . import models
+
+        by_type = defaultdict(list)
+        for code, object_id in index_queryset.values_list('type_code', 'object_id'):
+            by_type[code].append(object_id)
+        rows = []
+        for code, ids in by_type.items():
+            model_name, has_asset = TransactionIndexer.TYPES[code]
+            related = ['requestor__userprofile', 'current_step'] + (['asset'] if has_asset else [])
+            for obj in getattr(models, model_name).objects.select_related(*related).filter(pk__in=ids):
+                rows.append(TransactionIndexer.build_row(code, obj))
+        if rows:
+            TransactionIndexer._upsert(models.TransactionIndex, rows)
@@ -0,0 +1,52 @@
+import datetime
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import LogArchive
+from inventory.partitions import LogPartitions
+
+
+class Command(BaseCommand):
+    help = 'Archives closed months of the audit/movement/service logs to compressed JSONL, or restores an archived month'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', choices=sorted(LogPartitions.TABLES), action='append', dest='tables', help='Log table (repeatable; default: all)')
+        parser.add_argument('--keep-months', type=int, default=12, help='Months kept hot before the current one')
+        parser.add_argument('--month', help='Archive (or restore) only this month (YYYY-MM)')
+        parser.add_argument('--restore', action='store_true', help='Reinsert --month of each --table from its archive')
+        parser.add_argument('--ensure-partitions', type=int, default=3, metavar='MONTHS', help='PostgreSQL: months ahead to pre-create partitions for')
+        parser.add_argument('--dry-run', action='store_true', help='List the months and row counts that would be archived')
+
+    def handle(self, *args, **options):
+        tables = options['tables'] or sorted(LogPartitions.TABLES)
+        month = self._month(options['month']) if options['month'] else None
+
+        if options['restore']:
+            if not month:
+                raise CommandError('--restore needs --month.')
+            for label in tables:
+                try:
+                    restored = LogPartitions.restore(label, month)
+                except LogArchive.DoesNotExist:
+                    self.stdout.write(f"{label} {month:%Y-%m}: no archive.")
+                    continue
+                self.stdout.write(self.style.SUCCESS(f"{label} {month:%Y-%m}: restored {restored} row(s)."))
+            return
+
+        if not options['dry_run']:
+            created = LogPartitions.ensure_partitions(options['ensure_partitions'])
+            if created:
+                self.stdout.write(f"Created {created} upcoming partition(s).")
+
+        for label in tables:
+            months = [month] if month else LogPartitions.closed_months(label, options['keep_months'])
+            for closed in months:
+                if options['dry_run']:
+                    self.stdout.write(f"[dry run] {label} {closed:%Y-%m}: {LogPartitions.rows(label, closed).count()} row(s)")
+                    continue
+                archive = LogPartitions.archive(label, closed)
+                self.stdout.write(self.style.SUCCESS(f"{label} {closed:%Y-%m}: archived {archive.rows} row(s) to {archive.path}"))
+
+    def _month(self, value):
+        try:
+            return datetime.datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f"Invalid month '{value}' (expected YYYY-MM).")
@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from workflow.movements import MovementStepLinker
+
+
+class Command(BaseCommand):
+    help = 'Links historical workflow movement logs to the WorkflowStep each one completed (timeline data)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Logs per bulk update')
+        parser.add_argument('--dry-run', action='store_true', help='Count the logs that would be linked without writing')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Linking movement logs to workflow steps...")
+        start = time.perf_counter()
+        linked = MovementStepLinker.backfill(chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - start
+        verb = 'would be linked' if options['dry_run'] else 'linked'
+        self.stdout.write(self.style.SUCCESS(f"{linked} movement logs {verb} in {elapsed:.2f}s."))
@@ -0,0 +1,111 @@
+import csv
+import io
+import random
+import time
+from datetime import date
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from inventory.importer import AssetImporter
+from inventory.models import Asset
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark data once measured."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the bulk asset import on a synthetic RPCPPE file against a time budget (rolled back afterwards)'
+
+    OFFICES = [f'Office {n:03d}' for n in range(60)]
+    CATEGORIES = ['ICT Equipment', 'Machinery', 'Vehicle', 'Office Equipment', 'Furniture and Fixtures', 'Airconditioning']
+    TYPES = ['Laptops', 'Desktops & All-in-one PCs', 'Seating Units', 'Cars', 'HVAC Systems']
+    HEADERS = [
+        'property_number', 'name', 'description', 'date_acquired', 'acquisition_cost', 'assigned_office',
+        'ppe_category', 'asset_type', 'status', 'accountable_firstname', 'accountable_surname',
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='Rows in the synthetic file')
+        parser.add_argument('--existing', type=float, default=0.2, help='Share of rows whose property number already exists (updates)')
+        parser.add_argument('--chunk-size', type=int, default=AssetImporter.CHUNK_SIZE)
+        parser.add_argument('--budget', type=float, default=60.0, help='Target seconds for the import')
+        parser.add_argument('--resource-rows', type=int, default=0, help='Also time AssetResource.import_data on this many rows')
+
+    def handle(self, *args, **options):
+        rows = max(1, options['rows'])
+        existing = int(rows * min(max(options['existing'], 0), 1))
+        payload = self._csv(rows)
+        self.stdout.write(self.style.SUCCESS(
+            f'--- Asset Import Benchmark: {rows} rows ({existing} existing), {len(payload) / 2**20:.1f} MiB CSV ---'
+        ))
+
+        elapsed, queries, stats = self._run(payload, existing, options['chunk_size'])
+        self.stdout.write(
+            f"  engine   | {elapsed:8.2f} s | {rows / elapsed:9.0f} rows/s | {queries:6} queries | "
+            f"{stats['created']} created, {stats['updated']} updated, {stats['errors']} errors"
+        )
+        if options['resource_rows']:
+            sample = min(options['resource_rows'], rows)
+            r_elapsed, r_queries = self._run_resource(self._csv(sample))
+            self.stdout.write(
+                f"  resource | {r_elapsed:8.2f} s | {sample / r_elapsed:9.0f} rows/s | {r_queries:6} queries | {sample} rows (sample)"
+            )
+
+        verdict = 'within' if elapsed <= options['budget'] else 'OVER'
+        style = self.style.SUCCESS if verdict == 'within' else self.style.ERROR
+        self.stdout.write(style(f'--- {elapsed:.2f}s is {verdict} the {options["budget"]:.0f}s budget (all data rolled back) ---'))
+
+    def _csv(self, rows):
+        rng = random.Random(42)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.HEADERS)
+        for n in range(rows):
+            writer.writerow([
+                f'BENCH-{n:07d}', f'Benchmark Item {n}', 'Synthetic RPCPPE row',
+                date(2015 + n % 10, 1 + n % 12, 1 + n % 28).strftime('%m/%d/%Y'),
+                f'{rng.randint(1000, 250000):,}.00', rng.choice(self.OFFICES), rng.choice(self.CATEGORIES),
+                rng.choice(self.TYPES), 'serviceable', 'Juan', 'Dela Cruz',
+            ])
+        return buffer.getvalue().encode('utf-8')
+
+    def _seed_existing(self, count):
+        Asset.objects.bulk_create([
+            Asset(property_number=f'PAR-BENCH-{n:07d}', item_id=f'BENCH-ITEM-{n}', name='Old', date_acquired=date(2010, 1, 1))
+            for n in range(count)
+        ], batch_size=2000)
+
+    def _run(self, payload, existing, chunk_size):
+        result = {}
+        try:
+            with transaction.atomic():
+                self._seed_existing(existing)
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    result['stats'] = AssetImporter.import_file(io.BytesIO(payload), 'csv', chunk_size=chunk_size)
+                    result['elapsed'] = time.perf_counter() - start
+                result['queries'] = len(ctx.captured_queries)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        return result['elapsed'], result['queries'], result['stats']
+
+    def _run_resource(self, payload):
+        import tablib
+        from inventory.resources import AssetResource
+
+        result = {}
+        try:
+            with transaction.atomic():
+                dataset = tablib.Dataset().load(payload.decode('utf-8'), format='csv')
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    AssetResource().import_data(dataset, dry_run=False, use_transactions=False)
+                    result['elapsed'] = time.perf_counter() - start
+                result['queries'] = len(ctx.captured_queries)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        return result['elapsed'], result['queries']
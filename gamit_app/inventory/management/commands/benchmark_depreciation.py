@@ -0,0 +1,96 @@
+import datetime
+import random
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from inventory import depreciation
+from inventory.depreciation import DepreciationEngine
+from inventory.models import Asset
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark data once measured."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks depreciation schedules for a synthetic asset register (numpy vs pure Python; writes are rolled back)'
+
+    METHODS = ['STRAIGHT_LINE', 'STRAIGHT_LINE', 'STRAIGHT_LINE', 'DECLINING_BALANCE', 'SUM_OF_YEARS']
+    LIVES = [3, 5, 5, 7, 10, 15]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assets', type=int, default=100000, help='Synthetic assets to depreciate')
+        parser.add_argument('--write', action='store_true', help='Also time seeding + materializing the schedule table and as-of lookups')
+        parser.add_argument('--as-of', default='2024-06-30', help='Date for the as-of lookup timing (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        count = max(1, options['assets'])
+        records = self._records(count)
+        self.stdout.write(self.style.SUCCESS(f'--- Depreciation Benchmark: {count} assets ---'))
+
+        if depreciation.np is not None:
+            self._time('numpy', records, True)
+        else:
+            self.stdout.write('  numpy    | not installed (pure-Python fallback only)')
+        self._time('python', records, False)
+
+        if options['write']:
+            self._time_write(records, datetime.date.fromisoformat(options['as_of']))
+
+    def _records(self, count):
+        rng = random.Random(42)
+        return [
+            (
+                n, Decimal(rng.randint(5000, 500000)), Decimal(rng.choice([0, 0, 1000])), rng.choice(self.LIVES),
+                rng.choice(self.METHODS), datetime.date(2012 + n % 12, 1 + n % 12, 1 + n % 28),
+            )
+            for n in range(1, count + 1)
+        ]
+
+    def _time(self, label, records, use_numpy):
+        start = time.perf_counter()
+        months = sum(len(accumulated) for _, _, accumulated in DepreciationEngine.schedules(records, use_numpy))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f'  {label:<8} | {elapsed:8.2f} s | {months:10} asset-months | {months / elapsed:12.0f} months/s')
+
+    def _time_write(self, records, as_of):
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                Asset.objects.bulk_create([
+                    Asset(
+                        property_number=f'PAR-DEPR-{pk:07d}', item_id=f'DEPR-ITEM-{pk}', name='Benchmark',
+                        acquisition_cost=cost, salvage_value=salvage, useful_life_years=years,
+                        depreciation_method=method, date_acquired=acquired,
+                    )
+                    for pk, cost, salvage, years, method, acquired in records
+                ], batch_size=2000)
+                seeded = time.perf_counter() - start
+                self.stdout.write(f'  seed     | {seeded:8.2f} s | {len(records)} assets (bulk_create, not part of the engine)')
+
+                queryset = Asset.objects.filter(property_number__startswith='PAR-DEPR-')
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    assets, rows = DepreciationEngine.rebuild(queryset)
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f'  write    | {elapsed:8.2f} s | {rows:10} rows | {len(ctx.captured_queries)} queries for {assets} assets'
+                )
+
+                loaded = list(queryset.only('pk', 'accumulated_depreciation', *DepreciationEngine.FIELDS)[:1000])
+                start = time.perf_counter()
+                DepreciationEngine.book_values(as_of, loaded)
+                indexed = time.perf_counter() - start
+                start = time.perf_counter()
+                for asset in loaded:
+                    DepreciationEngine.book_value_as_of(asset, as_of)
+                single = (time.perf_counter() - start) / len(loaded)
+                self.stdout.write(
+                    f'  as-of    | {indexed * 1000:8.1f} ms for {len(loaded)} assets | {single * 1000:.2f} ms per single-asset lookup'
+                )
+                raise _Rollback()
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('--- all benchmark data rolled back ---'))
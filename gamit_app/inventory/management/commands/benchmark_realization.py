@@ -0,0 +1,65 @@
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from inventory.models import AssetBatch, BatchItem
+from inventory.workflow import WorkflowEngine
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark data once measured."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks WorkflowEngine._realize_assets on a synthetic acquisition batch (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--units', type=int, default=2000, help='Total physical units in the batch')
+        parser.add_argument('--items', type=int, default=10, help='Number of BatchItem lines the units are spread over')
+        parser.add_argument('--mode', choices=['bulk', 'per-unit', 'both'], default='both')
+
+    def handle(self, *args, **options):
+        units = max(1, options['units'])
+        items = max(1, min(options['items'], units))
+        modes = ['bulk', 'per-unit'] if options['mode'] == 'both' else [options['mode']]
+
+        self.stdout.write(self.style.SUCCESS(f'--- Realization Benchmark: {units} units over {items} items ---'))
+        for mode in modes:
+            elapsed, query_count, created = self._run(mode, units, items)
+            self.stdout.write(
+                f"  {mode:9} | {created:6} assets | {elapsed:8.3f} s | {query_count:6} queries"
+            )
+        self.stdout.write(self.style.SUCCESS('--- Benchmark Completed (all data rolled back) ---'))
+
+    def _run(self, mode, units, items):
+        result = {}
+        try:
+            with transaction.atomic():
+                batch = self._seed_batch(units, items)
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    created = WorkflowEngine._realize_assets(batch, bulk=(mode == 'bulk'))
+                    result['elapsed'] = time.perf_counter() - start
+                result['queries'] = len(ctx.captured_queries)
+                result['created'] = len(created or [])
+                raise _Rollback()
+        except _Rollback:
+            pass
+        return result['elapsed'], result['queries'], result['created']
+
+    def _seed_batch(self, units, items):
+        user = User.objects.create(username=f'benchmark_{time.time_ns()}')
+        batch = AssetBatch.objects.create(requestor=user, supplier_name='Benchmark Supplier')
+        per_item, remainder = divmod(units, items)
+        BatchItem.objects.bulk_create([
+            BatchItem(
+                batch=batch,
+                description=f'Benchmark Item {i + 1}',
+                quantity=per_item + (1 if i < remainder else 0),
+                amount=Decimal('1500.00'),
+            )
+            for i in range(items)
+        ])
+        return batch
@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from inventory.depreciation import DepreciationEngine
+from inventory.models import Asset
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the materialized monthly depreciation schedule of every asset (after bulk imports/updates)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DepreciationEngine.CHUNK_SIZE, help='Assets computed and written per transaction')
+        parser.add_argument('--asset', type=int, action='append', dest='assets', help='Only this asset id (repeatable)')
+        parser.add_argument('--pure-python', action='store_true', help='Do not use numpy even when it is installed')
+
+    def handle(self, *args, **options):
+        queryset = Asset.objects.all()
+        if options['assets']:
+            queryset = queryset.filter(pk__in=options['assets'])
+
+        start = time.perf_counter()
+        assets, rows = DepreciationEngine.rebuild(
+            queryset, chunk_size=options['chunk_size'], use_numpy=False if options['pure_python'] else None,
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} schedule rows for {assets} asset(s) in {elapsed:.1f}s."))
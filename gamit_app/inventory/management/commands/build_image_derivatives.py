@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from inventory.images import ImageDerivatives
+from inventory.models import Asset
+
+
+class Command(BaseCommand):
+    help = 'Generates missing or stale WebP thumbnails for asset serial/condition photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=None, help='Worker processes (default: CPU count; 1 renders inline)')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Assets written back per bulk update')
+        parser.add_argument('--asset', type=int, action='append', dest='assets', help='Only this asset id (repeatable)')
+
+    def handle(self, *args, **options):
+        queryset = Asset.objects.all()
+        if options['assets']:
+            queryset = queryset.filter(pk__in=options['assets'])
+
+        start = time.perf_counter()
+        updated = ImageDerivatives.backfill(
+            processes=options['processes'], chunk_size=options['chunk_size'], queryset=queryset,
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Updated derivatives for {updated} photo(s) in {elapsed:.1f}s."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from inventory.media_store import MediaStore
+
+
+class Command(BaseCommand):
+    help = 'Moves existing signatures and transaction documents into the content-addressed media store, collapsing duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be collapsed without writing anything')
+        parser.add_argument('--keep-originals', action='store_true', help='Leave the legacy files on disk after re-pointing the rows')
+        parser.add_argument('--recount-only', action='store_true', help='Only recompute blob reference counts (e.g. after bulk updates)')
+
+    def handle(self, *args, **options):
+        if options['recount_only']:
+            with transaction.atomic():
+                blobs, purged = MediaStore.recount(dry_run=options['dry_run'])
+            self.stdout.write(self.style.SUCCESS(f"{blobs} referenced blob(s), {purged} unreferenced blob(s) purged."))
+            return
+
+        with transaction.atomic():
+            stats = MediaStore.collapse(dry_run=options['dry_run'], keep_originals=options['keep_originals'])
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(
+            f"{prefix}{stats['files']} file(s) -> {stats['blobs']} blob(s) across {stats['rows']} row(s); "
+            f"{stats['bytes_saved'] / 2**20:.2f} MiB of duplicates; {stats['missing']} missing file(s) skipped."
+        )
+        self.stdout.write(self.style.SUCCESS(f"{prefix}Media collapse completed."))
@@ -0,0 +1,41 @@
+import time
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from inventory.outbox import NotificationDispatcher
+
+
+class Command(BaseCommand):
+    help = 'Sends queued workflow notifications from the NotificationOutbox over a single mail connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=NotificationDispatcher.BATCH_SIZE, help='Messages per batch')
+        parser.add_argument('--backend', help='Override EMAIL_BACKEND (e.g. django.core.mail.backends.console.EmailBackend)')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting once it is drained')
+        parser.add_argument('--interval', type=float, default=10.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        connection = get_connection(options['backend'])
+        totals = {'sent': 0, 'retried': 0, 'failed': 0, 'duplicates': 0}
+        try:
+            while True:
+                # Drain everything currently due, batch by batch, over the same connection
+                while True:
+                    stats = NotificationDispatcher.drain(connection=connection, batch_size=options['batch_size'])
+                    for key, value in stats.items():
+                        totals[key] += value
+                    if sum(stats.values()) < options['batch_size']:
+                        break
+                # Don't hold the session idle across polls; the relay would drop it
+                connection.close()
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Notifications sent: {totals['sent']}, retrying: {totals['retried']}, "
+            f"failed: {totals['failed']}, duplicates skipped: {totals['duplicates']}."
+        ))
@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from inventory.partitions import LogPartitions
+
+
+class Command(BaseCommand):
+    help = 'PostgreSQL: creates the current and upcoming monthly partitions of the log tables (run as a worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3, help='Months after the current one to pre-create')
+        parser.add_argument('--loop', action='store_true', help='Keep checking instead of exiting after one pass')
+        parser.add_argument('--interval', type=float, default=21600.0, help='Seconds between checks with --loop')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                created = LogPartitions.ensure_partitions(options['months_ahead'])
+                if created:
+                    self.stdout.write(self.style.SUCCESS(f"Created {created} log partition(s)."))
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
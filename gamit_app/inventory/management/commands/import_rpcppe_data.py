@@ -1,66 +1,38 @@
-import csv
-import decimal
-from django.core.management.base import BaseCommand
-from inventory.models import Asset, Department
+from django.core.management.base import BaseCommand, CommandError
+from inventory.importer import RpcppeImporter
 
 class Command(BaseCommand):
     help = 'Imports actual RPCPPE data from the COA CSV file'
 
-    def handle(self, *args, **options):
-        csv_file_path = "/app/rpcppe_data.csv"
-        self.stdout.write(f'Importing from {csv_file_path}...')
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default="/app/rpcppe_data.csv", help='RPCPPE CSV export')
+        parser.add_argument('--chunk-size', type=int, default=RpcppeImporter.CHUNK_SIZE, help='Rows upserted per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report new/changed/unchanged counts per department without writing')
 
-        with open(csv_file_path, newline='', encoding='utf-8-sig') as csvfile:
-            reader = csv.reader(csvfile)
-            # Skip header rows (1-7)
-            for _ in range(7):
-                next(reader)
-            
-            count = 0
-            for row in reader:
-                if not row or len(row) < 13:
-                    continue
-                
-                article = row[0].strip()
-                brand = row[1].strip()
-                description = row[2].strip()
-                prop_num = row[3].strip()
-                uom = row[4].strip()
-                cost_str = row[5].replace(',', '').replace('"', '').strip()
-                qty_card = row[6].strip()
-                qty_physical = row[7].strip()
-                office_name = row[12].strip()
-                
-                if not prop_num or not office_name:
-                    continue
+    def handle(self, *args, **options):
+        csv_file_path = options['path']
+        dry_run = options['dry_run']
+        self.stdout.write(f'{"Comparing" if dry_run else "Importing"} from {csv_file_path}...')
 
-                # 1. Get or create Department
-                dept, _ = Department.objects.get_or_create(name=office_name)
+        def progress(stats):
+            self.stdout.write(f"Processed {stats['rows']} rows...")
 
-                # 2. Cleanup cost
-                try:
-                    cost = decimal.Decimal(cost_str) if cost_str else 0
-                except decimal.InvalidOperation:
-                    cost = 0
+        try:
+            stats = RpcppeImporter.run(
+                RpcppeImporter.read_rows(csv_file_path), chunk_size=options['chunk_size'],
+                dry_run=dry_run, progress=progress,
+            )
+        except OSError as e:
+            raise CommandError(str(e))
 
-                # 3. Create Asset
-                Asset.objects.update_or_create(
-                    property_number=prop_num,
-                    defaults={
-                        'name': article,
-                        'brand': brand,
-                        'description': description,
-                        'unit_of_measure': uom or 'Unit',
-                        'acquisition_cost': cost,
-                        'quantity_physical_count': int(qty_physical) if qty_physical.isdigit() else 1,
-                        'department': dept,
-                        'asset_class': article, # Article maps to Category in GAMIT context
-                        'status': 'SERVICEABLE',
-                        'date_acquired': '2026-01-01', # Placeholder for date
-                    }
-                )
-                count += 1
-                if count % 100 == 0:
-                    self.stdout.write(f'Imported {count} assets...')
+        if dry_run:
+            width = max([len(name) for name in stats['by_department']] + [10])
+            self.stdout.write(f"{'Department':<{width}}  {'New':>7}  {'Changed':>7}  {'Unchanged':>9}")
+            for name, counts in sorted(stats['by_department'].items()):
+                self.stdout.write(f"{name:<{width}}  {counts['new']:>7}  {counts['changed']:>7}  {counts['unchanged']:>9}")
 
-        self.stdout.write(self.style.SUCCESS(f'Successfully imported {count} assets.'))
+        prefix = '[dry run] Would import' if dry_run else 'Successfully imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {stats['new'] + stats['changed']} assets "
+            f"({stats['new']} new, {stats['changed']} changed, {stats['unchanged']} unchanged)."
+        ))
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from inventory.documents import DocumentJobQueue
+
+
+class Command(BaseCommand):
+    help = 'Renders queued PAR/ICS/PTR document jobs (run alongside the web workers)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs instead of exiting when idle')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls with --loop')
+        parser.add_argument('--limit', type=int, help='Stop after this many jobs')
+
+    def handle(self, *args, **options):
+        total_done = total_failed = 0
+        try:
+            while True:
+                remaining = None if options['limit'] is None else options['limit'] - total_done - total_failed
+                done, failed = DocumentJobQueue.process(limit=remaining)
+                total_done += done
+                total_failed += failed
+                if done or failed:
+                    self.stdout.write(f"Rendered {done} document(s), {failed} failed.")
+                if not options['loop'] or (remaining is not None and done + failed >= remaining):
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Document jobs finished: {total_done} rendered, {total_failed} failed."))
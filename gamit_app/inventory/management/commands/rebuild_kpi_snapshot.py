@@ -0,0 +1,14 @@
+import time
+from django.core.management.base import BaseCommand
+from inventory.snapshots import AssetKpiTracker
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the dashboard AssetKpiSnapshot table from the Asset and ServiceLog tables'
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding dashboard KPI snapshot...")
+        start = time.perf_counter()
+        rows = AssetKpiTracker.rebuild()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Snapshot rebuilt: {rows} cells written in {elapsed:.2f}s."))
@@ -0,0 +1,98 @@
+import os
+import re
+from django.db import transaction
+from .images import ImageDerivatives
+
+
+class AssetImageLinker:
+    """
+    Links bulk-uploaded images to assets by the property number in the file
+    name. Property numbers are matched on Asset.property_digits (their digits
+    without leading zeros, indexed and maintained in Asset.save), so a chunk
+    of files costs one lookup query plus one targeted UPDATE per matched asset,
+    instead of an icontains scan and a full save() per file.
+    """
+
+    # upload_type -> Asset image field
+    FIELDS = {'serials': 'image_serial', 'condition': 'image_condition'}
+
+    @staticmethod
+    def normalize(value):
+        """'PAR-000123' -> '123'; '' when the value has no digits."""
+        digits = ''.join(re.findall(r'\d', value or ''))
+        return digits.lstrip('0') or ('0' if digits else '')
+
+    @staticmethod
+    def candidates(filename):
+        """Keys to try for a file name, best first: all of its digits, then each digit run ('000123 (1).jpg')."""
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        keys = [AssetImageLinker.normalize(stem)]
+        keys += [AssetImageLinker.normalize(run) for run in re.findall(r'\d+', stem)]
+        return [key for i, key in enumerate(keys) if key and key not in keys[:i]]
+
+    @staticmethod
+    def match(filenames):
+        """{filename: (asset id, property number) or None} with a single query."""
+        from .models import Asset
+
+        wanted = {name: AssetImageLinker.candidates(name) for name in filenames}
+        keys = {key for keys in wanted.values() for key in keys}
+        by_digits = {}
+        # Lowest id wins when different series share digits (e.g. PAR-0001 / ICS-0001)
+        for asset_id, number, digits in Asset.objects.filter(property_digits__in=keys).order_by('-id').values_list(
+            'id', 'property_number', 'property_digits'
+        ):
+            by_digits[digits] = (asset_id, number)
+        return {
+            name: next((by_digits[key] for key in keys if key in by_digits), None)
+            for name, keys in wanted.items()
+        }
+
+    @staticmethod
+    def link(images, upload_type):
+        """Stores and links uploaded images. Returns (per-file results, summary counts) for the UI."""
+        from .models import Asset
+
+        field = Asset._meta.get_field(AssetImageLinker.FIELDS.get(upload_type, 'image_condition'))
+        matches = AssetImageLinker.match([image.name for image in images])
+
+        results = []
+        winners = {}  # asset id -> index of the last file that matched it
+        for image in images:
+            found = matches[image.name]
+            if not AssetImageLinker.candidates(image.name):
+                results.append({'file': image.name, 'status': 'Error', 'msg': 'No numeric PAR found in name.'})
+            elif found is None:
+                digits = ' / '.join(AssetImageLinker.candidates(image.name))
+                results.append({'file': image.name, 'status': 'Not Found', 'msg': f'No Asset matches digits: {digits}'})
+            else:
+                winners[found[0]] = len(results)
+                results.append({'file': image.name, 'status': 'Success', 'asset': found[1]})
+
+        updates = {}
+        for position, (image, result) in enumerate(zip(images, results)):
+            if result['status'] != 'Success':
+                continue
+            asset_id = matches[image.name][0]
+            if winners[asset_id] != position:
+                # Same outcome as saving them one after another: the last file wins
+                result.update(status='Error', msg='Replaced by a later file for the same asset.')
+                continue
+            try:
+                updates[asset_id] = field.storage.save(
+                    field.generate_filename(None, image.name), image, max_length=field.max_length
+                )
+            except Exception as e:
+                result.update(status='Error', msg=str(e))
+
+        with transaction.atomic():
+            for asset_id, name in updates.items():
+                Asset.objects.filter(pk=asset_id).update(**{field.attname: name})
+            if updates:
+                # update() skips post_save, so request the thumbnails here
+                transaction.on_commit(lambda: ImageDerivatives.refresh(list(updates)))
+
+        summary = {'success': 0, 'not_found': 0, 'error': 0}
+        for result in results:
+            summary[{'Success': 'success', 'Not Found': 'not_found'}.get(result['status'], 'error')] += 1
+        return results, summary
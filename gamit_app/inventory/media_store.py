@@ -0,0 +1,251 @@
+import hashlib
+import os
+import uuid
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names every file after the SHA256 of its bytes
+    (cas/ab/cd/abcd....png), so identical uploads land on one file.
+    Files are shared between rows, therefore delete() is a no-op here: blobs are
+    removed by MediaStore once their reference count (inventory.MediaBlob) drops to zero.
+    """
+
+    PREFIX = 'cas/'
+    CHUNK_SIZE = 64 * 1024
+
+    def _save(self, name, content):
+        target = self.blob_name(self.digest(content), name)
+        if self.exists(target):
+            return target
+        content.seek(0)
+        # Written under a private name and renamed into place: a concurrent upload of the same
+        # bytes swaps in an identical file instead of colliding on the name (FileSystemStorage
+        # would retry get_available_name(), i.e. the same name, forever)
+        temporary = super()._save(f"{target}.{uuid.uuid4().hex}.tmp", content)
+        os.replace(self.path(temporary), self.path(target))
+        return target
+
+    def get_available_name(self, name, max_length=None):
+        # The real name is decided from the content in _save
+        return name
+
+    def delete(self, name):
+        pass
+
+    def purge(self, name):
+        """Physically removes a blob (MediaStore only)."""
+        super().delete(name)
+
+    @staticmethod
+    def digest(content):
+        sha = hashlib.sha256()
+        content.seek(0)
+        for chunk in iter(lambda: content.read(ContentAddressedStorage.CHUNK_SIZE), b''):
+            sha.update(chunk if isinstance(chunk, bytes) else chunk.encode())
+        return sha.hexdigest()
+
+    @staticmethod
+    def blob_name(sha, original_name=''):
+        ext = os.path.splitext(original_name or '')[1].lower()[:10]
+        return f"{ContentAddressedStorage.PREFIX}{sha[:2]}/{sha[2:4]}/{sha}{ext}"
+
+    @staticmethod
+    def is_blob(name):
+        return bool(name) and name.startswith(ContentAddressedStorage.PREFIX)
+
+
+_content_store = ContentAddressedStorage()
+
+
+def content_store():
+    """Storage callable for FileFields that hold signatures and transaction documents."""
+    return _content_store
+
+
+class MediaStore:
+    """
+    Reference counting for content-addressed blobs. Every tracked FileField
+    (FIELDS) holding a cas/ name counts as one reference; inventory.signals
+    retains/releases references as rows are saved, changed and deleted, and
+    `manage.py collapse_media_duplicates` moves legacy files into the store and
+    recounts from the tables. QuerySet.update()/bulk_create() skip the signals,
+    so run it with --recount-only after bulk edits of these fields.
+    """
+
+    # (app label, model, field) holding shared media
+    FIELDS = [
+        ('workflow', 'Persona', 'signature_image'),
+        ('workflow', 'WorkflowMovementLog', 'signature_snapshot'),
+        ('inventory', 'UserSignature', 'signature_image'),
+        ('inventory', 'ApprovalLog', 'signature_snapshot'),
+        ('inventory', 'InspectionRequest', 'document_1'),
+        ('inventory', 'InspectionRequest', 'document_2'),
+        ('inventory', 'AssetBatch', 'doc_1_file'),
+        ('inventory', 'AssetBatch', 'doc_2_file'),
+        ('inventory', 'AssetBatch', 'doc_3_file'),
+        ('inventory', 'AssetBatch', 'doc_4_file'),
+        ('inventory', 'AssetBatch', 'doc_5_file'),
+        ('inventory', 'AssetTransferRequest', 'document_1'),
+        ('inventory', 'AssetTransferRequest', 'document_2'),
+        ('inventory', 'AssetReturnRequest', 'original_par_document'),
+        ('inventory', 'AssetLossReport', 'notice_of_loss'),
+        ('inventory', 'AssetLossReport', 'affidavit_of_loss'),
+        ('inventory', 'AssetLossReport', 'police_report'),
+        ('inventory', 'PropertyClearanceRequest', 'routing_form'),
+    ]
+
+    @staticmethod
+    def tracked_fields():
+        """{model class: [field names]} for FIELDS."""
+        from django.apps import apps
+
+        fields = {}
+        for app_label, model_name, field in MediaStore.FIELDS:
+            fields.setdefault(apps.get_model(app_label, model_name), []).append(field)
+        return fields
+
+    @staticmethod
+    def snapshot(field_file, name):
+        """
+        Value for copying `field_file` into another tracked field: the blob name
+        when it already lives in the store (a new reference, no bytes read), else
+        its content (which the store then de-duplicates on save).
+        """
+        from django.core.files.base import ContentFile
+
+        if ContentAddressedStorage.is_blob(field_file.name):
+            return field_file.name
+        field_file.open('rb')
+        try:
+            return ContentFile(field_file.read(), name=name)
+        finally:
+            field_file.close()
+
+    @staticmethod
+    def retain(name):
+        from .models import MediaBlob
+
+        if not ContentAddressedStorage.is_blob(name):
+            return
+        if not MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1):
+            blob, created = MediaBlob.objects.get_or_create(
+                name=name, defaults={'sha256': MediaStore._sha_of(name), 'size': MediaStore._size_of(name), 'ref_count': 1},
+            )
+            if not created:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+
+    @staticmethod
+    def release(name):
+        from .models import MediaBlob
+
+        if not ContentAddressedStorage.is_blob(name):
+            return
+        MediaBlob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+        # Delete the bytes only once the releasing transaction is durable
+        transaction.on_commit(lambda: MediaStore._purge_if_unreferenced(name))
+
+    @staticmethod
+    def recount(dry_run=False):
+        """Recomputes every blob's reference count from the tracked tables and purges unreferenced blobs."""
+        from collections import Counter
+        from .models import LogArchive, MediaBlob
+
+        counts = Counter()
+        for model, fields in MediaStore.tracked_fields().items():
+            for field in fields:
+                names = model.objects.filter(**{f"{field}__startswith": ContentAddressedStorage.PREFIX})
+                counts.update(names.values_list(field, flat=True))
+        # Rows moved out to log archives still reference their blobs
+        for media in LogArchive.objects.filter(restored_at__isnull=True).values_list('media', flat=True):
+            counts.update({name: refs for name, refs in media.items() if name.startswith(ContentAddressedStorage.PREFIX)})
+
+        purged = 0
+        existing = dict(MediaBlob.objects.values_list('name', 'ref_count'))
+        for name, refs in counts.items():
+            if name not in existing and not dry_run:
+                MediaBlob.objects.create(
+                    name=name, sha256=MediaStore._sha_of(name), size=MediaStore._size_of(name), ref_count=refs,
+                )
+            elif existing.get(name) != refs and not dry_run:
+                MediaBlob.objects.filter(name=name).update(ref_count=refs)
+        for name in set(existing) - set(counts):
+            purged += 1
+            if not dry_run:
+                MediaBlob.objects.filter(name=name).update(ref_count=0)
+                transaction.on_commit(lambda name=name: MediaStore._purge_if_unreferenced(name))
+        return len(counts), purged
+
+    @staticmethod
+    def collapse(dry_run=False, keep_originals=False):
+        """
+        Moves every legacy (non cas/) file of the tracked fields into the store,
+        points the rows at the shared blob and recounts references. Returns
+        {'files', 'blobs', 'rows', 'missing', 'bytes_saved'}.
+        """
+        from django.core.files import File
+        from django.core.files.storage import default_storage
+
+        stats = {'files': 0, 'blobs': 0, 'rows': 0, 'missing': 0, 'bytes_saved': 0}
+        moved = {}  # legacy name -> blob name
+        seen_blobs = set()
+        for model, fields in MediaStore.tracked_fields().items():
+            for field in fields:
+                legacy = (
+                    model.objects.exclude(**{f"{field}__startswith": ContentAddressedStorage.PREFIX})
+                    .exclude(**{field: ''}).exclude(**{f"{field}__isnull": True})
+                )
+                for name in legacy.values_list(field, flat=True).distinct():
+                    if name not in moved:
+                        if not default_storage.exists(name):
+                            stats['missing'] += 1
+                            continue
+                        with default_storage.open(name, 'rb') as handle:
+                            blob = ContentAddressedStorage.blob_name(ContentAddressedStorage.digest(handle), name)
+                            if blob in seen_blobs or _content_store.exists(blob):
+                                stats['bytes_saved'] += default_storage.size(name)
+                            elif not dry_run:
+                                blob = _content_store.save(name, File(handle, name=name))
+                        seen_blobs.add(blob)
+                        moved[name] = blob
+                        stats['files'] += 1
+                    if not dry_run:
+                        stats['rows'] += model.objects.filter(**{field: name}).update(**{field: moved[name]})
+                    else:
+                        stats['rows'] += model.objects.filter(**{field: name}).count()
+
+        stats['blobs'] = len(seen_blobs)
+        if dry_run:
+            return stats
+        MediaStore.recount()
+        if not keep_originals:
+            # Only after every row points at its blob
+            transaction.on_commit(lambda: [default_storage.delete(name) for name in moved])
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _purge_if_unreferenced(name):
+        from .models import MediaBlob
+
+        deleted, _ = MediaBlob.objects.filter(name=name, ref_count__lte=0).delete()
+        if deleted:
+            _content_store.purge(name)
+
+    @staticmethod
+    def _sha_of(name):
+        return os.path.splitext(os.path.basename(name))[0][:64]
+
+    @staticmethod
+    def _size_of(name):
+        try:
+            return _content_store.size(name)
+        except OSError:
+            return 0
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0039_alter_asset_item_id_alter_asset_property_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenceCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150, unique=True, verbose_name='Sequence Key')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='Last Issued Number')),
+                ('width', models.PositiveSmallIntegerField(default=5, verbose_name='Zero-fill Width')),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0040_sequencecounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetKpiSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ACQUIRED', 'Assets by Date Acquired'), ('CREATED', 'Assets by Date Registered'), ('SERVICE', 'Service Logs by Service Date')], max_length=10)),
+                ('asset_class', models.CharField(max_length=255)),
+                ('asset_nature', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=20)),
+                ('period', models.DateField(verbose_name='Day Bucket')),
+                ('item_count', models.IntegerField(default=0, verbose_name='Assets / Service Logs')),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Acquisition Cost / Service Cost')),
+                ('max_cost', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.department')),
+                ('max_asset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='inventory.asset')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'period'], name='asset_kpi_kind_period_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'asset_class', 'asset_nature', 'status', 'department', 'period'), name='uniq_asset_kpi_cell')],
+            },
+        ),
+    ]
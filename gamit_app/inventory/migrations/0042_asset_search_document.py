@@ -0,0 +1,74 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:36
+
+from django.db import migrations, models
+
+
+POSTGRES_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS asset_search_tsv_idx ON inventory_asset "
+    "USING gin (to_tsvector('simple', search_document))",
+    "CREATE INDEX IF NOT EXISTS asset_search_trgm_idx ON inventory_asset "
+    "USING gin (search_document gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS asset_prop_prefix_idx ON inventory_asset "
+    "(property_number varchar_pattern_ops)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS asset_prop_prefix_idx",
+    "DROP INDEX IF EXISTS asset_search_trgm_idx",
+    "DROP INDEX IF EXISTS asset_search_tsv_idx",
+]
+
+
+def compose(*parts):
+    # Frozen copy of inventory.search.AssetSearch.compose as of this migration
+    return ' '.join(' '.join(str(p).split()) for p in parts if p).lower()
+
+
+def backfill_search_document(apps, schema_editor):
+    Asset = apps.get_model('inventory', 'Asset')
+    batch = []
+    for asset in Asset.objects.select_related('department').iterator(chunk_size=1000):
+        asset.search_document = compose(
+            asset.property_number, asset.name, asset.description,
+            asset.accountable_firstname, asset.accountable_surname,
+            asset.department.name if asset.department_id else None,
+        )
+        batch.append(asset)
+        if len(batch) >= 1000:
+            Asset.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        Asset.objects.bulk_update(batch, ['search_document'])
+
+
+def create_postgres_indexes(apps, schema_editor):
+    # GIN / trigram / pattern-ops indexes only exist on PostgreSQL; SQLite dev uses plain LIKE
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in POSTGRES_INDEXES:
+        schema_editor.execute(statement)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in POSTGRES_DROP:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0041_assetkpisnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
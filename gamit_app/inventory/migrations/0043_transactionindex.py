@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_transaction_index(apps, schema_editor):
+    from inventory.ledger import TransactionIndexer
+    TransactionIndexer.rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0042_asset_search_document'),
+        ('workflow', '0004_persona_position_title_persona_signature_image'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type_code', models.CharField(choices=[('BATCH', 'Acquisition'), ('REQ', 'Inspection'), ('TRF', 'Transfer'), ('RET', 'Return'), ('LOSS', 'Loss Report'), ('CLR', 'Clearance')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('transaction_id', models.CharField(max_length=20)),
+                ('requestor_name', models.CharField(blank=True, max_length=300)),
+                ('requestor_office', models.CharField(blank=True, max_length=100, null=True)),
+                ('raw_status', models.CharField(blank=True, max_length=50)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('APPROVED', 'Approved'), ('RETURNED', 'Returned')], default='PENDING', max_length=10, verbose_name='Normalized Status')),
+                ('asset_label', models.CharField(blank=True, max_length=255)),
+                ('asset_name', models.CharField(blank=True, max_length=255)),
+                ('search_text', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField()),
+                ('asset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='inventory.asset')),
+                ('current_step', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='workflow.workflowstep')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='inventory.department', verbose_name='Requestor Department')),
+                ('requestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('required_role', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='workflow.role', verbose_name='Current Required Role')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['requestor', '-created_at'], name='txn_idx_requestor_idx'), models.Index(fields=['department', '-created_at'], name='txn_idx_department_idx'), models.Index(fields=['required_role', 'status'], name='txn_idx_role_status_idx'), models.Index(fields=['status', '-created_at'], name='txn_idx_status_created_idx'), models.Index(fields=['type_code', '-created_at'], name='txn_idx_type_created_idx'), models.Index(fields=['-created_at', '-id'], name='txn_idx_created_idx')],
+                'constraints': [models.UniqueConstraint(fields=('type_code', 'object_id'), name='uniq_transaction_index_source')],
+            },
+        ),
+        migrations.RunPython(backfill_transaction_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:03
+
+import inventory.media_store
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0045_documentjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Storage Path')),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='approvallog',
+            name='signature_snapshot',
+            field=models.ImageField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='signatures/snapshots/'),
+        ),
+        migrations.AlterField(
+            model_name='assetbatch',
+            name='doc_1_file',
+            field=models.FileField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='batch_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='assetbatch',
+            name='doc_2_file',
+            field=models.FileField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='batch_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='assetbatch',
+            name='doc_3_file',
+            field=models.FileField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='batch_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='assetbatch',
+            name='doc_4_file',
+            field=models.FileField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='batch_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='assetbatch',
+            name='doc_5_file',
+            field=models.FileField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='batch_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='assetlossreport',
+            name='affidavit_of_loss',
+            field=models.FileField(storage=inventory.media_store.content_store, upload_to='loss_docs/', verbose_name='Notarized Affidavit of Loss'),
+        ),
+        migrations.AlterField(
+            model_name='assetlossreport',
+            name='notice_of_loss',
+            field=models.FileField(storage=inventory.media_store.content_store, upload_to='loss_docs/', verbose_name='Notice of Loss'),
+        ),
+        migrations.AlterField(
+            model_name='assetlossreport',
+            name='police_report',
+            field=models.FileField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='loss_docs/', verbose_name='Police/Fire Report (Optional)'),
+        ),
+        migrations.AlterField(
+            model_name='assetreturnrequest',
+            name='original_par_document',
+            field=models.FileField(storage=inventory.media_store.content_store, upload_to='return_docs/', verbose_name='Signed Copy of Original PAR/ICS'),
+        ),
+        migrations.AlterField(
+            model_name='assettransferrequest',
+            name='document_1',
+            field=models.FileField(storage=inventory.media_store.content_store, upload_to='transfer_docs/', verbose_name='Transfer Form (ITR)'),
+        ),
+        migrations.AlterField(
+            model_name='assettransferrequest',
+            name='document_2',
+            field=models.FileField(storage=inventory.media_store.content_store, upload_to='transfer_docs/', verbose_name='ID / Authorization'),
+        ),
+        migrations.AlterField(
+            model_name='inspectionrequest',
+            name='document_1',
+            field=models.FileField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='inspection_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='inspectionrequest',
+            name='document_2',
+            field=models.FileField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='inspection_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='propertyclearancerequest',
+            name='routing_form',
+            field=models.FileField(storage=inventory.media_store.content_store, upload_to='clearance_docs/', verbose_name='Employee Routing / Clearance Form'),
+        ),
+        migrations.AlterField(
+            model_name='usersignature',
+            name='signature_image',
+            field=models.ImageField(storage=inventory.media_store.content_store, upload_to='signatures/', verbose_name='Digital Signature'),
+        ),
+    ]
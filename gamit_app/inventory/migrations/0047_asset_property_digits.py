@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:04
+
+import re
+
+from django.db import migrations, models
+
+
+def normalize(value):
+    # Frozen copy of inventory.media_linker.AssetImageLinker.normalize as of this migration
+    digits = ''.join(re.findall(r'\d', value or ''))
+    return digits.lstrip('0') or ('0' if digits else '')
+
+
+def backfill_property_digits(apps, schema_editor):
+    Asset = apps.get_model('inventory', 'Asset')
+    batch = []
+    for asset in Asset.objects.only('id', 'property_number').iterator(chunk_size=1000):
+        asset.property_digits = normalize(asset.property_number)[:64]
+        batch.append(asset)
+        if len(batch) >= 1000:
+            Asset.objects.bulk_update(batch, ['property_digits'])
+            batch = []
+    if batch:
+        Asset.objects.bulk_update(batch, ['property_digits'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0046_media_blob_content_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='property_digits',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_property_digits, migrations.RunPython.noop),
+    ]
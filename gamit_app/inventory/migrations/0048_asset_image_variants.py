@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0047_asset_property_digits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
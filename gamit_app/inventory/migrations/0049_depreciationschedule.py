@@ -0,0 +1,82 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:16
+
+import datetime
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of inventory.depreciation.DepreciationEngine (pure-Python path) as of this migration
+def accumulated_curve(method, years, cost, depreciable):
+    months = years * 12
+    if method == 'DECLINING_BALANCE':
+        factor = 1 - (2 / years) / 12
+        accumulated = [round(min(cost * (1 - factor ** m), depreciable), 2) for m in range(1, months + 1)]
+        accumulated[-1] = round(depreciable, 2)
+        return accumulated
+    if method == 'SUM_OF_YEARS':
+        total = years * (years + 1) / 2
+        fractions, done = [], 0.0
+        for year in range(years):
+            share = (years - year) / total
+            fractions.extend(done + share * m / 12 for m in range(1, 13))
+            done += share
+    else:
+        fractions = [m / months for m in range(1, months + 1)]
+    return [round(depreciable * f, 2) for f in fractions]
+
+
+def backfill_schedules(apps, schema_editor):
+    Asset = apps.get_model('inventory', 'Asset')
+    DepreciationSchedule = apps.get_model('inventory', 'DepreciationSchedule')
+    assets = Asset.objects.filter(acquisition_cost__gt=0, useful_life_years__gt=0).values_list(
+        'pk', 'acquisition_cost', 'salvage_value', 'useful_life_years', 'depreciation_method',
+        'depreciation_start_date', 'date_acquired',
+    )
+    batch = []
+    for pk, cost, salvage, years, method, start, acquired in assets.iterator(chunk_size=2000):
+        start = start or acquired
+        cost, salvage = float(cost), float(salvage or 0)
+        if not start or cost <= salvage:
+            continue
+        year, month, previous = start.year, start.month, 0.0
+        for total in accumulated_curve(method or 'STRAIGHT_LINE', years, cost, cost - salvage):
+            batch.append(DepreciationSchedule(
+                asset_id=pk, period=datetime.date(year, month, 1),
+                depreciation=Decimal(str(round(total - previous, 2))), accumulated=Decimal(str(total)),
+                book_value=Decimal(str(round(cost - total, 2))),
+            ))
+            previous = total
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        if len(batch) >= 20000:
+            DepreciationSchedule.objects.bulk_create(batch, batch_size=2000)
+            batch = []
+    if batch:
+        DepreciationSchedule.objects.bulk_create(batch, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0048_asset_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepreciationSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(verbose_name='Month')),
+                ('depreciation', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('accumulated', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('book_value', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='depreciation_schedule', to='inventory.asset')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'asset'], name='depr_period_idx')],
+                'constraints': [models.UniqueConstraint(fields=('asset', 'period'), name='uniq_depreciation_period')],
+            },
+        ),
+        migrations.RunPython(backfill_schedules, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0049_depreciationschedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=50)),
+                ('month', models.DateField()),
+                ('path', models.CharField(max_length=500)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('sha256', models.CharField(max_length=64)),
+                ('media', models.JSONField(blank=True, default=dict)),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('restored_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['table', '-month'],
+                'constraints': [models.UniqueConstraint(fields=('table', 'month'), name='uniq_log_archive_month')],
+            },
+        ),
+    ]
@@ -0,0 +1,119 @@
+import datetime
+
+from django.db import migrations
+
+
+# (table, time column) of the append-only logs as of this migration (see inventory.partitions.LogPartitions)
+LOG_TABLES = (
+    ('inventory_assetchangelog', 'timestamp'),
+    ('workflow_workflowmovementlog', 'timestamp'),
+    ('inventory_servicelog', 'created_at'),
+)
+# Partitions created up front beyond the current month (`manage.py ensure_log_partitions` keeps ahead of it)
+MONTHS_AHEAD = 3
+
+
+def month_bounds(month):
+    start = datetime.datetime(month.year, month.month, 1, tzinfo=datetime.timezone.utc)
+    end = datetime.datetime(month.year + month.month // 12, month.month % 12 + 1, 1, tzinfo=datetime.timezone.utc)
+    return start, end
+
+
+def upcoming_months(count):
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    first = today.year * 12 + today.month - 1
+    return {datetime.date(index // 12, index % 12 + 1, 1) for index in range(first, first + count + 1)}
+
+
+def partition_table(schema_editor, table, column):
+    """
+    Converts a plain table into one range-partitioned by `column`, using only the
+    catalog: its indexes and foreign keys are read back with pg_get_indexdef /
+    pg_get_constraintdef and recreated on the partitioned parent. The primary key
+    becomes (id, column), as PostgreSQL requires the partition key in it.
+    """
+    quote = schema_editor.quote_name
+    execute = schema_editor.execute
+    legacy = f"{table}_unpartitioned"
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)", [table],
+        )
+        if cursor.fetchone():
+            return
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND NOT indisprimary",
+            [table],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute("SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [table])
+        primary_key = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'", [table],
+        )
+        is_identity = bool(cursor.fetchone()[0])
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+        sequence = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', {quote(column)} AT TIME ZONE 'UTC')::date FROM {quote(table)}"
+        )
+        months = {row[0] for row in cursor.fetchall()} | upcoming_months(MONTHS_AHEAD)
+
+    # The old table keeps its data until the copy; free the names the new table needs
+    execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(legacy)}")
+    execute(f"ALTER TABLE {quote(legacy)} RENAME CONSTRAINT {quote(primary_key)} TO {quote(legacy + '_pkey')}")
+    execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(legacy)} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({quote(column)})"
+    )
+    execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(primary_key)} PRIMARY KEY (id, {quote(column)})")
+    execute(f"CREATE TABLE {quote(table + '_default')} PARTITION OF {quote(table)} DEFAULT")
+    for month in sorted(months):
+        start, end = month_bounds(month)
+        # DDL takes no bind parameters; the bounds are generated here, not user input
+        execute(
+            f"CREATE TABLE {quote(f'{table}_p{month:%Y%m}')} PARTITION OF {quote(table)} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    if sequence and not is_identity:
+        # A serial column's sequence belongs to the old table; keep it alive for the new one
+        execute(f"ALTER SEQUENCE {sequence} OWNED BY {quote(table)}.id")
+
+    execute(f"INSERT INTO {quote(table)} OVERRIDING SYSTEM VALUE SELECT * FROM {quote(legacy)}")
+    execute(f"DROP TABLE {quote(legacy)}")
+    for statement in indexes:
+        execute(statement)
+    for name, definition in foreign_keys:
+        execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}")
+    execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE((SELECT MAX(id) FROM {quote(table)}), 0) + 1, false)",
+        [table],
+    )
+
+
+def partition_log_tables(apps, schema_editor):
+    # PostgreSQL only: SQLite keeps plain tables (archival then deletes row ranges)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in LOG_TABLES:
+        partition_table(schema_editor, table, column)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0050_logarchive'),
+        ('workflow', '0006_content_addressed_signatures'),
+    ]
+
+    operations = [
+        # Irreversible in place; the partitioned tables behave like plain ones for the ORM
+        migrations.RunPython(partition_log_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0051_partition_log_tables'),
+        ('workflow', '0006_content_addressed_signatures'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['department', 'status'], name='asset_dept_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['status', 'asset_class', 'asset_nature'], name='asset_status_class_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['asset_class', 'asset_nature'], name='asset_class_nature_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['date_acquired', 'id'], name='asset_date_acquired_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['name', 'id'], name='asset_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['-created_at'], name='asset_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['department', '-created_at'], name='asset_dept_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(condition=models.Q(('status', 'SERVICEABLE')), fields=['department', 'asset_class', 'name'], name='asset_serviceable_rpcppe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetbatch',
+            index=models.Index(fields=['requestor', '-created_at'], name='batch_requestor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetbatch',
+            index=models.Index(fields=['status', '-created_at'], name='batch_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetlossreport',
+            index=models.Index(fields=['requestor', '-created_at'], name='loss_requestor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetlossreport',
+            index=models.Index(fields=['status', '-created_at'], name='loss_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetreturnrequest',
+            index=models.Index(fields=['requestor', '-created_at'], name='return_requestor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetreturnrequest',
+            index=models.Index(fields=['status', '-created_at'], name='return_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assettransferrequest',
+            index=models.Index(fields=['requestor', '-created_at'], name='transfer_requestor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assettransferrequest',
+            index=models.Index(fields=['status', '-created_at'], name='transfer_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionrequest',
+            index=models.Index(fields=['requestor', '-created_at'], name='inspection_requestor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionrequest',
+            index=models.Index(fields=['status', '-created_at'], name='inspection_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyclearancerequest',
+            index=models.Index(fields=['requestor', '-created_at'], name='clearance_requestor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyclearancerequest',
+            index=models.Index(fields=['status', '-created_at'], name='clearance_status_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:02
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def merge_unassigned_duplicates(apps, schema_editor):
+    """Folds duplicate "no department" cells (created concurrently) into one row before the constraint."""
+    AssetKpiSnapshot = apps.get_model('inventory', 'AssetKpiSnapshot')
+    key = ('kind', 'asset_class', 'asset_nature', 'status', 'period')
+    unassigned = AssetKpiSnapshot.objects.filter(department__isnull=True)
+    duplicates = unassigned.values(*key).annotate(
+        rows=Count('id'), n=Sum('item_count'), total=Sum('total_value'), top=Max('max_cost'),
+    ).filter(rows__gt=1)
+    for cell in duplicates:
+        rows = list(unassigned.filter(**{field: cell[field] for field in key}).order_by('id'))
+        keep = rows[0]
+        keep.item_count, keep.total_value = cell['n'], cell['total']
+        holder = next((row for row in rows if cell['top'] is not None and row.max_cost == cell['top']), None)
+        keep.max_cost, keep.max_asset_id = (holder.max_cost, holder.max_asset_id) if holder else (None, None)
+        keep.save(update_fields=['item_count', 'total_value', 'max_cost', 'max_asset'])
+        AssetKpiSnapshot.objects.filter(pk__in=[row.pk for row in rows[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0052_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_unassigned_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='assetkpisnapshot',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('kind', 'asset_class', 'asset_nature', 'status', 'period'), name='uniq_asset_kpi_cell_unassigned'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:20
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_batch_outputs(apps, schema_editor):
+    # PAR/ICS jobs rendered before this field existed point at their batch's par_file
+    AssetBatch = apps.get_model('inventory', 'AssetBatch')
+    DocumentJob = apps.get_model('inventory', 'DocumentJob')
+    DocumentJob.objects.filter(status='DONE', batch__isnull=False).update(
+        output=Subquery(AssetBatch.objects.filter(pk=OuterRef('batch_id')).values('par_file')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0053_assetkpisnapshot_unassigned_cell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentjob',
+            name='output',
+            field=models.FileField(blank=True, null=True, upload_to='documents/final/', verbose_name='Rendered Document'),
+        ),
+        migrations.RunPython(backfill_batch_outputs, migrations.RunPython.noop),
+    ]
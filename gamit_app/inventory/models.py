@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils.crypto import get_random_string
+from django.utils import timezone
+from .media_store import content_store
 import datetime
 
 # 0. DEPARTMENT MODEL (New)
@@ -31,49 +33,32 @@ class UserProfile(models.Model):
     
     def __str__(self): return f"{self.user.username} - {self.role}"
     
+# 1.0 SEQUENCE COUNTERS (Concurrency-safe numbering)
+class SequenceCounter(models.Model):
+    """
+    One row per numbering series (e.g. 'inventory.Asset.property_number:PAR-').
+    Locked and incremented by inventory.sequences.SequenceAllocator.
+    """
+    name = models.CharField(max_length=150, unique=True, verbose_name="Sequence Key")
+    last_value = models.PositiveBigIntegerField(default=0, verbose_name="Last Issued Number")
+    width = models.PositiveSmallIntegerField(default=5, verbose_name="Zero-fill Width")
+
+    def __str__(self): return f"{self.name} = {self.last_value}"
+
 def get_next_sequence(prefix, model, field_name="property_number", use_year=True):
     """
     Helper to get the next sequential number.
     By default: PREFIX-YYYY-NNNNN
     If use_year=False: PREFIX-NNNNNN (Legacy/Continuous)
+    Backed by SequenceCounter rows, so concurrent saves never collide.
     """
-    import datetime
-    
-    if use_year:
-        year = datetime.date.today().year
-        search_prefix = f"{prefix}-{year}-"
-    else:
-        search_prefix = f"{prefix}-"
-    
-    # Filter for items starting with our prefix
-    last_item = model.objects.filter(**{f"{field_name}__startswith": search_prefix}).order_by(f"-{field_name}").first()
-    
-    if last_item:
-        last_val = getattr(last_item, field_name)
-        try:
-            # Extract the last digits after the last hyphen
-            last_seq_str = last_val.split('-')[-1]
-            last_seq = int(last_seq_str)
-            new_seq = last_seq + 1
-            # Maintain the length of the number if possible, or default to 5-6
-            zfill_len = len(last_seq_str)
-        except (ValueError, IndexError):
-            new_seq = 1
-            zfill_len = 5
-    else:
-        new_seq = 1
-        zfill_len = 5
-        
-    if use_year:
-        return f"{search_prefix}{str(new_seq).zfill(5)}"
-    else:
-        # For legacy PAR, we typically use 6 digits or match existing
-        return f"{search_prefix}{str(new_seq).zfill(zfill_len if zfill_len > 0 else 5)}"
+    from .sequences import SequenceAllocator
+    return SequenceAllocator.next_value(prefix, model, field_name, use_year=use_year)
 
 # 1.1 USER SIGNATURE (New for Workflow)
 class UserSignature(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='signature')
-    signature_image = models.ImageField(upload_to='signatures/', verbose_name="Digital Signature")
+    signature_image = models.ImageField(upload_to='signatures/', storage=content_store, verbose_name="Digital Signature")
     position_title = models.CharField(max_length=150, verbose_name="Official Position Title")
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -173,6 +158,13 @@ class Asset(models.Model):
     longitude = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Denormalized, lowercased search text (see inventory/search.py); maintained in save()
+    search_document = models.TextField(blank=True, default='', editable=False)
+    # Digits of property_number without leading zeros (see inventory/media_linker.py); maintained in save()
+    property_digits = models.CharField(max_length=64, blank=True, default='', db_index=True, editable=False)
+    # WebP thumbnails of image_serial / image_condition (see inventory/images.py); maintained on upload
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
     # ==============================================
     # FINANCE & VALUATION FIELDS (Tab 2)
     # ==============================================
@@ -222,6 +214,22 @@ class Asset(models.Model):
     appraisal_date = models.DateField(blank=True, null=True, verbose_name="Last Appraisal Date")
     appraised_value = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, verbose_name="Appraised Value")
 
+    class Meta:
+        # Matched to the dashboard / asset_list slicers and sorts and the RPCPPE report
+        indexes = [
+            models.Index(fields=['department', 'status'], name='asset_dept_status_idx'),
+            models.Index(fields=['status', 'asset_class', 'asset_nature'], name='asset_status_class_idx'),
+            models.Index(fields=['asset_class', 'asset_nature'], name='asset_class_nature_idx'),
+            models.Index(fields=['date_acquired', 'id'], name='asset_date_acquired_idx'),
+            models.Index(fields=['name', 'id'], name='asset_name_idx'),
+            models.Index(fields=['-created_at'], name='asset_created_idx'),
+            models.Index(fields=['department', '-created_at'], name='asset_dept_created_idx'),
+            models.Index(
+                fields=['department', 'asset_class', 'name'], condition=models.Q(status='SERVICEABLE'),
+                name='asset_serviceable_rpcppe_idx',
+            ),
+        ]
+
     # ==============================================
     # COMPUTED PROPERTIES
     # ==============================================
@@ -245,13 +253,33 @@ class Asset(models.Model):
             return self.accumulated_depreciation >= (self.acquisition_cost - self.salvage_value)
         return False
 
+    # (field, prefix, use_year) of the counter-backed numbers; see SequenceAllocator
+    SEQUENCES = (("property_number", "PAR", False), ("item_id", "AST", True))
+
     def save(self, *args, **kwargs):
+        # Numbers drawn here are already below the counter (signals skip observe() for them)
+        self._allocated_sequences = set()
         if not self.property_number:
             # Match legacy format: PAR-XXXXXX (Continuous sequence)
             self.property_number = get_next_sequence("PAR", Asset, "property_number", use_year=False)
+            self._allocated_sequences.add('property_number')
         if not self.item_id:
             # Keep item_id internal sequence (UP-YYYY-NNNNN or similar)
             self.item_id = get_next_sequence("AST", Asset, "item_id", use_year=True)
+            self._allocated_sequences.add('item_id')
+
+        # Keep the search document in step with its source fields
+        from .search import AssetSearch
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or AssetSearch.SOURCE_FIELDS.intersection(update_fields):
+            self.search_document = AssetSearch.document_for(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'search_document'}
+        if update_fields is None or 'property_number' in update_fields:
+            from .media_linker import AssetImageLinker
+            self.property_digits = AssetImageLinker.normalize(self.property_number)[:64]
+            if update_fields is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'property_digits'}
         super().save(*args, **kwargs)
 
     def __str__(self): return f"{self.property_number} - {self.name}"
@@ -265,12 +293,18 @@ class InspectionRequest(models.Model):
     notes = models.TextField()
     status = models.CharField(max_length=50, default='Pending Inspection', choices=STATUS_CHOICES)
     current_step = models.ForeignKey('workflow.WorkflowStep', on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Current Workflow Step")
-    document_1 = models.FileField(upload_to='inspection_docs/', blank=True, null=True)
-    document_2 = models.FileField(upload_to='inspection_docs/', blank=True, null=True)
+    document_1 = models.FileField(upload_to='inspection_docs/', storage=content_store, blank=True, null=True)
+    document_2 = models.FileField(upload_to='inspection_docs/', storage=content_store, blank=True, null=True)
     admin_remarks = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['requestor', '-created_at'], name='inspection_requestor_idx'),
+            models.Index(fields=['status', '-created_at'], name='inspection_status_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.transaction_id:
             self.transaction_id = get_next_sequence("REQ", InspectionRequest, "transaction_id")
@@ -325,15 +359,15 @@ class AssetBatch(models.Model):
     
     # --- 5 DOCUMENT SLOTS ---
     doc_1_name = models.CharField(max_length=100, blank=True, null=True)
-    doc_1_file = models.FileField(upload_to='batch_docs/', blank=True, null=True)
+    doc_1_file = models.FileField(upload_to='batch_docs/', storage=content_store, blank=True, null=True)
     doc_2_name = models.CharField(max_length=100, blank=True, null=True)
-    doc_2_file = models.FileField(upload_to='batch_docs/', blank=True, null=True)
+    doc_2_file = models.FileField(upload_to='batch_docs/', storage=content_store, blank=True, null=True)
     doc_3_name = models.CharField(max_length=100, blank=True, null=True)
-    doc_3_file = models.FileField(upload_to='batch_docs/', blank=True, null=True)
+    doc_3_file = models.FileField(upload_to='batch_docs/', storage=content_store, blank=True, null=True)
     doc_4_name = models.CharField(max_length=100, blank=True, null=True)
-    doc_4_file = models.FileField(upload_to='batch_docs/', blank=True, null=True)
+    doc_4_file = models.FileField(upload_to='batch_docs/', storage=content_store, blank=True, null=True)
     doc_5_name = models.CharField(max_length=100, blank=True, null=True)
-    doc_5_file = models.FileField(upload_to='batch_docs/', blank=True, null=True)
+    doc_5_file = models.FileField(upload_to='batch_docs/', storage=content_store, blank=True, null=True)
 
     is_posted = models.BooleanField(default=False, editable=False)
 
@@ -342,6 +376,12 @@ class AssetBatch(models.Model):
         """Calculates total value of all items in batch."""
         return sum(item.amount * item.quantity for item in self.items.all())
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['requestor', '-created_at'], name='batch_requestor_idx'),
+            models.Index(fields=['status', '-created_at'], name='batch_status_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.transaction_id:
             self.transaction_id = get_next_sequence("BATCH", AssetBatch, "transaction_id")
@@ -359,7 +399,7 @@ class ApprovalLog(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     
     # Snapshot of signature used (path to a copy, not the user's live profile to prevent mutation)
-    signature_snapshot = models.ImageField(upload_to='signatures/snapshots/', null=True, blank=True)
+    signature_snapshot = models.ImageField(upload_to='signatures/snapshots/', storage=content_store, null=True, blank=True)
 
     def __str__(self): return f"{self.batch.transaction_id} - {self.action} by {self.user}"
 
@@ -414,8 +454,14 @@ class AssetTransferRequest(models.Model):
     admin_remarks = models.TextField(blank=True, null=True)
 
     # 2 Required Documents
-    document_1 = models.FileField(upload_to='transfer_docs/', verbose_name="Transfer Form (ITR)")
-    document_2 = models.FileField(upload_to='transfer_docs/', verbose_name="ID / Authorization")
+    document_1 = models.FileField(upload_to='transfer_docs/', storage=content_store, verbose_name="Transfer Form (ITR)")
+    document_2 = models.FileField(upload_to='transfer_docs/', storage=content_store, verbose_name="ID / Authorization")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['requestor', '-created_at'], name='transfer_requestor_idx'),
+            models.Index(fields=['status', '-created_at'], name='transfer_status_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.transaction_id:
@@ -513,9 +559,15 @@ class AssetReturnRequest(models.Model):
     reason = models.TextField(verbose_name="Reason for Return")
     
     # Required Document
-    original_par_document = models.FileField(upload_to='return_docs/', verbose_name="Signed Copy of Original PAR/ICS")
+    original_par_document = models.FileField(upload_to='return_docs/', storage=content_store, verbose_name="Signed Copy of Original PAR/ICS")
     admin_remarks = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['requestor', '-created_at'], name='return_requestor_idx'),
+            models.Index(fields=['status', '-created_at'], name='return_status_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.transaction_id:
             self.transaction_id = get_next_sequence("RET", AssetReturnRequest, "transaction_id")
@@ -539,11 +591,17 @@ class AssetLossReport(models.Model):
     description = models.TextField(verbose_name="Description of Incident")
     
     # Required Documents
-    notice_of_loss = models.FileField(upload_to='loss_docs/', verbose_name="Notice of Loss")
-    affidavit_of_loss = models.FileField(upload_to='loss_docs/', verbose_name="Notarized Affidavit of Loss")
-    police_report = models.FileField(upload_to='loss_docs/', blank=True, null=True, verbose_name="Police/Fire Report (Optional)")
+    notice_of_loss = models.FileField(upload_to='loss_docs/', storage=content_store, verbose_name="Notice of Loss")
+    affidavit_of_loss = models.FileField(upload_to='loss_docs/', storage=content_store, verbose_name="Notarized Affidavit of Loss")
+    police_report = models.FileField(upload_to='loss_docs/', storage=content_store, blank=True, null=True, verbose_name="Police/Fire Report (Optional)")
     admin_remarks = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['requestor', '-created_at'], name='loss_requestor_idx'),
+            models.Index(fields=['status', '-created_at'], name='loss_status_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.transaction_id:
             self.transaction_id = get_next_sequence("LOSS", AssetLossReport, "transaction_id")
@@ -563,14 +621,288 @@ class PropertyClearanceRequest(models.Model):
     current_step = models.ForeignKey('workflow.WorkflowStep', on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Current Workflow Step")
     
     # Required Document
-    routing_form = models.FileField(upload_to='clearance_docs/', verbose_name="Employee Routing / Clearance Form")
+    routing_form = models.FileField(upload_to='clearance_docs/', storage=content_store, verbose_name="Employee Routing / Clearance Form")
     purpose = models.CharField(max_length=150, verbose_name="Purpose of Clearance (e.g., Retirement, Transfer)")
     admin_remarks = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['requestor', '-created_at'], name='clearance_requestor_idx'),
+            models.Index(fields=['status', '-created_at'], name='clearance_status_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.transaction_id:
             self.transaction_id = get_next_sequence("CLR", PropertyClearanceRequest, "transaction_id")
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.transaction_id} - {self.requestor.get_full_name()}"
\ No newline at end of file
+        return f"{self.transaction_id} - {self.requestor.get_full_name()}"
+# ==========================================
+# 13. ASSET KPI SNAPSHOT (Dashboard Materialization)
+# ==========================================
+class AssetKpiSnapshot(models.Model):
+    """
+    Pre-aggregated dashboard cells keyed by the dashboard filter dimensions
+    (class / nature / status / department) plus a day bucket. Maintained
+    incrementally by inventory.snapshots.AssetKpiTracker on Asset/ServiceLog writes;
+    rebuilt from scratch with `manage.py rebuild_kpi_snapshot`.
+    """
+    KIND_CHOICES = [
+        ('ACQUIRED', 'Assets by Date Acquired'),
+        ('CREATED', 'Assets by Date Registered'),
+        ('SERVICE', 'Service Logs by Service Date'),
+    ]
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    asset_class = models.CharField(max_length=255)
+    asset_nature = models.CharField(max_length=100)
+    status = models.CharField(max_length=20)
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    period = models.DateField(verbose_name="Day Bucket")
+
+    item_count = models.IntegerField(default=0, verbose_name="Assets / Service Logs")
+    total_value = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name="Acquisition Cost / Service Cost")
+    max_cost = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    max_asset = models.ForeignKey(Asset, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'asset_class', 'asset_nature', 'status', 'department', 'period'],
+                name='uniq_asset_kpi_cell',
+            ),
+            # NULLs are distinct in the constraint above, so "no department" cells need their own
+            models.UniqueConstraint(
+                fields=['kind', 'asset_class', 'asset_nature', 'status', 'period'],
+                condition=models.Q(department__isnull=True),
+                name='uniq_asset_kpi_cell_unassigned',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'period'], name='asset_kpi_kind_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.asset_class}/{self.asset_nature}/{self.status} @ {self.period}: {self.item_count}"
+
+# ==========================================
+# 14. TRANSACTION INDEX (Unified Inbox / Ledger)
+# ==========================================
+class TransactionIndex(models.Model):
+    """
+    One row per workflow transaction across the six transaction models, so the
+    inbox metrics, ledger search, sorting and pagination are single indexed
+    queries over one table. Maintained by inventory.ledger.TransactionIndexer on
+    every save (which covers WorkflowEngine.transition / initialize_transaction);
+    rebuilt with `manage.py rebuild_transaction_index`.
+    """
+    TYPE_CHOICES = [
+        ('BATCH', 'Acquisition'),
+        ('REQ', 'Inspection'),
+        ('TRF', 'Transfer'),
+        ('RET', 'Return'),
+        ('LOSS', 'Loss Report'),
+        ('CLR', 'Clearance'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('APPROVED', 'Approved'),
+        ('RETURNED', 'Returned'),
+    ]
+
+    type_code = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    transaction_id = models.CharField(max_length=20)
+
+    requestor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    requestor_name = models.CharField(max_length=300, blank=True)
+    requestor_office = models.CharField(max_length=100, blank=True, null=True)
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Requestor Department")
+
+    current_step = models.ForeignKey('workflow.WorkflowStep', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    required_role = models.ForeignKey('workflow.Role', on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Current Required Role")
+    raw_status = models.CharField(max_length=50, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING', verbose_name="Normalized Status")
+
+    asset = models.ForeignKey(Asset, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    asset_label = models.CharField(max_length=255, blank=True)
+    asset_name = models.CharField(max_length=255, blank=True)
+    search_text = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['type_code', 'object_id'], name='uniq_transaction_index_source'),
+        ]
+        indexes = [
+            models.Index(fields=['requestor', '-created_at'], name='txn_idx_requestor_idx'),
+            models.Index(fields=['department', '-created_at'], name='txn_idx_department_idx'),
+            models.Index(fields=['required_role', 'status'], name='txn_idx_role_status_idx'),
+            models.Index(fields=['status', '-created_at'], name='txn_idx_status_created_idx'),
+            models.Index(fields=['type_code', '-created_at'], name='txn_idx_type_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='txn_idx_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_id} ({self.get_type_code_display()}) - {self.status}"
+
+
+# ==========================================
+# 15. NOTIFICATION OUTBOX (Queued Workflow E-mail)
+# ==========================================
+class NotificationOutbox(models.Model):
+    """
+    One queued e-mail per recipient, written in the same DB transaction as the
+    workflow movement that caused it and sent by `manage.py dispatch_notifications`.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+        ('DUPLICATE', 'Duplicate (Skipped)'),
+    ]
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    # Same key + recipient while still pending = the same notification (enqueued once)
+    dedup_key = models.CharField(max_length=200)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipient', 'dedup_key'], condition=models.Q(status='PENDING'),
+                name='uniq_pending_notification',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.status}] {self.recipient}: {self.subject}"
+
+
+# ==========================================
+# 16. DOCUMENT JOBS (Background PAR / ICS / PTR Rendering)
+# ==========================================
+class DocumentJob(models.Model):
+    """
+    Final document rendering queued by WorkflowEngine on FINALIZE and run by
+    `manage.py process_document_jobs`; status/progress are polled by the detail pages.
+    """
+    KIND_CHOICES = [
+        ('PAR', 'Property Acknowledgement Receipt'),
+        ('ICS', 'Inventory Custodian Slip'),
+        ('PTR', 'Property Transfer Report'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Queued'),
+        ('RUNNING', 'Rendering'),
+        ('DONE', 'Ready'),
+        ('FAILED', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=3, choices=KIND_CHOICES)
+    batch = models.ForeignKey(AssetBatch, on_delete=models.CASCADE, null=True, blank=True, related_name='document_jobs')
+    transfer = models.ForeignKey('AssetTransferRequest', on_delete=models.CASCADE, null=True, blank=True, related_name='document_jobs')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="Progress (%)")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    output = models.FileField(upload_to='documents/final/', blank=True, null=True, verbose_name="Rendered Document")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='docjob_status_idx'),
+        ]
+
+    def __str__(self):
+        target = self.batch or self.transfer
+        return f"{self.kind} for {getattr(target, 'transaction_id', '-')} [{self.status}]"
+
+
+# ==========================================
+# 17. MEDIA BLOBS (Content-Addressed Storage)
+# ==========================================
+class MediaBlob(models.Model):
+    """One stored file of the content-addressed media store and how many rows reference it."""
+    sha256 = models.CharField(max_length=64, db_index=True)
+    name = models.CharField(max_length=255, unique=True, verbose_name="Storage Path")
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+# ==========================================
+# 18. DEPRECIATION SCHEDULE (Materialized Monthly Book Values)
+# ==========================================
+class DepreciationSchedule(models.Model):
+    """
+    One month of an asset's depreciation (see inventory/depreciation.py).
+    Rows cover the months of the useful life; book value as of a date is the
+    row of that month (unique asset/period index).
+    """
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name='depreciation_schedule')
+    period = models.DateField(verbose_name="Month")
+    depreciation = models.DecimalField(max_digits=14, decimal_places=2)
+    accumulated = models.DecimalField(max_digits=14, decimal_places=2)
+    book_value = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['asset', 'period'], name='uniq_depreciation_period'),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'asset'], name='depr_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asset_id} {self.period:%Y-%m}: {self.book_value}"
+
+
+# ==========================================
+# 19. LOG ARCHIVES (Exported Months of the Append-Only Logs)
+# ==========================================
+class LogArchive(models.Model):
+    """
+    One month of a log table exported to compressed JSONL and removed from the
+    hot table (see inventory/partitions.py). `media` counts the content-addressed
+    blobs the archived rows reference, so their files outlive the rows.
+    """
+    table = models.CharField(max_length=50)
+    month = models.DateField()
+    path = models.CharField(max_length=500)
+    rows = models.PositiveIntegerField(default=0)
+    sha256 = models.CharField(max_length=64)
+    media = models.JSONField(default=dict, blank=True)
+    archived_at = models.DateTimeField(auto_now=True)
+    restored_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['table', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'month'], name='uniq_log_archive_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.table} {self.month:%Y-%m} ({self.rows} rows)"
@@ -0,0 +1,124 @@
+import smtplib
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+
+class NotificationDispatcher:
+    """
+    Transactional outbox for workflow e-mail (inventory.NotificationOutbox).
+    Requests only INSERT outbox rows (inside the caller's transaction, so a
+    rolled-back transition never mails anyone); `manage.py dispatch_notifications`
+    drains due rows in batches over one mail connection. Failed sends are
+    retried with exponential backoff until MAX_ATTEMPTS; delivery is
+    at-least-once (a crash between send and commit re-sends that batch).
+    """
+
+    BATCH_SIZE = 100
+    MAX_ATTEMPTS = 6
+    BACKOFF_BASE = timedelta(minutes=1)
+    BACKOFF_MAX = timedelta(hours=2)
+
+    @staticmethod
+    def enqueue(recipients, subject, body, dedup_key):
+        """Queues one message per distinct recipient; one still pending under the same key is not queued again."""
+        from .models import NotificationOutbox
+
+        rows = [
+            NotificationOutbox(recipient=email, subject=subject[:255], body=body, dedup_key=dedup_key[:200])
+            for email in sorted({r.strip().lower() for r in recipients if r and r.strip()})
+        ]
+        if rows:
+            # The partial unique index (recipient, dedup_key WHERE PENDING) drops the repeats
+            NotificationOutbox.objects.bulk_create(rows, ignore_conflicts=True)
+        return len(rows)
+
+    @staticmethod
+    def drain(connection=None, batch_size=BATCH_SIZE, now=None):
+        """
+        Sends one batch of due messages. Returns {'sent', 'retried', 'failed', 'duplicates'}.
+        Pass an open `connection` to reuse it across batches; a session the relay
+        dropped is reopened before the message is counted as failed.
+        """
+        from .models import NotificationOutbox
+
+        now = now or timezone.now()
+        stats = {'sent': 0, 'retried': 0, 'failed': 0, 'duplicates': 0}
+        own_connection = connection is None
+        if own_connection:
+            connection = get_connection()
+
+        with transaction.atomic():
+            # Concurrent workers skip each other's rows (PostgreSQL; a no-op on SQLite)
+            due = list(
+                NotificationOutbox.objects.select_for_update(skip_locked=True)
+                .filter(status='PENDING', next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:batch_size]
+            )
+            if not due:
+                return stats
+
+            seen = set()
+            try:
+                connection.open()
+                open_error = None
+            except Exception as exc:
+                open_error = exc
+
+            for row in due:
+                fingerprint = (row.recipient, row.subject, row.body)
+                if fingerprint in seen:
+                    # Same text to the same person queued under another key in this batch
+                    row.status = 'DUPLICATE'
+                    stats['duplicates'] += 1
+                    continue
+                seen.add(fingerprint)
+
+                error = open_error
+                if error is None:
+                    try:
+                        NotificationDispatcher._send(EmailMessage(
+                            subject=row.subject, body=row.body,
+                            from_email=settings.DEFAULT_FROM_EMAIL, to=[row.recipient],
+                            connection=connection,
+                        ), connection)
+                    except Exception as exc:
+                        error = exc
+
+                row.attempts += 1
+                if error is None:
+                    row.status, row.sent_at, row.last_error = 'SENT', now, ''
+                    stats['sent'] += 1
+                elif row.attempts >= NotificationDispatcher.MAX_ATTEMPTS:
+                    row.status, row.last_error = 'FAILED', str(error)[:1000]
+                    stats['failed'] += 1
+                else:
+                    row.next_attempt_at = now + NotificationDispatcher.backoff(row.attempts)
+                    row.last_error = str(error)[:1000]
+                    stats['retried'] += 1
+
+            NotificationOutbox.objects.bulk_update(
+                due, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'],
+            )
+
+        if own_connection:
+            connection.close()
+        return stats
+
+    @staticmethod
+    def _send(message, connection):
+        """Sends one message, reconnecting once if the relay dropped the session."""
+        try:
+            message.send()
+        except smtplib.SMTPServerDisconnected:
+            # open() is a no-op while the stale session is still set; close it first
+            connection.close()
+            connection.open()
+            message.send()
+
+    @staticmethod
+    def backoff(attempts):
+        """Delay before retry number `attempts` (1 min, 2 min, 4 min, ... capped at BACKOFF_MAX)."""
+        return min(NotificationDispatcher.BACKOFF_BASE * (2 ** (attempts - 1)), NotificationDispatcher.BACKOFF_MAX)
@@ -0,0 +1,209 @@
+import base64
+import binascii
+import datetime
+import json
+import math
+from decimal import Decimal
+from django.db import connection
+from django.db.models import F, Q
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator; mirrors the parts of django.core.paginator.Page the templates use."""
+
+    def __init__(self, object_list, number, per_page, has_next, has_previous, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.number = number
+        self.per_page = per_page
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.per_page + 1
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
+
+
+class KeysetPaginator:
+    """
+    Cursor (seek) pagination keyed on the active sort fields plus the primary key.
+    Each page is one `WHERE (sort, id) beyond cursor ORDER BY sort, id LIMIT n+1`
+    query, so page 500 costs the same as page 1 (no OFFSET scan, no COUNT).
+
+    ordering: list of (field_path, descending) pairs; the pk is appended as tiebreaker.
+    NULLs sort last ascending / first descending (the native PostgreSQL btree order).
+    count: optional (exact or estimated) total, only used for "Page N of M".
+    """
+
+    LAST = 'last'
+
+    def __init__(self, queryset, per_page, ordering, count=None):
+        self.per_page = max(1, int(per_page))
+        self.count = count
+        self.ordering = list(ordering) + [('pk', ordering[0][1] if ordering else False)]
+        self.aliases = [f"keyset_{i}" for i in range(len(self.ordering))]
+        self.signature = ','.join(f"{'-' if desc else ''}{field}" for field, desc in self.ordering)
+        self.queryset = queryset.annotate(**{
+            alias: F(field) for alias, (field, _) in zip(self.aliases, self.ordering)
+        })
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def page(self, cursor=None):
+        state = self.decode(cursor) if cursor and cursor != self.LAST else None
+
+        if cursor == self.LAST:
+            rows = list(self._ordered(reverse=True)[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            number = self.num_pages or 1
+            return self._build(rows, number, has_next=False, has_previous=has_previous)
+
+        if state is None:
+            rows = list(self._ordered()[:self.per_page + 1])
+            return self._build(rows[:self.per_page], 1, has_next=len(rows) > self.per_page, has_previous=False)
+
+        values, number, backwards = state
+        if backwards:
+            rows = list(self._ordered(reverse=True).filter(self._beyond(values, reverse=True))[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            # Walking back to the start re-anchors the page number
+            return self._build(rows, number if has_previous else 1, has_next=True, has_previous=has_previous)
+
+        rows = list(self._ordered().filter(self._beyond(values))[:self.per_page + 1])
+        return self._build(rows[:self.per_page], number, has_next=len(rows) > self.per_page, has_previous=True)
+
+    # ------------------------------------------------------------------
+    # Cursor encoding (opaque, url-safe; bound to the sort signature)
+    # ------------------------------------------------------------------
+    def encode(self, obj, number, backwards=False):
+        values = [getattr(obj, alias) for alias in self.aliases]
+        payload = {'s': self.signature, 'k': values, 'p': number, 'b': int(backwards)}
+        raw = json.dumps(payload, default=self._json_default, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode(self, cursor):
+        """Returns (values, page number, backwards) or None for a malformed/stale cursor (-> first page)."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            payload = json.loads(raw)
+        except (binascii.Error, ValueError, TypeError):
+            return None
+        if not isinstance(payload, dict) or payload.get('s') != self.signature:
+            return None
+        values = payload.get('k')
+        if not isinstance(values, list) or len(values) != len(self.aliases):
+            return None
+        try:
+            number = max(1, int(payload.get('p', 1)))
+        except (TypeError, ValueError):
+            number = 1
+        return values, number, bool(payload.get('b'))
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _build(self, rows, number, has_next, has_previous):
+        page = KeysetPage(rows, number, self.per_page, has_next, has_previous)
+        if rows and has_next:
+            page.next_cursor = self.encode(rows[-1], number + 1)
+        if rows and has_previous:
+            page.previous_cursor = self.encode(rows[0], max(1, number - 1), backwards=True)
+        return page
+
+    def _ordered(self, reverse=False):
+        order = []
+        for alias, (_, desc) in zip(self.aliases, self.ordering):
+            if desc != reverse:
+                order.append(F(alias).desc(nulls_first=True))
+            else:
+                order.append(F(alias).asc(nulls_last=True))
+        return self.queryset.order_by(*order)
+
+    def _beyond(self, values, reverse=False, index=0):
+        """Rows strictly past `values` in travel order (lexicographic over the keys, NULL-aware)."""
+        alias = self.aliases[index]
+        descending = self.ordering[index][1] != reverse
+        value = values[index]
+        rest = self._beyond(values, reverse, index + 1) if index + 1 < len(self.aliases) else None
+
+        is_null = Q(**{f"{alias}__isnull": True})
+        if not descending:
+            # Ascending, NULLs last
+            if value is None:
+                return (is_null & rest) if rest is not None else Q(pk__in=[])
+            condition = Q(**{f"{alias}__gt": value}) | is_null
+        else:
+            # Descending, NULLs first
+            if value is None:
+                condition = Q(**{f"{alias}__isnull": False})
+                return (condition | (is_null & rest)) if rest is not None else condition
+            condition = Q(**{f"{alias}__lt": value})
+        if rest is not None:
+            condition |= Q(**{alias: value}) & rest
+        return condition
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f"Unsupported cursor value: {type(value).__name__}")
+
+
+def estimated_count(queryset, exact_below=10000):
+    """
+    Returns (count, is_estimate). For an unfiltered queryset on PostgreSQL the
+    planner statistics (pg_class.reltuples) are used once the table is large
+    enough for COUNT(*) to matter; everything else gets an exact count.
+    """
+    if connection.vendor == 'postgresql' and not queryset.query.has_filters():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= exact_below:
+            return row[0], True
+    return queryset.count(), False
+
+
+def page_query(request, **changes):
+    """Current query string with `changes` applied (None removes a key); used for pager links."""
+    params = request.GET.copy()
+    for key, value in changes.items():
+        if value is None:
+            params.pop(key, None)
+        else:
+            params[key] = value
+    return params.urlencode()
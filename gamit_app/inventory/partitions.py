@@ -0,0 +1,287 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+from collections import Counter
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+
+class LogPartitions:
+    """
+    Month-partitioned storage and archival for the append-only logs.
+
+    On PostgreSQL each table in TABLES is range-partitioned on its time column
+    (migration 0051): one partition per month (<table>_pYYYYMM) plus a default
+    partition, so reads of recent history prune to the newest partitions.
+    `manage.py ensure_log_partitions` (the log_partitions worker) keeps the
+    upcoming months' partitions created ahead of time.
+    SQLite keeps the plain table; a "partition" is then the month's row range.
+
+    archive() exports a closed month to <LOG_ARCHIVE_ROOT>/<label>/YYYY-MM.jsonl.gz,
+    verifies the row count, then detaches and drops the partition (or deletes
+    the rows) and records an inventory.LogArchive. restore() reinserts the rows.
+    Both paths skip model signals: rows keep their media blob references
+    (LogArchive.media), and restored rows whose CASCADE parent is gone are dropped.
+    """
+
+    # label -> (app label, model, time column)
+    TABLES = {
+        'asset_change_log': ('inventory', 'AssetChangeLog', 'timestamp'),
+        'workflow_movement_log': ('workflow', 'WorkflowMovementLog', 'timestamp'),
+        'service_log': ('inventory', 'ServiceLog', 'created_at'),
+    }
+    BATCH_SIZE = 2000
+
+    # ------------------------------------------------------------------
+    # Registry / months
+    # ------------------------------------------------------------------
+    @staticmethod
+    def model(label):
+        app_label, model_name, column = LogPartitions.TABLES[label]
+        return apps.get_model(app_label, model_name), column
+
+    @staticmethod
+    def archive_root():
+        return getattr(settings, 'LOG_ARCHIVE_ROOT', os.path.join(settings.BASE_DIR, 'log_archive'))
+
+    @staticmethod
+    def month_bounds(month):
+        """[start, end) of a month as UTC datetimes (partition bounds)."""
+        start = datetime.datetime(month.year, month.month, 1, tzinfo=datetime.timezone.utc)
+        end = datetime.datetime(month.year + month.month // 12, month.month % 12 + 1, 1, tzinfo=datetime.timezone.utc)
+        return start, end
+
+    @staticmethod
+    def partition_name(table, month):
+        return f"{table}_p{month:%Y%m}"
+
+    @staticmethod
+    def closed_months(label, keep_months=12, today=None):
+        """Months with rows that ended more than `keep_months` months before this one (oldest first)."""
+        model, column = LogPartitions.model(label)
+        today = today or timezone.now().date()
+        index = today.year * 12 + today.month - 1 - keep_months
+        cutoff, _ = LogPartitions.month_bounds(datetime.date(index // 12, index % 12 + 1, 1))
+        months = model.objects.filter(**{f'{column}__lt': cutoff}).datetimes(column, 'month', tzinfo=datetime.timezone.utc)
+        return [value.date() for value in months]
+
+    # ------------------------------------------------------------------
+    # PostgreSQL partitions
+    # ------------------------------------------------------------------
+    @staticmethod
+    def is_partitioned(table, using=None):
+        conn = using or connection
+        if conn.vendor != 'postgresql':
+            return False
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = %s AND pg_table_is_visible(c.oid)", [table],
+            )
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def partition_exists(table, month, using=None):
+        conn = using or connection
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [LogPartitions.partition_name(table, month)])
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def create_partition(table, month, using=None):
+        """
+        Creates the month's partition unless it exists. Rows of the month that
+        landed in the default partition meanwhile (no partition was ready when the
+        month began) are moved into it: PostgreSQL refuses a new partition that the
+        default still holds rows for, so the default is detached around the move.
+        """
+        conn = using or connection
+        if LogPartitions.partition_exists(table, month, conn):
+            return False
+        start, end = LogPartitions.month_bounds(month)
+        quote = conn.ops.quote_name
+        column = LogPartitions._column(table, conn)
+        partition, default = quote(LogPartitions.partition_name(table, month)), quote(table + '_default')
+        # DDL takes no bind parameters; the bounds are generated here, not user input
+        bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+            cursor.execute(f"SELECT 1 FROM {default} WHERE {column} >= %s AND {column} < %s LIMIT 1", [start, end])
+            if not cursor.fetchone():
+                cursor.execute(f"CREATE TABLE {partition} PARTITION OF {quote(table)} {bounds}")
+                return True
+            cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {default}")
+            cursor.execute(f"CREATE TABLE {partition} PARTITION OF {quote(table)} {bounds}")
+            cursor.execute(
+                f"INSERT INTO {partition} SELECT * FROM {default} WHERE {column} >= %s AND {column} < %s", [start, end],
+            )
+            cursor.execute(f"DELETE FROM {default} WHERE {column} >= %s AND {column} < %s", [start, end])
+            cursor.execute(f"ALTER TABLE {quote(table)} ATTACH PARTITION {default} DEFAULT")
+        return True
+
+    @staticmethod
+    def ensure_partitions(months_ahead=3, today=None):
+        """Creates this month's and the next `months_ahead` partitions of every partitioned log table."""
+        today = today or timezone.now().date()
+        created = 0
+        for label in LogPartitions.TABLES:
+            model, _ = LogPartitions.model(label)
+            table = model._meta.db_table
+            if not LogPartitions.is_partitioned(table):
+                continue
+            for offset in range(months_ahead + 1):
+                index = today.year * 12 + today.month - 1 + offset
+                created += LogPartitions.create_partition(table, datetime.date(index // 12, index % 12 + 1, 1))
+        return created
+
+    @staticmethod
+    def _column(table, conn):
+        for label in LogPartitions.TABLES:
+            model, column = LogPartitions.model(label)
+            if model._meta.db_table == table:
+                return conn.ops.quote_name(model._meta.get_field(column).column)
+        raise KeyError(table)
+
+    # ------------------------------------------------------------------
+    # Archive / restore
+    # ------------------------------------------------------------------
+    @staticmethod
+    def rows(label, month):
+        """The month's rows of a log table."""
+        model, column = LogPartitions.model(label)
+        start, end = LogPartitions.month_bounds(month)
+        return model.objects.filter(**{f'{column}__gte': start, f'{column}__lt': end})
+
+    @staticmethod
+    def archive(label, month):
+        """Exports one month of a log table and removes it from the hot table. Returns the LogArchive."""
+        from .media_store import MediaStore
+        from .models import LogArchive
+
+        model, _ = LogPartitions.model(label)
+        month = month.replace(day=1)
+        rows = LogPartitions.rows(label, month)
+
+        media_fields = MediaStore.tracked_fields().get(model, ())
+        path = os.path.join(LogPartitions.archive_root(), label, f"{month:%Y-%m}.jsonl.gz")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with transaction.atomic():
+            count, media = 0, Counter()
+            with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as handle:
+                for values in rows.order_by('pk').values().iterator(chunk_size=LogPartitions.BATCH_SIZE):
+                    handle.write(json.dumps(values, cls=DjangoJSONEncoder) + '\n')
+                    count += 1
+                    media.update(values[f] for f in media_fields if values.get(f))
+            if count != rows.count():
+                os.remove(path + '.tmp')
+                raise RuntimeError(f"{label} {month:%Y-%m}: rows changed while exporting; nothing was removed")
+            os.replace(path + '.tmp', path)
+
+            LogPartitions._detach(model, month, rows)
+            archive, _ = LogArchive.objects.update_or_create(
+                table=label, month=month,
+                defaults={
+                    'path': path, 'rows': count, 'sha256': LogPartitions._sha256(path),
+                    'media': dict(media), 'restored_at': None,
+                },
+            )
+        return archive
+
+    @staticmethod
+    def restore(label, month):
+        """Reinserts an archived month (recreating its partition). Returns the number of rows restored."""
+        from .models import LogArchive
+
+        model, _ = LogPartitions.model(label)
+        archive = LogArchive.objects.get(table=label, month=month.replace(day=1))
+        if archive.restored_at:
+            return 0
+        if LogPartitions._sha256(archive.path) != archive.sha256:
+            raise RuntimeError(f"{archive.path} does not match its recorded checksum")
+
+        table = model._meta.db_table
+        restored = 0
+        with transaction.atomic():
+            if LogPartitions.is_partitioned(table):
+                LogPartitions.create_partition(table, archive.month)
+            with gzip.open(archive.path, 'rt', encoding='utf-8') as handle:
+                batch = []
+                for line in handle:
+                    batch.append(json.loads(line))
+                    if len(batch) >= LogPartitions.BATCH_SIZE:
+                        restored += LogPartitions._insert(model, batch)
+                        batch = []
+                if batch:
+                    restored += LogPartitions._insert(model, batch)
+            archive.restored_at = timezone.now()
+            archive.save(update_fields=['restored_at'])
+        return restored
+
+    @staticmethod
+    def _detach(model, month, rows):
+        table = model._meta.db_table
+        quote = connection.ops.quote_name
+        if LogPartitions.is_partitioned(table) and LogPartitions.partition_exists(table, month):
+            partition = quote(LogPartitions.partition_name(table, month))
+            with connection.cursor() as cursor:
+                cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {partition}")
+                cursor.execute(f"DROP TABLE {partition}")
+        else:
+            # Plain table (or rows that landed in the default partition): a signal-free range delete
+            rows._raw_delete(rows.db)
+
+    @staticmethod
+    def _insert(model, batch):
+        """Raw INSERT of archived rows (keeps ids and timestamps; auto_now_add/signals don't apply)."""
+        fields = [f for f in model._meta.concrete_fields if f.attname in batch[0]]
+        keep = LogPartitions._live_rows(fields, batch)
+        if not keep:
+            return 0
+        quote = connection.ops.quote_name
+        sql = (
+            f"INSERT INTO {quote(model._meta.db_table)} ({', '.join(quote(f.column) for f in fields)}) "
+            f"VALUES ({', '.join(['%s'] * len(fields))})"
+        )
+        params = [
+            [f.get_db_prep_save(f.to_python(row[f.attname]), connection) for f in fields]
+            for row in keep
+        ]
+        # The ids were issued by the table's sequence before archiving, so they cannot collide with newer rows
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+        return len(keep)
+
+    @staticmethod
+    def _live_rows(fields, batch):
+        """Drops rows whose CASCADE parent was deleted since archiving; clears other dangling references."""
+        keep = batch
+        for field in fields:
+            if not field.remote_field:
+                continue
+            ids = {row[field.attname] for row in keep if row[field.attname] is not None}
+            if not ids:
+                continue
+            target = field.remote_field.model
+            live = {str(pk) for pk in target._base_manager.filter(pk__in=ids).values_list('pk', flat=True)}
+            missing = {pk for pk in ids if str(pk) not in live}
+            if not missing:
+                continue
+            if field.remote_field.on_delete is models.CASCADE:
+                keep = [row for row in keep if row[field.attname] not in missing]
+            else:
+                for row in keep:
+                    if row[field.attname] in missing:
+                        row[field.attname] = None
+        return keep
+
+    @staticmethod
+    def _sha256(path):
+        sha = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for block in iter(lambda: handle.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
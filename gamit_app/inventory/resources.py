@@ -50,6 +50,54 @@ def patch_csv_format():
 # Execute the patch on module load
 patch_csv_format()
 
+# --- Row Normalization (shared with the bulk import engine, inventory/importer.py) ---
+def normalize_asset_row(row):
+    """Maps categories/types, prefixes PAR numbers, upper-cases status and truncates names. No queries."""
+    # 0. CATEGORY MAPPING & NORMALIZATION
+    # PPE CATEGORY MAPPING
+    # PPE CATEGORY MAPPING (1:1 with standard CSV)
+    ppe_map = {
+        'ICT EQUIPMENT': 'ICT EQUIPMENT',
+        'MACHINERY': 'MACHINERY',
+        'MOTOR VEHICLE': 'MOTOR VEHICLE',
+        'VEHICLE': 'MOTOR VEHICLE',
+        'OFFICE EQUIPMENT': 'OFFICE EQUIPMENT',
+        'TECHNICAL AND SCIENTIFIC EQUIPMENT': 'TECHNICAL AND SCIENTIFIC EQUIPMENT',
+        'FURNITURE AND FIXTURES': 'FURNITURE AND FIXTURES',
+        'AIRCONDITIONING': 'AIRCONDITIONING',
+    }
+
+    # Apply PPE Category Mapping
+    raw_ppe = str(row.get('ppe_category', '')).strip().upper()
+    row['asset_class'] = ppe_map.get(raw_ppe, 'OTHER')
+
+    # Map Asset Type
+    raw_type = str(row.get('asset_type', '')).strip()
+    if raw_type:
+        row['asset_nature'] = raw_type.replace(' ', '_').replace('&', 'AND').replace('/', '_').upper()
+    else:
+        row['asset_nature'] = 'OTHER'
+
+    # 1. Automated PAR prefixing for property numbers
+    prop_no = row.get('property_number')
+    if prop_no:
+        prop_no = str(prop_no).strip()
+        if not prop_no.upper().startswith('PAR-'):
+            prop_no = f"PAR-{prop_no}"
+        row['property_number'] = prop_no
+
+    # 2. Handle Status (Case-Insensitive)
+    status = row.get('status')
+    if status:
+        row['status'] = str(status).strip().upper()
+    
+    # 4. TRUNCATION: Prevent "Value too long" (max 255 for CharField)
+    name = row.get('name')
+    if name and len(str(name)) > 250:
+        row['name'] = str(name)[:250] # Truncate to 250 for safety
+
+    return row
+
 # --- Asset Resource Definition ---
 class AssetResource(resources.ModelResource):
     """
@@ -59,6 +107,8 @@ class AssetResource(resources.ModelResource):
         super().__init__(*args, **kwargs)
         # Track property numbers processed in the CURRENT session to prevent internal-CSV duplicates
         self._processed_numbers = set()
+        # Department name -> id, loaded on the first row that names an office
+        self._department_ids = None
 
     # Map 'ppe_category' column to 'asset_class'
     asset_class = fields.Field(
@@ -88,54 +138,18 @@ class AssetResource(resources.ModelResource):
     )
 
     def before_import_row(self, row, **kwargs):
-        # 0. CATEGORY MAPPING & NORMALIZATION
-        # PPE CATEGORY MAPPING
-        # PPE CATEGORY MAPPING (1:1 with standard CSV)
-        ppe_map = {
-            'ICT EQUIPMENT': 'ICT EQUIPMENT',
-            'MACHINERY': 'MACHINERY',
-            'MOTOR VEHICLE': 'MOTOR VEHICLE',
-            'VEHICLE': 'MOTOR VEHICLE',
-            'OFFICE EQUIPMENT': 'OFFICE EQUIPMENT',
-            'TECHNICAL AND SCIENTIFIC EQUIPMENT': 'TECHNICAL AND SCIENTIFIC EQUIPMENT',
-            'FURNITURE AND FIXTURES': 'FURNITURE AND FIXTURES',
-            'AIRCONDITIONING': 'AIRCONDITIONING',
-        }
-
-        # Apply PPE Category Mapping
-        raw_ppe = str(row.get('ppe_category', '')).strip().upper()
-        row['asset_class'] = ppe_map.get(raw_ppe, 'OTHER')
-
-        # Map Asset Type
-        raw_type = str(row.get('asset_type', '')).strip()
-        if raw_type:
-            row['asset_nature'] = raw_type.replace(' ', '_').replace('&', 'AND').replace('/', '_').upper()
-        else:
-            row['asset_nature'] = 'OTHER'
+        normalize_asset_row(row)
 
-        # 1. Automated PAR prefixing for property numbers
-        prop_no = row.get('property_number')
-        if prop_no:
-            prop_no = str(prop_no).strip()
-            if not prop_no.upper().startswith('PAR-'):
-                prop_no = f"PAR-{prop_no}"
-            row['property_number'] = prop_no
-
-        # 2. Handle Status (Case-Insensitive)
-        status = row.get('status')
-        if status:
-            row['status'] = str(status).strip().upper()
-        
-        # 3. Handle Department (Auto-Creation if missing)
+        # 3. Handle Department (Auto-Creation if missing; names resolve through a map loaded once per import)
         office_name = row.get('assigned_office') # CSV Header name
         if office_name:
-            dept_obj, created = Department.objects.get_or_create(name=str(office_name).strip())
-            row['department'] = dept_obj.id
-
-        # 4. TRUNCATION: Prevent "Value too long" (max 255 for CharField)
-        name = row.get('name')
-        if name and len(str(name)) > 250:
-            row['name'] = str(name)[:250] # Truncate to 250 for safety
+            office_name = str(office_name).strip()
+            if self._department_ids is None:
+                self._department_ids = dict(Department.objects.values_list('name', 'id'))
+            if office_name not in self._department_ids:
+                dept_obj, created = Department.objects.get_or_create(name=office_name)
+                self._department_ids[office_name] = dept_obj.id
+            row['department'] = self._department_ids[office_name]
 
         return row
 
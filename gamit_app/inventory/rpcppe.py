@@ -0,0 +1,125 @@
+import datetime
+from decimal import Decimal
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+class RpcppeReport:
+    """
+    Report on the Physical Count of PPE, computed in the database.
+    Department subtotals come from one grouped aggregation (the grand totals
+    are the sum of those few rows); the asset lines are streamed in report
+    order with their total price computed in SQL, so HTML/CSV/XLSX output
+    never holds the registry in memory. The as-of date limits the report to
+    assets acquired on or before that day (statuses are the current ones).
+    """
+
+    UNASSIGNED = "UNASSIGNED / GENERAL"
+    CHUNK_SIZE = 500
+    COLUMNS = [
+        'Office / Department', 'Article', 'Brand / Model', 'Description', 'Property No.', 'UOM',
+        'Unit Value', 'Qty per Card', 'Qty Physical', 'Total Price', 'Remarks',
+    ]
+    ROW_FIELDS = (
+        'department__name', 'asset_class', 'brand', 'name', 'property_number', 'unit_of_measure',
+        'acquisition_cost', 'quantity_physical_count', 'total_price',
+    )
+
+    @staticmethod
+    def filter(queryset, as_of=None, asset_class=''):
+        """SERVICEABLE assets of `queryset` acquired by `as_of`, optionally of one PPE class."""
+        queryset = queryset.filter(status='SERVICEABLE')
+        if as_of:
+            queryset = queryset.filter(date_acquired__lte=as_of)
+        if asset_class:
+            queryset = queryset.filter(asset_class=asset_class)
+        return queryset
+
+    @staticmethod
+    def parse_as_of(value):
+        """YYYY-MM-DD from the query string, or None (invalid values are ignored)."""
+        try:
+            return datetime.date.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _total_price():
+        money = DecimalField(max_digits=20, decimal_places=2)
+        return ExpressionWrapper(
+            Coalesce(F('acquisition_cost'), Value(Decimal('0')), output_field=money)
+            * Coalesce(F('quantity_physical_count'), Value(0)),
+            output_field=money,
+        )
+
+    @staticmethod
+    def totals(queryset):
+        """
+        One grouped query: {'departments': {name: {'count', 'total'}}, 'grand_total', 'total_count'}.
+        `count` is the physical quantity, as on the printed report.
+        """
+        groups = (
+            queryset.order_by().values('department__name')
+            .annotate(count=Sum('quantity_physical_count'), total=Sum(RpcppeReport._total_price()))
+        )
+        departments = {}
+        for group in groups:
+            departments[group['department__name'] or RpcppeReport.UNASSIGNED] = {
+                'count': group['count'] or 0, 'total': group['total'] or Decimal('0'),
+            }
+        return {
+            'departments': departments,
+            'grand_total': sum((d['total'] for d in departments.values()), Decimal('0')),
+            'total_count': sum(d['count'] for d in departments.values()),
+        }
+
+    @staticmethod
+    def lines(queryset, totals, chunk_size=CHUNK_SIZE):
+        """
+        Yields report lines in order: ('department', name, None), ('asset', name, row dict)
+        and ('subtotal', name, {'count', 'total'}) after each department.
+        """
+        rows = (
+            queryset.annotate(total_price=RpcppeReport._total_price())
+            .order_by('department__name', 'asset_class', 'name', 'id')
+            .values(*RpcppeReport.ROW_FIELDS)
+        )
+        current = None
+        for row in rows.iterator(chunk_size=chunk_size):
+            department = row['department__name'] or RpcppeReport.UNASSIGNED
+            if department != current:
+                if current is not None:
+                    yield 'subtotal', current, totals['departments'][current]
+                current = department
+                yield 'department', department, None
+            row['qty_card'] = 1  # Asset is serialized by default
+            yield 'asset', department, row
+        if current is not None:
+            yield 'subtotal', current, totals['departments'][current]
+
+    @staticmethod
+    def batches(lines, size=CHUNK_SIZE):
+        """Groups lines into lists of `size` (one template render / write per batch)."""
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def csv_records(queryset, totals):
+        """Header, asset lines, subtotal and grand-total rows as lists of cells."""
+        yield RpcppeReport.COLUMNS
+        for kind, department, data in RpcppeReport.lines(queryset, totals):
+            if kind == 'asset':
+                yield [
+                    department, data['asset_class'], data['brand'] or '', data['name'], data['property_number'],
+                    data['unit_of_measure'], data['acquisition_cost'] or Decimal('0'), data['qty_card'],
+                    data['quantity_physical_count'], data['total_price'], 'SERVICEABLE',
+                ]
+            elif kind == 'subtotal':
+                yield [department, f'SUBTOTAL FOR {department}', '', '', '', '', '', '', data['count'], data['total'], '']
+        yield ['', 'GRAND TOTAL', '', '', '', '', '', '', totals['total_count'], totals['grand_total'], '']
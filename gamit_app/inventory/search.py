@@ -0,0 +1,169 @@
+import re
+from django.db import connection
+from django.db.models import Case, When, Value, BooleanField, IntegerField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+
+class AssetSearch:
+    """
+    Registry search backed by the denormalized `Asset.search_document` column.
+    The document is a lowercased concatenation of every searchable attribute
+    (including the department name), so a search touches one column of one table:
+      - PostgreSQL: GIN indexes on to_tsvector('simple', search_document) and on
+        search_document gin_trgm_ops (see migration 0042), ranked with ts_rank.
+      - SQLite (dev): plain LIKE on the same column, ranked by field bonuses.
+    Explicit "PAR-..." input uses a prefix mode that walks the property_number
+    btree (varchar_pattern_ops on PostgreSQL) instead of any text index. Bare
+    digits stay a text search, widened with the property-number prefix and a
+    digits-anywhere match on `property_digits` (gin_trgm_ops on PostgreSQL,
+    migration 0055, so every arm of the OR is index-backed).
+    """
+
+    # Fields whose change must refresh the document
+    SOURCE_FIELDS = frozenset({
+        'property_number', 'name', 'description',
+        'accountable_firstname', 'accountable_surname', 'department', 'department_id',
+    })
+
+    MODE_AUTO = 'auto'
+    MODE_TEXT = 'text'
+    MODE_PREFIX = 'prefix'
+
+    # "PAR-0012", "par 12" -> property number prefix
+    PROPERTY_PATTERN = re.compile(r'^PAR[-\s]?\d[\d-]*$', re.IGNORECASE)
+    # "0012", "2024-" -> text search OR property number prefix / digits
+    DIGITS_PATTERN = re.compile(r'^\d[\d-]*$')
+    TOKEN_STRIP = re.compile(r"[^\w.\-/]+")
+
+    @staticmethod
+    def compose(property_number=None, name=None, description=None,
+                accountable_firstname=None, accountable_surname=None, department_name=None):
+        parts = (property_number, name, description, accountable_firstname, accountable_surname, department_name)
+        return ' '.join(' '.join(str(p).split()) for p in parts if p).lower()
+
+    @staticmethod
+    def document_for(asset, department_name=None):
+        """Builds the document for an in-memory Asset. Pass department_name to skip the FK fetch."""
+        if department_name is None and asset.department_id:
+            department_name = asset.department.name
+        return AssetSearch.compose(
+            asset.property_number, asset.name, asset.description,
+            asset.accountable_firstname, asset.accountable_surname, department_name,
+        )
+
+    @staticmethod
+    def refresh(queryset, chunk_size=1000):
+        """Recomputes the stored document for every asset in `queryset` (e.g. after a department rename)."""
+        from .models import Asset
+
+        pending = []
+        updated = 0
+        for asset in queryset.select_related('department').only(
+            'id', 'property_number', 'name', 'description',
+            'accountable_firstname', 'accountable_surname', 'department__name', 'search_document',
+        ).iterator(chunk_size=chunk_size):
+            document = AssetSearch.document_for(asset, asset.department.name if asset.department_id else '')
+            if document != asset.search_document:
+                asset.search_document = document
+                pending.append(asset)
+            if len(pending) >= chunk_size:
+                Asset.objects.bulk_update(pending, ['search_document'])
+                updated += len(pending)
+                pending = []
+        if pending:
+            Asset.objects.bulk_update(pending, ['search_document'])
+            updated += len(pending)
+        return updated
+
+    @staticmethod
+    def resolve_mode(term, mode=MODE_AUTO):
+        if mode in (AssetSearch.MODE_TEXT, AssetSearch.MODE_PREFIX):
+            return mode
+        return AssetSearch.MODE_PREFIX if AssetSearch.PROPERTY_PATTERN.match(term) else AssetSearch.MODE_TEXT
+
+    @staticmethod
+    def tokens(term):
+        cleaned = (AssetSearch.TOKEN_STRIP.sub(' ', t) for t in term.lower().split())
+        return [t for chunk in cleaned for t in chunk.split() if t]
+
+    @staticmethod
+    def filter(queryset, term, mode=MODE_AUTO):
+        """
+        Returns (queryset, mode) restricted to `term` and annotated with `search_rank`.
+        An empty term returns the queryset untouched.
+        """
+        term = (term or '').strip()
+        if not term:
+            return queryset, None
+
+        mode = AssetSearch.resolve_mode(term, mode)
+        if mode == AssetSearch.MODE_PREFIX:
+            prefixes = AssetSearch._property_prefixes(term)
+            match = Q()
+            for prefix in prefixes:
+                match |= Q(property_number__startswith=prefix)
+            queryset = queryset.filter(match).annotate(
+                search_rank=Case(
+                    When(property_number__in=prefixes, then=Value(100.0)),
+                    default=Value(50.0),
+                    output_field=FloatField(),
+                )
+            )
+            return queryset, mode
+
+        tokens = AssetSearch.tokens(term)
+        if not tokens:
+            return queryset.none(), mode
+
+        # Every token must appear somewhere in the document (AND semantics, so "juan cruz" works)
+        substring = Q()
+        for token in tokens:
+            substring &= Q(search_document__contains=token)
+
+        # Bare digits may be a property number ("9999" -> PAR-009999) as well as text ("Printer 2024 model")
+        match = substring
+        bonus = (
+            Case(When(property_number__iexact=term, then=Value(100)), default=Value(0), output_field=IntegerField())
+            + Case(When(name__istartswith=tokens[0], then=Value(20)), default=Value(0), output_field=IntegerField())
+            + Case(When(name__icontains=tokens[0], then=Value(10)), default=Value(0), output_field=IntegerField())
+        )
+        if AssetSearch.DIGITS_PATTERN.match(term):
+            number_match = Q(property_digits__contains=re.sub(r'\D', '', term))
+            for prefix in AssetSearch._property_prefixes(term):
+                number_match |= Q(property_number__startswith=prefix)
+            match |= number_match
+            bonus += Case(When(number_match, then=Value(50)), default=Value(0), output_field=IntegerField())
+
+        if connection.vendor == 'postgresql':
+            # Word-prefix match on the tsvector index OR substring match on the trigram index
+            tsquery = ' & '.join(f"{AssetSearch._ts_escape(t)}:*" for t in tokens)
+            ts_match = RawSQL(
+                "to_tsvector('simple', search_document) @@ to_tsquery('simple', %s)", (tsquery,),
+                output_field=BooleanField(),
+            )
+            ts_rank = RawSQL(
+                "ts_rank(to_tsvector('simple', search_document), to_tsquery('simple', %s))", (tsquery,),
+                output_field=FloatField(),
+            )
+            queryset = queryset.filter(Q(ts_match) | match).annotate(search_rank=ts_rank * 10 + bonus)
+        else:
+            queryset = queryset.filter(match).annotate(search_rank=bonus * 1.0)
+        return queryset, mode
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _property_prefixes(term):
+        """'par 12' -> ['PAR-12']; '0012' -> ['0012', 'PAR-0012'] (legacy PAR- numbers)."""
+        normalized = re.sub(r'\s+', '-', term.strip()).upper()
+        normalized = re.sub(r'^PAR-?', 'PAR-', normalized)
+        prefixes = [normalized]
+        if normalized[0].isdigit():
+            prefixes.append(f"PAR-{normalized}")
+        return prefixes
+
+    @staticmethod
+    def _ts_escape(token):
+        # Quote each lexeme so tsquery operators in user input are taken literally
+        return "'" + token.replace("'", "''").replace('\\', '\\\\') + "'"
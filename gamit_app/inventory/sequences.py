@@ -0,0 +1,152 @@
+import datetime
+from django.db import connection, transaction, IntegrityError
+from django.db.models import F
+
+
+class SequenceAllocator:
+    """
+    Counter-table backed sequence service.
+    Replaces the legacy `startswith` + `ORDER BY DESC` scan with a single locked
+    counter row per (model, field, prefix), so concurrent saves never receive the
+    same number and a whole block of N numbers costs one round trip.
+    """
+
+    DEFAULT_WIDTH = 5
+
+    @staticmethod
+    def build_prefix(prefix, use_year=True):
+        """PREFIX-YYYY- (yearly reset) or PREFIX- (Legacy/Continuous)."""
+        if use_year:
+            return f"{prefix}-{datetime.date.today().year}-"
+        return f"{prefix}-"
+
+    @staticmethod
+    def counter_key(model, field_name, search_prefix):
+        return f"{model._meta.label}.{field_name}:{search_prefix}"
+
+    @staticmethod
+    def next_value(prefix, model, field_name="property_number", use_year=True):
+        """Returns a single formatted sequence value (drop-in for get_next_sequence)."""
+        return SequenceAllocator.reserve_block(prefix, model, field_name, use_year, count=1)[0]
+
+    @staticmethod
+    def reserve_block(prefix, model, field_name="property_number", use_year=True, count=1):
+        """
+        Atomically reserves `count` contiguous numbers and returns them formatted.
+        Numbers are never handed out twice, even if the caller's save later fails.
+        """
+        if count < 1:
+            return []
+
+        search_prefix = SequenceAllocator.build_prefix(prefix, use_year)
+        key = SequenceAllocator.counter_key(model, field_name, search_prefix)
+
+        with transaction.atomic():
+            last_value, width = SequenceAllocator._increment(key, count)
+            if last_value is None:
+                # First use of this prefix: seed the counter from the existing rows (one-time scan)
+                SequenceAllocator._create_counter(key, model, field_name, search_prefix)
+                last_value, width = SequenceAllocator._increment(key, count)
+
+        # Yearly sequences always use 5 digits; continuous ones keep the legacy width
+        if use_year:
+            width = SequenceAllocator.DEFAULT_WIDTH
+        first = last_value - count + 1
+        return [f"{search_prefix}{str(n).zfill(width)}" for n in range(first, last_value + 1)]
+
+    @staticmethod
+    def resync(prefix, model, field_name="property_number", use_year=True):
+        """
+        Raises the counter to the highest number already stored in the table.
+        Call after writing explicit numbers (CSV/RPCPPE imports) so the allocator
+        never hands out a value that an import already used.
+        """
+        from .models import SequenceCounter
+
+        search_prefix = SequenceAllocator.build_prefix(prefix, use_year)
+        key = SequenceAllocator.counter_key(model, field_name, search_prefix)
+        seed, width = SequenceAllocator._scan_existing(model, field_name, search_prefix)
+
+        with transaction.atomic():
+            counter = SequenceCounter.objects.select_for_update().filter(name=key).first()
+            if counter is None:
+                SequenceAllocator._create_counter(key, model, field_name, search_prefix)
+            elif seed > counter.last_value:
+                counter.last_value = seed
+                counter.save(update_fields=['last_value'])
+        return seed
+
+    @staticmethod
+    def observe(value, prefix, model, field_name="property_number", use_year=True):
+        """
+        Raises the counter past an explicitly written value (admin import/form,
+        manual saves) so the next allocation does not collide with it.
+        A single conditional UPDATE; a counter that does not exist yet is left
+        alone because its first use seeds it from the table anyway.
+        """
+        from .models import SequenceCounter
+
+        search_prefix = SequenceAllocator.build_prefix(prefix, use_year)
+        if not value or not value.startswith(search_prefix):
+            return
+        try:
+            number = int(value[len(search_prefix):])
+        except ValueError:
+            return
+        key = SequenceAllocator.counter_key(model, field_name, search_prefix)
+        SequenceCounter.objects.filter(name=key, last_value__lt=number).update(last_value=number)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _increment(key, count):
+        """
+        Bumps the counter row and returns (new last_value, width), or (None, None)
+        if the row does not exist yet. The UPDATE itself takes the row lock.
+        """
+        from .models import SequenceCounter
+
+        if connection.features.can_return_columns_from_insert:
+            # Postgres / SQLite >= 3.35: UPDATE ... RETURNING in a single round trip
+            table = connection.ops.quote_name(SequenceCounter._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET last_value = last_value + %s WHERE name = %s RETURNING last_value, width",
+                    [count, key],
+                )
+                row = cursor.fetchone()
+            return (row[0], row[1]) if row else (None, None)
+
+        updated = SequenceCounter.objects.filter(name=key).update(last_value=F('last_value') + count)
+        if not updated:
+            return None, None
+        return SequenceCounter.objects.filter(name=key).values_list('last_value', 'width').get()
+
+    @staticmethod
+    def _create_counter(key, model, field_name, search_prefix):
+        from .models import SequenceCounter
+
+        seed, width = SequenceAllocator._scan_existing(model, field_name, search_prefix)
+        try:
+            # Savepoint so a concurrent creator does not poison the outer transaction
+            with transaction.atomic():
+                SequenceCounter.objects.create(name=key, last_value=seed, width=width)
+        except IntegrityError:
+            pass  # Another worker seeded it first; the caller simply increments that row
+
+    @staticmethod
+    def _scan_existing(model, field_name, search_prefix):
+        """Legacy lookup: highest existing value for the prefix -> (last number, zero-fill width)."""
+        last_val = model.objects.filter(
+            **{f"{field_name}__startswith": search_prefix}
+        ).order_by(f"-{field_name}").values_list(field_name, flat=True).first()
+
+        if not last_val:
+            return 0, SequenceAllocator.DEFAULT_WIDTH
+        try:
+            # Extract the last digits after the last hyphen
+            last_seq_str = last_val.split('-')[-1]
+            return int(last_seq_str), (len(last_seq_str) or SequenceAllocator.DEFAULT_WIDTH)
+        except (ValueError, IndexError):
+            return 0, SequenceAllocator.DEFAULT_WIDTH
@@ -6,7 +6,9 @@ from django.core.files.base import ContentFile
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4, portrait
 from reportlab.lib.colors import Color
+from reportlab.lib.utils import ImageReader
 from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, FloatObject, NameObject
 from .models import AssetBatch, ApprovalLog, UserSignature
 
 class PARGenerator:
@@ -118,16 +120,74 @@ class PARGenerator:
              return ContentFile(buffer.getvalue(), name=f"par_draft_{batch.transaction_id}.pdf")
 
     @staticmethod
-    def finalize_par(batch: AssetBatch):
+    def finalize_par(batch: AssetBatch, progress=None):
         """
         Generates the FINAL PAR with ALL signatures, 1 page per asset.
+        progress: optional callable(pages_done, total_pages) (document job progress).
         """
-        assets = batch.generated_assets.all()
-        if not assets.exists():
+        assets = list(batch.generated_assets.all())
+        if not assets:
             return None
 
+        logs = list(batch.movement_logs.select_related('user', 'persona__role').order_by('timestamp'))
+        final_content = PARGenerator.render_final(batch, assets, logs, progress=progress)
+        
+        # Hash for integrity
+        sha256_hash = hashlib.sha256(final_content).hexdigest()
+        
+        batch.par_file.save(f"PAR_FINAL_{batch.transaction_id}.pdf", ContentFile(final_content))
+        batch.par_hash = sha256_hash
+        batch.save()
+        
+        return batch.par_file
+
+    # Name of the shared template Form XObject on every PAR page
+    TEMPLATE_XOBJECT = '/GamitPARTemplate'
+
+    _template_cache = {}  # path -> (mtime, bytes)
+
+    @staticmethod
+    def render_final(batch, assets, logs, single_pass=True, progress=None):
+        """
+        Returns the final PAR PDF bytes (one page per asset).
+
+        single_pass=True draws every page into ONE ReportLab document (signature
+        images decoded once via cached ImageReaders and embedded once), parses the
+        template once, and stamps it on each page as a single shared Form XObject,
+        so the template's content and images are stored once however many assets.
+        single_pass=False keeps the legacy canvas + template parse per page
+        (used by benchmark_par_rendering for comparison).
+        """
+        if not single_pass:
+            return PARGenerator._render_final_per_page(batch, assets, logs)
+
+        images = {}
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pagesize=portrait(A4))
+        for done, asset in enumerate(assets, 1):
+            PARGenerator._draw_final_page(c, batch, asset, logs, images)
+            c.showPage()
+            if progress:
+                progress(done, len(assets))
+        c.save()
+        buffer.seek(0)
+        overlay_pdf = PdfReader(buffer)
+
+        writer = PdfWriter()
+        template_ref = PARGenerator._template_xobject(writer)
+        for overlay_page in overlay_pdf.pages:
+            page = writer.add_page(overlay_page)
+            if template_ref is not None:
+                PARGenerator._stamp_template(writer, page, template_ref)
+
+        output_buffer = BytesIO()
+        writer.write(output_buffer)
+        return output_buffer.getvalue()
+
+    @staticmethod
+    def _render_final_per_page(batch, assets, logs):
+        """Legacy path: a fresh canvas, template parse and signature reload for every asset page."""
         bulk_writer = PdfWriter()
-        logs = batch.movement_logs.all().order_by('timestamp')
 
         # To keep readers in scope if necessary
         readers = []
@@ -135,64 +195,7 @@ class PARGenerator:
         for asset in assets:
             buffer = BytesIO()
             c = canvas.Canvas(buffer, pagesize=portrait(A4))
-            
-            # 1. Draw HEADER and Asset Details (1 per page)
-            PARGenerator._draw_header(c, batch)
-            PARGenerator._draw_asset_details(c, asset)
-            
-            # 2. Draw Signatures
-            for log in logs:
-                 role_key = None
-                 role_code = log.persona.role.code if log.persona and log.persona.role else ''
-                 
-                 # RECEIVED BY (Unit AO / Accountable Officer)
-                 if role_code == 'UNIT_AO': 
-                     role_key = 'SIG_RECEIVED'
-                     c.setFont("Helvetica-Bold", 10)
-                     c.drawCentredString(PARGenerator.COORDS['NAME_RECEIVED'][0], PARGenerator.COORDS['NAME_RECEIVED'][1], f"{log.user.get_full_name()}".upper())
-                     
-                     # Draw Position, Office, Date
-                     pos = log.persona.position_title if log.persona and log.persona.position_title else "Accountable Officer"
-                     c.setFont("Helvetica", 9)
-                     c.drawCentredString(PARGenerator.COORDS['POS_RECEIVED'][0], PARGenerator.COORDS['POS_RECEIVED'][1], pos)
-                     c.drawCentredString(PARGenerator.COORDS['OFFICE_RECEIVED'][0], PARGenerator.COORDS['OFFICE_RECEIVED'][1], str(batch.requesting_unit or ""))
-                     c.drawCentredString(PARGenerator.COORDS['DATE_RECEIVED'][0], PARGenerator.COORDS['DATE_RECEIVED'][1], log.timestamp.strftime("%m/%d/%Y"))
-                     
-                 elif role_code == 'SPMO_CHIEF': 
-                     role_key = 'SIG_ISSUED'
-                     # Template already has name static. Overlaying sig only. 
-                     
-                 # Footer signatories (Appendix 71)
-                 elif role_code == 'SPMO_CLERK': 
-                     c.setFont("Helvetica", 8)
-                     c.drawString(PARGenerator.COORDS['FOOTER_PREPARED'][0], PARGenerator.COORDS['FOOTER_PREPARED'][1], f"{log.user.get_full_name()}")
-                     c.drawString(PARGenerator.COORDS['FOOTER_DATE_X'], PARGenerator.COORDS['FOOTER_PREPARED'][1], log.timestamp.strftime("%Y-%m-%d"))
-                 
-                 elif role_code == 'INSPECTION_OFFICER': 
-                     c.setFont("Helvetica", 8)
-                     c.drawString(PARGenerator.COORDS['FOOTER_INSPECTED'][0], PARGenerator.COORDS['FOOTER_INSPECTED'][1], f"{log.user.get_full_name()}")
-                     c.drawString(PARGenerator.COORDS['FOOTER_DATE_X'], PARGenerator.COORDS['FOOTER_INSPECTED'][1], log.timestamp.strftime("%Y-%m-%d"))
-
-                 elif role_code == 'SPMO_SUPERVISOR': 
-                     c.setFont("Helvetica", 8)
-                     c.drawString(PARGenerator.COORDS['FOOTER_REVIEWED'][0], PARGenerator.COORDS['FOOTER_REVIEWED'][1], f"{log.user.get_full_name()}")
-                     c.drawString(PARGenerator.COORDS['FOOTER_DATE_X'], PARGenerator.COORDS['FOOTER_REVIEWED'][1], log.timestamp.strftime("%Y-%m-%d"))
-
-                 if role_key and log.signature_snapshot:
-                      PARGenerator._draw_signature(c, log.signature_snapshot.path, PARGenerator.COORDS[role_key])
-            
-            # 3. Draw Custodian Signature and Name (If present)
-            if asset.assigned_custodian:
-                c.setFont("Helvetica-Oblique", 7)
-                # Bottom left near the Location box, below the AO Note
-                c.drawString(40, 238, f"Actual User (Custodian): {asset.assigned_custodian}")
-                if asset.custodian_signature:
-                    # Signature above the text
-                    PARGenerator._draw_signature(c, asset.custodian_signature.path, (40, 245))
-
-            # Footer static signatories names are in template. Only drawing individual dates.
-            # Names should only be drawn if they differ from template defaults (SOP: rely on signatures).
-
+            PARGenerator._draw_final_page(c, batch, asset, logs)
             c.showPage()
             c.save()
             
@@ -212,19 +215,112 @@ class PARGenerator:
             else:
                 bulk_writer.add_page(overlay_pdf.pages[0])
 
-        # 4. Finalize and Save
         output_buffer = BytesIO()
         bulk_writer.write(output_buffer)
-        final_content = output_buffer.getvalue()
-        
-        # Hash for integrity
-        sha256_hash = hashlib.sha256(final_content).hexdigest()
+        return output_buffer.getvalue()
+
+    @staticmethod
+    def _draw_final_page(c, batch, asset, logs, images=None):
+        """Draws one asset's PAR overlay (header, details, signatories) on the current canvas page."""
+        # 1. Draw HEADER and Asset Details (1 per page)
+        PARGenerator._draw_header(c, batch)
+        PARGenerator._draw_asset_details(c, asset)
         
-        batch.par_file.save(f"PAR_FINAL_{batch.transaction_id}.pdf", ContentFile(final_content))
-        batch.par_hash = sha256_hash
-        batch.save()
+        # 2. Draw Signatures
+        for log in logs:
+             role_key = None
+             role_code = log.persona.role.code if log.persona and log.persona.role else ''
+             
+             # RECEIVED BY (Unit AO / Accountable Officer)
+             if role_code == 'UNIT_AO': 
+                 role_key = 'SIG_RECEIVED'
+                 c.setFont("Helvetica-Bold", 10)
+                 c.drawCentredString(PARGenerator.COORDS['NAME_RECEIVED'][0], PARGenerator.COORDS['NAME_RECEIVED'][1], f"{log.user.get_full_name()}".upper())
+                 
+                 # Draw Position, Office, Date
+                 pos = log.persona.position_title if log.persona and log.persona.position_title else "Accountable Officer"
+                 c.setFont("Helvetica", 9)
+                 c.drawCentredString(PARGenerator.COORDS['POS_RECEIVED'][0], PARGenerator.COORDS['POS_RECEIVED'][1], pos)
+                 c.drawCentredString(PARGenerator.COORDS['OFFICE_RECEIVED'][0], PARGenerator.COORDS['OFFICE_RECEIVED'][1], str(batch.requesting_unit or ""))
+                 c.drawCentredString(PARGenerator.COORDS['DATE_RECEIVED'][0], PARGenerator.COORDS['DATE_RECEIVED'][1], log.timestamp.strftime("%m/%d/%Y"))
+                 
+             elif role_code == 'SPMO_CHIEF': 
+                 role_key = 'SIG_ISSUED'
+                 # Template already has name static. Overlaying sig only. 
+                 
+             # Footer signatories (Appendix 71)
+             elif role_code == 'SPMO_CLERK': 
+                 c.setFont("Helvetica", 8)
+                 c.drawString(PARGenerator.COORDS['FOOTER_PREPARED'][0], PARGenerator.COORDS['FOOTER_PREPARED'][1], f"{log.user.get_full_name()}")
+                 c.drawString(PARGenerator.COORDS['FOOTER_DATE_X'], PARGenerator.COORDS['FOOTER_PREPARED'][1], log.timestamp.strftime("%Y-%m-%d"))
+             
+             elif role_code == 'INSPECTION_OFFICER': 
+                 c.setFont("Helvetica", 8)
+                 c.drawString(PARGenerator.COORDS['FOOTER_INSPECTED'][0], PARGenerator.COORDS['FOOTER_INSPECTED'][1], f"{log.user.get_full_name()}")
+                 c.drawString(PARGenerator.COORDS['FOOTER_DATE_X'], PARGenerator.COORDS['FOOTER_INSPECTED'][1], log.timestamp.strftime("%Y-%m-%d"))
+
+             elif role_code == 'SPMO_SUPERVISOR': 
+                 c.setFont("Helvetica", 8)
+                 c.drawString(PARGenerator.COORDS['FOOTER_REVIEWED'][0], PARGenerator.COORDS['FOOTER_REVIEWED'][1], f"{log.user.get_full_name()}")
+                 c.drawString(PARGenerator.COORDS['FOOTER_DATE_X'], PARGenerator.COORDS['FOOTER_REVIEWED'][1], log.timestamp.strftime("%Y-%m-%d"))
+
+             if role_key and log.signature_snapshot:
+                  PARGenerator._draw_signature(c, log.signature_snapshot.path, PARGenerator.COORDS[role_key], images)
         
-        return batch.par_file
+        # 3. Draw Custodian Signature and Name (If present)
+        if asset.assigned_custodian:
+            c.setFont("Helvetica-Oblique", 7)
+            # Bottom left near the Location box, below the AO Note
+            c.drawString(40, 238, f"Actual User (Custodian): {asset.assigned_custodian}")
+            if asset.custodian_signature:
+                # Signature above the text
+                PARGenerator._draw_signature(c, asset.custodian_signature.path, (40, 245), images)
+
+        # Footer static signatories names are in template. Only drawing individual dates.
+        # Names should only be drawn if they differ from template defaults (SOP: rely on signatures).
+
+    @staticmethod
+    def _template_bytes():
+        """Raw template PDF, read from disk once per process (re-read if the file changes)."""
+        path = PARGenerator.TEMPLATE_PATH
+        if not os.path.exists(path):
+            return None
+        mtime = os.path.getmtime(path)
+        cached = PARGenerator._template_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'rb') as f:
+                cached = (mtime, f.read())
+            PARGenerator._template_cache[path] = cached
+        return cached[1]
+
+    @staticmethod
+    def _template_xobject(writer):
+        """Adds the template's first page to `writer` as one Form XObject; returns its reference (None without a template)."""
+        raw = PARGenerator._template_bytes()
+        if raw is None:
+            return None
+        template_page = PdfReader(BytesIO(raw)).pages[0]
+        form = DecodedStreamObject()
+        form.set_data(template_page.get_contents().get_data())
+        form.update({
+            NameObject('/Type'): NameObject('/XObject'),
+            NameObject('/Subtype'): NameObject('/Form'),
+            NameObject('/BBox'): ArrayObject([FloatObject(v) for v in template_page.mediabox]),
+            NameObject('/Resources'): template_page['/Resources'].get_object().clone(writer),
+        })
+        return writer._add_object(form.flate_encode())
+
+    @staticmethod
+    def _stamp_template(writer, page, template_ref):
+        """Paints the shared template XObject underneath the page's own overlay content."""
+        resources = page['/Resources'].get_object()
+        if '/XObject' not in resources:
+            resources[NameObject('/XObject')] = DictionaryObject()
+        resources['/XObject'].get_object()[NameObject(PARGenerator.TEMPLATE_XOBJECT)] = template_ref
+
+        content = DecodedStreamObject()
+        content.set_data(f"q {PARGenerator.TEMPLATE_XOBJECT} Do Q\n".encode() + page.get_contents().get_data())
+        page[NameObject('/Contents')] = writer._add_object(content.flate_encode())
 
     @staticmethod
     def _draw_header(c, batch):
@@ -270,9 +366,25 @@ class PARGenerator:
         c.drawRightString(PARGenerator.COORDS['TOTAL_COST'][0], PARGenerator.COORDS['TOTAL_COST'][1], f"{cost:,.2f}")
 
     @staticmethod
-    def _draw_signature(c, image_path, coords):
+    def _draw_signature(c, image_path, coords, images=None):
+        """
+        images: optional {(path, coords): form name} shared across the pages of one
+        canvas; each signature is then decoded once into a ReportLab form and
+        every later page only references it (no re-read, re-hash or re-embed).
+        """
         try:
-            c.drawImage(image_path, coords[0], coords[1], width=80, height=40, mask='auto')
+            if images is None:
+                c.drawImage(image_path, coords[0], coords[1], width=80, height=40, mask='auto')
+                return
+            key = (image_path, tuple(coords))
+            if key not in images:
+                image = ImageReader(image_path)  # Raises here (before the form opens) on a bad file
+                name = f"GamitSig{len(images)}"
+                c.beginForm(name)
+                c.drawImage(image, coords[0], coords[1], width=80, height=40, mask='auto')
+                c.endForm()
+                images[key] = name
+            c.doForm(images[key])
         except Exception as e:
             print(f"Error drawing signature: {e}")
             c.setFont("Helvetica-Oblique", 7)
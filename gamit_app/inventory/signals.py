@@ -1,7 +1,23 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_init, pre_save, post_delete, pre_delete
 from django.dispatch import receiver
+from django.db import transaction
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import (
+    UserProfile, Asset, ServiceLog, Department,
+    AssetBatch, InspectionRequest, AssetTransferRequest, AssetReturnRequest, AssetLossReport, PropertyClearanceRequest,
+    TransactionIndex,
+)
+from .snapshots import AssetKpiTracker
+from .ledger import TransactionIndexer
+from .inbox import PendingCountStore
+from .media_store import MediaStore
+from .images import ImageDerivatives
+from .depreciation import DepreciationEngine
+from .audit import AssetAudit
+from .sequences import SequenceAllocator
+from workflow.models import ActionProcess, Workflow, WorkflowPhase, WorkflowStep, SignatorySlot, Persona, Role
+from workflow.personas import PersonaResolver
+from workflow.graph import WorkflowGraphCache
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -12,3 +28,281 @@ def create_user_profile(sender, instance, created, **kwargs):
 def save_user_profile(sender, instance, **kwargs):
     if hasattr(instance, 'userprofile'):
         instance.userprofile.save()
+
+# --- DASHBOARD KPI SNAPSHOT MAINTENANCE ---
+# Asset/ServiceLog keep the values they were loaded with, so each save only
+# moves the affected snapshot cells (no re-aggregation of the Asset table).
+
+@receiver(post_init, sender=Asset)
+def remember_asset_kpi_state(sender, instance, **kwargs):
+    instance._kpi_state = AssetKpiTracker.capture_asset_state(instance) if instance.pk else None
+
+@receiver(pre_save, sender=Asset)
+def load_deferred_asset_kpi_state(sender, instance, raw=False, **kwargs):
+    # Only instances loaded with .only()/.defer() need a lookup of their previous values
+    if not raw and instance.pk and not instance._state.adding and instance._kpi_state is None:
+        instance._kpi_state = AssetKpiTracker.load_asset_state(instance.pk)
+
+@receiver(post_save, sender=Asset)
+def update_asset_kpi_snapshot(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new_state = AssetKpiTracker.capture_asset_state(instance) or AssetKpiTracker.load_asset_state(instance.pk)
+    old_state = getattr(instance, '_kpi_state', None)
+    if created or old_state is None:
+        AssetKpiTracker.asset_added(new_state, instance.pk)
+    else:
+        AssetKpiTracker.asset_changed(old_state, new_state, instance.pk)
+    instance._kpi_state = new_state
+
+@receiver(post_delete, sender=Asset)
+def remove_asset_kpi_snapshot(sender, instance, **kwargs):
+    state = getattr(instance, '_kpi_state', None) or AssetKpiTracker.capture_asset_state(instance)
+    if state:
+        AssetKpiTracker.asset_removed(state, instance.pk)
+
+@receiver(post_init, sender=ServiceLog)
+def remember_service_kpi_state(sender, instance, **kwargs):
+    loaded = instance.__dict__
+    instance._kpi_state = (loaded.get('asset_id'), loaded.get('service_date'), loaded.get('cost')) if instance.pk else None
+
+@receiver(post_save, sender=ServiceLog)
+def update_service_kpi_snapshot(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = getattr(instance, '_kpi_state', None)
+    new_state = (instance.asset_id, instance.service_date, instance.cost)
+    if old_state == new_state:
+        return
+    if not created and old_state and old_state[0]:
+        AssetKpiTracker.service_removed(*old_state)
+    AssetKpiTracker.service_added(*new_state)
+    instance._kpi_state = new_state
+
+@receiver(post_delete, sender=ServiceLog)
+def remove_service_kpi_snapshot(sender, instance, **kwargs):
+    AssetKpiTracker.service_removed(instance.asset_id, instance.service_date, instance.cost)
+
+@receiver(post_delete, sender=Department)
+def rebuild_unassigned_kpi_slice(sender, instance, **kwargs):
+    # Assets of a deleted department fall back to "no department" via SET_NULL (no Asset signals fire)
+    from django.db.models import Q
+    AssetKpiTracker.rebuild(asset_filter=Q(department__isnull=True))
+
+# --- SEQUENCE COUNTER MAINTENANCE ---
+# Explicit numbers (admin import-export, admin form, manual saves) raise the
+# counter so the allocator never hands out a value that is already stored.
+
+@receiver(post_init, sender=Asset)
+def remember_sequence_values(sender, instance, **kwargs):
+    loaded = instance.__dict__
+    instance._sequence_values = {field: loaded.get(field) for field, _, _ in Asset.SEQUENCES} if instance.pk else {}
+
+@receiver(post_save, sender=Asset)
+def observe_explicit_sequence_values(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    allocated = getattr(instance, '_allocated_sequences', set())
+    for field, prefix, use_year in Asset.SEQUENCES:
+        value = getattr(instance, field)
+        if field in allocated or (update_fields is not None and field not in update_fields):
+            continue
+        if created or raw or getattr(instance, '_sequence_values', {}).get(field) != value:
+            SequenceAllocator.observe(value, prefix, Asset, field, use_year=use_year)
+    instance._sequence_values = {field: getattr(instance, field) for field, _, _ in Asset.SEQUENCES}
+    instance._allocated_sequences = set()
+
+# --- ASSET SEARCH DOCUMENT MAINTENANCE ---
+# The department name is copied into Asset.search_document, so renames and
+# deletions must refresh the affected assets (Asset.save() covers the rest).
+
+@receiver(post_init, sender=Department)
+def remember_department_name(sender, instance, **kwargs):
+    instance._search_name = instance.__dict__.get('name') if instance.pk else None
+
+@receiver(post_save, sender=Department)
+def refresh_department_search_documents(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    if instance.name != getattr(instance, '_search_name', None):
+        from .search import AssetSearch
+        AssetSearch.refresh(Asset.objects.filter(department=instance))
+    instance._search_name = instance.name
+
+@receiver(post_delete, sender=Department)
+def refresh_unassigned_search_documents(sender, instance, **kwargs):
+    from .search import AssetSearch
+    AssetSearch.refresh(Asset.objects.filter(department__isnull=True))
+
+# --- TRANSACTION INDEX MAINTENANCE ---
+# Every transaction write (including WorkflowEngine.transition, which saves the
+# transaction) upserts its TransactionIndex row; edits to copied columns follow.
+# A step change on any save path (engine, admin, direct saves) also moves the
+# cached pending counters from the old role to the new one.
+
+TRANSACTION_MODELS = (AssetBatch, InspectionRequest, AssetTransferRequest, AssetReturnRequest, AssetLossReport, PropertyClearanceRequest)
+REQUESTOR_NAME_FIELDS = {'first_name', 'last_name', 'username'}
+ASSET_LABEL_FIELDS = {'property_number', 'name'}
+
+_UNKNOWN_STEP = object()
+
+def remember_indexed_step(sender, instance, **kwargs):
+    instance._indexed_step_id = instance.__dict__.get('current_step_id', _UNKNOWN_STEP) if instance.pk else None
+
+def sync_transaction_index(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    step_changed = created or getattr(instance, '_indexed_step_id', _UNKNOWN_STEP) != instance.current_step_id
+    old_role_id = TransactionIndexer.indexed_role(instance) if step_changed and not created else None
+    new_role_id = TransactionIndexer.sync(instance)
+    if step_changed:
+        PendingCountStore.moved(old_role_id, new_role_id)
+    instance._indexed_step_id = instance.current_step_id
+
+def remove_transaction_index(sender, instance, **kwargs):
+    PendingCountStore.moved(TransactionIndexer.remove(instance), None)
+
+for _model in TRANSACTION_MODELS:
+    post_init.connect(remember_indexed_step, sender=_model, dispatch_uid=f'txn_index_step_{_model.__name__}')
+    post_save.connect(sync_transaction_index, sender=_model, dispatch_uid=f'txn_index_sync_{_model.__name__}')
+    post_delete.connect(remove_transaction_index, sender=_model, dispatch_uid=f'txn_index_remove_{_model.__name__}')
+
+@receiver(post_save, sender=User)
+def refresh_transaction_index_requestor(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created or (update_fields is not None and not REQUESTOR_NAME_FIELDS.intersection(update_fields)):
+        return
+    TransactionIndexer.requestor_changed(instance)
+
+@receiver(post_save, sender=UserProfile)
+def refresh_transaction_index_department(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        TransactionIndexer.profile_changed(instance)
+
+@receiver(post_save, sender=Asset)
+def refresh_transaction_index_asset(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created or (update_fields is not None and not ASSET_LABEL_FIELDS.intersection(update_fields)):
+        return
+    TransactionIndexer.asset_changed(instance)
+
+@receiver(post_save, sender=WorkflowStep)
+def refresh_transaction_index_step(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        PendingCountStore.invalidate_roles(*TransactionIndexer.step_changed(instance))
+
+@receiver(pre_delete, sender=WorkflowStep)
+def invalidate_deleted_step_counts(sender, instance, **kwargs):
+    # Waiting transactions fall off the step (SET_NULL) without a save
+    PendingCountStore.invalidate_roles(instance.required_persona_role_id)
+    TransactionIndex.objects.filter(current_step=instance).update(required_role=None)
+
+# --- PERSONA RESOLVER INVALIDATION ---
+
+@receiver([post_save, post_delete], sender=Persona)
+@receiver([post_save, post_delete], sender=Role)
+def bump_persona_version(sender, instance, raw=False, **kwargs):
+    PersonaResolver.bump()
+
+@receiver(post_save, sender=UserProfile)
+def forget_profile_personas(sender, instance, raw=False, **kwargs):
+    PersonaResolver.forget_user(instance.user_id)
+
+# --- ASSET PHOTO DERIVATIVES ---
+# A new serial/condition photo gets its thumbnails once the upload has committed.
+
+@receiver(post_save, sender=Asset)
+def queue_image_derivatives(sender, instance, raw=False, **kwargs):
+    if not raw and ImageDerivatives.stale_fields(instance):
+        transaction.on_commit(lambda: ImageDerivatives.refresh([instance.pk]))
+
+
+# --- ASSET AUDIT TRAIL ---
+# Instances keep the values they were loaded with; a save logs every changed
+# field in one insert (see AssetAudit for the bulk import paths).
+
+@receiver(post_init, sender=Asset)
+def remember_audit_state(sender, instance, **kwargs):
+    instance._audit_state = AssetAudit.state(instance) if instance.pk else None
+
+@receiver(post_save, sender=Asset)
+def record_asset_changes(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        AssetAudit.saved(instance, None if created else update_fields)
+
+
+# --- DEPRECIATION SCHEDULES ---
+# Only saves that change the finance columns recompute the asset's monthly rows.
+
+def _depreciation_state(instance):
+    loaded = instance.__dict__
+    if any(field not in loaded for field in DepreciationEngine.FIELDS):
+        return None  # deferred at load time
+    return tuple(loaded[field] for field in DepreciationEngine.FIELDS)
+
+@receiver(post_init, sender=Asset)
+def remember_depreciation_state(sender, instance, **kwargs):
+    instance._depreciation_state = _depreciation_state(instance) if instance.pk else None
+
+@receiver(post_save, sender=Asset)
+def rebuild_depreciation_schedule(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    old_state, new_state = getattr(instance, '_depreciation_state', None), _depreciation_state(instance)
+    if update_fields is not None and not set(update_fields) & set(DepreciationEngine.FIELDS):
+        changed = False
+    else:
+        changed = created or old_state is None or old_state != new_state
+    instance._depreciation_state = new_state
+    if changed:
+        transaction.on_commit(lambda: DepreciationEngine.rebuild(Asset.objects.filter(pk=instance.pk)))
+
+
+# --- CONTENT-ADDRESSED MEDIA REFERENCES ---
+# Rows keep the blob names they were loaded with; saves retain/release only the
+# file fields that changed, deletes release every blob the row referenced.
+
+def _media_names(instance):
+    loaded = instance.__dict__
+    return {
+        field: getattr(loaded[field], 'name', loaded[field]) or ''
+        for field in instance._media_fields if field in loaded
+    }
+
+def remember_media_names(sender, instance, **kwargs):
+    instance._media_names = _media_names(instance) if instance.pk else {}
+
+def update_media_references(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    old_names = {} if created else getattr(instance, '_media_names', {})
+    new_names = _media_names(instance)
+    for field, name in new_names.items():
+        if update_fields is not None and field not in update_fields:
+            continue
+        if not created and field not in old_names:
+            continue  # deferred at load time: previous value unknown (collapse_media_duplicates --recount-only fixes it)
+        if old_names.get(field, '') != name:
+            MediaStore.release(old_names.get(field, ''))
+            MediaStore.retain(name)
+    instance._media_names = new_names
+
+def release_media_references(sender, instance, **kwargs):
+    # The names as stored, not unsaved edits of the instance
+    names = getattr(instance, '_media_names', None) or _media_names(instance)
+    for name in names.values():
+        MediaStore.release(name)
+
+for _model, _fields in MediaStore.tracked_fields().items():
+    _model._media_fields = tuple(_fields)
+    post_init.connect(remember_media_names, sender=_model, dispatch_uid=f'media_remember_{_model.__name__}')
+    post_save.connect(update_media_references, sender=_model, dispatch_uid=f'media_update_{_model.__name__}')
+    post_delete.connect(release_media_references, sender=_model, dispatch_uid=f'media_release_{_model.__name__}')
+
+
+# --- WORKFLOW GRAPH INVALIDATION ---
+
+@receiver([post_save, post_delete], sender=ActionProcess)
+@receiver([post_save, post_delete], sender=Workflow)
+@receiver([post_save, post_delete], sender=WorkflowPhase)
+@receiver([post_save, post_delete], sender=WorkflowStep)
+@receiver([post_save, post_delete], sender=SignatorySlot)
+@receiver([post_save, post_delete], sender=Role)
+def bump_workflow_graph(sender, instance, **kwargs):
+    WorkflowGraphCache.bump()
@@ -0,0 +1,317 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction, IntegrityError
+from django.db.models import F, Q, Sum, Count
+from django.utils import timezone
+
+
+class AssetKpiTracker:
+    """
+    Maintains AssetKpiSnapshot cells for the GAMIT dashboard.
+    Each Asset / ServiceLog write only touches the cells it moves in or out of,
+    so the dashboard can read every KPI from one snapshot query.
+    """
+
+    DIMENSIONS = ('asset_class', 'asset_nature', 'status', 'department_id')
+    ASSET_STATE_FIELDS = DIMENSIONS + ('date_acquired', 'created_at', 'acquisition_cost')
+    INACTIVE_STATUSES = ('INACTIVE', 'DISPOSED', 'UNSERVICEABLE')
+
+    # ------------------------------------------------------------------
+    # State capture (no extra queries: reads only already-loaded attributes)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def capture_asset_state(asset):
+        """Returns the KPI-relevant field values, or None if any of them is deferred."""
+        loaded = asset.__dict__
+        if any(f not in loaded for f in AssetKpiTracker.ASSET_STATE_FIELDS):
+            return None
+        return {f: loaded[f] for f in AssetKpiTracker.ASSET_STATE_FIELDS}
+
+    @staticmethod
+    def load_asset_state(asset_id):
+        from .models import Asset
+        return Asset.objects.filter(pk=asset_id).values(*AssetKpiTracker.ASSET_STATE_FIELDS).first()
+
+    @staticmethod
+    def _dims(state):
+        return {f: state[f] for f in AssetKpiTracker.DIMENSIONS}
+
+    @staticmethod
+    def _day(value):
+        if value is None:
+            return None
+        if isinstance(value, datetime.datetime):
+            return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+        if isinstance(value, str):
+            return datetime.date.fromisoformat(value[:10])
+        return value
+
+    # ------------------------------------------------------------------
+    # Asset events
+    # ------------------------------------------------------------------
+    @staticmethod
+    def asset_added(state, asset_id):
+        dims = AssetKpiTracker._dims(state)
+        cost = state['acquisition_cost'] or Decimal('0')
+        acquired = AssetKpiTracker._day(state['date_acquired'])
+        if acquired:
+            AssetKpiTracker._apply('ACQUIRED', dims, acquired, 1, cost)
+            AssetKpiTracker._offer_max(dims, acquired, state['acquisition_cost'], asset_id)
+        created = AssetKpiTracker._day(state['created_at'])
+        if created:
+            AssetKpiTracker._apply('CREATED', dims, created, 1, cost)
+
+    @staticmethod
+    def asset_removed(state, asset_id):
+        dims = AssetKpiTracker._dims(state)
+        cost = state['acquisition_cost'] or Decimal('0')
+        acquired = AssetKpiTracker._day(state['date_acquired'])
+        if acquired:
+            AssetKpiTracker._apply('ACQUIRED', dims, acquired, -1, -cost)
+            AssetKpiTracker._recompute_max_if_holder(dims, acquired, asset_id)
+        created = AssetKpiTracker._day(state['created_at'])
+        if created:
+            AssetKpiTracker._apply('CREATED', dims, created, -1, -cost)
+
+    @staticmethod
+    def asset_changed(old_state, new_state, asset_id):
+        if old_state == new_state:
+            return
+        AssetKpiTracker.asset_removed(old_state, asset_id)
+        AssetKpiTracker.asset_added(new_state, asset_id)
+
+        # Service totals follow the asset into its new dimension slice
+        old_dims, new_dims = AssetKpiTracker._dims(old_state), AssetKpiTracker._dims(new_state)
+        if old_dims != new_dims:
+            from .models import ServiceLog
+            per_day = ServiceLog.objects.filter(asset_id=asset_id).values('service_date').annotate(
+                n=Count('id'), cost=Sum('cost')
+            )
+            for row in per_day:
+                AssetKpiTracker._apply('SERVICE', old_dims, row['service_date'], -row['n'], -(row['cost'] or 0))
+                AssetKpiTracker._apply('SERVICE', new_dims, row['service_date'], row['n'], row['cost'] or 0)
+
+    @staticmethod
+    def assets_bulk_created(assets):
+        """Folds rows inserted with bulk_create (no signals) into the snapshot in one pass per cell."""
+        cells = defaultdict(lambda: [0, Decimal('0'), None, None])
+        for asset in assets:
+            state = AssetKpiTracker.capture_asset_state(asset)
+            if state is None:
+                continue
+            dims_key = tuple(AssetKpiTracker._dims(state).items())
+            cost = state['acquisition_cost'] or Decimal('0')
+            for kind, day in (('ACQUIRED', state['date_acquired']), ('CREATED', state['created_at'])):
+                day = AssetKpiTracker._day(day)
+                if not day:
+                    continue
+                cell = cells[(kind, dims_key, day)]
+                cell[0] += 1
+                cell[1] += cost
+                if kind == 'ACQUIRED' and state['acquisition_cost'] is not None and (cell[2] is None or state['acquisition_cost'] > cell[2]):
+                    cell[2], cell[3] = state['acquisition_cost'], asset.pk
+
+        for (kind, dims_key, day), (n, total, max_cost, max_id) in cells.items():
+            dims = dict(dims_key)
+            AssetKpiTracker._apply(kind, dims, day, n, total)
+            if kind == 'ACQUIRED':
+                AssetKpiTracker._offer_max(dims, day, max_cost, max_id)
+
+    # ------------------------------------------------------------------
+    # ServiceLog events
+    # ------------------------------------------------------------------
+    @staticmethod
+    def service_added(asset_id, service_date, cost, sign=1):
+        state = AssetKpiTracker.load_asset_state(asset_id)
+        day = AssetKpiTracker._day(service_date)
+        if state is None or day is None:
+            return
+        AssetKpiTracker._apply('SERVICE', AssetKpiTracker._dims(state), day, sign, sign * (cost or Decimal('0')))
+
+    @staticmethod
+    def service_removed(asset_id, service_date, cost):
+        AssetKpiTracker.service_added(asset_id, service_date, cost, sign=-1)
+
+    # ------------------------------------------------------------------
+    # Dashboard read path
+    # ------------------------------------------------------------------
+    @staticmethod
+    def empty_metrics():
+        return {
+            'total_count': 0, 'total_value': Decimal('0'),
+            'highest_val': 0, 'highest_name': 'N/A',
+            'active_count': 0, 'inactive_count': 0, 'repair_count': 0,
+            'aging_assets_count': 0,
+            'maintenance_cost': Decimal('0'), 'maintenance_count': 0,
+            'recent_count': 0, 'recent_value': Decimal('0'),
+            'top_office_name': 'N/A', 'top_office_count': 0,
+        }
+
+    @staticmethod
+    def dashboard_metrics(department=None, asset_class='', asset_nature='', status='', today=None):
+        """Reads every dashboard KPI with a single snapshot query."""
+        from .models import AssetKpiSnapshot
+
+        today = today or timezone.localdate()
+        five_years_ago = today - datetime.timedelta(days=5 * 365)
+        one_year_ago = today - datetime.timedelta(days=365)
+        thirty_days_ago = today - datetime.timedelta(days=30)
+
+        qs = AssetKpiSnapshot.objects.filter(
+            Q(kind='ACQUIRED') |
+            Q(kind='CREATED', period__gte=thirty_days_ago) |
+            Q(kind='SERVICE', period__gte=one_year_ago)
+        )
+        if department is not None:
+            qs = qs.filter(department=department)
+        if asset_class:
+            qs = qs.filter(asset_class=asset_class)
+        if asset_nature:
+            qs = qs.filter(asset_nature=asset_nature)
+        if status:
+            qs = qs.filter(status=status)
+
+        m = AssetKpiTracker.empty_metrics()
+        m['highest_val'] = None
+        offices = defaultdict(int)
+
+        for row in qs.values('kind', 'status', 'period', 'department__name', 'item_count',
+                             'total_value', 'max_cost', 'max_asset__name'):
+            n = row['item_count']
+            if row['kind'] == 'SERVICE':
+                m['maintenance_count'] += n
+                m['maintenance_cost'] += row['total_value']
+            elif row['kind'] == 'CREATED':
+                m['recent_count'] += n
+                m['recent_value'] += row['total_value']
+            else:
+                m['total_count'] += n
+                m['total_value'] += row['total_value']
+                if row['status'] == 'SERVICEABLE':
+                    m['active_count'] += n
+                elif row['status'] in AssetKpiTracker.INACTIVE_STATUSES:
+                    m['inactive_count'] += n
+                elif row['status'] == 'UNDER_REPAIR':
+                    m['repair_count'] += n
+                if row['period'] < five_years_ago:
+                    m['aging_assets_count'] += n
+                if n > 0 and row['max_cost'] is not None and (m['highest_val'] is None or row['max_cost'] > m['highest_val']):
+                    m['highest_val'] = row['max_cost']
+                    m['highest_name'] = row['max_asset__name'] or 'N/A'
+                offices[row['department__name']] += n
+
+        m['highest_val'] = m['highest_val'] or 0
+        top = max(((name, c) for name, c in offices.items() if c > 0), key=lambda x: x[1], default=None)
+        m['top_office_name'] = top[0] if top else "N/A"
+        m['top_office_count'] = top[1] if top else 0
+        return m
+
+    # ------------------------------------------------------------------
+    # Full rebuild (backfill / repair after queryset.update() writes)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def rebuild(asset_filter=None):
+        """
+        Recomputes snapshot cells from the Asset and ServiceLog tables.
+        asset_filter (Q on Asset fields) limits the rebuild to one slice.
+        Returns the number of snapshot rows written.
+        """
+        from .models import Asset, ServiceLog, AssetKpiSnapshot
+
+        assets = Asset.objects.all()
+        services = ServiceLog.objects.all()
+        snapshot = AssetKpiSnapshot.objects.all()
+        if asset_filter is not None:
+            assets = assets.filter(asset_filter)
+            services = services.filter(asset__in=assets.values('pk'))
+            slice_keys = set(assets.values_list(*AssetKpiTracker.DIMENSIONS).distinct())
+            slice_q = Q(pk__in=[])
+            for values in slice_keys:
+                slice_q |= Q(**dict(zip(AssetKpiTracker.DIMENSIONS, values)))
+            snapshot = snapshot.filter(slice_q)
+
+        cells = {}
+
+        def cell(kind, dims, day):
+            key = (kind, tuple(dims.items()), day)
+            if key not in cells:
+                cells[key] = AssetKpiSnapshot(kind=kind, period=day, total_value=Decimal('0'), **dims)
+            return cells[key]
+
+        for state in assets.values('pk', *AssetKpiTracker.ASSET_STATE_FIELDS).iterator(chunk_size=2000):
+            dims = AssetKpiTracker._dims(state)
+            cost = state['acquisition_cost'] or Decimal('0')
+            acquired = AssetKpiTracker._day(state['date_acquired'])
+            if acquired:
+                row = cell('ACQUIRED', dims, acquired)
+                row.item_count += 1
+                row.total_value += cost
+                if state['acquisition_cost'] is not None and (row.max_cost is None or state['acquisition_cost'] > row.max_cost):
+                    row.max_cost, row.max_asset_id = state['acquisition_cost'], state['pk']
+            created = AssetKpiTracker._day(state['created_at'])
+            if created:
+                row = cell('CREATED', dims, created)
+                row.item_count += 1
+                row.total_value += cost
+
+        per_day = services.values(
+            'asset__asset_class', 'asset__asset_nature', 'asset__status', 'asset__department_id', 'service_date'
+        ).annotate(n=Count('id'), cost=Sum('cost'))
+        for row in per_day:
+            dims = AssetKpiTracker._dims({
+                'asset_class': row['asset__asset_class'], 'asset_nature': row['asset__asset_nature'],
+                'status': row['asset__status'], 'department_id': row['asset__department_id'],
+            })
+            target = cell('SERVICE', dims, row['service_date'])
+            target.item_count += row['n']
+            target.total_value += row['cost'] or 0
+
+        with transaction.atomic():
+            snapshot.delete()
+            AssetKpiSnapshot.objects.bulk_create(cells.values(), batch_size=500)
+        return len(cells)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _cell_qs(kind, dims, day):
+        from .models import AssetKpiSnapshot
+        return AssetKpiSnapshot.objects.filter(kind=kind, period=day, **dims)
+
+    @staticmethod
+    def _apply(kind, dims, day, count_delta, value_delta):
+        """Adds deltas to a cell, creating it on first use."""
+        from .models import AssetKpiSnapshot
+
+        qs = AssetKpiTracker._cell_qs(kind, dims, day)
+        if qs.update(item_count=F('item_count') + count_delta, total_value=F('total_value') + value_delta):
+            return
+        try:
+            with transaction.atomic():
+                AssetKpiSnapshot.objects.create(kind=kind, period=day, item_count=count_delta,
+                                                total_value=value_delta, **dims)
+        except IntegrityError:
+            # Created concurrently; fold our delta into that row
+            qs.update(item_count=F('item_count') + count_delta, total_value=F('total_value') + value_delta)
+
+    @staticmethod
+    def _offer_max(dims, day, cost, asset_id):
+        if cost is None:
+            return
+        AssetKpiTracker._cell_qs('ACQUIRED', dims, day).filter(
+            Q(max_cost__isnull=True) | Q(max_cost__lt=cost)
+        ).update(max_cost=cost, max_asset_id=asset_id)
+
+    @staticmethod
+    def _recompute_max_if_holder(dims, day, asset_id):
+        """Only when the departing asset held the cell maximum do we look at the Asset table."""
+        from .models import Asset
+
+        cell = AssetKpiTracker._cell_qs('ACQUIRED', dims, day)
+        if not cell.filter(max_asset_id=asset_id).exists():
+            return
+        top = Asset.objects.filter(date_acquired=day, acquisition_cost__isnull=False, **dims).order_by('-acquisition_cost') \
+            .values('pk', 'acquisition_cost').first()
+        cell.update(max_cost=top['acquisition_cost'] if top else None, max_asset_id=top['pk'] if top else None)
@@ -12,3 +12,10 @@ def query_transform(context, **kwargs):
         else:
             updated.pop(k, None)
     return updated.urlencode()
+
+
+@register.simple_tag
+def image_variant(asset, field, spec='thumb'):
+    """URL of a resized WebP derivative of an asset photo (falls back to the original)."""
+    from inventory.images import ImageDerivatives
+    return ImageDerivatives.url(asset, field, spec)
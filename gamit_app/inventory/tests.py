@@ -1,8 +1,39 @@
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from django.urls import reverse
+import datetime
+import os
 from datetime import date
-from .models import Asset, UserProfile, Department
+from unittest import skipUnless
+from decimal import Decimal
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count
+from .models import (
+    Asset, UserProfile, Department, SequenceCounter, AssetBatch, BatchItem, ServiceLog, AssetKpiSnapshot,
+    TransactionIndex, AssetTransferRequest, InspectionRequest, AssetReturnRequest, AssetLossReport, PropertyClearanceRequest,
+    NotificationOutbox, DocumentJob, MediaBlob, DepreciationSchedule, AssetChangeLog, AssetNotification, LogArchive,
+)
+from .snapshots import AssetKpiTracker
+from .workflow import WorkflowEngine
+from .sequences import SequenceAllocator
+from .search import AssetSearch
+from .pagination import KeysetPaginator
+from .ledger import TransactionIndexer
+from .inbox import PendingCountStore
+from .activity import ActivityFeed
+from .outbox import NotificationDispatcher
+from .documents import DocumentJobQueue
+from .media_store import MediaStore, ContentAddressedStorage
+from .media_linker import AssetImageLinker
+from .images import ImageDerivatives
+from .importer import AssetImporter, RpcppeImporter
+from .rpcppe import RpcppeReport
+from . import depreciation
+from .depreciation import DepreciationEngine
+from .audit import AssetAudit
+from .partitions import LogPartitions
+from django.core.cache import cache
+from workflow.models import Role, ActionProcess, Workflow, WorkflowPhase, WorkflowStep, Persona, WorkflowMovementLog
 
 class AssetSecurityTests(TestCase):
     def setUp(self):
@@ -78,4 +109,1376 @@ class AssetSecurityTests(TestCase):
         response = self.client.get(url)
         
         # Should return 404 (Not Found), effectively hiding it
-        self.assertEqual(response.status_code, 404)
\ No newline at end of file
+        self.assertEqual(response.status_code, 404)
+
+
+class SequenceAllocatorTests(TestCase):
+    def test_seeds_from_existing_rows_and_keeps_width(self):
+        Asset.objects.create(property_number='PAR-000041', name='Legacy', date_acquired=date(2020, 1, 1))
+        self.assertEqual(
+            SequenceAllocator.next_value("PAR", Asset, "property_number", use_year=False),
+            'PAR-000042'
+        )
+
+    def test_block_reservation_is_contiguous_and_single_use(self):
+        block = SequenceAllocator.reserve_block("PAR", Asset, "property_number", use_year=False, count=3)
+        self.assertEqual(block, ['PAR-00001', 'PAR-00002', 'PAR-00003'])
+        self.assertEqual(
+            SequenceAllocator.next_value("PAR", Asset, "property_number", use_year=False),
+            'PAR-00004'
+        )
+
+    def test_asset_save_draws_from_counter(self):
+        first = Asset.objects.create(name='Unit A', date_acquired=date(2024, 1, 1))
+        second = Asset.objects.create(name='Unit B', date_acquired=date(2024, 1, 1))
+        self.assertNotEqual(first.property_number, second.property_number)
+        self.assertNotEqual(first.item_id, second.item_id)
+        counter = SequenceCounter.objects.get(name='inventory.Asset.property_number:PAR-')
+        self.assertEqual(counter.last_value, 2)
+
+    def test_resync_skips_imported_numbers(self):
+        SequenceAllocator.next_value("PAR", Asset, "property_number", use_year=False)
+        Asset.objects.create(property_number='PAR-00050', name='Imported', date_acquired=date(2020, 1, 1))
+        SequenceAllocator.resync("PAR", Asset, "property_number", use_year=False)
+        self.assertEqual(
+            SequenceAllocator.next_value("PAR", Asset, "property_number", use_year=False),
+            'PAR-00051'
+        )
+
+
+    def test_explicit_numbers_raise_the_counter(self):
+        SequenceAllocator.next_value("PAR", Asset, "property_number", use_year=False)
+        Asset.objects.create(property_number='PAR-00002', name='Manual', date_acquired=date(2020, 1, 1))
+        following = Asset.objects.create(name='Allocated', date_acquired=date(2024, 1, 1))
+        self.assertEqual(following.property_number, 'PAR-00003')
+
+        following.property_number = 'PAR-00010'
+        following.save()
+        self.assertEqual(
+            SequenceAllocator.next_value("PAR", Asset, "property_number", use_year=False),
+            'PAR-00011'
+        )
+
+
+class BulkRealizationTests(TestCase):
+    def test_bulk_realization_numbers_every_unit(self):
+        user = User.objects.create_user(username='requestor', password='password123')
+        batch = AssetBatch.objects.create(requestor=user)
+        BatchItem.objects.create(batch=batch, description='Laptop', quantity=3, amount=60000)
+        BatchItem.objects.create(batch=batch, description='Monitor', quantity=2, amount=9000)
+
+        created = WorkflowEngine._realize_assets(batch)
+
+        self.assertEqual(len(created), 5)
+        assets = Asset.objects.filter(acquisition_batch=batch).order_by('property_number')
+        self.assertEqual(
+            list(assets.values_list('property_number', flat=True)),
+            ['PAR-00001', 'PAR-00002', 'PAR-00003', 'PAR-00004', 'PAR-00005']
+        )
+        self.assertEqual(len(set(assets.values_list('item_id', flat=True))), 5)
+        # Second finalization is a no-op
+        self.assertIsNone(WorkflowEngine._realize_assets(batch))
+
+
+class AssetKpiSnapshotTests(TestCase):
+    def setUp(self):
+        self.dept_a = Department.objects.create(name='Dept A')
+        self.dept_b = Department.objects.create(name='Dept B')
+        self.laptop = Asset.objects.create(name='Laptop', date_acquired=date(2015, 5, 1), acquisition_cost=80000,
+                                           department=self.dept_a, asset_class='ICT EQUIPMENT')
+        self.chair = Asset.objects.create(name='Chair', date_acquired=date.today(), acquisition_cost=5000,
+                                          department=self.dept_a, asset_class='FURNITURE AND FIXTURES')
+        self.aircon = Asset.objects.create(name='Aircon', date_acquired=date.today(), acquisition_cost=45000,
+                                           department=self.dept_b, status='UNDER_REPAIR')
+        ServiceLog.objects.create(asset=self.laptop, description='Cleaning', service_provider='IT', cost=1200)
+
+    def test_incremental_updates_track_saves_and_deletes(self):
+        kpi = AssetKpiTracker.dashboard_metrics()
+        self.assertEqual(kpi['total_count'], 3)
+        self.assertEqual(kpi['total_value'], 130000)
+        self.assertEqual(kpi['highest_name'], 'Laptop')
+        self.assertEqual(kpi['aging_assets_count'], 1)
+        self.assertEqual(kpi['repair_count'], 1)
+        self.assertEqual((kpi['maintenance_count'], kpi['maintenance_cost']), (1, 1200))
+        self.assertEqual((kpi['top_office_name'], kpi['top_office_count']), ('Dept A', 2))
+
+        # Moving the laptop moves its value, maximum and service history with it
+        self.laptop.department = self.dept_b
+        self.laptop.acquisition_cost = 30000
+        self.laptop.save()
+        self.aircon.delete()
+
+        kpi = AssetKpiTracker.dashboard_metrics(department=self.dept_b)
+        self.assertEqual(kpi['total_count'], 1)
+        self.assertEqual(kpi['total_value'], 30000)
+        self.assertEqual(kpi['maintenance_cost'], 1200)
+        self.assertEqual(AssetKpiTracker.dashboard_metrics()['highest_name'], 'Laptop')
+        self.assertEqual(AssetKpiTracker.dashboard_metrics(department=self.dept_a)['maintenance_count'], 0)
+
+    def test_rebuild_matches_incremental_state(self):
+        self.chair.status = 'DISPOSED'
+        self.chair.save()
+        incremental = AssetKpiTracker.dashboard_metrics()
+        AssetKpiSnapshot.objects.all().delete()
+        AssetKpiTracker.rebuild()
+        self.assertEqual(AssetKpiTracker.dashboard_metrics(), incremental)
+
+    def test_unassigned_cells_are_unique(self):
+        Asset.objects.create(name='Desk', date_acquired=date.today(), acquisition_cost=7000)
+        Asset.objects.create(name='Cabinet', date_acquired=date.today(), acquisition_cost=3000)
+        cell = AssetKpiSnapshot.objects.get(kind='ACQUIRED', department__isnull=True, period=date.today())
+        self.assertEqual((cell.item_count, cell.total_value), (2, 10000))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AssetKpiSnapshot.objects.create(kind=cell.kind, asset_class=cell.asset_class, asset_nature=cell.asset_nature,
+                                            status=cell.status, period=cell.period)
+
+    def test_dashboard_reads_snapshot(self):
+        User.objects.create_superuser(username='admin', password='password123')
+        self.client.login(username='admin', password='password123')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_count'], 3)
+        self.assertEqual(response.context['inactive_count'], 0)
+
+
+class AssetSearchTests(TestCase):
+    def setUp(self):
+        self.dept = Department.objects.create(name='Procurement Office')
+        self.laptop = Asset.objects.create(
+            property_number='PAR-001234', name='Dell Latitude Laptop', date_acquired=date(2023, 1, 1),
+            department=self.dept, accountable_firstname='Juan', accountable_surname='Dela Cruz',
+        )
+        self.printer = Asset.objects.create(
+            property_number='PAR-009999', name='Laser Printer', description='Shared printer near the laptop dock',
+            date_acquired=date(2023, 1, 1),
+        )
+
+    def search(self, term, mode=AssetSearch.MODE_AUTO):
+        queryset, mode = AssetSearch.filter(Asset.objects.all(), term, mode)
+        return list(queryset.order_by('-search_rank', 'property_number')), mode
+
+    def test_document_maintained_on_save_and_department_rename(self):
+        self.assertIn('procurement office', Asset.objects.get(pk=self.laptop.pk).search_document)
+        self.dept.name = 'Supply Office'
+        self.dept.save()
+        document = Asset.objects.get(pk=self.laptop.pk).search_document
+        self.assertIn('supply office', document)
+        self.assertNotIn('procurement', document)
+
+    def test_text_search_ranks_name_matches_first(self):
+        results, mode = self.search('LAPTOP')
+        self.assertEqual(mode, AssetSearch.MODE_TEXT)
+        self.assertEqual(results, [self.laptop, self.printer])
+        self.assertEqual(self.search('juan cruz')[0], [self.laptop])
+
+    def test_property_number_prefix_mode(self):
+        results, mode = self.search('par 0012')
+        self.assertEqual(mode, AssetSearch.MODE_PREFIX)
+        self.assertEqual(results, [self.laptop])
+        self.assertEqual(self.search('0099')[0], [self.printer])
+
+    def test_bare_digits_match_numbers_and_text(self):
+        model = Asset.objects.create(property_number='PAR-000777', name='Printer 2024 model', date_acquired=date(2024, 1, 1))
+        results, mode = self.search('9999')
+        self.assertEqual(mode, AssetSearch.MODE_TEXT)
+        self.assertEqual(results, [self.printer])
+        self.assertEqual(self.search('2024')[0], [model])
+        # Property-number hits rank above text hits
+        monitor = Asset.objects.create(property_number='PAR-002024', name='Monitor', date_acquired=date(2022, 1, 1))
+        self.assertEqual(self.search('2024')[0], [monitor, model])
+
+    def test_asset_list_orders_by_relevance(self):
+        User.objects.create_superuser(username='admin', password='password123')
+        self.client.login(username='admin', password='password123')
+        response = self.client.get(reverse('asset_list'), {'search': 'laptop'})
+        self.assertEqual(list(response.context['object_list']), [self.laptop, self.printer])
+        self.assertEqual(response.context['search_mode'], AssetSearch.MODE_TEXT)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        depts = [Department.objects.create(name=n) for n in ('Alpha', 'Bravo')] + [None]
+        for i in range(23):
+            Asset.objects.create(
+                property_number=f'PAR-{i:06d}', name=f'Item {i % 5}', date_acquired=date(2023, 1, 1 + i % 7),
+                department=depts[i % 3],
+            )
+
+    def walk(self, ordering, per_page=4):
+        paginator = KeysetPaginator(Asset.objects.all(), per_page, ordering, count=Asset.objects.count())
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_forward_and_backward_walks_cover_every_row_once(self):
+        for ordering in ([('department__name', False)], [('department__name', True)], [('name', True)], [('date_acquired', False)]):
+            paginator, pages = self.walk(ordering)
+            seen = [a.pk for page in pages for a in page]
+            self.assertEqual(sorted(seen), sorted(Asset.objects.values_list('pk', flat=True)), ordering)
+            self.assertEqual(len(pages), paginator.num_pages)
+            self.assertEqual(pages[-1].number, paginator.num_pages)
+
+            # Walking back from the last page retraces the same pages
+            page = pages[-1]
+            for expected in reversed(pages[:-1]):
+                page = paginator.page(page.previous_cursor)
+                self.assertEqual([a.pk for a in page], [a.pk for a in expected])
+                self.assertEqual(page.number, expected.number)
+            self.assertFalse(page.has_previous())
+
+    def test_stale_cursor_falls_back_to_first_page(self):
+        paginator, pages = self.walk([('name', False)])
+        other = KeysetPaginator(Asset.objects.all(), 4, [('name', True)])
+        self.assertEqual(other.page(pages[1].next_cursor).number, 1)
+        self.assertEqual(other.page('not-a-cursor').number, 1)
+
+    def test_asset_list_cursor_links(self):
+        User.objects.create_superuser(username='admin', password='password123')
+        self.client.login(username='admin', password='password123')
+        response = self.client.get(reverse('asset_list'), {'per_page': 10})
+        self.assertEqual(response.context['total_count_all'], 23)
+        self.assertEqual(response.context['num_pages'], 3)
+        self.assertIn('cursor=', response.context['page_links']['next'])
+        response = self.client.get(reverse('asset_list') + '?' + response.context['page_links']['next'])
+        self.assertEqual(response.context['object_list'].number, 2)
+        self.assertEqual(response.context['object_list'].start_index(), 11)
+
+
+class TransactionIndexTests(TestCase):
+    def setUp(self):
+        self.dept = Department.objects.create(name='Physics')
+        self.requestor = User.objects.create_user(username='req', password='password123', first_name='Ana', last_name='Santos')
+        self.requestor.userprofile.department = self.dept
+        self.requestor.userprofile.save()
+        self.role = Role.objects.create(name='Supply Officer', code='SUPPLY')
+        workflow = Workflow.objects.create(name='Transfer', process=ActionProcess.objects.create(name='Transfer', code='TRF'))
+        phase = WorkflowPhase.objects.create(workflow=workflow, name='Review')
+        self.step = WorkflowStep.objects.create(phase=phase, label='For Supply Review', required_persona_role=self.role)
+        self.asset = Asset.objects.create(property_number='PAR-000777', name='Projector', date_acquired=date(2023, 1, 1))
+        self.transfer = AssetTransferRequest.objects.create(requestor=self.requestor, asset=self.asset, current_step=self.step)
+        self.batch = AssetBatch.objects.create(requestor=self.requestor, supplier_name='Acme Trading')
+
+    def test_rows_follow_saves_and_copied_columns(self):
+        row = TransactionIndex.objects.get(type_code='TRF', object_id=self.transfer.pk)
+        self.assertEqual((row.required_role, row.department, row.status), (self.role, self.dept, 'PENDING'))
+        self.assertEqual((row.asset_label, row.requestor_name), ('PAR-000777', 'Ana Santos'))
+
+        self.transfer.status = 'PAR_RELEASED'
+        self.transfer.current_step = None
+        self.transfer.save()
+        self.asset.property_number = 'PAR-000778'
+        self.asset.save()
+        self.requestor.last_name = 'Reyes'
+        self.requestor.save()
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.required_role, row.asset_label), ('APPROVED', None, 'PAR-000778'))
+        self.assertIn('reyes', row.search_text)
+
+        self.batch.delete()
+        self.assertFalse(TransactionIndex.objects.filter(type_code='BATCH').exists())
+
+    def test_rebuild_matches_incremental_rows(self):
+        fields = ['type_code', 'object_id', 'requestor', 'department', 'required_role', 'status', 'search_text']
+        incremental = list(TransactionIndex.objects.order_by('type_code').values(*fields))
+        self.assertEqual(TransactionIndexer.rebuild(), 2)
+        self.assertEqual(list(TransactionIndex.objects.order_by('type_code').values(*fields)), incremental)
+
+    def test_ledger_and_inbox_read_the_index(self):
+        officer = User.objects.create_user(username='officer', password='password123')
+        Persona.objects.create(user=officer, role=self.role)
+        self.client.login(username='officer', password='password123')
+
+        response = self.client.get(reverse('transaction_ledger'), {'q': 'santos projector'})
+        self.assertEqual([r['transaction_id'] for r in response.context['rows']], [self.transfer.transaction_id])
+        self.assertEqual(response.context['total_count'], 1)
+
+        response = self.client.get(reverse('transaction_history'))
+        self.assertEqual(response.context['metrics']['total'], 1)
+        self.assertEqual(list(response.context['transfers']), [self.transfer])
+        self.assertEqual(list(response.context['batches']), [])
+
+
+class PendingCountStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.role_a = Role.objects.create(name='Inspector', code='INSPECTOR')
+        self.role_b = Role.objects.create(name='Approver', code='APPROVER')
+        workflow = Workflow.objects.create(name='Transfer', process=ActionProcess.objects.create(name='Transfer', code='TRANSFER'))
+        phase = WorkflowPhase.objects.create(workflow=workflow, name='Review')
+        self.step_a = WorkflowStep.objects.create(phase=phase, label='For Inspection', order=10, required_persona_role=self.role_a)
+        self.step_b = WorkflowStep.objects.create(phase=phase, label='For Approval', order=20, required_persona_role=self.role_b)
+        self.user_a = User.objects.create_user(username='inspector', password='password123')
+        self.user_b = User.objects.create_user(username='approver', password='password123')
+        Persona.objects.create(user=self.user_a, role=self.role_a)
+        Persona.objects.create(user=self.user_b, role=self.role_b)
+        self.admin = User.objects.create_superuser(username='admin', password='password123')
+
+        asset = Asset.objects.create(property_number='PAR-000100', name='Table', date_acquired=date(2023, 1, 1))
+        self.transfers = []
+        for _ in range(3):
+            transfer = AssetTransferRequest.objects.create(requestor=self.admin, asset=asset)
+            with self.captureOnCommitCallbacks(execute=True):
+                WorkflowEngine.initialize_transaction(transfer, 'TRANSFER')
+            self.transfers.append(transfer)
+
+    def exact(self, role):
+        # The original per-model COUNT the nav badge used to run
+        models = [AssetBatch, InspectionRequest, AssetTransferRequest, AssetReturnRequest, AssetLossReport, PropertyClearanceRequest]
+        return sum(m.objects.filter(current_step__required_persona_role=role).count() for m in models)
+
+    def assertCountsExact(self):
+        self.assertEqual(PendingCountStore.for_user(self.user_a), self.exact(self.role_a))
+        self.assertEqual(PendingCountStore.for_user(self.user_b), self.exact(self.role_b))
+
+    def test_counts_stay_exact_across_transitions(self):
+        self.assertCountsExact()
+        with self.assertNumQueries(0):
+            self.assertEqual(PendingCountStore.for_user(self.user_a), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkflowEngine.transition(self.transfers[0], self.step_b.id, self.admin)
+        self.assertCountsExact()
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkflowEngine.transition(self.transfers[0], self.step_a.id, self.admin)
+            WorkflowEngine.transition(self.transfers[1], 'REJECT', self.admin)
+        self.assertCountsExact()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.transfers[2].delete()
+        self.assertCountsExact()
+
+        # Re-assigning a step's role moves its waiting transactions
+        self.step_a.required_persona_role = self.role_b
+        self.step_a.save()
+        self.assertCountsExact()
+        with self.assertNumQueries(0):
+            self.assertEqual(PendingCountStore.for_user(self.user_b), 1)
+
+    def test_direct_step_saves_move_the_counters(self):
+        self.assertCountsExact()
+        # An admin edit that bypasses WorkflowEngine
+        transfer = AssetTransferRequest.objects.get(pk=self.transfers[0].pk)
+        transfer.current_step = self.step_b
+        with self.captureOnCommitCallbacks(execute=True):
+            transfer.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(PendingCountStore.for_user(self.user_a), 2)
+            self.assertEqual(PendingCountStore.for_user(self.user_b), 1)
+        self.assertCountsExact()
+
+    def test_short_ttl_without_a_shared_cache(self):
+        from django.test import override_settings
+
+        self.assertEqual(PendingCountStore.timeout(), PendingCountStore.LOCAL_TIMEOUT)
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379'}}):
+            self.assertEqual(PendingCountStore.timeout(), PendingCountStore.TIMEOUT)
+
+    def test_nav_badge_uses_store(self):
+        self.client.login(username='inspector', password='password123')
+        response = self.client.get(reverse('transaction_history'))
+        self.assertEqual(response.context['pending_count'], 3)
+
+
+class ActivityFeedTests(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.admin = User.objects.create_superuser(username='admin', password='password123')
+        self.asset = Asset.objects.create(property_number='PAR-000900', name='Printer', date_acquired=date(2023, 1, 1))
+        self.t1 = AssetTransferRequest.objects.create(requestor=self.admin, asset=self.asset)
+        self.t2 = AssetTransferRequest.objects.create(requestor=self.admin, asset=self.asset)
+
+        now = timezone.now()
+        moves = [(self.t1, 5, 'Submitted'), (self.t2, 4, 'Submitted'), (self.t1, 3, 'Approved'), (None, 2, 'System sync')]
+        self.logs = []
+        for transfer, minutes_ago, action in moves:
+            log = WorkflowMovementLog.objects.create(transfer=transfer, user=self.admin, action_taken=action)
+            WorkflowMovementLog.objects.filter(pk=log.pk).update(timestamp=now - timedelta(minutes=minutes_ago))
+            self.logs.append(log)
+        self.service = ServiceLog.objects.create(asset=self.asset, description='Cleaned rollers', service_provider='Tech')
+
+    def test_groups_latest_move_per_transaction(self):
+        self.client.login(username='admin', password='password123')
+        response = self.client.get(reverse('activity_log'))
+        page = response.context['grouped_transactions']
+        self.assertEqual(page.paginator.count, 3)
+        self.assertEqual(
+            [(g['type'], g['latest'].pk, [h.pk for h in g['history']]) for g in page],
+            [('sys', self.logs[3].pk, []), ('transfer', self.logs[2].pk, [self.logs[0].pk]), ('transfer', self.logs[1].pk, [])],
+        )
+
+    def test_live_pulse_merges_sources_newest_first(self):
+        pulse = ActivityFeed.live_pulse(WorkflowMovementLog.objects.all())
+        self.assertEqual([p['type'] for p in pulse], ['SERVICE', 'CREATION'] + ['WORKFLOW'] * 4)
+        self.assertEqual(pulse[0]['action'], 'Preventive Maintenance: Cleaned rollers')
+        self.assertEqual(pulse[2]['target_id'], 'SYS')
+        self.assertEqual((pulse[3]['target_id'], pulse[3]['category'], pulse[3]['user']), (self.t1.transaction_id, 'TRANSFER', self.admin))
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        role = Role.objects.create(name='Approver', code='APPROVER')
+        workflow = Workflow.objects.create(name='Transfer', process=ActionProcess.objects.create(name='Transfer', code='TRANSFER'))
+        phase = WorkflowPhase.objects.create(workflow=workflow, name='Review')
+        WorkflowStep.objects.create(phase=phase, label='Submitted', order=10)
+        self.step = WorkflowStep.objects.create(phase=phase, label='For Approval', order=20, required_persona_role=role)
+        for name in ('approver1', 'approver2'):
+            Persona.objects.create(user=User.objects.create_user(username=name, email=f'{name}@up.edu.ph'), role=role)
+        self.admin = User.objects.create_superuser(username='admin', password='password123')
+        asset = Asset.objects.create(property_number='PAR-000500', name='Cabinet', date_acquired=date(2023, 1, 1))
+        self.transfer = AssetTransferRequest.objects.create(requestor=self.admin, asset=asset)
+        WorkflowEngine.initialize_transaction(self.transfer, 'TRANSFER')
+
+    def test_transition_queues_instead_of_sending(self):
+        from django.core import mail
+
+        WorkflowEngine.transition(self.transfer, self.step.id, self.admin)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(sorted(NotificationOutbox.objects.values_list('recipient', flat=True)), ['approver1@up.edu.ph', 'approver2@up.edu.ph'])
+
+        # Returned and re-advanced before the worker ran: still one pending message per recipient
+        WorkflowEngine.transition(self.transfer, self.step.phase.steps.get(order=10).id, self.admin)
+        WorkflowEngine.transition(self.transfer, self.step.id, self.admin)
+        self.assertEqual(NotificationOutbox.objects.count(), 2)
+
+        stats = NotificationDispatcher.drain()
+        self.assertEqual(stats['sent'], 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(NotificationOutbox.objects.filter(status='SENT').count(), 2)
+
+    def test_failed_sends_back_off_then_fail(self):
+        from django.utils import timezone
+
+        class BrokenRelay:
+            def open(self):
+                raise OSError('relay unavailable')
+
+            def close(self):
+                pass
+
+        NotificationDispatcher.enqueue(['a@up.edu.ph', 'a@up.edu.ph', 'A@up.edu.ph '], 'Subject', 'Body', 'key-1')
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+        now = timezone.now()
+        self.assertEqual(NotificationDispatcher.drain(connection=BrokenRelay(), now=now)['retried'], 1)
+        row = NotificationOutbox.objects.get()
+        self.assertEqual((row.attempts, row.next_attempt_at), (1, now + NotificationDispatcher.backoff(1)))
+        self.assertIn('relay unavailable', row.last_error)
+        # Not due yet
+        self.assertEqual(sum(NotificationDispatcher.drain(connection=BrokenRelay(), now=now).values()), 0)
+
+        NotificationOutbox.objects.update(attempts=NotificationDispatcher.MAX_ATTEMPTS - 1, next_attempt_at=now)
+        self.assertEqual(NotificationDispatcher.drain(connection=BrokenRelay(), now=now)['failed'], 1)
+        self.assertEqual(NotificationOutbox.objects.get().status, 'FAILED')
+
+    def test_dropped_session_is_reopened(self):
+        from smtplib import SMTPServerDisconnected
+
+        class DroppingRelay:
+            # A connection the relay closed while the worker slept: the socket is still set
+            def __init__(self):
+                self.connection, self.sent = 'stale', []
+
+            def open(self):
+                if self.connection is None:
+                    self.connection = 'fresh'
+
+            def close(self):
+                self.connection = None
+
+            def send_messages(self, messages):
+                if self.connection != 'fresh':
+                    raise SMTPServerDisconnected('please run connect() first')
+                self.sent.extend(messages)
+                return len(messages)
+
+        NotificationDispatcher.enqueue(['a@up.edu.ph', 'b@up.edu.ph'], 'Subject', 'Body', 'key-1')
+        relay = DroppingRelay()
+        self.assertEqual(NotificationDispatcher.drain(connection=relay)['sent'], 2)
+        self.assertEqual(sorted(m.to[0] for m in relay.sent), ['a@up.edu.ph', 'b@up.edu.ph'])
+        self.assertEqual(NotificationOutbox.objects.filter(status='SENT').count(), 2)
+
+
+class PARRenderingTests(TestCase):
+    def test_single_pass_shares_one_template_across_pages(self):
+        from io import BytesIO
+        from pypdf import PdfReader
+        from .services import PARGenerator
+
+        batch = AssetBatch(transaction_id='PAR-TEST', requesting_unit='Physics', supplier_name='Acme')
+        assets = [
+            Asset(property_number=f'PAR-{i:06d}', name=f'Laptop {i}', date_acquired=date(2024, 1, 1), acquisition_cost=1000)
+            for i in range(3)
+        ]
+        reader = PdfReader(BytesIO(PARGenerator.render_final(batch, assets, [])))
+        self.assertEqual(len(reader.pages), 3)
+        self.assertIn('PAR-000002', reader.pages[2].extract_text())
+
+        templates = {
+            page['/Resources']['/XObject'].raw_get(PARGenerator.TEMPLATE_XOBJECT).idnum for page in reader.pages
+        }
+        self.assertEqual(len(templates), 1)
+
+
+class DocumentJobTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        cache.clear()
+        workflow = Workflow.objects.create(name='Acquisition', process=ActionProcess.objects.create(name='Acquisition', code='BATCH_ACQUISITION'))
+        phase = WorkflowPhase.objects.create(workflow=workflow, name='Release')
+        WorkflowStep.objects.create(phase=phase, label='For Chief Final Signature', order=10)
+        self.admin = User.objects.create_superuser(username='admin', password='password123')
+        self.batch = AssetBatch.objects.create(requestor=self.admin, supplier_name='Acme', requesting_unit='Physics')
+        BatchItem.objects.create(batch=self.batch, description='Workstation', quantity=3, amount=60000)
+        WorkflowEngine.initialize_transaction(self.batch, 'BATCH_ACQUISITION')
+
+    def test_finalize_queues_and_worker_renders(self):
+        WorkflowEngine.transition(self.batch, 'FINALIZE', self.admin)
+        self.batch.refresh_from_db()
+        self.assertFalse(self.batch.par_file)
+        job = DocumentJob.objects.get()
+        self.assertEqual((job.kind, job.status, job.batch), ('PAR', 'PENDING', self.batch))
+
+        self.assertEqual(DocumentJobQueue.process(), (1, 0))
+        job.refresh_from_db()
+        self.batch.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.attempts), ('DONE', 100, 1))
+        self.assertTrue(self.batch.par_file)
+        self.assertEqual(len(self.batch.par_hash), 64)
+
+        self.client.login(username='admin', password='password123')
+        payload = self.client.get(reverse('batch_document_status', args=[self.batch.pk])).json()
+        self.assertEqual((payload['status'], payload['file_url']), ('DONE', self.batch.par_file.url))
+        self.assertContains(self.client.get(reverse('batch_detail', args=[self.batch.pk])), 'id="documentJobCard"')
+
+    def test_failed_render_is_retried_then_marked_failed(self):
+        from unittest import mock
+
+        job = DocumentJobQueue.enqueue(self.batch)
+        with mock.patch('inventory.services.PARGenerator.finalize_par', side_effect=OSError('disk full')):
+            self.assertEqual(DocumentJobQueue.process(), (0, DocumentJobQueue.MAX_ATTEMPTS))
+        job.refresh_from_db()
+        self.assertEqual((job.kind, job.status, job.attempts), ('PAR', 'FAILED', DocumentJobQueue.MAX_ATTEMPTS))
+        self.assertIn('disk full', job.error)
+        self.assertIsNone(DocumentJobQueue.claim())
+
+    def test_worker_dying_on_last_attempt_fails_the_job(self):
+        from django.utils import timezone
+
+        job = DocumentJobQueue.enqueue(self.batch)
+        started = timezone.now() - DocumentJobQueue.STALE_AFTER * 2
+        DocumentJob.objects.filter(pk=job.pk).update(status='RUNNING', started_at=started, attempts=DocumentJobQueue.MAX_ATTEMPTS)
+        self.assertIsNone(DocumentJobQueue.claim())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertIsNotNone(job.finished_at)
+
+    def test_ptr_job_reports_its_own_file(self):
+        from unittest import mock
+        from django.core.files.base import ContentFile
+
+        asset = Asset.objects.create(property_number='PAR-000321', name='Projector', date_acquired=date(2023, 1, 1))
+        transfer = AssetTransferRequest.objects.create(requestor=self.admin, asset=asset)
+        job = DocumentJobQueue.enqueue(transfer)
+        with mock.patch('inventory.services.PTRGenerator.finalize_ptr', return_value=ContentFile(b'%PDF-ptr', name='ptr.pdf')):
+            self.assertEqual(DocumentJobQueue.process(), (1, 0))
+        job.refresh_from_db()
+        self.assertTrue(job.output.name.endswith('.pdf'))
+        self.assertEqual(DocumentJobQueue.status_payload(job)['file_url'], job.output.url)
+
+
+class MediaStoreTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.admin = User.objects.create_superuser(username='admin', password='password123')
+
+    def _batch(self, **files):
+        return AssetBatch.objects.create(requestor=self.admin, supplier_name='Acme', requesting_unit='Physics', **files)
+
+    def test_racing_identical_uploads_keep_one_blob(self):
+        from unittest import mock
+        from django.core.files.base import ContentFile
+
+        storage = ContentAddressedStorage()
+        name = storage.save('po.pdf', ContentFile(b'%PDF-race'))
+        # The other upload passed its exists() check before this one's file appeared
+        with mock.patch.object(ContentAddressedStorage, 'exists', return_value=False):
+            self.assertEqual(storage.save('copy.pdf', ContentFile(b'%PDF-race')), name)
+        directory = os.path.dirname(storage.path(name))
+        self.assertEqual(os.listdir(directory), [os.path.basename(name)])
+        with storage.open(name) as handle:
+            self.assertEqual(handle.read(), b'%PDF-race')
+
+    def test_identical_uploads_share_one_refcounted_blob(self):
+        from django.core.files.base import ContentFile
+
+        first = self._batch(doc_1_file=ContentFile(b'%PDF-same', name='po.pdf'))
+        second = self._batch(doc_1_file=ContentFile(b'%PDF-same', name='copy_of_po.pdf'))
+        self.assertEqual(first.doc_1_file.name, second.doc_1_file.name)
+        self.assertTrue(ContentAddressedStorage.is_blob(first.doc_1_file.name))
+        blob = MediaBlob.objects.get()
+        self.assertEqual((blob.ref_count, blob.size), (2, len(b'%PDF-same')))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AssetBatch.objects.get(pk=first.pk).delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(first.doc_1_file.storage.exists(blob.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AssetBatch.objects.get(pk=second.pk).delete()
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(first.doc_1_file.storage.exists(blob.name))
+
+    def test_snapshot_of_stored_file_references_same_blob(self):
+        from django.core.files.base import ContentFile
+
+        batch = self._batch(doc_1_file=ContentFile(b'signature', name='sig.png'))
+        batch.doc_2_file = MediaStore.snapshot(batch.doc_1_file, 'unused.png')
+        batch.save()
+        self.assertEqual(batch.doc_2_file.name, batch.doc_1_file.name)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 2)
+
+    def test_collapse_moves_legacy_duplicates_into_store(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        names = [default_storage.save(f'batch_docs/legacy_{i}.pdf', ContentFile(b'%PDF-legacy')) for i in range(3)]
+        batches = [self._batch() for _ in names]
+        for batch, name in zip(batches, names):
+            AssetBatch.objects.filter(pk=batch.pk).update(doc_1_file=name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = MediaStore.collapse()
+        self.assertEqual((stats['files'], stats['blobs'], stats['rows']), (3, 1, 3))
+        self.assertEqual(stats['bytes_saved'], 2 * len(b'%PDF-legacy'))
+
+        stored = set(AssetBatch.objects.values_list('doc_1_file', flat=True))
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(MediaBlob.objects.get(name=stored.pop()).ref_count, 3)
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+
+
+class AssetImageLinkerTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.admin = User.objects.create_superuser(username='admin', password='password123')
+        self.client = Client()
+        self.client.login(username='admin', password='password123')
+        self.laptop = Asset.objects.create(property_number='PAR-000123', name='Laptop', date_acquired=date(2024, 1, 1))
+        self.printer = Asset.objects.create(property_number='PAR-2024-0456', name='Printer', date_acquired=date(2024, 1, 1))
+
+    def test_property_digits_maintained_on_save(self):
+        self.assertEqual(self.laptop.property_digits, '123')
+        self.printer.property_number = 'PAR-2024-0789'
+        self.printer.save(update_fields=['property_number'])
+        self.assertEqual(Asset.objects.get(pk=self.printer.pk).property_digits, '20240789')
+
+    def test_chunk_links_with_one_lookup_and_targeted_updates(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        files = [
+            SimpleUploadedFile('000123 (1).jpg', b'first', content_type='image/jpeg'),
+            SimpleUploadedFile('PAR-2024-0456.jpg', b'printer', content_type='image/jpeg'),
+            SimpleUploadedFile('999999.jpg', b'nothing', content_type='image/jpeg'),
+            SimpleUploadedFile('no_digits.jpg', b'nothing', content_type='image/jpeg'),
+            SimpleUploadedFile('123.jpg', b'second', content_type='image/jpeg'),
+        ]
+        # session + auth, one lookup, 2 updates in a savepoint, session save in a savepoint
+        with self.assertNumQueries(10):
+            response = self.client.post(
+                reverse('bulk_media_upload'), {'upload_type': 'serials', 'images': files},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+        data = response.json()
+        self.assertEqual(
+            [r['status'] for r in data['results']], ['Error', 'Success', 'Not Found', 'Error', 'Success']
+        )
+        self.assertEqual(data['summary'], {'success': 2, 'not_found': 1, 'error': 2})
+
+        self.laptop.refresh_from_db()
+        self.printer.refresh_from_db()
+        self.assertEqual(self.laptop.image_serial.read(), b'second')
+        self.assertEqual(self.printer.image_serial.read(), b'printer')
+        self.assertFalse(self.laptop.image_condition)
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+    def _photo(self, name, color):
+        import io
+        from PIL import Image
+        from django.core.files.base import ContentFile
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (2000, 1500), color).save(buffer, 'JPEG')
+        return ContentFile(buffer.getvalue(), name=name)
+
+    def test_upload_generates_hashed_webp_derivatives(self):
+        from PIL import Image
+        from django.core.files.storage import default_storage
+        from inventory.templatetags.inventory_tags import image_variant
+
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = Asset.objects.create(
+                property_number='PAR-000900', name='Camera', date_acquired=date(2024, 1, 1),
+                image_condition=self._photo('condition.jpg', (200, 30, 30)),
+            )
+        asset.refresh_from_db()
+        entry = asset.image_variants['image_condition']
+        self.assertEqual(entry['source'], asset.image_condition.name)
+        self.assertRegex(entry['thumb'], r'^derivatives/[0-9a-f]{2}/[0-9a-f]{64}_thumb\.webp$')
+        with default_storage.open(entry['thumb']) as handle, Image.open(handle) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ('WEBP', (160, 120)))
+        self.assertEqual(image_variant(asset, 'image_condition', 'card'), default_storage.url(entry['card']))
+        self.assertEqual(image_variant(asset, 'image_serial'), '')
+
+    def test_backfill_replaces_stale_entries_after_bulk_update(self):
+        from django.core.files.storage import default_storage
+
+        asset = Asset.objects.create(property_number='PAR-000901', name='Drone', date_acquired=date(2024, 1, 1))
+        name = default_storage.save('assets/serials/new.jpg', self._photo('new.jpg', (30, 30, 200)))
+        Asset.objects.filter(pk=asset.pk).update(image_serial=name)
+        asset.refresh_from_db()
+        # update() skipped the signal: the tag serves the original until the backfill runs
+        self.assertEqual(ImageDerivatives.url(asset, 'image_serial'), asset.image_serial.url)
+
+        self.assertEqual(ImageDerivatives.backfill(processes=1), 1)
+        asset.refresh_from_db()
+        self.assertTrue(ImageDerivatives.url(asset, 'image_serial').endswith('_thumb.webp'))
+        self.assertEqual(ImageDerivatives.backfill(processes=1), 0)
+
+
+class AssetImporterTests(TestCase):
+    HEADER = 'property_number,name,date_acquired,acquisition_cost,assigned_office,ppe_category,asset_type,status\n'
+
+    def setUp(self):
+        self.physics = Department.objects.create(name='Physics')
+        self.existing = Asset.objects.create(property_number='PAR-0001', name='Old name', date_acquired=date(2020, 1, 1))
+
+    def _import(self, body, **kwargs):
+        import io
+        return AssetImporter.import_file(io.BytesIO((self.HEADER + body).encode('cp1252')), 'csv', **kwargs)
+
+    def test_chunked_import_creates_updates_and_reports(self):
+        stats = self._import(
+            '0001,Renamed laptop,01/15/2021,"55,000.00",Physics,ict equipment,Laptops,unserviceable\n'
+            '0002,Microscope,02/01/2022,1200,Biología,Technical and Scientific Equipment,,\n'
+            '0002,Duplicate row,02/01/2022,1,Physics,,,\n'
+            ',Unnumbered chair,03/01/2022,900,Physics,Furniture and Fixtures,Seating Units,\n'
+            '0004,Bad date,31/31/2022,5,Physics,,,\n',
+            chunk_size=2,
+        )
+        self.assertEqual(
+            {k: stats[k] for k in ('rows', 'created', 'updated', 'skipped', 'errors', 'chunks')},
+            {'rows': 5, 'created': 2, 'updated': 1, 'skipped': 1, 'errors': 1, 'chunks': 2},
+        )
+        self.assertEqual(stats['error_rows'][0]['line'], 6)
+
+        self.existing.refresh_from_db()
+        self.assertEqual(
+            (self.existing.name, self.existing.status, self.existing.asset_class, self.existing.department),
+            ('Renamed laptop', 'UNSERVICEABLE', 'ICT EQUIPMENT', self.physics),
+        )
+        changes = dict(self.existing.change_logs.values_list('field_name', 'new_value'))
+        self.assertEqual((changes['name'], changes['department']), ('Renamed laptop', 'Physics'))
+        self.assertIn('renamed laptop', self.existing.search_document)
+
+        microscope = Asset.objects.get(property_number='PAR-0002')
+        self.assertEqual((microscope.department.name, microscope.property_digits, microscope.status), ('Biología', '2', 'SERVICEABLE'))
+        self.assertTrue(microscope.item_id)
+        chair = Asset.objects.get(name='Unnumbered chair')
+        self.assertTrue(chair.property_number.startswith('PAR-'))
+        # The dashboard snapshot matches a full recount
+        self.assertEqual(AssetKpiTracker.dashboard_metrics()['total_count'], Asset.objects.count())
+
+    def test_partial_columns_leave_other_fields_alone(self):
+        import io
+
+        self.existing.description = 'Core i7, 16GB'
+        self.existing.department = self.physics
+        self.existing.accountable_surname = 'Santos'
+        self.existing.status = 'DISPOSED'
+        self.existing.asset_class = 'ICT EQUIPMENT'
+        self.existing.save()
+        self.existing.change_logs.all().delete()
+
+        body = 'property_number,name,date_acquired\n0001,Renamed laptop,01/15/2021\n'
+        stats = AssetImporter.import_file(io.BytesIO(body.encode()), 'csv')
+        self.assertEqual(stats['updated'], 1)
+
+        self.existing.refresh_from_db()
+        self.assertEqual(
+            (self.existing.name, self.existing.date_acquired, self.existing.description, self.existing.department,
+             self.existing.accountable_surname, self.existing.status, self.existing.asset_class),
+            ('Renamed laptop', date(2021, 1, 15), 'Core i7, 16GB', self.physics, 'Santos', 'DISPOSED', 'ICT EQUIPMENT'),
+        )
+        self.assertIn('physics', self.existing.search_document)
+        self.assertEqual(
+            set(self.existing.change_logs.values_list('field_name', flat=True)), {'name', 'date_acquired'}
+        )
+
+    def test_updates_need_no_date_and_keep_status_on_blank(self):
+        import io
+
+        self.existing.status = 'DISPOSED'
+        self.existing.save()
+        acquired = Asset.objects.get(pk=self.existing.pk).date_acquired
+
+        body = 'property_number,name,status\n0001,Renamed,\n0999,New item,\n'
+        stats = AssetImporter.import_file(io.BytesIO(body.encode()), 'csv')
+        self.assertEqual((stats['updated'], stats['created'], stats['errors']), (1, 0, 1))
+        self.assertEqual(stats['error_rows'][0]['error'], 'date_acquired is required')
+
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.name, self.existing.status, self.existing.date_acquired), ('Renamed', 'DISPOSED', acquired))
+
+    def test_cost_changes_rebuild_depreciation_schedules(self):
+        self.existing.useful_life_years = 1
+        self.existing.acquisition_cost = Decimal('1200')
+        self.existing.save()
+        DepreciationSchedule.objects.all().delete()  # save() schedules on commit; start from none
+
+        self._import('0001,Old name,01/15/2021,2400,,,,\n')
+        self.assertEqual(DepreciationSchedule.objects.filter(asset=self.existing).count(), 12)
+        self.assertEqual(
+            DepreciationSchedule.objects.get(asset=self.existing, period=date(2021, 1, 1)).book_value, Decimal('2200')
+        )
+
+    def test_query_count_grows_with_chunks_not_rows(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def run(start, count):
+            body = ''.join(f'{n},Item {n},01/01/2023,100,Physics,,,\n' for n in range(start, start + count))
+            with CaptureQueriesContext(connection) as ctx:
+                self._import(body, chunk_size=500)
+            return len(ctx.captured_queries)
+
+        # Preloads, sequences, KPI rebuild and a few INSERT batches (SQLite caps parameters per statement)
+        self.assertLess(run(1000, 300), 50)
+
+    def test_dry_run_rolls_back(self):
+        stats = self._import('0009,Ghost,01/01/2023,1,New Office,,,\n', dry_run=True)
+        self.assertEqual(stats['created'], 1)
+        self.assertFalse(Asset.objects.filter(property_number='PAR-0009').exists())
+        self.assertFalse(Department.objects.filter(name='New Office').exists())
+
+
+class RpcppeImportTests(TestCase):
+    def _csv(self, lines):
+        import csv
+        import tempfile
+
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='', encoding='utf-8')
+        self.addCleanup(lambda: __import__('os').unlink(handle.name))
+        writer = csv.writer(handle)
+        for _ in range(RpcppeImporter.HEADER_ROWS):
+            writer.writerow(['RPCPPE header'])
+        for article, prop, cost, office in lines:
+            writer.writerow([article, 'Brand', 'Desc', prop, 'unit', cost, '1', '1', '', '', '', '', office])
+        handle.close()
+        return handle.name
+
+    def _run(self, path, *args):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('import_rpcppe_data', '--path', path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_upsert_and_dry_run_diff(self):
+        self._run(self._csv([('Laptop', 'R-1', '1,000.00', 'Physics'), ('Chair', 'R-2', '500', 'Biology')]))
+        laptop = Asset.objects.get(property_number='R-1')
+        self.assertEqual((laptop.acquisition_cost, laptop.department.name), (1000, 'Physics'))
+        self.assertTrue(laptop.item_id)
+
+        changed = self._csv([
+            ('Laptop', 'R-1', '1,200.00', 'Physics'), ('Chair', 'R-2', '500', 'Biology'), ('Desk', 'R-3', '700', 'Chemistry'),
+        ])
+        before = list(Asset.objects.order_by('id').values())
+        with self.assertNumQueries(2):  # departments + one lookup per chunk
+            stats = RpcppeImporter.run(RpcppeImporter.read_rows(changed), dry_run=True)
+        self.assertEqual(list(Asset.objects.order_by('id').values()), before)
+        self.assertEqual((stats['new'], stats['changed'], stats['unchanged']), (1, 1, 1))
+        self.assertEqual(stats['by_department']['Chemistry'], {'new': 1, 'changed': 0, 'unchanged': 0})
+        self.assertIn('[dry run]', self._run(changed, '--dry-run'))
+
+        self._run(changed)
+        laptop_after = Asset.objects.get(property_number='R-1')
+        self.assertEqual((laptop_after.acquisition_cost, laptop_after.item_id), (1200, laptop.item_id))
+        self.assertEqual(Asset.objects.get(property_number='R-3').department.name, 'Chemistry')
+        self.assertIn('desk', Asset.objects.get(property_number='R-3').search_document)
+
+
+class RpcppeReportTests(TestCase):
+    def setUp(self):
+        self.physics = Department.objects.create(name='Physics')
+        self.admin = User.objects.create_superuser(username='admin', password='password123')
+        self.client = Client()
+        self.client.login(username='admin', password='password123')
+        rows = [
+            ('PAR-1', 'Laptop', 'ICT EQUIPMENT', self.physics, 50000, 2, date(2023, 1, 1), 'SERVICEABLE'),
+            ('PAR-2', 'Chair', 'FURNITURE AND FIXTURES', self.physics, 1500, 4, date(2024, 6, 1), 'SERVICEABLE'),
+            ('PAR-3', 'Printer', 'ICT EQUIPMENT', None, 9000, 1, date(2022, 3, 1), 'SERVICEABLE'),
+            ('PAR-4', 'Broken fan', 'OTHER', self.physics, 800, 1, date(2022, 3, 1), 'UNSERVICEABLE'),
+        ]
+        for number, name, asset_class, department, cost, qty, acquired, status in rows:
+            Asset.objects.create(
+                property_number=number, name=name, asset_class=asset_class, department=department,
+                acquisition_cost=cost, quantity_physical_count=qty, date_acquired=acquired, status=status,
+            )
+
+    def test_totals_in_one_grouped_query(self):
+        queryset = RpcppeReport.filter(Asset.objects.all())
+        with self.assertNumQueries(1):
+            totals = RpcppeReport.totals(queryset)
+        self.assertEqual(totals['departments']['Physics'], {'count': 6, 'total': 106000})
+        self.assertEqual(totals['departments'][RpcppeReport.UNASSIGNED]['total'], 9000)
+        self.assertEqual((totals['grand_total'], totals['total_count']), (115000, 7))
+
+        lines = list(RpcppeReport.lines(queryset, totals))
+        self.assertEqual([kind for kind, _, _ in lines].count('subtotal'), 2)
+        self.assertEqual(lines[-1], ('subtotal', lines[-1][1], totals['departments'][lines[-1][1]]))
+
+    def test_html_csv_and_filters(self):
+        url = reverse('rpcppe_report')
+        response = self.client.get(url, {'as_of': '2023-12-31', 'asset_class': 'ICT EQUIPMENT'})
+        self.assertTrue(response.streaming)
+        html = b''.join(response.streaming_content).decode()
+        self.assertIn('Laptop', html)
+        self.assertIn('Printer', html)
+        self.assertNotIn('Chair', html)
+        self.assertNotIn('Broken fan', html)
+        self.assertIn('₱109,000', html)
+
+        response = self.client.get(url, {'format': 'csv', 'as_of': '2023-12-31'})
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(rows[0].split(',')[0], 'Office / Department')
+        self.assertIn('SUBTOTAL FOR Physics', rows[-2] + rows[-3])
+        self.assertTrue(rows[-1].startswith(',GRAND TOTAL'))
+        self.assertIn('109000', rows[-1])
+
+
+class DepreciationEngineTests(TestCase):
+    def test_schedules_match_between_numpy_and_python(self):
+        records = [
+            (1, Decimal('12000'), Decimal('0'), 1, 'STRAIGHT_LINE', date(2024, 3, 15)),
+            (2, Decimal('10000'), Decimal('1000'), 3, 'SUM_OF_YEARS', date(2024, 1, 1)),
+            (3, Decimal('10000'), Decimal('500'), 5, 'DECLINING_BALANCE', date(2024, 1, 1)),
+            (4, Decimal('500'), Decimal('500'), 5, 'STRAIGHT_LINE', date(2024, 1, 1)),  # nothing to depreciate
+            (5, None, None, 5, 'STRAIGHT_LINE', date(2024, 1, 1)),
+        ]
+        python = {pk: (start, acc) for pk, start, acc in DepreciationEngine.schedules(records, use_numpy=False)}
+        self.assertEqual(set(python), {1, 2, 3})
+        self.assertEqual(python[1][0], date(2024, 3, 1))
+        self.assertEqual(python[1][1][:2], [1000.0, 2000.0])
+        self.assertEqual(python[2][1][11], 4500.0)  # first sum-of-years year: 3/6 of 9000
+        for start, accumulated in python.values():
+            self.assertEqual(accumulated, sorted(accumulated))
+        self.assertEqual(python[3][1][-1], 9500.0)
+        if depreciation.np is not None:
+            vectorized = {pk: (start, acc) for pk, start, acc in DepreciationEngine.schedules(records, use_numpy=True)}
+            self.assertEqual(vectorized, python)
+
+    def test_save_materializes_schedule_and_as_of_lookup(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = Asset.objects.create(
+                name='Generator', acquisition_cost=Decimal('24000'), salvage_value=Decimal('0'),
+                useful_life_years=2, depreciation_method='STRAIGHT_LINE', date_acquired=date(2024, 1, 10),
+            )
+        self.assertEqual(DepreciationSchedule.objects.filter(asset=asset).count(), 24)
+
+        asset = Asset.objects.get(pk=asset.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(DepreciationEngine.book_value_as_of(asset, date(2024, 6, 30)), Decimal('18000'))
+        self.assertEqual(DepreciationEngine.book_value_as_of(asset, date(2023, 12, 31)), Decimal('24000'))
+        self.assertEqual(DepreciationEngine.book_value_as_of(asset, date(2030, 1, 1)), Decimal('0'))
+
+        # Unrelated edits keep the rows; a new useful life recomputes them
+        row_ids = set(DepreciationSchedule.objects.filter(asset=asset).values_list('pk', flat=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            asset.name = 'Diesel generator'
+            asset.save()
+        self.assertEqual(set(DepreciationSchedule.objects.filter(asset=asset).values_list('pk', flat=True)), row_ids)
+        with self.captureOnCommitCallbacks(execute=True):
+            asset.useful_life_years = 4
+            asset.save()
+        self.assertEqual(DepreciationSchedule.objects.filter(asset=asset).count(), 48)
+        self.assertEqual(DepreciationEngine.book_values(date(2024, 6, 30), Asset.objects.filter(pk=asset.pk)), {asset.pk: Decimal('21000')})
+
+    def test_missing_schedule_is_computed_inline(self):
+        asset = Asset.objects.create(
+            name='Server', acquisition_cost=Decimal('12000'), useful_life_years=5, date_acquired=date(2024, 1, 5),
+        )
+        DepreciationSchedule.objects.filter(asset=asset).delete()  # as after a bulk write or before the backfill
+        asset = Asset.objects.get(pk=asset.pk)
+        self.assertEqual(DepreciationEngine.book_value_as_of(asset, date(2024, 6, 30)), Decimal('10800'))
+        self.assertEqual(DepreciationEngine.book_value_as_of(asset, date(2029, 1, 1)), Decimal('0'))
+        self.assertEqual(DepreciationEngine.book_value_as_of(asset, date(2023, 12, 1)), Decimal('12000'))
+
+
+class AssetAuditTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='password123')
+        self.asset = Asset.objects.create(
+            property_number='PAR-1', name='Laptop', date_acquired=date(2023, 1, 1), acquisition_cost=Decimal('50000'),
+        )
+
+    def test_tab_save_logs_changed_fields_in_one_insert(self):
+        client = Client()
+        client.login(username='admin', password='password123')
+        data = {
+            'active_tab': 'finance', 'fair_market_value': '', 'salvage_value': '500', 'useful_life_years': '5',
+            'depreciation_method': 'STRAIGHT_LINE', 'accumulated_depreciation': '', 'depreciation_start_date': '',
+        }
+        response = client.post(reverse('asset_detail', args=[self.asset.pk]), data)
+        self.assertEqual(response.status_code, 302)
+
+        logs = AssetChangeLog.objects.filter(asset=self.asset)
+        self.assertEqual(
+            sorted(logs.values_list('field_name', 'old_value', 'new_value')),
+            [('salvage_value', '', '500'), ('useful_life_years', '', '5')],
+        )
+        self.assertEqual({(log.tab, log.user_id) for log in logs}, {('FINANCE', self.admin.pk)})
+        self.assertEqual(AssetNotification.objects.get(asset=self.asset).recipient_role, 'SPMO_ADMIN')
+
+    def test_save_diffs_against_load_time_values(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        asset = Asset.objects.get(pk=self.asset.pk)
+        asset.acquisition_cost = Decimal('50000.00')  # same value, different scale
+        asset.name = 'Laptop (docked)'
+        asset.status = 'UNSERVICEABLE'
+        with AssetAudit.actor(self.admin, '10.0.0.1', 'property'):
+            with CaptureQueriesContext(connection) as ctx:
+                asset.save()
+        inserts = [q['sql'] for q in ctx.captured_queries if 'inventory_assetchangelog' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(asset._audit_changes, ['name', 'status'])
+        self.assertEqual(set(asset.change_logs.values_list('ip_address', flat=True)), {'10.0.0.1'})
+
+        # The saved values are the new baseline: audited columns only, no nested earlier snapshots
+        self.assertEqual(set(asset._audit_state), set(AssetAudit.tracked_fields()))
+        asset.save()
+        self.assertEqual(asset.change_logs.count(), 2)
+
+
+class LogArchiveTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+
+        archive = tempfile.TemporaryDirectory()
+        self.addCleanup(archive.cleanup)
+        archive_override = override_settings(LOG_ARCHIVE_ROOT=archive.name)
+        archive_override.enable()
+        self.addCleanup(archive_override.disable)
+
+        self.user = User.objects.create_user(username='clerk', password='password123')
+        self.asset = Asset.objects.create(property_number='PAR-1', name='Laptop', date_acquired=date(2020, 1, 1))
+        self.old = [
+            AssetChangeLog.objects.create(asset=self.asset, user=self.user, tab='PROPERTY', field_name='name', old_value=str(n), new_value=str(n + 1))
+            for n in range(3)
+        ]
+        AssetChangeLog.objects.filter(pk__in=[log.pk for log in self.old]).update(
+            timestamp=datetime.datetime(2020, 3, 15, 8, 30, tzinfo=datetime.timezone.utc)
+        )
+        self.recent = AssetChangeLog.objects.create(asset=self.asset, tab='PROPERTY', field_name='status')
+
+    def test_archive_and_restore_closed_month(self):
+        self.assertEqual(LogPartitions.closed_months('asset_change_log', keep_months=12), [date(2020, 3, 1)])
+
+        archive = LogPartitions.archive('asset_change_log', date(2020, 3, 1))
+        self.assertEqual(archive.rows, 3)
+        self.assertTrue(os.path.exists(archive.path))
+        self.assertEqual(list(AssetChangeLog.objects.values_list('pk', flat=True)), [self.recent.pk])
+
+        # Restored rows keep their ids and timestamps; references to deleted users are cleared
+        self.user.delete()
+        self.assertEqual(LogPartitions.restore('asset_change_log', date(2020, 3, 1)), 3)
+        restored = AssetChangeLog.objects.filter(pk__in=[log.pk for log in self.old])
+        self.assertEqual(
+            {(log.timestamp.month, log.user_id, log.old_value) for log in restored},
+            {(3, None, '0'), (3, None, '1'), (3, None, '2')},
+        )
+        self.assertIsNotNone(LogArchive.objects.get(table='asset_change_log').restored_at)
+        self.assertEqual(LogPartitions.restore('asset_change_log', date(2020, 3, 1)), 0)
+
+    @skipUnless(connection.vendor == 'postgresql', 'log tables are only partitioned on PostgreSQL')
+    def test_late_partition_adopts_rows_from_the_default(self):
+        table = AssetChangeLog._meta.db_table
+        for label in LogPartitions.TABLES:
+            self.assertTrue(LogPartitions.is_partitioned(LogPartitions.model(label)[0]._meta.db_table))
+
+        # No partition existed when the month began, so its rows went to the default partition
+        AssetChangeLog.objects.filter(pk=self.recent.pk).update(
+            timestamp=datetime.datetime(2040, 5, 10, tzinfo=datetime.timezone.utc)
+        )
+        self.assertTrue(LogPartitions.create_partition(table, date(2040, 5, 1)))
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM {table}_p204005')
+            self.assertEqual(cursor.fetchall(), [(self.recent.pk,)])
+            cursor.execute(f"SELECT count(*) FROM {table}_default WHERE timestamp >= '2040-05-01'")
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(AssetChangeLog.objects.count(), 4)
+
+
+class HotPathIndexTests(TestCase):
+    """EXPLAIN-based checks that the dashboard / asset_list / inbox filters are served by the index pack."""
+
+    ASSETS = 6000
+
+    @classmethod
+    def setUpTestData(cls):
+        from django.db import connection
+
+        cls.departments = [Department.objects.create(name=f'Office {n}') for n in range(12)]
+        cls.user = User.objects.create_superuser(username='admin', password='password123')
+        statuses = [code for code, _ in Asset.STATUS_CHOICES]
+        classes = [code for code, _ in Asset.CLASS_CHOICES]
+        natures = [code for code, _ in Asset.ASSET_TYPE_CHOICES]
+        Asset.objects.bulk_create([
+            Asset(
+                property_number=f'PAR-{n:06d}', item_id=f'AST-{n}', name=f'Item {n % 997}',
+                date_acquired=date(2010 + n % 15, 1 + n % 12, 1 + n % 28), acquisition_cost=100 + n,
+                department=cls.departments[n % len(cls.departments)], status=statuses[n % len(statuses)],
+                asset_class=classes[n % len(classes)], asset_nature=natures[n % len(natures)],
+            )
+            for n in range(cls.ASSETS)
+        ], batch_size=1000)
+        asset = Asset.objects.first()
+        InspectionRequest.objects.bulk_create([
+            InspectionRequest(transaction_id=f'REQ-{n}', requestor=cls.user, asset=asset, notes='-') for n in range(200)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        from django.db import connection
+
+        if connection.vendor == 'postgresql':
+            # Small test tables: make the planner show whether an index *can* serve the query
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    def _plan(self, sql):
+        from django.db import connection
+
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            return '\n'.join(' '.join(str(c) for c in row) for row in cursor.fetchall())
+
+    def assertIndexed(self, queryset, index=None):
+        plan = queryset.explain()
+        self.assertNotRegex(plan, r'SCAN inventory_asset(?! USING)|Seq Scan on inventory_asset\b', plan)
+        self.assertRegex(plan, r'USING (COVERING )?INDEX|Index', plan)
+        if index:
+            self.assertIn(index, plan)
+
+    def test_asset_filters_use_the_index_pack(self):
+        office = self.departments[3]
+        self.assertIndexed(Asset.objects.order_by('-created_at')[:5], 'asset_created_idx')
+        self.assertIndexed(Asset.objects.filter(department=office).order_by('-created_at')[:5], 'asset_dept_created_idx')
+        self.assertIndexed(Asset.objects.filter(status='UNSERVICEABLE', asset_class='ICT EQUIPMENT'), 'asset_status_class_idx')
+        self.assertIndexed(Asset.objects.filter(asset_class='ICT EQUIPMENT', asset_nature='OTHER'), 'asset_class_nature_idx')
+        self.assertIndexed(Asset.objects.order_by('date_acquired', 'id')[:20], 'asset_date_acquired_idx')
+        self.assertIndexed(Asset.objects.order_by('name', 'id')[:20], 'asset_name_idx')
+        self.assertIndexed(RpcppeReport.filter(Asset.objects.filter(department=office)))
+
+    def test_transaction_filters_use_indexes(self):
+        self.assertIndexed(InspectionRequest.objects.filter(requestor=self.user).order_by('-created_at')[:20], 'inspection_requestor_idx')
+        self.assertIndexed(InspectionRequest.objects.filter(status='Approved').order_by('-created_at')[:20], 'inspection_status_idx')
+        self.assertIndexed(TransactionIndex.objects.filter(required_role__in=[1, 2]).values('required_role').annotate(n=Count('id')))
+
+    @skipUnless(connection.vendor == 'postgresql', 'text search indexes are PostgreSQL-only')
+    def test_bare_digit_search_uses_indexes(self):
+        queryset, _ = AssetSearch.filter(Asset.objects.all(), '0012')
+        self.assertIndexed(queryset, 'asset_prop_digits_trgm_idx')
+
+    def test_views_do_not_scan_the_asset_table(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        client = Client()
+        client.login(username='admin', password='password123')
+        requests = [
+            ('dashboard', {'status': 'SERVICEABLE', 'asset_class': 'ICT EQUIPMENT'}),
+            ('asset_list', {'status': 'UNSERVICEABLE', 'asset_class': 'ICT EQUIPMENT'}),
+            ('asset_list', {'department': self.departments[5].pk, 'sort': 'date'}),
+        ]
+        inspected = 0
+        for name, params in requests:
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(client.get(reverse(name), params).status_code, 200)
+            for query in ctx.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or 'FROM "inventory_asset"' not in sql:
+                    continue
+                plan = self._plan(sql)
+                self.assertNotRegex(plan, r'SCAN inventory_asset(?! USING)|Seq Scan on inventory_asset\b', f'{name} {params}: {sql}\n{plan}')
+                inspected += 1
+        self.assertGreaterEqual(inspected, 3)
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Per-view query ceilings that do not depend on the amount of data.
+    Every page is rendered after seeding `rows` records per table and again
+    after growing the data to three times that: both renders must stay under
+    the view's budget and the larger dataset may not add queries (N+1).
+    QUERY_BUDGET_ROWS scales the dataset; the per-view query count and DB time
+    are printed at the end of the run.
+    """
+
+    BUDGETS = {
+        'dashboard': 8, 'asset_list': 9, 'asset_detail': 9, 'transaction_history': 14,
+        'transaction_ledger': 8, 'activity_log': 12, 'rpcppe_report': 8, 'batch_detail': 16,
+        'bulk_media_upload': 11, 'print_property_card': 7,
+    }
+    report = []
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.report:
+            import sys
+            sys.stderr.write('\n{:<22} {:>6} {:>8} {:>9} {:>7}\n'.format('view', 'rows', 'queries', 'db ms', 'budget'))
+            for name, rows, queries, seconds in cls.report:
+                sys.stderr.write(f'{name:<22} {rows:>6} {queries:>8} {seconds * 1000:>9.1f} {cls.BUDGETS[name]:>7}\n')
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        cache.clear()
+        self.rows = int(os.environ.get('QUERY_BUDGET_ROWS', '10'))
+        self.admin = User.objects.create_superuser(username='admin', password='password123')
+        self.client = Client()
+        self.client.login(username='admin', password='password123')
+        workflow = Workflow.objects.create(name='Acquisition', process=ActionProcess.objects.create(name='Acquisition', code='BATCH_ACQUISITION'))
+        phase = WorkflowPhase.objects.create(workflow=workflow, name='Review')
+        self.step = WorkflowStep.objects.create(phase=phase, label='For SPMO Review', order=10)
+        self.departments = [Department.objects.create(name=f'Office {n}') for n in range(3)]
+        self.seeded = 0
+
+    def _grow(self, count):
+        """Adds `count` assets, service logs, change logs and transactions of each kind (with their movement logs)."""
+        from django.core.files.base import ContentFile
+
+        start = self.seeded
+        for n in range(start, start + count):
+            department = self.departments[n % len(self.departments)]
+            asset = Asset.objects.create(
+                property_number=f'PAR-{n:05d}', name=f'Asset {n}', date_acquired=date(2020, 1 + n % 12, 1),
+                acquisition_cost=1000 + n, department=department, status='SERVICEABLE',
+            )
+            ServiceLog.objects.create(asset=self.asset if n else asset, description='Checked', service_provider='Tech')
+            AssetChangeLog.objects.create(asset=self.asset if n else asset, user=self.admin, tab='PROPERTY', field_name='name')
+            if n == 0:
+                self.asset = asset
+            batch = AssetBatch.objects.create(
+                requestor=self.admin, supplier_name='Acme', requesting_unit=department.name,
+                requesting_unit_obj=department, current_step=self.step,
+            )
+            BatchItem.objects.create(batch=self.batch if n else batch, description='Chair', quantity=1, amount=100)
+            if n == 0:
+                self.batch = batch
+            transfer = AssetTransferRequest.objects.create(
+                requestor=self.admin, asset=asset, current_officer='A', new_officer_firstname='B',
+                new_officer_surname='C', remarks='-', current_step=self.step,
+                document_1=ContentFile(b'itr', name='itr.pdf'), document_2=ContentFile(b'id', name='id.pdf'),
+            )
+            if n == 0:
+                self.transfer = transfer
+            InspectionRequest.objects.create(requestor=self.admin, asset=asset, notes='-', current_step=self.step)
+            for target in (batch, self.batch, self.transfer):
+                WorkflowMovementLog.objects.create(
+                    user=self.admin, role_name='SPMO', unit_name=department.name, status_label='For SPMO Review',
+                    action_taken='Advanced', step=self.step,
+                    **{'batch' if isinstance(target, AssetBatch) else 'transfer': target},
+                )
+        self.seeded += count
+
+    def _pages(self):
+        return [
+            ('dashboard', reverse('dashboard')),
+            ('asset_list', reverse('asset_list')),
+            ('asset_detail', reverse('asset_detail', args=[self.asset.pk])),
+            ('transaction_history', reverse('transaction_history')),
+            ('transaction_ledger', reverse('transaction_ledger')),
+            ('activity_log', reverse('activity_log')),
+            ('rpcppe_report', reverse('rpcppe_report')),
+            ('batch_detail', reverse('batch_detail', args=[self.batch.pk])),
+            ('bulk_media_upload', reverse('bulk_media_upload')),
+            ('print_property_card', reverse('print_property_card', args=[self.asset.pk])),
+        ]
+
+    def _measure(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, url)
+        return len(ctx.captured_queries), sum(float(q['time']) for q in ctx.captured_queries)
+
+    def test_views_stay_within_query_budget(self):
+        counts = {}
+        for size in (self.rows, self.rows * 3):
+            self._grow(size - self.seeded)
+            self.client.get(reverse('dashboard'))  # warm the per-process caches (personas, workflow graph)
+            for name, url in self._pages():
+                queries, seconds = self._measure(url)
+                self.report.append((name, self.seeded, queries, seconds))
+                counts.setdefault(name, []).append(queries)
+
+        for name, (small, large) in counts.items():
+            with self.subTest(view=name):
+                self.assertLessEqual(large, self.BUDGETS[name], f'{name}: {large} queries')
+                self.assertLessEqual(large, small, f'{name}: {small} queries at {self.rows} rows, {large} at {self.rows * 3}')
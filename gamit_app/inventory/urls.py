@@ -57,6 +57,7 @@ urlpatterns = [
     # --- WORKFLOW ---
     path('profile/signature/', views.upload_signature, name='upload_signature'),
     path('batch/<int:pk>/', views.batch_detail, name='batch_detail'),
+    path('batch/<int:pk>/document-status/', views.batch_document_status, name='batch_document_status'),
     path('batch/<int:pk>/workflow/<str:target_state>/', views.approve_batch_workflow, name='approve_batch_workflow'),
     path('return/<int:pk>/', views.return_detail, name='return_detail'),
     path('return/<int:pk>/workflow/<str:target_state>/', views.approve_return_workflow, name='approve_return_workflow'),
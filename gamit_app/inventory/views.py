@@ -5,15 +5,23 @@ from collections import Counter
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import Http404, JsonResponse
-from django.db.models import Sum, Count, Q, Avg
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.template import loader
+from django.db.models import Sum, Count, Q, Avg, Case, When, Value, CharField
 from django.utils import timezone
 from django.urls import reverse
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 
 # Updated Imports
-from .models import Asset, UserProfile, InspectionRequest, AssetBatch, AssetTransferRequest, ServiceLog, AssetChangeLog, AssetNotification, AssetReturnRequest, AssetLossReport, PropertyClearanceRequest, Department
+from .models import Asset, UserProfile, InspectionRequest, AssetBatch, AssetTransferRequest, ServiceLog, AssetChangeLog, AssetNotification, AssetReturnRequest, AssetLossReport, PropertyClearanceRequest, Department, TransactionIndex
 from workflow.models import WorkflowMovementLog, WorkflowStep, Persona
+from workflow.personas import PersonaResolver
+from .search import AssetSearch
+from .activity import ActivityFeed
+from .documents import DocumentJobQueue
+from .rpcppe import RpcppeReport
+from .audit import AssetAudit
+from .pagination import KeysetPaginator, estimated_count, page_query
 
 from .forms import (
     AddAssetForm, AssetTransactionForm, InspectionRequestForm, AssetBatchForm, 
@@ -30,6 +38,8 @@ def dashboard(request):
     
     # --- PERSONA-AWARE FILTERING (SEP) ---
     demo_role = request.session.get('active_demo_role')
+    kpi_department = None
+    no_access = False
     
     if request.user.is_superuser and not demo_role:
         # Superuser God View
@@ -41,10 +51,13 @@ def dashboard(request):
             demo_dept = Department.objects.get(id=128)
             assets = assets.filter(department=demo_dept)
             user_department = demo_dept
+            kpi_department = demo_dept
         except Department.DoesNotExist:
             assets = Asset.objects.none()
+            no_access = True
         except Exception:
             assets = Asset.objects.none()
+            no_access = True
     # -------------------------------------
 
     # 2. SLICERS / FILTERS
@@ -59,48 +72,44 @@ def dashboard(request):
     if selected_status:
         assets = assets.filter(status=selected_status)
 
-    # 3. KPI METRICS
-    total_count = assets.count()
-    
-    total_val_agg = assets.aggregate(sum=Sum('acquisition_cost'))
-    total_value = total_val_agg['sum'] if total_val_agg['sum'] is not None else 0
-    
-    highest_asset = assets.order_by('-acquisition_cost').first()
-    highest_val = highest_asset.acquisition_cost if highest_asset else 0
-    highest_name = highest_asset.name if highest_asset else "N/A"
+    # 3. KPI METRICS (single read from the materialized AssetKpiSnapshot)
+    from .snapshots import AssetKpiTracker
+    if no_access:
+        kpi = AssetKpiTracker.empty_metrics()
+    else:
+        kpi = AssetKpiTracker.dashboard_metrics(
+            department=kpi_department,
+            asset_class=selected_class,
+            asset_nature=selected_nature,
+            status=selected_status,
+        )
+
+    total_count = kpi['total_count']
+    total_value = kpi['total_value']
+    highest_val = kpi['highest_val']
+    highest_name = kpi['highest_name']
 
     # NEW METRIC 1: Asset Status Breakdown
-    active_count = assets.filter(status='SERVICEABLE').count()
+    active_count = kpi['active_count']
     active_percentage = (active_count / total_count * 100) if total_count > 0 else 0
-    inactive_count = assets.filter(status__in=['INACTIVE', 'DISPOSED', 'UNSERVICEABLE']).count()
-    repair_count = assets.filter(status='UNDER_REPAIR').count()
+    inactive_count = kpi['inactive_count']
+    repair_count = kpi['repair_count']
     
     # NEW METRIC 2: Depreciation Alert (assets >5 years old)
-    from datetime import date, timedelta
-    five_years_ago = date.today() - timedelta(days=5*365)
-    aging_assets_count = assets.filter(date_acquired__lt=five_years_ago).count()
+    aging_assets_count = kpi['aging_assets_count']
     
     # NEW METRIC 3: Maintenance Cost (last 12 months)
-    one_year_ago = timezone.now() - timedelta(days=365)
-    maintenance_logs = ServiceLog.objects.filter(
-        asset__in=assets,
-        service_date__gte=one_year_ago
-    )
-    maintenance_cost = maintenance_logs.aggregate(sum=Sum('cost'))['sum'] or 0
-    maintenance_count = maintenance_logs.count()
+    maintenance_cost = kpi['maintenance_cost']
+    maintenance_count = kpi['maintenance_count']
     
     # Metrics using Department model
-    office_breakdown = assets.values('department__name').annotate(count=Count('id')).order_by('-count')
-    top_office = office_breakdown[0] if office_breakdown else None
-    top_office_name = top_office['department__name'] if top_office else "N/A"
-    top_office_count = top_office['count'] if top_office else 0
+    top_office_name = kpi['top_office_name']
+    top_office_count = kpi['top_office_count']
     top_office_percentage = (top_office_count / total_count * 100) if total_count > 0 else 0
     
     # NEW METRIC 5: Recent Acquisitions (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_acquisitions = assets.filter(created_at__gte=thirty_days_ago)
-    recent_count = recent_acquisitions.count()
-    recent_value = recent_acquisitions.aggregate(sum=Sum('acquisition_cost'))['sum'] or 0
+    recent_count = kpi['recent_count']
+    recent_value = kpi['recent_value']
 
     def format_money(val):
         if val >= 1000000: return f"{val/1000000:.1f}M"
@@ -173,7 +182,7 @@ def dashboard(request):
 # 2. ASSET LIST
 @login_required
 def asset_list(request):
-    assets = Asset.objects.all()
+    assets = Asset.objects.select_related('department')
     
     # --- PERSONA-AWARE FILTERING (SEP) ---
     demo_role = request.session.get('active_demo_role')
@@ -218,23 +227,10 @@ def asset_list(request):
     if selected_department and request.user.is_staff: # Only staff can filter by other departments
          assets = assets.filter(department__id=selected_department)
 
-    # 3. Search Bar Filter
+    # 3. Search Bar Filter (indexed search document, ranked; property numbers use prefix mode)
     search_term = request.GET.get('search', '').strip()
-    if search_term:
-        search_filter = (
-            Q(property_number__icontains=search_term) |
-            Q(name__icontains=search_term) |
-            Q(description__icontains=search_term) |
-            Q(accountable_firstname__icontains=search_term) |
-            Q(accountable_surname__icontains=search_term) |
-            Q(department__name__icontains=search_term) 
-        )
-        # Support full-name search
-        if " " in search_term:
-            parts = search_term.split()
-            search_filter |= (Q(accountable_firstname__icontains=parts[0]) & Q(accountable_surname__icontains=parts[-1]))
-            
-        assets = assets.filter(search_filter)
+    search_mode = request.GET.get('mode', AssetSearch.MODE_AUTO)
+    assets, search_mode = AssetSearch.filter(assets, search_term, search_mode)
 
     # 4. Sorting logic
     sort_by = request.GET.get('sort', 'prop')
@@ -251,10 +247,11 @@ def asset_list(request):
     }
     
     sort_field = allowed_sort_fields.get(sort_by, 'name')
-    if direction == 'desc':
-        sort_field = '-' + sort_field
-        
-    assets = assets.order_by(sort_field)
+    if search_term and 'sort' not in request.GET:
+        # Searches default to relevance unless the user picked a column
+        ordering = [('search_rank', True), ('property_number', False)]
+    else:
+        ordering = [(sort_field, direction == 'desc')]
 
     # 5. Pagination
     per_page = request.GET.get('per_page', 20)
@@ -262,15 +259,40 @@ def asset_list(request):
         per_page = int(per_page)
     except (ValueError, TypeError):
         per_page = 20
-        
-    paginator = Paginator(assets, per_page)
-    page = request.GET.get('page')
-    try:
-        assets_paginated = paginator.page(page)
-    except PageNotAnInteger:
-        assets_paginated = paginator.page(1)
-    except EmptyPage:
-        assets_paginated = paginator.page(paginator.num_pages)
+    per_page = max(per_page, 1)
+
+    # One count per request: planner estimate for the unfiltered registry, exact otherwise
+    total_count_all, count_is_estimate = estimated_count(assets)
+
+    if request.GET.get('page') and not request.GET.get('cursor'):
+        # Legacy OFFSET mode, kept for old bookmarks (?page=N)
+        assets = assets.order_by(*[('-' if desc else '') + field for field, desc in ordering], '-pk')
+        paginator = Paginator(assets, per_page)
+        paginator.count = total_count_all  # cached_property: skip Paginator's own COUNT(*)
+        try:
+            assets_paginated = paginator.page(request.GET.get('page'))
+        except PageNotAnInteger:
+            assets_paginated = paginator.page(1)
+        except EmptyPage:
+            assets_paginated = paginator.page(paginator.num_pages)
+        num_pages = paginator.num_pages
+        page_links = {
+            'first': page_query(request, page=1),
+            'previous': page_query(request, page=assets_paginated.previous_page_number()) if assets_paginated.has_previous() else None,
+            'next': page_query(request, page=assets_paginated.next_page_number()) if assets_paginated.has_next() else None,
+            'last': page_query(request, page=num_pages),
+        }
+    else:
+        # Keyset mode: seek past the (sort value, id) cursor instead of OFFSET
+        paginator = KeysetPaginator(assets, per_page, ordering, count=total_count_all)
+        assets_paginated = paginator.page(request.GET.get('cursor'))
+        num_pages = paginator.num_pages
+        page_links = {
+            'first': page_query(request, cursor=None, page=None),
+            'previous': page_query(request, cursor=assets_paginated.previous_cursor, page=None) if assets_paginated.has_previous() else None,
+            'next': page_query(request, cursor=assets_paginated.next_cursor, page=None) if assets_paginated.has_next() else None,
+            'last': page_query(request, cursor=KeysetPaginator.LAST, page=None),
+        }
 
     # 5. Context Data for Dropdowns (Standardized Tuples)
     all_classes = Asset.CLASS_CHOICES
@@ -291,8 +313,11 @@ def asset_list(request):
 
     context = {
         'object_list': assets_paginated,
-        'num_pages': paginator.num_pages,
-        'total_count_all': assets.count(), # Full filtered count
+        'num_pages': num_pages,
+        'total_count_all': total_count_all, # Full filtered count (estimated for the unfiltered registry)
+        'count_is_estimate': count_is_estimate,
+        'page_links': page_links,
+        'search_mode': search_mode,
         'search_term': search_term,
         
         # Dropdown Options
@@ -319,8 +344,8 @@ def asset_list(request):
         new_dir = 'desc' if (sort_by == field and direction == 'asc') else 'asc'
         curr_params['sort'] = field
         curr_params['dir'] = new_dir
-        if 'page' in curr_params:
-            curr_params.pop('page')
+        curr_params.pop('page', None)
+        curr_params.pop('cursor', None)
         return f"?{curr_params.urlencode()}"
 
     context['sort_urls'] = {
@@ -360,9 +385,8 @@ def get_user_tab_permissions(user, role_override=None):
     if user.is_superuser:
         return {k: True for k in perms}
     
-    try:
-        role = user.userprofile.role
-    except (UserProfile.DoesNotExist, AttributeError):
+    role = PersonaResolver.for_user(user).profile_role
+    if role is None:
         return perms
     # SPMO Admin: Property, Lifecycle, Government
     if role in ('SPMO_ADMIN', 'ADMIN_OFFICER'):
@@ -375,38 +399,6 @@ def get_user_tab_permissions(user, role_override=None):
     return perms
 
 
-def _detect_changes(asset, form, tab_name, user, request):
-    """Detect field changes and create AssetChangeLog entries. Returns list of changed field names."""
-    changed = []
-    if not form.changed_data:
-        return changed
-
-    # IMPORTANT: form.is_valid() has already mutated the 'asset' instance.
-    # We must fetch the original state from the database to compare.
-    old_instance = Asset.objects.get(pk=asset.pk)
-
-    for field_name in form.changed_data:
-        old_val = getattr(old_instance, field_name, None)
-        new_val = form.cleaned_data.get(field_name)
-        
-        # Stringify for storage
-        old_str = str(old_val) if old_val is not None else ''
-        new_str = str(new_val) if new_val is not None else ''
-        
-        if old_str != new_str:
-            AssetChangeLog.objects.create(
-                asset=asset,
-                user=user,
-                tab=tab_name.upper(), # Standardize to match TAB_CHOICES
-                field_name=field_name,
-                old_value=old_str[:500],
-                new_value=new_str[:500],
-                ip_address=request.META.get('REMOTE_ADDR', ''),
-            )
-            changed.append(field_name)
-    return changed
-
-
 def _create_cross_office_notification(asset, user, tab_name, changed_fields):
     """Alert the OTHER office when changes are made."""
     if not changed_fields:
@@ -439,20 +431,15 @@ def asset_detail(request, pk):
         pass
     elif demo_role and demo_role.startswith('UNIT_'):
         # Unit Persona: Strict Department Isolation (Fixed to UPRI ID 128)
-        from .models import Department
-        try:
-            demo_dept = Department.objects.get(id=128)
-            if asset.department != demo_dept:
-                from django.http import Http404
-                raise Http404("You are not authorized to view this asset.")
-        except Department.DoesNotExist:
-            from django.http import Http404
+        if not Department.objects.filter(id=128).exists():
             raise Http404("Persona department configuration error.")
+        if asset.department_id != 128:
+            raise Http404("You are not authorized to view this asset.")
     elif not request.user.is_staff and not demo_role:
         # Standard User
         try:
             profile = request.user.userprofile
-            if asset.department != profile.department:
+            if asset.department_id != profile.department_id:
                 raise Http404("You are not authorized to view this asset.")
         except (UserProfile.DoesNotExist, AttributeError):
             raise Http404("User profile not found.")
@@ -474,9 +461,10 @@ def asset_detail(request, pk):
             FormClass = TAB_FORMS[active_tab]
             form_tab = FormClass(request.POST, instance=asset)
             if form_tab.is_valid():
-                changed = _detect_changes(asset, form_tab, active_tab, request.user, request)
-                form_tab.save()
-                _create_cross_office_notification(asset, request.user, active_tab, changed)
+                # The audit trail is written by the post_save capture (one insert for all changed fields)
+                with AssetAudit.actor(request.user, request.META.get('REMOTE_ADDR'), active_tab):
+                    form_tab.save()
+                _create_cross_office_notification(asset, request.user, active_tab, asset._audit_changes)
                 messages.success(request, f'{active_tab.title()} tab updated successfully.')
                 return redirect('asset_detail', pk=pk)
             else:
@@ -606,107 +594,62 @@ def transaction_history(request):
     
     if request.user.is_superuser and not demo_role_code:
         # Superuser God View: All transactions
-        inspections = InspectionRequest.objects.all()
-        batches = AssetBatch.objects.all()
-        transfers = AssetTransferRequest.objects.all()
-        returns = AssetReturnRequest.objects.all()
-        losses = AssetLossReport.objects.all()
-        clearances = PropertyClearanceRequest.objects.all()
+        index = TransactionIndex.objects.all()
     else:
         # Determine effective roles (demo role takes precedence)
         if demo_role_code:
             effective_roles = [demo_persona.role.id] if demo_persona and demo_persona.role else []
             effective_user = demo_persona.user if demo_persona else request.user
         else:
-            effective_roles = Persona.objects.filter(user=request.user, is_active=True).values_list('role', flat=True)
+            effective_roles = list(PersonaResolver.for_user(request.user).role_ids)
             effective_user = request.user
 
-        # Base queries (transactions involving the effective user)
-        inspections = InspectionRequest.objects.filter(requestor=effective_user)
-        batches = AssetBatch.objects.filter(requestor=effective_user)
-        transfers = AssetTransferRequest.objects.filter(requestor=effective_user)
-        returns = AssetReturnRequest.objects.filter(requestor=effective_user)
-        losses = AssetLossReport.objects.filter(requestor=effective_user)
-        clearances = PropertyClearanceRequest.objects.filter(requestor=effective_user)
-        
+        # Transactions involving the effective user, plus tasks where the persona role is required
+        visible = Q(requestor=effective_user)
         if effective_roles:
-            # Add tasks where the persona role is required
-            as_i = InspectionRequest.objects.filter(current_step__required_persona_role__in=effective_roles)
-            as_b = AssetBatch.objects.filter(current_step__required_persona_role__in=effective_roles)
-            as_t = AssetTransferRequest.objects.filter(current_step__required_persona_role__in=effective_roles)
-            as_r = AssetReturnRequest.objects.filter(current_step__required_persona_role__in=effective_roles)
-            as_l = AssetLossReport.objects.filter(current_step__required_persona_role__in=effective_roles)
-            as_c = PropertyClearanceRequest.objects.filter(current_step__required_persona_role__in=effective_roles)
-            
-            inspections = (inspections | as_i).distinct()
-            batches = (batches | as_b).distinct()
-            transfers = (transfers | as_t).distinct()
-            returns = (returns | as_r).distinct()
-            losses = (losses | as_l).distinct()
-            clearances = (clearances | as_c).distinct()
+            visible |= Q(required_role__in=effective_roles)
+        index = TransactionIndex.objects.filter(visible)
 
         # UNIT FILTERING: If acting as a unit role, restrict by department
         if demo_role_code and demo_role_code.startswith('UNIT_'):
             persona = getattr(request.user, 'demo_persona', None)
             if persona and persona.department:
-                dept = persona.department
-                inspections = inspections.filter(requestor__userprofile__department=dept)
-                batches = batches.filter(requestor__userprofile__department=dept)
-                transfers = transfers.filter(requestor__userprofile__department=dept)
-                returns = returns.filter(requestor__userprofile__department=dept)
-                losses = losses.filter(requestor__userprofile__department=dept)
-                clearances = clearances.filter(requestor__userprofile__department=dept)
+                index = index.filter(department=persona.department)
             else:
                 # If no department is found for the Unit role, show nothing (fail-safe)
-                inspections = Asset.objects.none()
-                batches = Asset.objects.none()
-                transfers = Asset.objects.none()
-                returns = Asset.objects.none()
-                losses = Asset.objects.none()
-                clearances = Asset.objects.none()
+                index = TransactionIndex.objects.none()
     # -------------------------------------
 
-    # Calculate real-time metrics for the Smart Dashboard
-    total_count = inspections.count() + batches.count() + transfers.count() + returns.count() + losses.count() + clearances.count()
-    
-    approved_count = (
-        inspections.filter(status__iexact='Approved').count() +
-        batches.filter(status__iexact='APPROVED').count() +
-        transfers.filter(status__iexact='APPROVED').count() +
-        returns.filter(status__iexact='FINALIZED').count() +
-        losses.filter(status__iexact='FINALIZED').count() +
-        clearances.filter(status__iexact='FINALIZED').count()
-    )
-    
-    returned_count = (
-        inspections.filter(Q(status__iexact='Returned') | Q(status__iexact='Rejected')).count() +
-        batches.filter(Q(status__iexact='RETURNED') | Q(status__iexact='REJECTED')).count() +
-        transfers.filter(Q(status__iexact='RETURNED') | Q(status__iexact='REJECTED')).count() +
-        returns.filter(Q(status__icontains='RETURN') | Q(status__icontains='REJECT')).count() +
-        losses.filter(Q(status__icontains='RETURN') | Q(status__icontains='REJECT')).count() +
-        clearances.filter(Q(status__icontains='RETURN') | Q(status__icontains='REJECT')).count()
+    # Calculate real-time metrics for the Smart Dashboard (one aggregate over the index)
+    metrics = index.aggregate(
+        total=Count('id'),
+        approved=Count('id', filter=Q(status='APPROVED')),
+        returned=Count('id', filter=Q(status='RETURNED')),
     )
-    
+    total_count = metrics['total']
+    approved_count = metrics['approved']
+    returned_count = metrics['returned']
     pending_count = total_count - (approved_count + returned_count)
 
-    # Smart Insight: Office with most requests in current view
-    all_requestors = (
-        list(inspections.values_list('requestor__userprofile__office', flat=True)) +
-        list(batches.values_list('requestor__userprofile__office', flat=True)) +
-        list(transfers.values_list('requestor__userprofile__office', flat=True))
+    # Smart Insight: Office with most requests in current view (inspections, acquisitions, transfers)
+    top_office = (
+        index.filter(type_code__in=['REQ', 'BATCH', 'TRF']).exclude(requestor_office__isnull=True).exclude(requestor_office='')
+        .values('requestor_office').annotate(total=Count('id')).order_by('-total').first()
     )
-    from collections import Counter
-    counts = Counter(o for o in all_requestors if o)
-    top_office = counts.most_common(1)
-    office_insight = {'requestor_office': top_office[0][0], 'pending_count': top_office[0][1]} if top_office else None
+    office_insight = {'requestor_office': top_office['requestor_office'], 'pending_count': top_office['total']} if top_office else None
+
+    def listing(model, code, *related):
+        ids = index.filter(type_code=code).values('object_id')
+        # The tables show the requestor (and office) and the asset of every row
+        return model.objects.filter(pk__in=ids).select_related('requestor__userprofile', *related).order_by('-created_at')
 
     context = {
-        'inspections': inspections.order_by('-created_at'),
-        'batches': batches.order_by('-created_at'),
-        'transfers': transfers.order_by('-created_at'),
-        'returns': returns.order_by('-created_at'),
-        'losses': losses.order_by('-created_at'),
-        'clearances': clearances.order_by('-created_at'),
+        'inspections': listing(InspectionRequest, 'REQ', 'asset'),
+        'batches': listing(AssetBatch, 'BATCH'),
+        'transfers': listing(AssetTransferRequest, 'TRF', 'asset'),
+        'returns': listing(AssetReturnRequest, 'RET', 'asset'),
+        'losses': listing(AssetLossReport, 'LOSS', 'asset'),
+        'clearances': listing(PropertyClearanceRequest, 'CLR'),
         'metrics': {
             'total': total_count,
             'approved': approved_count,
@@ -733,157 +676,69 @@ def transaction_ledger(request):
     # Global Admin is ONLY the real Superuser NOT in demo mode
     is_global_admin = request.user.is_superuser and not demo_role
 
-    def base_qs(model, related=None):
-        if is_global_admin:
-            qs = model.objects.all()
-        else:
-            # Identify department context for Unit Personas or Standard Users
-            dept = None
-            if demo_role and demo_role.startswith('UNIT_'):
-                dept = persona.department if persona else None
-            elif not request.user.is_staff and not request.user.is_superuser:
-                from .models import UserProfile
-                try:
-                    dept = request.user.userprofile.department
-                except (UserProfile.DoesNotExist, AttributeError):
-                    pass
-            
-            if dept:
-                # Department Isolation: See all transactions in the office
-                qs = model.objects.filter(requestor__userprofile__department=dept)
-            else:
-                # Individual Isolation: See only own transactions
-                qs = model.objects.filter(requestor=request.user)
-            
-            # Plus items where the current persona is required for the next step (Inbox)
-            from workflow.models import Persona
-            active_roles = list(Persona.objects.filter(
-                user=request.user, is_active=True
-            ).values_list('role', flat=True)) if not is_global_admin else []
-            
-            if active_roles:
-                qs = (qs | model.objects.filter(current_step__required_persona_role__in=active_roles)).distinct()
-            
-            qs = qs.distinct()
-            
-        if related:
-            qs = qs.select_related(*related)
-        return qs
-
-    def normalize_status(raw):
-        u = str(raw).upper()
-        if u in ('APPROVED', 'PAR_RELEASED', 'FINALIZED'):
-            return 'Approved'
-        if u in ('RETURNED', 'REJECTED'):
-            return 'Returned'
-        return 'Pending'
+    if is_global_admin:
+        index = TransactionIndex.objects.all()
+    else:
+        # Identify department context for Unit Personas or Standard Users
+        dept = None
+        if demo_role and demo_role.startswith('UNIT_'):
+            dept = persona.department if persona else None
+        elif not request.user.is_staff and not request.user.is_superuser:
+            from .models import UserProfile
+            try:
+                dept = request.user.userprofile.department
+            except (UserProfile.DoesNotExist, AttributeError):
+                pass
+
+        # Department Isolation: See all transactions in the office; otherwise only own transactions
+        visible = Q(department=dept) if dept else Q(requestor=request.user)
+
+        # Plus items where the current persona is required for the next step (Inbox)
+        active_roles = list(PersonaResolver.for_user(request.user).role_ids)
+        if active_roles:
+            visible |= Q(required_role__in=active_roles)
+        index = TransactionIndex.objects.filter(visible)
 
     TYPE_MAP = {
-        'BATCH': ('Acquisition', 'fas fa-boxes-packing', 'success',
-                  AssetBatch, False, ['requestor']),
-        'REQ':   ('Inspection', 'fas fa-search', 'info',
-                  InspectionRequest, True, ['asset', 'requestor']),
-        'TRF':   ('Transfer', 'fas fa-exchange-alt', 'warning',
-                  AssetTransferRequest, True, ['asset', 'requestor']),
-        'RET':   ('Return', 'fas fa-undo', 'primary',
-                  AssetReturnRequest, True, ['asset', 'requestor']),
-        'LOSS':  ('Loss Report', 'fas fa-exclamation-triangle', 'danger',
-                  AssetLossReport, True, ['asset', 'requestor']),
-        'CLR':   ('Clearance', 'fas fa-file-signature', 'secondary',
-                  PropertyClearanceRequest, False, ['requestor']),
+        'BATCH': ('Acquisition', 'fas fa-boxes-packing', 'success'),
+        'REQ':   ('Inspection', 'fas fa-search', 'info'),
+        'TRF':   ('Transfer', 'fas fa-exchange-alt', 'warning'),
+        'RET':   ('Return', 'fas fa-undo', 'primary'),
+        'LOSS':  ('Loss Report', 'fas fa-exclamation-triangle', 'danger'),
+        'CLR':   ('Clearance', 'fas fa-file-signature', 'secondary'),
     }
 
     DETAIL_URLS = {
         'BATCH': 'batch_detail', 'TRF': 'transfer_detail',
         'RET': 'return_detail', 'LOSS': 'loss_detail', 'CLR': 'clearance_detail',
     }
+    NORM_LABELS = dict(TransactionIndex.STATUS_CHOICES)
 
-    rows = []
-    for code, (label, icon, color, model, has_asset, related) in TYPE_MAP.items():
-        if type_filter and type_filter != code:
-            continue
-
-        qs = base_qs(model, related)
-
-        # Search
-        if search:
-            # Support multi-word name searches
-            q_s = (Q(transaction_id__icontains=search) |
-                   Q(requestor__first_name__icontains=search) |
-                   Q(requestor__last_name__icontains=search) |
-                   Q(requestor__username__icontains=search))
-            
-            if " " in search:
-                parts = search.split()
-                q_s |= (Q(requestor__first_name__icontains=parts[0]) & Q(requestor__last_name__icontains=parts[-1]))
-
-            if has_asset:
-                q_s |= (Q(asset__name__icontains=search) |
-                        Q(asset__property_number__icontains=search))
-            elif code == 'BATCH':
-                q_s |= (Q(supplier_name__icontains=search) |
-                        Q(requesting_unit__icontains=search) |
-                        Q(po_number__icontains=search))
-            elif code == 'CLR':
-                q_s |= Q(purpose__icontains=search)
-            qs = qs.filter(q_s)
-
-        # Status filter (Case-Insensitive & Inclusive)
-        if status_filter == 'APPROVED':
-            # Capture all successful/finalized states
-            qs = qs.filter(Q(status__iexact='Approved') | Q(status__iexact='APPROVED') | 
-                           Q(status__iexact='FINALIZED') | Q(status__iexact='PAR_RELEASED'))
-        elif status_filter == 'PENDING':
-            # Filter for anything NOT in a final state
-            qs = qs.exclude(Q(status__iexact='Approved') | Q(status__iexact='APPROVED') | 
-                            Q(status__iexact='FINALIZED') | Q(status__iexact='PAR_RELEASED') |
-                            Q(status__iexact='RETURNED') | Q(status__iexact='REJECTED') |
-                            Q(status__iexact='Rejected') | Q(status__iexact='Returned'))
-        elif status_filter == 'RETURNED':
-            qs = qs.filter(Q(status__iexact='RETURNED') | Q(status__iexact='REJECTED') |
-                           Q(status__iexact='Returned') | Q(status__iexact='Rejected'))
-
-        for obj in qs.order_by('-created_at')[:200]:
-            if has_asset:
-                a_label = obj.asset.property_number
-                a_name = obj.asset.name
-            elif code == 'BATCH':
-                a_label = obj.supplier_name or obj.requesting_unit or '-'
-                a_name = f"PO: {obj.po_number}" if obj.po_number else ''
-            else:
-                a_label = (obj.purpose[:50] + '...') if obj.purpose and len(obj.purpose) > 50 else (obj.purpose or '-')
-                a_name = ''
-
-            url_name = DETAIL_URLS.get(code, '')
-            detail_url = reverse(url_name, args=[obj.pk]) if url_name else ''
-
-            raw_status = obj.status or 'Pending'
-            rows.append({
-                'transaction_id': obj.transaction_id,
-                'type_code': code,
-                'type_label': label,
-                'type_icon': icon,
-                'type_color': color,
-                'asset_label': a_label,
-                'asset_name': a_name,
-                'requestor_name': obj.requestor.get_full_name() or obj.requestor.username,
-                'created_at': obj.created_at,
-                'raw_status': raw_status,
-                'norm_status': normalize_status(raw_status),
-                'detail_url': detail_url,
-            })
+    if type_filter in TYPE_MAP:
+        index = index.filter(type_code=type_filter)
+
+    # Search (every word must match the transaction id, requestor, asset or subject)
+    if search:
+        for word in search.lower().split():
+            index = index.filter(search_text__contains=word)
+
+    # Status filter (normalized at write time)
+    if status_filter in ('APPROVED', 'PENDING', 'RETURNED'):
+        index = index.filter(status=status_filter)
 
     # Sort
-    rev = (direction == 'desc')
-    sort_keys = {
-        'id': lambda r: r['transaction_id'],
-        'type': lambda r: r['type_label'],
-        'status': lambda r: r['norm_status'],
-    }
-    rows.sort(key=sort_keys.get(sort_by, lambda r: r['created_at']), reverse=rev)
+    prefix = '-' if direction == 'desc' else ''
+    if sort_by == 'type':
+        # Sort by the displayed label, not the code
+        index = index.annotate(type_label=Case(
+            *[When(type_code=code, then=Value(meta[0])) for code, meta in TYPE_MAP.items()],
+            output_field=CharField(),
+        ))
+    sort_fields = {'id': 'transaction_id', 'type': 'type_label', 'status': 'status'}
+    index = index.order_by(prefix + sort_fields.get(sort_by, 'created_at'), prefix + 'id')
 
     # Paginate
-    paginator = Paginator(rows, 20)
+    paginator = Paginator(index, 20)
     page = request.GET.get('page')
     try:
         page_obj = paginator.page(page)
@@ -892,9 +747,29 @@ def transaction_ledger(request):
     except EmptyPage:
         page_obj = paginator.page(paginator.num_pages)
 
+    rows = []
+    for entry in page_obj.object_list:
+        label, icon, color = TYPE_MAP[entry.type_code]
+        url_name = DETAIL_URLS.get(entry.type_code, '')
+        rows.append({
+            'transaction_id': entry.transaction_id,
+            'type_code': entry.type_code,
+            'type_label': label,
+            'type_icon': icon,
+            'type_color': color,
+            'asset_label': entry.asset_label,
+            'asset_name': entry.asset_name,
+            'requestor_name': entry.requestor_name,
+            'created_at': entry.created_at,
+            'raw_status': entry.raw_status,
+            'norm_status': NORM_LABELS[entry.status],
+            'detail_url': reverse(url_name, args=[entry.object_id]) if url_name else '',
+        })
+    page_obj.object_list = rows
+
     context = {
         'rows': page_obj,
-        'total_count': len(rows),
+        'total_count': paginator.count,
         'search': search,
         'type_filter': type_filter,
         'status_filter': status_filter,
@@ -1001,7 +876,8 @@ def update_transfer_status(request, pk, action):
                 asset = transfer.asset
                 asset.accountable_firstname = transfer.new_officer_firstname
                 asset.accountable_surname = transfer.new_officer_surname
-                asset.save()
+                with AssetAudit.actor(request.user, request.META.get('REMOTE_ADDR')):
+                    asset.save()
                 transfer.status = 'APPROVED'
                 transfer.save()
                 messages.success(request, f"Transfer Approved. Asset assigned to {transfer.new_officer_firstname}.")
@@ -1359,7 +1235,7 @@ def batch_detail(request, pk):
     """
     batch = get_object_or_404(AssetBatch, pk=pk)
     items = batch.items.all()
-    logs = batch.movement_logs.all().order_by('-timestamp')
+    logs = batch.movement_logs.select_related('user').order_by('-timestamp')
     
     # Determine allowed transitions for current user based on DB setup
     try:
@@ -1375,10 +1251,16 @@ def batch_detail(request, pk):
         'items': items,
         'logs': logs,
         'allowed_transitions': allowed_transitions,
-        'workflow_steps': workflow_steps
-
+        'workflow_steps': workflow_steps,
+        'document_job': DocumentJobQueue.latest_for(batch),
     })
 
+@login_required
+def batch_document_status(request, pk):
+    """Polling endpoint for the batch's background PAR/ICS rendering job."""
+    batch = get_object_or_404(AssetBatch, pk=pk)
+    return JsonResponse(DocumentJobQueue.status_payload(DocumentJobQueue.latest_for(batch)))
+
 @login_required
 def approve_batch_workflow(request, pk, target_state):
     """
@@ -1436,7 +1318,7 @@ def create_return_request(request):
 @login_required
 def return_detail(request, pk):
     req = get_object_or_404(AssetReturnRequest, pk=pk)
-    logs = req.movement_logs.all().order_by('-timestamp')
+    logs = req.movement_logs.select_related('user').order_by('-timestamp')
     try:
         allowed_transitions = WorkflowEngine.get_allowed_transitions(req, request.user)
         workflow_steps = WorkflowEngine.get_workflow_steps(req)
@@ -1479,7 +1361,7 @@ def create_loss_report(request):
 @login_required
 def loss_detail(request, pk):
     req = get_object_or_404(AssetLossReport, pk=pk)
-    logs = req.movement_logs.all().order_by('-timestamp')
+    logs = req.movement_logs.select_related('user').order_by('-timestamp')
     try:
         allowed_transitions = WorkflowEngine.get_allowed_transitions(req, request.user)
         workflow_steps = WorkflowEngine.get_workflow_steps(req)
@@ -1530,7 +1412,7 @@ def create_clearance_request(request):
 @login_required
 def clearance_detail(request, pk):
     req = get_object_or_404(PropertyClearanceRequest, pk=pk)
-    logs = req.movement_logs.all().order_by('-timestamp')
+    logs = req.movement_logs.select_related('user').order_by('-timestamp')
     try:
         allowed_transitions = WorkflowEngine.get_allowed_transitions(req, request.user)
         workflow_steps = WorkflowEngine.get_workflow_steps(req)
@@ -1577,7 +1459,7 @@ def activity_log(request):
     else:
         # Check for Chief/Supervisor active personas
         viewer_roles = ['SPMO_CHIEF', 'SPMO_SUPERVISOR', 'SPMO_ADMIN_SUPERVISOR']
-        if Persona.objects.filter(user=request.user, is_active=True, role__code__in=viewer_roles).exists():
+        if PersonaResolver.for_user(request.user).has_role_code(*viewer_roles):
             is_admin_viewer = True
 
     if not is_admin_viewer:
@@ -1637,104 +1519,15 @@ def activity_log(request):
         elif process_type == 'CLEARANCE':
             all_logs = all_logs.filter(clearance__isnull=False)
 
-    # 4. DATA GROUPING (Process Monitor Logic)
-    # We want to group logs by their parent transaction
-    from collections import OrderedDict
-    # --- UNIFIED LIVE ACTIVITY PULSE (ROBUST) ---
-    # Fetch 50 latest of each type to ensure a deep enough pool for sorting
-    workflow_moves = all_logs[:50]
-    
-    from .models import AssetChangeLog, Asset, ServiceLog
-    asset_revisions = AssetChangeLog.objects.all().select_related('user', 'asset').order_by('-timestamp')[:50]
-    new_assets = Asset.objects.all().order_by('-created_at')[:50]
-    recent_services = ServiceLog.objects.all().select_related('asset').order_by('-created_at')[:50]
-    
-    # Normalize and Combine
-    unified_pulse = []
-    
-    # 1. Workflow Moves (Standardized IDs)
-    for log in workflow_moves:
-        t_id = 'SYS'
-        if log.batch: t_id = log.batch.transaction_id
-        elif log.transfer: t_id = log.transfer.transaction_id
-        elif log.inspection: t_id = log.inspection.transaction_id
-        elif log.return_request: t_id = log.return_request.transaction_id
-        elif log.loss_report: t_id = log.loss_report.transaction_id
-        elif log.clearance: t_id = log.clearance.transaction_id
-
-        unified_pulse.append({
-            'user': log.user,
-            'timestamp': log.timestamp,
-            'action': log.action_taken,
-            'type': 'WORKFLOW',
-            'category': 'BATCH' if log.batch else 'TRANSFER' if log.transfer else 'INSPECT' if log.inspection else 'MOVE',
-            'target_id': t_id
-        })
-        
-    # 2. Asset Revisions (Edits)
-    for rev in asset_revisions:
-        unified_pulse.append({
-            'user': rev.user,
-            'timestamp': rev.timestamp,
-            'action': f"Updated {rev.get_tab_display()}: {rev.field_name}",
-            'type': 'REVISION',
-            'category': 'EDIT',
-            'target_id': rev.asset.property_number
-        })
+    # 4. LIVE ACTIVITY PULSE (one UNION across movements, edits, registrations and services)
+    live_feed = ActivityFeed.live_pulse(all_logs)
 
-    # 3. New Asset Registrations
-    for asset in new_assets:
-        unified_pulse.append({
-            'user': None,
-            'timestamp': asset.created_at,
-            'action': f"Newly Registered: {asset.name[:50]}",
-            'type': 'CREATION',
-            'category': 'NEW',
-            'target_id': asset.property_number
-        })
-
-    # 4. Service / Maintenance Logs
-    for service in recent_services:
-        unified_pulse.append({
-            'user': None,
-            'timestamp': service.created_at,
-            'action': f"{service.get_service_type_display()}: {service.description[:50]}",
-            'type': 'SERVICE',
-            'category': 'MAINT',
-            'target_id': service.asset.property_number
-        })
-        
-    # Final Sort and Slice (Top 25 for UI)
-    live_feed = sorted(unified_pulse, key=lambda x: x['timestamp'], reverse=True)[:25]
-
-    # Process Monitor Groups (Paginate groups, not individual moves)
-    grouped_data = OrderedDict()
-    
-    for log in all_logs:
-        # Determine unique key for transaction
-        t_key = None
-        if log.batch: t_key = f"batch_{log.batch.id}"
-        elif log.transfer: t_key = f"transfer_{log.transfer.id}"
-        elif log.inspection: t_key = f"inspect_{log.inspection.id}"
-        elif log.return_request: t_key = f"return_{log.return_request.id}"
-        elif log.loss_report: t_key = f"loss_{log.loss_report.id}"
-        elif log.clearance: t_key = f"clear_{log.clearance.id}"
-        else: t_key = f"sys_{log.id}" # Fallback for system logs
-
-        if t_key not in grouped_data:
-            grouped_data[t_key] = {
-                'latest': log,
-                'history': [],
-                'type': t_key.split('_')[0]
-            }
-        else:
-            grouped_data[t_key]['history'].append(log)
-
-    # 5. PAGINATION (Paginate the groups)
-    group_items = list(grouped_data.values())
-    paginator = Paginator(group_items, 15) # 15 processes per page is better for vertical space
+    # 5. PROCESS MONITOR (latest movement per transaction picked in SQL; paginate groups, not moves)
+    paginator = Paginator(ActivityFeed.latest_per_transaction(all_logs), 15) # 15 processes per page is better for vertical space
     page = request.GET.get('page')
     groups_paginated = paginator.get_page(page)
+    # History is only loaded for the groups on this page
+    groups_paginated.object_list = ActivityFeed.groups(all_logs, groups_paginated.object_list)
 
     return render(request, 'inventory/activity_log.html', {
         'grouped_transactions': groups_paginated,
@@ -1758,13 +1551,14 @@ def reports_home(request):
 def rpcppe_report(request):
     """
     COA-Compliant Report on Physical Count of Property, Plant & Equipment (RPCPPE).
-    Grouped by Department with totals.
+    Grouped by Department with totals (aggregated in SQL, rows streamed; see inventory/rpcppe.py).
+    GET: as_of=YYYY-MM-DD, asset_class=<PPE class>, format=csv|xlsx.
     """
     # --- PERSONA-AWARE FILTERING (SEP) ---
     demo_role = request.session.get('active_demo_role')
     persona = getattr(request.user, 'demo_persona', None)
     
-    assets_qs = Asset.objects.filter(status='SERVICEABLE').select_related('department')
+    assets_qs = Asset.objects.all()
     
     if demo_role and demo_role.startswith('UNIT_'):
         # Unit Persona: Strict Department Isolation (Fixed to PGC ID 127)
@@ -1781,34 +1575,21 @@ def rpcppe_report(request):
         except (UserProfile.DoesNotExist, AttributeError):
             assets_qs = assets_qs.none()
 
-    assets_qs = assets_qs.order_by('department__name', 'asset_class', 'name')
-    
-    grouped_data = {}
-    grand_total_cost = 0
-
-    total_assets_count = 0
-    for asset in assets_qs:
-        dept_name = asset.department.name if asset.department else "UNASSIGNED / GENERAL"
-        if dept_name not in grouped_data:
-            grouped_data[dept_name] = {
-                'assets': [],
-                'dept_total_cost': 0,
-            }
-        
-        # Calculations for COA alignment
-        qty_card = 1 # Asset is serialized by default
-        qty_physical = asset.quantity_physical_count or 0
-        unit_cost = asset.acquisition_cost or 0
-        total_price = unit_cost * qty_physical
-        
-        # Attach to asset object for template access
-        asset.qty_card = qty_card
-        asset.total_price = total_price
-        
-        grouped_data[dept_name]['assets'].append(asset)
-        grouped_data[dept_name]['dept_total_cost'] += total_price
-        grand_total_cost += total_price
-        total_assets_count += qty_physical
+    as_of = RpcppeReport.parse_as_of(request.GET.get('as_of'))
+    asset_class = request.GET.get('asset_class', '')
+    if asset_class not in dict(Asset.CLASS_CHOICES):
+        asset_class = ''
+    assets_qs = RpcppeReport.filter(assets_qs, as_of=as_of, asset_class=asset_class)
+
+    # Subtotals and grand totals: one grouped query
+    totals = RpcppeReport.totals(assets_qs)
+    report_date = as_of or timezone.now().date()
+
+    export_format = request.GET.get('format')
+    if export_format == 'csv':
+        return _rpcppe_csv_response(assets_qs, totals, report_date)
+    if export_format == 'xlsx':
+        return _rpcppe_xlsx_response(request, assets_qs, totals, report_date)
 
     # Get department name for persona-specific watermarking
     dept_name = "ALL DEPARTMENTS"
@@ -1817,15 +1598,68 @@ def rpcppe_report(request):
             dept_name = persona.department.name
 
     context = {
-        'grouped_data': grouped_data,
-        'grand_total_cost': grand_total_cost,
-        'total_assets_count': total_assets_count,
-        'dept_count': len(grouped_data),
-        'report_date': timezone.now().date(),
+        'grand_total_cost': totals['grand_total'],
+        'total_assets_count': totals['total_count'],
+        'dept_count': len(totals['departments']),
+        'report_date': report_date,
+        'as_of': as_of,
+        'asset_class': asset_class,
+        'class_choices': Asset.CLASS_CHOICES,
         'active_demo_role': demo_role,
         'department_name': dept_name,
     }
-    return render(request, 'inventory/rpcppe_report.html', context)
+
+    # Stream the page: header, one rendered batch of rows at a time, footer
+    head = loader.get_template('inventory/rpcppe_report.html')
+    rows = loader.get_template('inventory/rpcppe_report_rows.html')
+    foot = loader.get_template('inventory/rpcppe_report_footer.html')
+
+    def stream():
+        yield head.render(context, request)
+        is_empty = True
+        for batch in RpcppeReport.batches(RpcppeReport.lines(assets_qs, totals)):
+            is_empty = False
+            yield rows.render({'lines': batch})
+        yield foot.render({**context, 'is_empty': is_empty}, request)
+
+    return StreamingHttpResponse(stream(), content_type='text/html; charset=utf-8')
+
+
+class _Echo:
+    """File-like object whose write() returns the value (csv.writer -> streaming response)."""
+    def write(self, value):
+        return value
+
+
+def _rpcppe_csv_response(assets_qs, totals, report_date):
+    import csv
+    writer = csv.writer(_Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(record) for record in RpcppeReport.csv_records(assets_qs, totals)),
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="RPCPPE_{report_date:%Y%m%d}.csv"'
+    return response
+
+
+def _rpcppe_xlsx_response(request, assets_qs, totals, report_date):
+    import tempfile
+    from django.http import FileResponse
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        messages.error(request, "XLSX export needs the 'openpyxl' package; download the CSV instead.")
+        return redirect('rpcppe_report')
+
+    # write_only keeps one row in memory; the workbook is assembled in a temp file
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('RPCPPE')
+    for record in RpcppeReport.csv_records(assets_qs, totals):
+        sheet.append(record)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f"RPCPPE_{report_date:%Y%m%d}.xlsx")
 # ==========================================
 # 11. BULK MEDIA MANAGER (Surgical Execution)
 # ==========================================
@@ -1842,35 +1676,9 @@ def bulk_media_upload(request):
 
     # --- AJAX CHUNK HANDLER (POST) ---
     if request.method == 'POST' and request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        images = request.FILES.getlist('images')
-        upload_type = request.POST.get('upload_type', 'condition')
-        chunk_results = []
-
-        for image in images:
-            filename = image.name
-            match = re.search(r'(\d+)', filename)
-
-            if not match:
-                chunk_results.append({'file': filename, 'status': 'Error', 'msg': 'No numeric PAR found in name.'})
-                continue
-
-            par_digits = match.group(1)
-            asset = Asset.objects.filter(property_number__icontains=par_digits).first()
-
-            if asset:
-                try:
-                    if upload_type == 'serials':
-                        asset.image_serial = image
-                    else:
-                        asset.image_condition = image
-                    asset.save()
-                    chunk_results.append({'file': filename, 'status': 'Success', 'asset': asset.property_number})
-                except Exception as e:
-                    chunk_results.append({'file': filename, 'status': 'Error', 'msg': str(e)})
-            else:
-                chunk_results.append({'file': filename, 'status': 'Not Found', 'msg': f'No Asset matches digits: {par_digits}'})
-
-        return JsonResponse({'results': chunk_results})
+        from .media_linker import AssetImageLinker
+        results, summary = AssetImageLinker.link(request.FILES.getlist('images'), request.POST.get('upload_type', 'condition'))
+        return JsonResponse({'results': results, 'summary': summary})
 
     # --- KPI METRICS (GET) ---
     total_assets = Asset.objects.count()
@@ -1,10 +1,17 @@
 from django.utils import timezone
 from django.core.exceptions import PermissionDenied, ValidationError
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction as db_transaction
 from .models import AssetBatch, InspectionRequest, AssetTransferRequest, Asset
-from workflow.models import Workflow, WorkflowStep, Persona, WorkflowMovementLog
-from .services import PARGenerator, ICSGenerator, PTRGenerator
+from workflow.models import Persona, WorkflowMovementLog
+from workflow.personas import PersonaResolver
+from workflow.graph import WorkflowGraphCache
+from .documents import DocumentJobQueue
+from .sequences import SequenceAllocator
+from .snapshots import AssetKpiTracker
+from .search import AssetSearch
+from .outbox import NotificationDispatcher
+from .media_store import MediaStore
+from .media_linker import AssetImageLinker
 
 class WorkflowEngine:
     """
@@ -16,12 +23,12 @@ class WorkflowEngine:
     def get_workflow_steps(transaction):
         """Returns rich step objects for the transaction's workflow (for UI Vertical Timeline)."""
         steps = None
-        if transaction.current_step:
-            steps = WorkflowStep.objects.filter(phase__workflow=transaction.current_step.phase.workflow).order_by('order')
+        current_node = WorkflowGraphCache.node(transaction.current_step_id)
+        if current_node:
+            steps = WorkflowGraphCache.graph_of(current_node).nodes
         else:
             # System Fix: Fallback for finalized transactions whose active step was natively cleared
             from inventory.models import AssetBatch, AssetTransferRequest, InspectionRequest, AssetReturnRequest, AssetLossReport, PropertyClearanceRequest
-            from workflow.models import WorkflowProcess
             process_code = None
             if isinstance(transaction, AssetBatch): process_code = 'BATCH_ACQUISITION'
             elif isinstance(transaction, AssetTransferRequest): process_code = 'TRANSFER'
@@ -30,18 +37,22 @@ class WorkflowEngine:
             elif isinstance(transaction, AssetLossReport): process_code = 'LOSS_REPORT'
             elif isinstance(transaction, PropertyClearanceRequest): process_code = 'CLEARANCE'
             
-            if process_code:
-                process_obj = WorkflowProcess.objects.filter(code=process_code).first()
-                if process_obj and process_obj.workflows.exists():
-                    steps = process_obj.workflows.first().steps.all().order_by('order')
+            graph = WorkflowGraphCache.for_process(process_code) if process_code else None
+            if graph:
+                steps = graph.nodes
 
         if steps:
-            logs = transaction.movement_logs.all() if hasattr(transaction, 'movement_logs') else []
+            # One query for the whole timeline; logs come newest first, so the first hit per step is its latest completion
+            logs = list(transaction.movement_logs.select_related('user')) if hasattr(transaction, 'movement_logs') else []
+            completed = {}
+            for l in logs:
+                if l.step_id is not None:
+                    completed.setdefault(l.step_id, l)
             timeline = []
             reached_current = False
             
             for step in steps:
-                is_current = getattr(transaction, 'current_step', None) and (transaction.current_step.id == step.id) and transaction.status != 'FINALIZED'
+                is_current = transaction.current_step_id == step.id and transaction.status != 'FINALIZED'
 
                 if is_current:
                     reached_current = True
@@ -57,17 +68,13 @@ class WorkflowEngine:
                     status_class = 'secondary'
                     icon = 'fas fa-circle'
                     
-                # Attempt to find the log entry for this step
-                step_log = None
-                for l in logs:
-                    if step.label == l.status_label or getattr(l, 'action_taken', '').endswith(step.label):
-                        step_log = l
-                        break
+                # Log recorded when this step was completed (WorkflowMovementLog.step)
+                step_log = completed.get(step.id)
 
                 timeline.append({
                     'label': step.label,
-                    'role_expected': step.required_persona_role.name if step.required_persona_role else 'System',
-                    'signatories': list(step.signatory_slots.all().values_list('role__name', flat=True)),
+                    'role_expected': step.required_role_name or 'System',
+                    'signatories': list(step.signatory_role_names),
                     'is_current': is_current,
                     'status_class': status_class,
                     'icon': icon,
@@ -81,7 +88,7 @@ class WorkflowEngine:
                 'is_current': transaction.status == 'FINALIZED',
                 'status_class': 'success' if transaction.status == 'FINALIZED' else 'secondary',
                 'icon': 'fas fa-check-double' if transaction.status == 'FINALIZED' else 'fas fa-flag-checkered',
-                'log': list(logs)[0] if transaction.status == 'FINALIZED' and logs else None, # Latest log usually finalize
+                'log': logs[0] if transaction.status == 'FINALIZED' and logs else None, # Latest log usually finalize
             })
             return timeline
         return []
@@ -90,26 +97,17 @@ class WorkflowEngine:
     def get_allowed_transitions(transaction, user):
         """Returns the permitted next steps for the given transaction and user."""
         allowed_transitions = []
-        current_step = transaction.current_step
+        # Compiled blueprint: neighbours and role ids are in-memory lookups
+        current_step = WorkflowGraphCache.node(transaction.current_step_id)
         if not current_step:
             return allowed_transitions
-            
-        required_role = current_step.required_persona_role
-        signatory_roles = list(current_step.signatory_slots.all().values_list('role', flat=True))
-        
-        has_permission = False
-        if required_role:
-             has_permission = Persona.objects.filter(user=user, role=required_role, is_active=True).exists()
         
-        if not has_permission and signatory_roles:
-             has_permission = Persona.objects.filter(user=user, role__id__in=signatory_roles, is_active=True).exists()
+        # Primary role or any signatory slot role, from the cached persona set
+        has_permission = user.is_superuser or PersonaResolver.for_user(user).has_role(*current_step.role_ids)
 
-        if has_permission or user.is_superuser:
+        if has_permission:
                 # 1. Forward Move (Next Step)
-                next_step = WorkflowStep.objects.filter(
-                    phase__workflow=current_step.phase.workflow,
-                    order__gt=current_step.order
-                ).order_by('order').first()
+                next_step = current_step.next
                 
                 if next_step:
                     allowed_transitions.append({
@@ -128,10 +126,7 @@ class WorkflowEngine:
                     })
 
                 # 2. Backward Move (Return) - Only if not at Step 1
-                prev_step = WorkflowStep.objects.filter(
-                    phase__workflow=current_step.phase.workflow,
-                    order__lt=current_step.order
-                ).order_by('-order').first()
+                prev_step = current_step.prev
 
                 if prev_step:
                     allowed_transitions.append({
@@ -144,7 +139,7 @@ class WorkflowEngine:
 
                 # 3. Terminal Rejection (Only for certain roles/steps)
                 # Typically SPMO Officers can reject End-User requests
-                if required_role and required_role.code in ['SPMO_AO', 'SPMO_SUPERVISOR', 'SPMO_CHIEF']:
+                if current_step.required_role_code in ['SPMO_AO', 'SPMO_SUPERVISOR', 'SPMO_CHIEF']:
                     allowed_transitions.append({
                         'target': 'REJECT',
                         'action': 'Reject Transaction',
@@ -154,17 +149,73 @@ class WorkflowEngine:
                     })
         return allowed_transitions
 
+    # Rows per INSERT when realizing large acquisition batches
+    REALIZE_CHUNK_SIZE = 500
+
     @staticmethod
-    def _realize_assets(batch):
+    def _realize_assets(batch, bulk=True):
         """
         SOP Implementation: Converts BatchItems into individual Asset records.
         Executed upon Batch Finalization.
+
+        bulk=True reserves all property/item numbers up front and inserts the
+        Assets with chunked bulk_create (a handful of queries per batch).
+        bulk=False keeps the legacy one-create-per-unit path.
         """
         # 1. Prevent double realization
         if batch.generated_assets.exists():
             return
             
-        items = batch.items.all()
+        items = list(batch.items.all())
+        if not bulk:
+            return WorkflowEngine._realize_assets_per_unit(batch, items)
+
+        total_units = sum(item.quantity for item in items)
+        if not total_units:
+            return []
+
+        with db_transaction.atomic():
+            # 2. One counter round trip per series instead of two lookups per unit
+            property_numbers = SequenceAllocator.reserve_block("PAR", Asset, "property_number", use_year=False, count=total_units)
+            item_ids = SequenceAllocator.reserve_block("AST", Asset, "item_id", use_year=True, count=total_units)
+
+            # 3. Build every Asset row in memory
+            assets_created = []
+            date_acquired = batch.created_at.date()
+            department = batch.requesting_unit_obj
+            department_name = department.name if department else ''
+            for item in items:
+                for i in range(item.quantity):
+                    n = len(assets_created)
+                    asset = Asset(
+                        property_number=property_numbers[n],
+                        item_id=item_ids[n],
+                        acquisition_batch=batch,
+                        name=item.description[:255],
+                        acquisition_cost=item.amount,
+                        date_acquired=date_acquired,
+                        department=department,
+                        assigned_custodian=item.assigned_custodian,
+                        asset_class='OTHER',
+                        asset_nature='OTHER',
+                        status='SERVICEABLE'
+                    )
+                    # bulk_create bypasses save(), so fill the derived columns here
+                    asset.search_document = AssetSearch.document_for(asset, department_name)
+                    asset.property_digits = AssetImageLinker.normalize(asset.property_number)
+                    assets_created.append(asset)
+
+            # 4. Chunked insert
+            Asset.objects.bulk_create(assets_created, batch_size=WorkflowEngine.REALIZE_CHUNK_SIZE)
+
+            # 5. bulk_create skips post_save, so fold the new rows into the dashboard snapshot here
+            AssetKpiTracker.assets_bulk_created(assets_created)
+
+        return assets_created
+
+    @staticmethod
+    def _realize_assets_per_unit(batch, items):
+        """Legacy path: one Asset.objects.create (and its sequence lookups) per physical unit."""
         assets_created = []
         
         for item in items:
@@ -189,29 +240,17 @@ class WorkflowEngine:
     @staticmethod
     def transition(transaction, target_step_id_or_action, user, remarks='', **kwargs):
         """Executes a specific workflow transition, strictly enforcing DB rules."""
-        current_step = transaction.current_step
+        current_step = WorkflowGraphCache.node(transaction.current_step_id)
         if not current_step:
             raise ValidationError("Transaction has no current workflow step.")
             
         # 1. Enforce Role Permissions & Signatory Slots
-        required_role = current_step.required_persona_role
-        signatory_roles = list(current_step.signatory_slots.all().values_list('role', flat=True))
-        
-        active_persona = None
-        
-        # Check primary role
-        if required_role:
-            active_persona = Persona.objects.filter(user=user, role=required_role, is_active=True).first()
-            
-        # Fallback to signatory slots if primary is not met
-        if not active_persona and signatory_roles:
-            active_persona = Persona.objects.filter(user=user, role__id__in=signatory_roles, is_active=True).first()
+        # Check primary role, then fall back to signatory slots (single persona check)
+        active_persona = PersonaResolver.for_user(user).persona_for(*current_step.role_ids)
 
         if not active_persona and not user.is_superuser:
-            role_names = [required_role.name] if required_role else []
-            if signatory_roles:
-                from workflow.models import Role
-                role_names += list(Role.objects.filter(id__in=signatory_roles).values_list('name', flat=True))
+            role_names = [current_step.required_role_name] if current_step.required_role_name else []
+            role_names += list(current_step.signatory_role_names)
             
             raise PermissionDenied(f"User {user.username} lacks required signatory role(s): {', '.join(set(role_names))}")
         
@@ -226,15 +265,18 @@ class WorkflowEngine:
             action_verb = "Rejected"
         else:
             try:
-                next_step = WorkflowStep.objects.get(id=int(target_step_id_or_action))
-                target_label = next_step.label
-                # Determine if it was a return or advance
-                if next_step.order < current_step.order:
-                    action_verb = "Returned to"
-                else:
-                    action_verb = "Advanced to"
-            except (ValueError, TypeError, WorkflowStep.DoesNotExist):
+                target_node = WorkflowGraphCache.node(int(target_step_id_or_action))
+            except (ValueError, TypeError):
+                target_node = None
+            if target_node is None:
                 raise ValidationError("Invalid transition target ID.")
+            next_step = target_node.step
+            target_label = next_step.label
+            # Determine if it was a return or advance
+            if next_step.order < current_step.order:
+                action_verb = "Returned to"
+            else:
+                action_verb = "Advanced to"
                 
         # 3. Update Transaction States
         transaction.current_step = next_step
@@ -266,15 +308,12 @@ class WorkflowEngine:
         if manual_sig:
             sig_snapshot = manual_sig
         # 2. Fallback to Persona/Role-based reusable signature if the user has one (SSPMO)
+        # Stored signatures are content-addressed: the snapshot references the same blob (no copy)
         elif active_persona and active_persona.signature_image:
-             from django.core.files.base import ContentFile
-             sig_file = active_persona.signature_image
-             sig_snapshot = ContentFile(sig_file.read(), name=f"sig_{user.username}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.png")
+             sig_snapshot = MediaStore.snapshot(active_persona.signature_image, f"sig_{user.username}.png")
         # 3. Last fallback: User profile legacy signature (if any)
         elif hasattr(user, 'signature') and user.signature.signature_image:
-             from django.core.files.base import ContentFile
-             sig_file = user.signature.signature_image
-             sig_snapshot = ContentFile(sig_file.read(), name=f"sig_{user.username}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.png")
+             sig_snapshot = MediaStore.snapshot(user.signature.signature_image, f"sig_{user.username}.png")
         
         log_kwargs = {
             'user': user,
@@ -283,6 +322,7 @@ class WorkflowEngine:
             'unit_name': unit_label,
             'status_label': target_label,
             'action_taken': f"{action_verb} {target_label}",
+            'step': current_step.step,  # The step this movement completed (drives the timeline)
             'remarks': remarks,
             'signature_snapshot': sig_snapshot
         }
@@ -300,28 +340,22 @@ class WorkflowEngine:
         elif isinstance(transaction, PropertyClearanceRequest):
             log_kwargs['clearance'] = transaction
             
-        WorkflowMovementLog.objects.create(**log_kwargs)
+        with db_transaction.atomic():
+            WorkflowMovementLog.objects.create(**log_kwargs)
+            # Queue the e-mail to the next role in the same transaction as the log (sent by dispatch_notifications)
+            if next_step:
+                WorkflowEngine._queue_notification_to_next_role(transaction, next_step)
 
-        # 5. NEW: Trigger document generation AFTER the log entry is created
-        # This ensures the final signature snapshot is available to the Generator
+        # 5. Queue document generation AFTER the log entry is created
+        # (the worker then sees the final signature snapshot; rendering runs in process_document_jobs)
         if target_step_id_or_action == 'FINALIZE':
-             if isinstance(transaction, AssetBatch):
-                 if transaction.total_value >= 50000:
-                     PARGenerator.finalize_par(transaction)
-                 else:
-                     ICSGenerator.finalize_ics(transaction)
-             elif isinstance(transaction, AssetTransferRequest):
-                 PTRGenerator.finalize_ptr(transaction)
-        
-        # Trigger Email Notification to the next role
-        if next_step:
-            WorkflowEngine._send_notification_to_next_role(transaction, next_step)
+             DocumentJobQueue.enqueue(transaction)
         
         return transaction
 
     @staticmethod
-    def _send_notification_to_next_role(transaction, next_step):
-        """Dispatches an email to all active Personas who match the required role for the next step."""
+    def _queue_notification_to_next_role(transaction, next_step):
+        """Queues an email to all active Personas who match the required role for the next step (outbox)."""
         if not next_step.required_persona_role:
             return
             
@@ -329,42 +363,32 @@ class WorkflowEngine:
         
         # Determine strict departmental scope if the transaction has a requesting_unit
         # For Phase 2 baseline, we broadcast to the Role. In production, we'd filter by unit as well.
-        target_personas = Persona.objects.filter(role=required_role, is_active=True).select_related('user')
-        
-        recipient_emails = [p.user.email for p in target_personas if p.user.email]
+        recipient_emails = Persona.objects.filter(
+            role=required_role, is_active=True
+        ).exclude(user__email='').values_list('user__email', flat=True)
         
-        if recipient_emails:
-            subject = f"GAMIT Action Required: {next_step.label}"
-            t_id = getattr(transaction, 'transaction_id', 'Transaction')
-            message = (
-                f"Hello,\n\n"
-                f"A transaction requires your attention as a {required_role.name}.\n"
-                f"Transaction ID: {t_id}\n"
-                f"Current Status: {next_step.label}\n\n"
-                f"Please log in to GAMIT to review and process this document."
-            )
-            try:
-                # Use fail_silently=True to prevent SMTP delays from crashing the web request
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@spmo.edu.ph'),
-                    recipient_list=list(set(recipient_emails)), 
-                    fail_silently=True
-                )
-            except Exception as e:
-                print(f"SMTP Notification Error: {e}")
+        subject = f"GAMIT Action Required: {next_step.label}"
+        t_id = getattr(transaction, 'transaction_id', 'Transaction')
+        message = (
+            f"Hello,\n\n"
+            f"A transaction requires your attention as a {required_role.name}.\n"
+            f"Transaction ID: {t_id}\n"
+            f"Current Status: {next_step.label}\n\n"
+            f"Please log in to GAMIT to review and process this document."
+        )
+        # A transaction bounced back to the same step before the queue drains is notified once
+        NotificationDispatcher.enqueue(recipient_emails, subject, message, dedup_key=f"{t_id}:step:{next_step.id}")
 
     @staticmethod
     def initialize_transaction(transaction, workflow_process_code):
         """Used during transaction creation to securely hook it into Step 1 of a specific workflow."""
-        try:
-            workflow = Workflow.objects.get(process__code=workflow_process_code)
-            first_step = WorkflowStep.objects.filter(phase__workflow=workflow).order_by('order').first()
-            if first_step:
-                transaction.current_step = first_step
-                if hasattr(transaction, 'status'):
-                    transaction.status = first_step.label
-                transaction.save()
-        except Workflow.DoesNotExist:
+        graph = WorkflowGraphCache.for_process(workflow_process_code)
+        if graph is None:
             print(f"Warning: Workflow process code {workflow_process_code} not seeded.")
+            return
+        if graph.first:
+            first_step = graph.first.step
+            transaction.current_step = first_step
+            if hasattr(transaction, 'status'):
+                transaction.status = first_step.label
+            transaction.save()
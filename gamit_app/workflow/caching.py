@@ -0,0 +1,17 @@
+from django.conf import settings
+
+# Backends whose entries live in one process only (invalidations do not reach other workers)
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared(alias='default'):
+    """True when every worker reads the same cache (Redis, Memcached, database, file)."""
+    return settings.CACHES.get(alias, {}).get('BACKEND') not in PROCESS_LOCAL_BACKENDS
+
+
+def cache_timeout(shared_timeout, local_timeout):
+    """TTL for entries that other workers invalidate: short when the cache is per-process."""
+    return shared_timeout if cache_is_shared() else local_timeout
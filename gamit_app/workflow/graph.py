@@ -0,0 +1,135 @@
+import uuid
+from django.core.cache import cache
+from .caching import cache_timeout
+
+
+class StepNode:
+    """One compiled WorkflowStep: the step itself plus its neighbours and role ids."""
+
+    __slots__ = (
+        'step', 'id', 'label', 'order', 'workflow_id',
+        'required_role_id', 'required_role_code', 'required_role_name',
+        'signatory_role_ids', 'signatory_role_names', 'next', 'prev',
+    )
+
+    def __init__(self, step, signatory_slots):
+        role = step.required_persona_role
+        self.step = step
+        self.id = step.id
+        self.label = step.label
+        self.order = step.order
+        self.workflow_id = step.phase.workflow_id
+        self.required_role_id = step.required_persona_role_id
+        self.required_role_code = role.code if role else None
+        self.required_role_name = role.name if role else None
+        self.signatory_role_ids = tuple(slot.role_id for slot in signatory_slots)
+        self.signatory_role_names = tuple(slot.role.name for slot in signatory_slots)
+        self.next = None
+        self.prev = None
+
+    @property
+    def role_ids(self):
+        """Every role allowed to act on this step (primary role first)."""
+        return (self.required_role_id,) + self.signatory_role_ids
+
+
+class WorkflowGraph:
+    """Ordered steps of one Workflow with next/prev pointers (same ordering rules as the old step queries)."""
+
+    def __init__(self, workflow, nodes):
+        self.workflow_id = workflow.id
+        self.process_code = workflow.process.code
+        self.nodes = sorted(nodes, key=lambda n: (n.order, n.id))
+        for node in self.nodes:
+            # Next = first step with a strictly greater order, prev = last with a strictly smaller one
+            node.next = next((n for n in self.nodes if n.order > node.order), None)
+            node.prev = next((n for n in reversed(self.nodes) if n.order < node.order), None)
+
+    @property
+    def first(self):
+        return self.nodes[0] if self.nodes else None
+
+
+class WorkflowGraphCache:
+    """
+    Compiled, in-memory copy of every workflow blueprint
+    (Workflow -> WorkflowPhase -> WorkflowStep -> SignatorySlot).
+    Each process keeps the compiled graphs in memory next to the version
+    token they were built for; any blueprint write (see inventory.signals)
+    replaces the token, so every process reading that cache recompiles on its
+    next lookup. A lookup therefore costs one cache read and a few dictionary hits.
+    With a shared cache (REDIS_URL) that is every worker. With the per-process
+    LocMem default the token itself expires after LOCAL_TIMEOUT seconds, which
+    bounds how long another worker serves a graph compiled before an edit.
+    """
+
+    VERSION_KEY = 'workflow:graph:version'
+    LOCAL_TIMEOUT = 60
+
+    _compiled = (None, {}, {}, {})  # (version token, {process code: graph}, {step id: node}, {workflow id: graph})
+
+    @staticmethod
+    def node(step_id):
+        """Compiled node for a step id, or None."""
+        if not step_id:
+            return None
+        return WorkflowGraphCache._load()[2].get(int(step_id))
+
+    @staticmethod
+    def for_process(process_code):
+        """Graph of the workflow serving an ActionProcess code, or None."""
+        return WorkflowGraphCache._load()[1].get(process_code)
+
+    @staticmethod
+    def graph_of(node):
+        """Graph containing a compiled node."""
+        return WorkflowGraphCache._load()[3].get(node.workflow_id)
+
+    @staticmethod
+    def version():
+        token = cache.get(WorkflowGraphCache.VERSION_KEY)
+        if token is None:
+            cache.add(WorkflowGraphCache.VERSION_KEY, uuid.uuid4().hex, WorkflowGraphCache.timeout())
+            token = cache.get(WorkflowGraphCache.VERSION_KEY)
+        return token
+
+    @staticmethod
+    def bump():
+        """Invalidates the compiled graphs in every process sharing the cache (blueprint writes)."""
+        cache.set(WorkflowGraphCache.VERSION_KEY, uuid.uuid4().hex, WorkflowGraphCache.timeout())
+
+    @staticmethod
+    def timeout():
+        # A shared token never needs to expire; a per-process one must, or other workers never see edits
+        return cache_timeout(None, WorkflowGraphCache.LOCAL_TIMEOUT)
+
+    @staticmethod
+    def _load():
+        token = WorkflowGraphCache.version()
+        compiled = WorkflowGraphCache._compiled
+        if token is None or compiled[0] != token:
+            compiled = (token,) + WorkflowGraphCache._compile()
+            WorkflowGraphCache._compiled = compiled
+        return compiled
+
+    @staticmethod
+    def _compile():
+        from collections import defaultdict
+        from .models import Workflow, WorkflowStep, SignatorySlot
+
+        slots = defaultdict(list)
+        for slot in SignatorySlot.objects.select_related('role').order_by('rank', 'id'):
+            slots[slot.step_id].append(slot)
+
+        nodes = defaultdict(list)
+        for step in WorkflowStep.objects.select_related('phase__workflow', 'required_persona_role'):
+            nodes[step.phase.workflow_id].append(StepNode(step, slots[step.id]))
+
+        by_process, by_step, by_workflow = {}, {}, {}
+        for workflow in Workflow.objects.select_related('process').order_by('id'):
+            graph = WorkflowGraph(workflow, nodes[workflow.id])
+            by_process.setdefault(graph.process_code, graph)
+            by_workflow[workflow.id] = graph
+            for node in graph.nodes:
+                by_step[node.id] = node
+        return by_process, by_step, by_workflow
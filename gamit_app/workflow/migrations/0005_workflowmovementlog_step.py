@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0004_persona_position_title_persona_signature_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflowmovementlog',
+            name='step',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movement_logs', to='workflow.workflowstep'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:03
+
+import inventory.media_store
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0005_workflowmovementlog_step'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='persona',
+            name='signature_image',
+            field=models.ImageField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='signatures/personas/', verbose_name='Digital Signature'),
+        ),
+        migrations.AlterField(
+            model_name='workflowmovementlog',
+            name='signature_snapshot',
+            field=models.ImageField(blank=True, null=True, storage=inventory.media_store.content_store, upload_to='signatures/snapshots/'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from inventory.media_store import content_store
 
 # ==========================================
 # 1. CORE PERSONA / ROLES
@@ -19,7 +20,7 @@ class Persona(models.Model):
     is_active = models.BooleanField(default=True)
     
     # Reusable Signature (for SSPMO Staff)
-    signature_image = models.ImageField(upload_to='signatures/personas/', blank=True, null=True, verbose_name="Digital Signature")
+    signature_image = models.ImageField(upload_to='signatures/personas/', storage=content_store, blank=True, null=True, verbose_name="Digital Signature")
     position_title = models.CharField(max_length=150, blank=True, null=True, verbose_name="Official Position Title")
 
     class Meta:
@@ -96,6 +97,9 @@ class WorkflowMovementLog(models.Model):
     loss_report = models.ForeignKey('inventory.AssetLossReport', on_delete=models.CASCADE, null=True, blank=True, related_name='movement_logs')
     clearance = models.ForeignKey('inventory.PropertyClearanceRequest', on_delete=models.CASCADE, null=True, blank=True, related_name='movement_logs')
 
+    # Step the transaction was on when this movement happened (recorded by WorkflowEngine.transition)
+    step = models.ForeignKey(WorkflowStep, on_delete=models.SET_NULL, null=True, blank=True, related_name='movement_logs')
+
     # Actor Context
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     persona = models.ForeignKey(Persona, on_delete=models.SET_NULL, null=True)
@@ -108,7 +112,7 @@ class WorkflowMovementLog(models.Model):
     remarks = models.TextField(blank=True, null=True)
     
     # Signature Snapshot
-    signature_snapshot = models.ImageField(upload_to='signatures/snapshots/', null=True, blank=True)
+    signature_snapshot = models.ImageField(upload_to='signatures/snapshots/', storage=content_store, null=True, blank=True)
     
     timestamp = models.DateTimeField(auto_now_add=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
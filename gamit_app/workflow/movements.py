@@ -0,0 +1,80 @@
+from django.apps import apps as global_apps
+
+
+class MovementStepLinker:
+    """
+    Back-fills WorkflowMovementLog.step (the step a movement completed) for logs
+    written before the engine recorded it. A transaction starts on its workflow's
+    first step and every movement lands on the step named by its status_label,
+    so replaying each transaction's logs oldest-first recovers the step that
+    every movement left. Logs whose previous position cannot be resolved
+    (renamed or deleted steps) are left unlinked.
+    """
+
+    # WorkflowMovementLog FK -> ActionProcess code of its workflow
+    PROCESS_CODES = {
+        'batch': 'BATCH_ACQUISITION',
+        'transfer': 'TRANSFER',
+        'inspection': 'INSPECTION',
+        'return_request': 'RETURN',
+        'loss_report': 'LOSS_REPORT',
+        'clearance': 'CLEARANCE',
+    }
+
+    @staticmethod
+    def backfill(apps=None, chunk_size=1000, dry_run=False):
+        """Links every unlinked log that can be resolved. Returns the number of logs linked."""
+        apps = apps or global_apps
+        log_model = apps.get_model('workflow', 'WorkflowMovementLog')
+        step_lists = MovementStepLinker._process_steps(apps)
+
+        linked = 0
+        pending = []
+        for field, process_code in MovementStepLinker.PROCESS_CODES.items():
+            steps = step_lists.get(process_code)
+            if not steps:
+                continue
+            first_step_id = steps[0][0]
+            by_label = {}
+            for step_id, label in steps:
+                by_label.setdefault(label, step_id)
+
+            current_txn, position = None, None
+            logs = log_model.objects.filter(**{f"{field}__isnull": False}).order_by(
+                f"{field}_id", 'timestamp', 'id'
+            ).values_list('id', f"{field}_id", 'status_label', 'step_id')
+            for log_id, txn_id, status_label, step_id in logs.iterator(chunk_size=chunk_size):
+                if txn_id != current_txn:
+                    current_txn, position = txn_id, first_step_id
+                if step_id is None and position is not None:
+                    pending.append(log_model(id=log_id, step_id=position))
+                # The movement landed on the step named by its status (None once finalized/rejected)
+                position = by_label.get(status_label)
+                if len(pending) >= chunk_size:
+                    linked += MovementStepLinker._flush(log_model, pending, dry_run)
+                    pending = []
+        if pending:
+            linked += MovementStepLinker._flush(log_model, pending, dry_run)
+        return linked
+
+    @staticmethod
+    def _process_steps(apps):
+        """{process code: [(step id, label), ...]} for the first workflow of each process, in step order."""
+        workflow_model = apps.get_model('workflow', 'Workflow')
+        step_model = apps.get_model('workflow', 'WorkflowStep')
+
+        workflows = {}
+        for workflow_id, code in workflow_model.objects.order_by('id').values_list('id', 'process__code'):
+            workflows.setdefault(code, workflow_id)
+        steps = {}
+        for code, workflow_id in workflows.items():
+            steps[code] = list(
+                step_model.objects.filter(phase__workflow_id=workflow_id).order_by('order', 'id').values_list('id', 'label')
+            )
+        return steps
+
+    @staticmethod
+    def _flush(log_model, logs, dry_run):
+        if not dry_run:
+            log_model.objects.bulk_update(logs, ['step'])
+        return len(logs)
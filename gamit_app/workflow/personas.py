@@ -0,0 +1,124 @@
+from django.core.cache import cache
+from .caching import cache_timeout
+
+
+class PersonaSet:
+    """A user's active personas (with role and department loaded) plus their profile role/department."""
+
+    def __init__(self, personas, profile_role=None, profile_department_id=None):
+        self.personas = list(personas)
+        self.profile_role = profile_role
+        self.profile_department_id = profile_department_id
+        self.role_ids = frozenset(p.role_id for p in self.personas)
+        self.role_codes = frozenset(p.role.code for p in self.personas)
+        self.department_ids = frozenset(p.department_id for p in self.personas if p.department_id)
+
+    def has_role(self, *role_ids):
+        return any(role_id in self.role_ids for role_id in role_ids if role_id)
+
+    def has_role_code(self, *codes):
+        return any(code in self.role_codes for code in codes)
+
+    def persona_for(self, *role_ids):
+        """First active persona holding one of `role_ids` (in the given priority order)."""
+        for role_id in role_ids:
+            for persona in self.personas:
+                if persona.role_id == role_id:
+                    return persona
+        return None
+
+
+class PersonaResolver:
+    """
+    Single entry point for "who is this user acting as".
+    Resolves a user's personas once per request (memoized on the user object)
+    and caches the result across requests under a version key; any Persona or
+    Role write bumps the version, profile writes drop just that user's entry.
+    Those invalidations only reach the processes sharing the cache: with the
+    per-process LocMem default, other workers keep their entry until it expires,
+    so entries there live LOCAL_TIMEOUT seconds (they drive authorization).
+    Configure a shared cache (REDIS_URL) when running several workers.
+    """
+
+    TIMEOUT = 60 * 60
+    LOCAL_TIMEOUT = 30
+    VERSION_KEY = 'personas:version'
+    USER_KEY = 'personas:v{}:user:{}'
+    DEMO_KEY = 'personas:v{}:demo:{}'
+    ROLES_KEY = 'personas:v{}:roles'
+    MEMO_ATTR = '_persona_set'
+
+    @staticmethod
+    def for_user(user):
+        if not getattr(user, 'is_authenticated', False):
+            return PersonaSet([])
+        memo = getattr(user, PersonaResolver.MEMO_ATTR, None)
+        if memo is not None:
+            return memo
+
+        key = PersonaResolver.USER_KEY.format(PersonaResolver.version(), user.pk)
+        resolved = cache.get(key)
+        if resolved is None:
+            resolved = PersonaResolver._load(user)
+            cache.set(key, resolved, PersonaResolver.timeout())
+        setattr(user, PersonaResolver.MEMO_ATTR, resolved)
+        return resolved
+
+    @staticmethod
+    def demo_persona(role_code):
+        """Persona impersonated by Presentation Mode for `role_code` (user/role/department loaded), or None."""
+        from .models import Persona
+
+        key = PersonaResolver.DEMO_KEY.format(PersonaResolver.version(), role_code)
+        cached = cache.get(key)
+        if cached is None:
+            persona = Persona.objects.select_related('user', 'role', 'department').filter(
+                role__code=role_code, is_active=True
+            ).first()
+            cached = (persona,)  # Tuple so "no persona" is cacheable too
+            cache.set(key, cached, PersonaResolver.timeout())
+        return cached[0]
+
+    @staticmethod
+    def all_roles():
+        from .models import Role
+
+        key = PersonaResolver.ROLES_KEY.format(PersonaResolver.version())
+        roles = cache.get(key)
+        if roles is None:
+            roles = list(Role.objects.all())
+            cache.set(key, roles, PersonaResolver.timeout())
+        return roles
+
+    @staticmethod
+    def timeout():
+        return cache_timeout(PersonaResolver.TIMEOUT, PersonaResolver.LOCAL_TIMEOUT)
+
+    @staticmethod
+    def version():
+        version = cache.get(PersonaResolver.VERSION_KEY)
+        if version is None:
+            cache.add(PersonaResolver.VERSION_KEY, 1, None)
+            version = cache.get(PersonaResolver.VERSION_KEY, 1)
+        return version
+
+    @staticmethod
+    def bump():
+        """Invalidates every cached resolution (Persona / Role writes)."""
+        try:
+            cache.incr(PersonaResolver.VERSION_KEY)
+        except ValueError:
+            cache.add(PersonaResolver.VERSION_KEY, 2, None)
+
+    @staticmethod
+    def forget_user(user_id):
+        cache.delete(PersonaResolver.USER_KEY.format(PersonaResolver.version(), user_id))
+
+    @staticmethod
+    def _load(user):
+        from .models import Persona
+        from inventory.models import UserProfile
+
+        personas = Persona.objects.select_related('role', 'department').filter(user=user, is_active=True).order_by('id')
+        profile = UserProfile.objects.filter(user=user).values('role', 'department_id').first() or {}
+        return PersonaSet(personas, profile.get('role'), profile.get('department_id'))
@@ -1,3 +1,121 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from .models import Role, Persona, ActionProcess, Workflow, WorkflowPhase, WorkflowStep, SignatorySlot
+from .personas import PersonaResolver
+from .graph import WorkflowGraphCache
 
-# Create your tests here.
+SHARED_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379'}}
+
+
+class PersonaResolverTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.chief = Role.objects.create(name='SPMO Chief', code='SPMO_CHIEF')
+        self.user = User.objects.create_user(username='chief', password='password123')
+        Persona.objects.create(user=self.user, role=self.chief)
+
+    def fresh_user(self):
+        # A new request gets a new user object (no per-request memo)
+        return User.objects.get(pk=self.user.pk)
+
+    def test_resolves_once_per_request_and_caches_across_requests(self):
+        user = self.fresh_user()
+        with self.assertNumQueries(2):
+            self.assertTrue(PersonaResolver.for_user(user).has_role_code('SPMO_CHIEF'))
+        next_request_user = self.fresh_user()
+        with self.assertNumQueries(0):
+            PersonaResolver.for_user(user)
+            self.assertEqual(PersonaResolver.for_user(next_request_user).role_ids, {self.chief.id})
+
+    def test_persona_and_role_writes_invalidate(self):
+        self.assertTrue(PersonaResolver.for_user(self.fresh_user()).has_role(self.chief.id))
+        Persona.objects.filter(user=self.user).update(is_active=False)
+        Persona.objects.get(user=self.user).save()
+        self.assertFalse(PersonaResolver.for_user(self.fresh_user()).has_role(self.chief.id))
+
+        self.assertEqual(PersonaResolver.demo_persona('SPMO_CHIEF'), None)
+        self.chief.name = 'Chief, SPMO'
+        self.chief.save()
+        self.assertEqual([r.name for r in PersonaResolver.all_roles()], ['Chief, SPMO'])
+
+    def test_short_ttl_without_a_shared_cache(self):
+        self.assertEqual(PersonaResolver.timeout(), PersonaResolver.LOCAL_TIMEOUT)
+        with override_settings(CACHES=SHARED_CACHES):
+            self.assertEqual(PersonaResolver.timeout(), PersonaResolver.TIMEOUT)
+
+    def test_suite_nav_flag_uses_resolver(self):
+        self.client.login(username='chief', password='password123')
+        response = self.client.get(reverse('dashboard'))
+        self.assertTrue(response.context['can_view_activity_log'])
+
+
+class WorkflowGraphCacheTests(TestCase):
+    def setUp(self):
+        from datetime import date
+        from inventory.models import Asset, AssetTransferRequest
+
+        cache.clear()
+        self.ao = Role.objects.create(name='Administrative Officer', code='SPMO_AO')
+        self.chief = Role.objects.create(name='SPMO Chief', code='SPMO_CHIEF')
+        workflow = Workflow.objects.create(name='Transfer', process=ActionProcess.objects.create(name='Transfer', code='TRANSFER'))
+        phase = WorkflowPhase.objects.create(workflow=workflow, name='Review')
+        self.review = WorkflowStep.objects.create(phase=phase, label='For Review', order=10, required_persona_role=self.ao)
+        self.approval = WorkflowStep.objects.create(phase=phase, label='For Approval', order=20, required_persona_role=self.chief)
+        SignatorySlot.objects.create(step=self.approval, role=self.ao, label='Noted By')
+
+        self.officer = User.objects.create_user(username='officer', password='password123')
+        Persona.objects.create(user=self.officer, role=self.ao)
+        admin = User.objects.create_superuser(username='admin', password='password123')
+        asset = Asset.objects.create(property_number='PAR-000321', name='Desk', date_acquired=date(2023, 1, 1))
+        self.transfer = AssetTransferRequest.objects.create(requestor=admin, asset=asset, current_step=self.approval)
+
+    def test_token_expires_without_a_shared_cache(self):
+        self.assertEqual(WorkflowGraphCache.timeout(), WorkflowGraphCache.LOCAL_TIMEOUT)
+        with override_settings(CACHES=SHARED_CACHES):
+            self.assertIsNone(WorkflowGraphCache.timeout())
+
+    def test_graph_links_steps_and_roles(self):
+        graph = WorkflowGraphCache.for_process('TRANSFER')
+        self.assertEqual([n.label for n in graph.nodes], ['For Review', 'For Approval'])
+        node = WorkflowGraphCache.node(self.approval.id)
+        self.assertEqual((node.prev.id, node.next), (self.review.id, None))
+        self.assertEqual(node.role_ids, (self.chief.id, self.ao.id))
+
+    def test_transitions_use_compiled_graph_and_follow_edits(self):
+        from inventory.workflow import WorkflowEngine
+
+        PersonaResolver.for_user(self.officer)
+        WorkflowGraphCache.node(self.approval.id)
+        with self.assertNumQueries(0):
+            actions = WorkflowEngine.get_allowed_transitions(self.transfer, self.officer)
+        self.assertEqual([a['target'] for a in actions], ['FINALIZE', str(self.review.id), 'REJECT'])
+
+        # Admin edits (new step, removed signatory) recompile the graph
+        final = WorkflowStep.objects.create(phase=self.review.phase, label='For Release', order=30)
+        SignatorySlot.objects.filter(step=self.approval).delete()
+        self.assertEqual(WorkflowGraphCache.node(self.approval.id).next.id, final.id)
+        self.assertEqual(WorkflowEngine.get_allowed_transitions(self.transfer, self.officer), [])
+
+    def test_movements_record_completed_step_for_timeline(self):
+        from inventory.workflow import WorkflowEngine
+        from .models import WorkflowMovementLog
+        from .movements import MovementStepLinker
+
+        self.transfer.current_step = self.review
+        self.transfer.save()
+        WorkflowEngine.transition(self.transfer, self.approval.id, self.officer)
+        log = WorkflowMovementLog.objects.get(transfer=self.transfer)
+        self.assertEqual(log.step, self.review)
+
+        WorkflowGraphCache.node(self.review.id)
+        with self.assertNumQueries(1):
+            timeline = WorkflowEngine.get_workflow_steps(self.transfer)
+        self.assertEqual([(t['label'], t['log']) for t in timeline[:2]], [('For Review', log), ('For Approval', None)])
+
+        # Legacy rows (no step) are relinked by replaying the transaction's history
+        WorkflowMovementLog.objects.update(step=None)
+        self.assertEqual(MovementStepLinker.backfill(), 1)
+        log.refresh_from_db()
+        self.assertEqual(log.step, self.review)
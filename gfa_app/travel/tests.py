@@ -34,3 +34,118 @@ class TravelBookingRenderingTest(TestCase):
             self.fail("Found raw template variable '{{ form.full_name }}' in response!")
             
         print("\n✅ Internal Check Passed: Form renders <input> tags correctly.")
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Per-view query ceilings that do not depend on the amount of data.
+    Every page is rendered after seeding `rows` bookings, trips, credit logs
+    and settlements and again after growing the data to three times that:
+    both renders must stay under the view's budget and the larger dataset may
+    not add queries (N+1). QUERY_BUDGET_ROWS scales the dataset; the per-view
+    query count and DB time are printed at the end of the run.
+    """
+
+    BUDGETS = {
+        'index': 8, 'gfa_dashboard': 16, 'gfa_transactions': 8, 'credit_log_list': 7,
+        'settlement_list': 7, 'booking_summary': 11, 'print_requisition': 7,
+    }
+    report = []
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.report:
+            import sys
+            sys.stderr.write('\n{:<22} {:>6} {:>8} {:>9} {:>7}\n'.format('view', 'rows', 'queries', 'db ms', 'budget'))
+            for name, rows, queries, seconds in cls.report:
+                sys.stderr.write(f'{name:<22} {rows:>6} {queries:>8} {seconds * 1000:>9.1f} {cls.BUDGETS[name]:>7}\n')
+
+    def setUp(self):
+        import os
+        from .models import Department, AirlineCredit, Airport
+
+        self.rows = int(os.environ.get('QUERY_BUDGET_ROWS', '10'))
+        self.admin = User.objects.create_superuser(username='admin', password='password')
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.offices = [Department.objects.create(name=f'Office {n}', code=f'OFF{n}') for n in range(3)]
+        self.airports = [
+            Airport.objects.create(iata_code='MNL', name='Ninoy Aquino', city_name='Manila'),
+            Airport.objects.create(iata_code='CEB', name='Mactan-Cebu', city_name='Cebu'),
+        ]
+        for airline in ('PAL', 'CEB'):
+            AirlineCredit.objects.create(airline=airline, current_balance=1000000, total_credit_limit=1000000)
+        self.seeded = 0
+
+    def _grow(self, count):
+        """Adds `count` bookings, trips (two passengers each), credit logs, settlements and news posts."""
+        from datetime import date, time
+        from .models import BookingRequest, TravelTrip, PassengerRecord, CreditLog, Settlement, NewsPost
+
+        for n in range(self.seeded, self.seeded + count):
+            office = self.offices[n % len(self.offices)]
+            travel = {
+                'created_by': self.admin, 'unit_office': office, 'mother_unit': self.offices[0],
+                'admin_officer': 'AO', 'purpose': 'Conference', 'departure_date': date(2026, 1 + n % 12, 1),
+                'departure_time': time(8), 'airline': ('PAL', 'CEB')[n % 2], 'supervisor_name': 'Chief',
+                'supervisor_email': 'chief@up.edu.ph', 'approval_date': date(2025, 12, 1),
+                'status': ('PENDING', 'BOOKED', 'APPROVED')[n % 3], 'total_amount': 5000,
+            }
+            booking = BookingRequest.objects.create(
+                email='t@up.edu.ph', full_name=f'Traveler {n}', employee_id=str(n), birthday=date(1990, 1, 1),
+                designation='Staff', up_mail='t@up.edu.ph', contact_number='0917', destination_details='Cebu', **travel
+            )
+            trip = TravelTrip.objects.create(
+                full_name=f'Traveler {n}', origin=self.airports[0], destination=self.airports[1],
+                legacy_booking=booking, **travel
+            )
+            PassengerRecord.objects.bulk_create([PassengerRecord(trip=trip, full_name=f'Passenger {n}-{p}') for p in range(2)])
+            settlement = Settlement.objects.create(
+                airline=travel['airline'], amount=5000, reference_no=f'DV-{n}', settlement_date=date(2026, 2, 1),
+                processed_by=self.admin, trip=trip, legacy_booking=booking,
+            )
+            CreditLog.objects.create(
+                trip=trip, airline=travel['airline'], amount=5000, transaction_type='DEDUCTION',
+                balance_after=995000, processed_by=self.admin, settlement=settlement,
+            )
+            NewsPost.objects.create(title=f'Advisory {n}', content='-')
+            if n == 0:
+                self.booking, self.trip = booking, trip
+        self.seeded += count
+
+    def _pages(self):
+        return [
+            ('index', reverse('index')),
+            ('gfa_dashboard', reverse('gfa_dashboard')),
+            ('gfa_transactions', reverse('gfa_transactions')),
+            ('credit_log_list', reverse('credit_log_list')),
+            ('settlement_list', reverse('settlement_list')),
+            ('booking_summary', reverse('booking_summary', args=[self.trip.pk])),
+            ('print_requisition', reverse('print_requisition', args=[self.booking.pk])),
+        ]
+
+    def _measure(self, name, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        # The landing page is public: signed-in users are sent on to the dashboard
+        client = Client() if name == 'index' else self.client
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(ctx.captured_queries), sum(float(q['time']) for q in ctx.captured_queries)
+
+    def test_views_stay_within_query_budget(self):
+        counts = {}
+        for size in (self.rows, self.rows * 3):
+            self._grow(size - self.seeded)
+            for name, url in self._pages():
+                queries, seconds = self._measure(name, url)
+                self.report.append((name, self.seeded, queries, seconds))
+                counts.setdefault(name, []).append(queries)
+
+        for name, (small, large) in counts.items():
+            with self.subTest(view=name):
+                self.assertLessEqual(large, self.BUDGETS[name], f'{name}: {large} queries')
+                self.assertLessEqual(large, small, f'{name}: {small} queries at {self.rows} rows, {large} at {self.rows * 3}')
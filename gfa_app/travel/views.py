@@ -117,22 +117,35 @@ def admin_dashboard(request):
         template_name = 'travel/user_transactions.html'
 
     # 2. Statistics
-    total_reqs = all_transactions.count()
-    pending_reqs = all_transactions.filter(status='PENDING').count()
-    # Multi-Role Pending Stats (Phase 11)
-    pending_admin = all_transactions.filter(status='FOR_ADMIN').count()
-    pending_supervisor = all_transactions.filter(status='FOR_SUPERVISOR').count()
-    pending_chief = all_transactions.filter(status='FOR_CHIEF').count()
-    approved_reqs = all_transactions.filter(status='APPROVED').count()
-    booked_txns = all_transactions.filter(status='BOOKED')
-    total_booked_count = booked_txns.count()
-    total_spent = booked_txns.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-    cancelled_count = all_transactions.filter(status='CANCELLED').count()
-    settled_count = all_transactions.filter(status='SETTLED').count()
-    draft_count = all_transactions.filter(status='DRAFT').count()
+    # One aggregate over the visible transactions instead of a COUNT per status
+    stats = all_transactions.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='PENDING')),
+        # Multi-Role Pending Stats (Phase 11)
+        pending_admin=Count('id', filter=Q(status='FOR_ADMIN')),
+        pending_supervisor=Count('id', filter=Q(status='FOR_SUPERVISOR')),
+        pending_chief=Count('id', filter=Q(status='FOR_CHIEF')),
+        approved=Count('id', filter=Q(status='APPROVED')),
+        booked=Count('id', filter=Q(status='BOOKED')),
+        spent=Sum('total_amount', filter=Q(status='BOOKED')),
+        cancelled=Count('id', filter=Q(status='CANCELLED')),
+        settled=Count('id', filter=Q(status='SETTLED')),
+        draft=Count('id', filter=Q(status='DRAFT')),
+    )
+    total_reqs = stats['total']
+    pending_reqs = stats['pending']
+    pending_admin = stats['pending_admin']
+    pending_supervisor = stats['pending_supervisor']
+    pending_chief = stats['pending_chief']
+    approved_reqs = stats['approved']
+    total_booked_count = stats['booked']
+    total_spent = stats['spent'] or 0
+    cancelled_count = stats['cancelled']
+    settled_count = stats['settled']
+    draft_count = stats['draft']
 
     # 3. Top 5 Recent Transactions
-    recent_transactions = all_transactions[:5]
+    recent_transactions = all_transactions.select_related('unit_office')[:5]
 
     # 4. Airline Balances & Formatting
     pal_display = {'val': '0', 'color': 'text-slate-400', 'raw': 0, 'limit': 0}
@@ -391,7 +404,7 @@ def transaction_list(request):
     if date_f: transactions = transactions.filter(departure_date=date_f)
     
     # Ordering
-    transactions = transactions.order_by('-created_at')
+    transactions = transactions.select_related('unit_office').order_by('-created_at')
     
     # Pagination
     paginator = Paginator(transactions, 20)
@@ -416,7 +429,7 @@ def credit_log_list(request):
     if not request.user.is_staff: return redirect('index')
     
     from .models import CreditLog
-    logs = CreditLog.objects.all().order_by('-timestamp')
+    logs = CreditLog.objects.select_related('processed_by').order_by('-timestamp')
     
     # Filter by Airline
     airline = request.GET.get('airline')
@@ -436,7 +449,7 @@ def credit_log_list(request):
 def settlement_list(request):
     if not request.user.is_staff: return redirect('index')
     from .models import Settlement
-    settlements = Settlement.objects.all().order_by('-settlement_date')
+    settlements = Settlement.objects.select_related('processed_by').order_by('-settlement_date')
     return render(request, 'travel/booking_summary.html', {'booking': booking})
 
 # 10. TRANSACTION LIST (Robustness Phase 1)
@@ -476,7 +489,7 @@ def transaction_list(request):
     if date_f: transactions = transactions.filter(departure_date=date_f)
     
     # Ordering
-    transactions = transactions.order_by('-created_at')
+    transactions = transactions.select_related('unit_office').order_by('-created_at')
     
     # Pagination
     paginator = Paginator(transactions, 20)
@@ -501,7 +514,7 @@ def credit_log_list(request):
     if not request.user.is_staff: return redirect('index')
     
     from .models import CreditLog
-    logs = CreditLog.objects.all().order_by('-timestamp')
+    logs = CreditLog.objects.select_related('processed_by').order_by('-timestamp')
     
     # Filter by Airline
     airline = request.GET.get('airline')
@@ -521,7 +534,7 @@ def credit_log_list(request):
 def settlement_list(request):
     if not request.user.is_staff: return redirect('index')
     from .models import Settlement
-    settlements = Settlement.objects.all().order_by('-settlement_date')
+    settlements = Settlement.objects.select_related('processed_by').order_by('-settlement_date')
     return render(request, 'travel/financial/settlement_list.html', {'settlements': settlements})
 
 @login_required
@@ -0,0 +1,76 @@
+import os
+import sys
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import NewsPost, Activity
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Per-view query ceilings that do not depend on the amount of data.
+    Every page is rendered after seeding `rows` news posts and activities and
+    again after growing the data to three times that: both renders must stay
+    under the view's budget and the larger dataset may not add queries.
+    QUERY_BUDGET_ROWS scales the dataset; the per-view query count and DB time
+    are printed at the end of the run.
+    """
+
+    BUDGETS = {'home': 8, 'news_archive': 9, 'dashboard': 6}
+    report = []
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.report:
+            sys.stderr.write('\n{:<22} {:>6} {:>8} {:>9} {:>7}\n'.format('view', 'rows', 'queries', 'db ms', 'budget'))
+            for name, rows, queries, seconds in cls.report:
+                sys.stderr.write(f'{name:<22} {rows:>6} {queries:>8} {seconds * 1000:>9.1f} {cls.BUDGETS[name]:>7}\n')
+
+    def setUp(self):
+        self.rows = int(os.environ.get('QUERY_BUDGET_ROWS', '10'))
+        self.staff = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        self.client.login(username='staff', password='password123')
+        self.seeded = 0
+
+    def _grow(self, count):
+        now = timezone.now()
+        for n in range(self.seeded, self.seeded + count):
+            NewsPost.objects.create(
+                title=f'Memo {n}', category='MEMO', summary='Summary', created_by=self.staff,
+                date_posted=now - timedelta(days=n * 40),
+            )
+            Activity.objects.create(
+                title=f'Inspection {n}', category='INSP', location='Quezon Hall', created_by=self.staff,
+                start_date=now + timedelta(days=n + 1),
+            )
+        self.seeded += count
+
+    def _measure(self, url):
+        # The portal's cross-app metrics use their own psycopg2 connections, not the Django one
+        with mock.patch('psycopg2.connect', side_effect=OSError('no metrics database in tests')), \
+                CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(ctx.captured_queries), sum(float(q['time']) for q in ctx.captured_queries)
+
+    def test_views_stay_within_query_budget(self):
+        counts = {}
+        for size in (self.rows, self.rows * 3):
+            self._grow(size - self.seeded)
+            for name in self.BUDGETS:
+                queries, seconds = self._measure(reverse(name))
+                self.report.append((name, self.seeded, queries, seconds))
+                counts.setdefault(name, []).append(queries)
+
+        for name, (small, large) in counts.items():
+            with self.subTest(view=name):
+                self.assertLessEqual(large, self.BUDGETS[name], f'{name}: {large} queries')
+                self.assertLessEqual(large, small, f'{name}: {small} queries at {self.rows} rows, {large} at {self.rows * 3}')
@@ -1,3 +1,135 @@
-from django.test import TestCase
+import os
+import sys
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    Category, Supplier, Product, StockBatch, Department, Order, OrderItem, APRRequest, APRItem,
+    Settlement, AnnualProcurementPlan, UserProfile, News, DeliveryRecord,
+)
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Per-view query ceilings that do not depend on the amount of data.
+    Every page is rendered after seeding `rows` products (with batches,
+    allocations, orders, APRs and settlements) and again after growing the
+    data to three times that: both renders must stay under the view's budget
+    and the larger dataset may not add queries (N+1). QUERY_BUDGET_ROWS scales
+    the dataset; the per-view query count and DB time are printed at the end
+    of the run.
+    """
+
+    BUDGETS = {
+        # Client pages (department staff with APP allocations)
+        'home': 19, 'search': 16, 'product_detail': 8, 'my_app_status': 9,
+        # Admin console (SPMO admin officer)
+        'admin_dashboard': 23, 'reports_dashboard': 13, 'transaction_list': 18, 'delivery_dashboard': 13,
+        'inventory_list': 17, 'inventory_detail': 17, 'batch_list': 13, 'apr_list': 13, 'apr_detail': 16,
+        'settlement_list': 16, 'supplier_list': 12, 'category_list': 12, 'unit_list': 13,
+        'broadcast_list': 12,
+    }
+    report = []
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.report:
+            sys.stderr.write('\n{:<22} {:>6} {:>8} {:>9} {:>7}\n'.format('view', 'rows', 'queries', 'db ms', 'budget'))
+            for name, rows, queries, seconds in cls.report:
+                sys.stderr.write(f'{name:<22} {rows:>6} {queries:>8} {seconds * 1000:>9.1f} {cls.BUDGETS[name]:>7}\n')
+
+    def setUp(self):
+        self.rows = int(os.environ.get('QUERY_BUDGET_ROWS', '10'))
+        self.departments = [Department.objects.create(name=f'Office {n}') for n in range(3)]
+        self.category = Category.objects.create(name='Paper')
+        self.supplier = Supplier.objects.create(name='PS-DBM', is_ps_dbm=True)
+
+        self.officer = User.objects.create_user(username='officer', password='password', is_staff=True)
+        UserProfile.objects.create(user=self.officer, department=self.departments[0], role='admin_off')
+        self.staff = User.objects.create_user(username='staff', password='password')
+        UserProfile.objects.create(user=self.staff, department=self.departments[0], role='dept_staff')
+        self.admin_client = Client()
+        self.admin_client.login(username='officer', password='password')
+        self.client.login(username='staff', password='password')
+        self.seeded = 0
+
+    def _grow(self, count):
+        """Adds `count` products with a batch, an allocation, an order, an APR line, a settlement and a news post."""
+        month = timezone.now().strftime('%b').lower()
+        for n in range(self.seeded, self.seeded + count):
+            department = self.departments[n % len(self.departments)]
+            product = Product.objects.create(
+                name=f'Item {n:04d}', item_code=f'IT-{n}', description='Bond paper', price=100,
+                category=self.category, supplier=self.supplier, stock=50, unit='ream',
+            )
+            apr = APRRequest.objects.create(apr_no=f'APR-{n}', supplier=self.supplier, prepared_by=self.officer)
+            APRItem.objects.create(apr=self.apr if n else apr, product=product, quantity_requested=10, unit_price=100)
+            delivery = DeliveryRecord.objects.create(apr=apr, dr_number=f'DR-{n}', received_by=self.officer)
+            StockBatch.objects.create(
+                product=self.product if n else product, quantity_initial=10, quantity_remaining=10,
+                cost_per_item=100, delivery_record=delivery, apr_reference=apr,
+            )
+            AnnualProcurementPlan.objects.create(department=self.departments[0], product=product, year=timezone.now().year, **{month: 5})
+            order = Order.objects.create(
+                user=self.staff, employee_name='Staff', department=department, total_amount=100,
+                status=('pending', 'approved', 'delivered')[n % 3], approved_at=timezone.now(),
+            )
+            OrderItem.objects.create(order=order, product=product, quantity=1, price=100)
+            OrderItem.objects.create(order=order, product=self.product if n else product, quantity=1, price=100)
+            Settlement.objects.create(
+                settlement_type='OUTGOING', order_id=order.pk, reference_no=f'OR-{n}', amount_paid=100,
+                processed_by=self.officer, date_settled=date(2026, 1, 1),
+            )
+            News.objects.create(title=f'Advisory {n}', content='-', author=self.officer)
+            if n == 0:
+                self.product, self.apr = product, apr
+        self.seeded += count
+
+    def _pages(self):
+        return [
+            ('home', self.client, reverse('home')),
+            ('search', self.client, reverse('search') + '?q=Item'),
+            ('product_detail', self.client, reverse('product_detail', args=[self.product.pk])),
+            ('my_app_status', self.client, reverse('my_app_status')),
+            ('admin_dashboard', self.admin_client, reverse('admin_dashboard')),
+            ('reports_dashboard', self.admin_client, reverse('reports_dashboard')),
+            ('transaction_list', self.admin_client, reverse('transaction_list')),
+            ('delivery_dashboard', self.admin_client, reverse('delivery_dashboard')),
+            ('inventory_list', self.admin_client, reverse('inventory_list')),
+            ('inventory_detail', self.admin_client, reverse('inventory_detail', args=[self.product.pk])),
+            ('batch_list', self.admin_client, reverse('batch_list')),
+            ('apr_list', self.admin_client, reverse('apr_list')),
+            ('apr_detail', self.admin_client, reverse('apr_detail', args=[self.apr.pk])),
+            ('settlement_list', self.admin_client, reverse('settlement_list')),
+            ('supplier_list', self.admin_client, reverse('supplier_list')),
+            ('category_list', self.admin_client, reverse('category_list')),
+            ('unit_list', self.admin_client, reverse('unit_list')),
+            ('broadcast_list', self.admin_client, reverse('broadcast_list')),
+        ]
+
+    def _measure(self, client, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(ctx.captured_queries), sum(float(q['time']) for q in ctx.captured_queries)
+
+    def test_views_stay_within_query_budget(self):
+        counts = {}
+        for size in (self.rows, self.rows * 3):
+            self._grow(size - self.seeded)
+            for name, client, url in self._pages():
+                queries, seconds = self._measure(client, url)
+                self.report.append((name, self.seeded, queries, seconds))
+                counts.setdefault(name, []).append(queries)
+
+        for name, (small, large) in counts.items():
+            with self.subTest(view=name):
+                self.assertLessEqual(large, self.BUDGETS[name], f'{name}: {large} queries')
+                self.assertLessEqual(large, small, f'{name}: {small} queries at {self.rows} rows, {large} at {self.rows * 3}')
@@ -23,7 +23,7 @@ def admin_dashboard(request):
     now = timezone.now()
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     
-    orders = Order.objects.all().order_by('-created_at')
+    orders = Order.objects.select_related('department').order_by('-created_at')
     
     # 1. Operational Aggragates
     active_orders_count = orders.filter(status='pending').count()
@@ -118,7 +118,7 @@ def transaction_list(request):
     if request.headers.get('HX-Request') or request.META.get('HTTP_HX_REQUEST'):
         base_template = "supplies/includes/admin_partial.html"
         
-    orders = Order.objects.all().order_by('-created_at')
+    orders = Order.objects.select_related('department').order_by('-created_at')
     departments = Order.objects.values_list('department', flat=True).distinct().order_by('department')
 
     count_pending = orders.filter(status='pending').count()
@@ -338,7 +338,7 @@ def inventory_list(request):
     if request.headers.get('HX-Request') or request.META.get('HTTP_HX_REQUEST'):
         base_template = "supplies/includes/admin_partial.html"
         
-    products = Product.objects.all().order_by('name')
+    products = Product.objects.select_related('category').order_by('name')
     categories = Category.objects.all().order_by('name')
     
     total_products_count = Product.objects.count()
@@ -515,7 +515,7 @@ def batch_list(request):
     if request.headers.get('HX-Request') or request.META.get('HTTP_HX_REQUEST'):
         base_template = "supplies/includes/admin_partial.html"
         
-    batches = StockBatch.objects.all().order_by('-date_received')
+    batches = StockBatch.objects.select_related('product').order_by('-date_received')
     return render(request, 'supplies/batch_list.html', {
         'batches': batches,
         'base_template': base_template
@@ -917,7 +917,7 @@ def broadcast_list(request):
     if request.headers.get('HX-Request') or request.META.get('HTTP_HX_REQUEST'):
         base_template = "supplies/includes/admin_partial.html"
 
-    news_items = News.objects.all().order_by('-date_posted')
+    news_items = News.objects.select_related('author').order_by('-date_posted')
         
     return render(request, 'supplies/broadcast_list.html', {
         'news_items': news_items,
@@ -67,6 +67,34 @@ def check_monthly_allocation(user, product_id, quantity_to_add, current_cart_qty
     except AnnualProcurementPlan.DoesNotExist:
         return False, "Restricted: Your department has no allocation record for this item this year.", 0
 
+def set_personal_stock(user_dept, products, cart):
+    """
+    Sets `personal_stock` (this month's allocation minus consumed and in-cart quantity)
+    on a page of products: one allocation query and one grouped consumption query.
+    """
+    now = timezone.now()
+    month_str = now.strftime('%b').lower()
+    product_ids = [p.id for p in products]
+
+    limits = dict(AnnualProcurementPlan.objects.filter(
+        department=user_dept,
+        product_id__in=product_ids,
+        year=now.year
+    ).values_list('product_id', month_str))
+
+    consumed = dict(OrderItem.objects.filter(
+        order__department=user_dept,
+        order__created_at__year=now.year,
+        order__created_at__month=now.month,
+        product_id__in=product_ids
+    ).exclude(order__status='cancelled').values('product_id').annotate(
+        total=Sum('quantity')
+    ).values_list('product_id', 'total'))
+
+    for p in products:
+        in_cart = cart.get(str(p.id), 0)
+        p.personal_stock = max(0, limits.get(p.id, 0) - (consumed.get(p.id, 0) + in_cart))
+
 def home(request):
     """
     APP Allocation Filtered View
@@ -162,35 +190,7 @@ def home(request):
 
     # --- CALCULATE MONTHLY PERSONAL STOCK (Current Page Only) ---
     if request.user.is_authenticated and user_dept:
-        now = timezone.now()
-        month_str = now.strftime('%b').lower()
-        current_cart = request.session.get('cart', {})
-        current_year = now.year
-        
-        for p in products_paginated:
-            try:
-                plan = AnnualProcurementPlan.objects.get(
-                    department=user_dept, 
-                    product=p, 
-                    year=current_year
-                )
-                limit = getattr(plan, month_str, 0)
-            except AnnualProcurementPlan.DoesNotExist:
-                limit = 0
-            
-            monthly_orders = Order.objects.filter(
-                department=user_dept,
-                created_at__year=current_year,
-                created_at__month=now.month
-            ).exclude(status='cancelled')
-            
-            consumed = OrderItem.objects.filter(
-                order__in=monthly_orders,
-                product=p
-            ).aggregate(total=Sum('quantity'))['total'] or 0
-            
-            in_cart = current_cart.get(str(p.id), 0)
-            p.personal_stock = max(0, limit - (consumed + in_cart))
+        set_personal_stock(user_dept, products_paginated, request.session.get('cart', {}))
     
     # 4. Context Data
     
@@ -274,7 +274,7 @@ def search(request):
                 # Filter search results to only allocated products
                 products = products.filter(id__in=list(allocated_product_ids))
         
-        products = products.order_by('category__name', 'name')
+        products = products.select_related('category', 'supplier').order_by('category__name', 'name')
         total_count_all = products.count()
         
         valid_category_ids = products.values_list('category_id', flat=True).distinct()
@@ -293,41 +293,13 @@ def search(request):
             products_paginated = paginator.page(paginator.num_pages)
 
         if user_dept:
-            now = timezone.now()
-            month_str = now.strftime('%b').lower()
-            current_cart = request.session.get('cart', {})
-            current_year = now.year
-
-            for p in products_paginated:
-                try:
-                    plan = AnnualProcurementPlan.objects.get(
-                        department=user_dept, 
-                        product=p, 
-                        year=current_year
-                    )
-                    limit = getattr(plan, month_str, 0)
-                except AnnualProcurementPlan.DoesNotExist:
-                    limit = 0
-                
-                monthly_orders = Order.objects.filter(
-                    department=user_dept,
-                    created_at__year=current_year,
-                    created_at__month=now.month
-                ).exclude(status='cancelled')
-                
-                consumed = OrderItem.objects.filter(
-                    order__in=monthly_orders,
-                    product=p
-                ).aggregate(total=Sum('quantity'))['total'] or 0
-                
-                in_cart = current_cart.get(str(p.id), 0)
-                p.personal_stock = max(0, limit - (consumed + in_cart))
+            set_personal_stock(user_dept, products_paginated, request.session.get('cart', {}))
         
         # Latest News
         urgent_news = News.objects.filter(is_active=True, urgency='URGENT').order_by('-date_posted')[:3]
     
     return render(request, 'supplies/home.html', {
-        'products': products, 
+        'products': products_paginated, 
         'categories': categories, 
         'search_query': query,
         'total_count_all': total_count_all,